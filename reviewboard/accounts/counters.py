@@ -0,0 +1,398 @@
+"""Maintenance of the review request counters on Local Site profiles.
+
+Each :py:class:`~reviewboard.accounts.models.LocalSiteProfile` keeps counts
+of the user's incoming, outgoing, and starred review requests, shown in the
+Dashboard. These are updated with deltas as review requests are published,
+closed, reopened, and retargeted, and as users join and leave review groups.
+
+If a counter drifts from the true count (for instance, after a failed
+update), :py:func:`check_site_profile_counters` can find and repair it
+without resetting counters, which would force every affected user to
+recompute them on their next page load.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter, defaultdict
+from typing import Callable, Collection, Optional, TYPE_CHECKING
+
+from django.db.models import Q
+from typing_extensions import TypedDict
+
+from reviewboard.reviews.models import ReviewRequest
+
+if TYPE_CHECKING:
+    from reviewboard.accounts.models import LocalSiteProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class CounterCheckStats(TypedDict):
+    """Statistics from checking Local Site profile counters.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of profiles checked.
+    checked: int
+
+    #: The number of counters that didn't match the true count.
+    drifted: int
+
+    #: The ID of the last profile checked, or ``None`` if none were checked.
+    last_pk: Optional[int]
+
+    #: The number of counters repaired.
+    repaired: int
+
+
+def compute_direct_incoming_request_count(
+    profile: LocalSiteProfile,
+) -> int:
+    """Return the number of review requests assigned directly to a user.
+
+    Version Added:
+        8.0
+
+    Args:
+        profile (reviewboard.accounts.models.LocalSiteProfile):
+            The profile to compute the count for.
+
+    Returns:
+        int:
+        The number of open review requests.
+    """
+    if not profile.user_id:
+        return 0
+
+    return ReviewRequest.objects.to_user_directly(
+        profile.user,
+        local_site=profile.local_site).count()
+
+
+def compute_total_incoming_request_count(
+    profile: LocalSiteProfile,
+) -> int:
+    """Return the number of review requests assigned to a user or their groups.
+
+    Version Added:
+        8.0
+
+    Args:
+        profile (reviewboard.accounts.models.LocalSiteProfile):
+            The profile to compute the count for.
+
+    Returns:
+        int:
+        The number of open review requests.
+    """
+    if not profile.user_id:
+        return 0
+
+    return ReviewRequest.objects.to_user(
+        profile.user,
+        local_site=profile.local_site).count()
+
+
+def compute_pending_outgoing_request_count(
+    profile: LocalSiteProfile,
+) -> int:
+    """Return the number of open review requests owned by a user.
+
+    Version Added:
+        8.0
+
+    Args:
+        profile (reviewboard.accounts.models.LocalSiteProfile):
+            The profile to compute the count for.
+
+    Returns:
+        int:
+        The number of open review requests.
+    """
+    if not profile.user_id:
+        return 0
+
+    return ReviewRequest.objects.from_user(
+        profile.user,
+        profile.user,
+        local_site=profile.local_site).count()
+
+
+def compute_total_outgoing_request_count(
+    profile: LocalSiteProfile,
+) -> int:
+    """Return the number of review requests ever owned by a user.
+
+    Version Added:
+        8.0
+
+    Args:
+        profile (reviewboard.accounts.models.LocalSiteProfile):
+            The profile to compute the count for.
+
+    Returns:
+        int:
+        The number of review requests.
+    """
+    if not profile.user_id:
+        return 0
+
+    return ReviewRequest.objects.from_user(
+        profile.user,
+        profile.user,
+        None,
+        local_site=profile.local_site).count()
+
+
+def compute_starred_public_request_count(
+    profile: LocalSiteProfile,
+) -> int:
+    """Return the number of public review requests starred by a user.
+
+    Version Added:
+        8.0
+
+    Args:
+        profile (reviewboard.accounts.models.LocalSiteProfile):
+            The profile to compute the count for.
+
+    Returns:
+        int:
+        The number of review requests.
+    """
+    if not profile.pk:
+        return 0
+
+    return profile.profile.starred_review_requests.public(
+        user=None,
+        local_site=profile.local_site).count()
+
+
+#: The functions computing each counter on a Local Site profile.
+#:
+#: Version Added:
+#:     8.0
+SITE_PROFILE_COUNTERS: dict[str, Callable[[LocalSiteProfile], int]] = {
+    'direct_incoming_request_count': compute_direct_incoming_request_count,
+    'total_incoming_request_count': compute_total_incoming_request_count,
+    'pending_outgoing_request_count': compute_pending_outgoing_request_count,
+    'total_outgoing_request_count': compute_total_outgoing_request_count,
+    'starred_public_request_count': compute_starred_public_request_count,
+}
+
+
+def update_counters_for_group_membership(
+    *,
+    user_ids: Collection[int],
+    group_ids: Collection[int],
+    removed: bool,
+) -> None:
+    """Update incoming counters for users joining or leaving review groups.
+
+    For each user, this counts the open review requests targeting the
+    groups that the user doesn't otherwise see (directly or through another
+    group they're in), and adjusts their total incoming count by that much.
+    As with the full count, review requests from inactive submitters are
+    excluded.
+    Users with the same change share a single ``UPDATE``.
+
+    This must be called after users are added to groups, or before they're
+    removed.
+
+    Version Added:
+        8.0
+
+    Args:
+        user_ids (collection of int):
+            The IDs of the users joining or leaving the groups.
+
+        group_ids (collection of int):
+            The IDs of the groups.
+
+        removed (bool):
+            Whether the users are leaving the groups.
+    """
+    from reviewboard.accounts.models import LocalSiteProfile
+
+    if not user_ids or not group_ids:
+        return
+
+    group_targets = ReviewRequest.target_groups.through.objects
+    people_targets = ReviewRequest.target_people.through.objects
+    targets_q = (
+        Q(group__in=group_ids) &
+        Q(reviewrequest__public=True) &
+        Q(reviewrequest__status=ReviewRequest.PENDING_REVIEW) &
+        Q(reviewrequest__submitter__is_active=True)
+    )
+
+    review_request_local_sites = dict(
+        group_targets
+        .filter(targets_q)
+        .values_list('reviewrequest', 'reviewrequest__local_site')
+    )
+
+    if not review_request_local_sites:
+        return
+
+    review_requests_sq = (
+        group_targets
+        .filter(targets_q)
+        .values('reviewrequest')
+    )
+
+    # Find the review requests that each user still sees without these
+    # groups.
+    still_incoming = set(
+        people_targets
+        .filter(reviewrequest__in=review_requests_sq,
+                user__in=user_ids)
+        .values_list('user', 'reviewrequest')
+    )
+    still_incoming.update(
+        group_targets
+        .filter(reviewrequest__in=review_requests_sq,
+                group__users__in=user_ids)
+        .exclude(group__in=group_ids)
+        .values_list('group__users', 'reviewrequest')
+    )
+
+    user_ids_by_delta: defaultdict[tuple[Optional[int], int], list[int]] = \
+        defaultdict(list)
+
+    for user_id in user_ids:
+        counts = Counter(
+            local_site_id
+            for review_request_id, local_site_id in (
+                review_request_local_sites.items()
+            )
+            if (user_id, review_request_id) not in still_incoming
+        )
+
+        for local_site_id, count in counts.items():
+            user_ids_by_delta[(local_site_id, count)].append(user_id)
+
+    counter = LocalSiteProfile.total_incoming_request_count
+
+    for (local_site_id, count), delta_user_ids in user_ids_by_delta.items():
+        queryset = LocalSiteProfile.objects.filter(user__in=delta_user_ids,
+                                                   local_site=local_site_id)
+
+        if removed:
+            counter.decrement(queryset, count)
+        else:
+            counter.increment(queryset, count)
+
+
+def check_site_profile_counters(
+    *,
+    repair: bool = True,
+    batch_size: int = 100,
+    after_pk: int = 0,
+    max_profiles: Optional[int] = None,
+) -> CounterCheckStats:
+    """Check Local Site profile counters against the true counts.
+
+    Counters that haven't been computed yet are skipped. A drifted counter
+    is only repaired if it hasn't changed since it was checked, so that
+    concurrent updates aren't lost. Anything skipped will be checked again
+    on the next run.
+
+    Version Added:
+        8.0
+
+    Args:
+        repair (bool, optional):
+            Whether to repair drifted counters.
+
+        batch_size (int, optional):
+            The number of profiles to load at a time.
+
+        after_pk (int, optional):
+            Only check profiles with IDs after this one.
+
+        max_profiles (int, optional):
+            The maximum number of profiles to check.
+
+    Returns:
+        CounterCheckStats:
+        Statistics on the check.
+    """
+    from reviewboard.accounts.models import LocalSiteProfile
+
+    stats: CounterCheckStats = {
+        'checked': 0,
+        'drifted': 0,
+        'last_pk': None,
+        'repaired': 0,
+    }
+    field_names = list(SITE_PROFILE_COUNTERS.keys())
+
+    while max_profiles is None or stats['checked'] < max_profiles:
+        limit = batch_size
+
+        if max_profiles is not None:
+            limit = min(limit, max_profiles - stats['checked'])
+
+        # Stored values are read separately from the profiles, since
+        # loading a profile computes any missing counters.
+        stored_values = list(
+            LocalSiteProfile.objects
+            .filter(pk__gt=after_pk)
+            .order_by('pk')
+            .values('pk', *field_names)
+            [:limit]
+        )
+
+        if not stored_values:
+            break
+
+        profiles = (
+            LocalSiteProfile.objects
+            .filter(pk__in=[values['pk'] for values in stored_values])
+            .select_related('local_site', 'profile', 'user')
+            .in_bulk()
+        )
+
+        for values in stored_values:
+            profile = profiles.get(values['pk'])
+
+            if profile is None:
+                # The profile was deleted.
+                continue
+
+            for field_name, compute_count in SITE_PROFILE_COUNTERS.items():
+                old_count = values[field_name]
+
+                if old_count is None:
+                    continue
+
+                count = compute_count(profile)
+
+                if count == old_count:
+                    continue
+
+                stats['drifted'] += 1
+                logger.info('LocalSiteProfile %s has %s=%s, but the true '
+                            'count is %s.',
+                            profile.pk, field_name, old_count, count)
+
+                if repair:
+                    stats['repaired'] += (
+                        LocalSiteProfile.objects
+                        .filter(pk=profile.pk, **{field_name: old_count})
+                        .update(**{field_name: count})
+                    )
+
+        after_pk = stored_values[-1]['pk']
+        stats['checked'] += len(stored_values)
+        stats['last_pk'] = after_pk
+
+    return stats
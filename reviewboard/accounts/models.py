@@ -25,6 +25,13 @@ from djblets.siteconfig.models import SiteConfiguration
 from djblets.util.symbols import UNSET
 from typing_extensions import TypedDict
 
+from reviewboard.accounts.counters import (
+    compute_direct_incoming_request_count,
+    compute_pending_outgoing_request_count,
+    compute_starred_public_request_count,
+    compute_total_incoming_request_count,
+    compute_total_outgoing_request_count,
+    update_counters_for_group_membership)
 from reviewboard.accounts.managers import (LocalSiteProfileManager,
                                            ProfileManager,
                                            ReviewRequestVisitManager,
@@ -1186,34 +1193,19 @@ class LocalSiteProfile(models.Model):
     # and starred (public).
     direct_incoming_request_count = CounterField(
         _('direct incoming review request count'),
-        initializer=lambda p: (
-            ReviewRequest.objects.to_user_directly(
-                p.user, local_site=p.local_site).count()
-            if p.user_id else 0))
+        initializer=compute_direct_incoming_request_count)
     total_incoming_request_count = CounterField(
         _('total incoming review request count'),
-        initializer=lambda p: (
-            ReviewRequest.objects.to_user(
-                p.user, local_site=p.local_site).count()
-            if p.user_id else 0))
+        initializer=compute_total_incoming_request_count)
     pending_outgoing_request_count = CounterField(
         _('pending outgoing review request count'),
-        initializer=lambda p: (
-            ReviewRequest.objects.from_user(
-                p.user, p.user, local_site=p.local_site).count()
-            if p.user_id else 0))
+        initializer=compute_pending_outgoing_request_count)
     total_outgoing_request_count = CounterField(
         _('total outgoing review request count'),
-        initializer=lambda p: (
-            ReviewRequest.objects.from_user(
-                p.user, p.user, None, local_site=p.local_site).count()
-            if p.user_id else 0))
+        initializer=compute_total_outgoing_request_count)
     starred_public_request_count = CounterField(
         _('starred public review request count'),
-        initializer=lambda p: (
-            p.profile.starred_review_requests.public(
-                user=None, local_site=p.local_site).count()
-            if p.pk else 0))
+        initializer=compute_starred_public_request_count)
 
     objects: ClassVar[LocalSiteProfileManager] = LocalSiteProfileManager()
 
@@ -1808,47 +1800,77 @@ def _on_group_user_membership_changed(instance, action, pk_set, reverse,
                                       **kwargs):
     """Handler for when a review group's membership has changed.
 
-    When a user is added to or removed from a review group, their
-    :py:attr:`~LocalSiteProfile.total_incoming_request_count` counter will
-    be cleared, forcing it to be recomputed on next access. This ensures that
-    their incoming count will be correct when group memberships change.
+    When users are added to or removed from a review group, their
+    :py:attr:`~LocalSiteProfile.total_incoming_request_count` counters are
+    adjusted by the number of open review requests they gain or lose
+    through the group.
+
+    Version Changed:
+        8.0:
+        Counters are now adjusted in place, instead of being cleared and
+        recomputed on next access. Removals are now handled before the
+        users are removed.
 
     Args:
         instance (django.db.models.Model):
             The instance that was updated. If ``reverse`` is ``True``, then
             this will be a :py:class:`~django.contrib.auth.models.User`.
-            Otherwise, it will be ignored.
+            Otherwise, it will be a
+            :py:class:`~reviewboard.reviews.models.group.Group`.
 
         action (unicode):
-            The membership change action. The incoming count is only cleared
-            if this ``post_add``, ``post_remove``, or ``pre_clear``.
+            The membership change action. Counters are only updated if this
+            is ``post_add``, ``pre_remove``, or ``pre_clear``.
 
         pk_set (set of int):
-            The user IDs added to the group. If ``reverse`` is ``True``,
-            then this is ignored in favor of ``instance``.
+            The IDs of the users (or groups, if ``reverse`` is ``True``)
+            being added or removed.
 
         reverse (bool):
-            Whether this signal is emitted when adding through the forward
-            relation (``True`` -- :py:attr:`Group.users
-            <reviewboard.reviews.models.group.Group.users>`) or the reverse
-            relation (``False`` -- ``User.review_groups``).
+            Whether this signal is emitted when adding through the reverse
+            relation (``True`` -- ``User.review_groups``) or the forward
+            relation (``False`` -- :py:attr:`Group.users
+            <reviewboard.reviews.models.group.Group.users>`).
 
         **kwargs (dict):
             Additional keyword arguments passed to the signal.
     """
-    if action in ('post_add', 'post_remove', 'pre_clear'):
-        q = None
+    if action == 'post_add':
+        # Only newly-added members are included in pk_set.
+        if reverse:
+            user_ids = [instance.pk]
+            group_ids = pk_set
+        else:
+            user_ids = pk_set
+            group_ids = [instance.pk]
 
+        removed = False
+    elif action in ('pre_remove', 'pre_clear'):
+        # Only count users who are actually members.
         if reverse:
-            if instance is not None:
-                q = Q(user=instance)
+            groups = instance.review_groups.all()
+
+            if action == 'pre_remove':
+                groups = groups.filter(pk__in=pk_set)
+
+            user_ids = [instance.pk]
+            group_ids = list(groups.values_list('pk', flat=True))
         else:
-            if pk_set:
-                q = Q(user__in=pk_set)
+            users = instance.users.all()
+
+            if action == 'pre_remove':
+                users = users.filter(pk__in=pk_set)
+
+            user_ids = list(users.values_list('pk', flat=True))
+            group_ids = [instance.pk]
+
+        removed = True
+    else:
+        return
 
-        if q is not None:
-            LocalSiteProfile.objects.filter(q).update(
-                total_incoming_request_count=None)
+    update_counters_for_group_membership(user_ids=user_ids,
+                                         group_ids=group_ids,
+                                         removed=removed)
 
 
 __all__ = [
@@ -0,0 +1,106 @@
+"""Unit tests for reviewboard.accounts.counters.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+
+from reviewboard.accounts.counters import check_site_profile_counters
+from reviewboard.accounts.models import LocalSiteProfile
+from reviewboard.testing import TestCase
+
+
+class CheckSiteProfileCountersTests(TestCase):
+    """Unit tests for check_site_profile_counters.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.user = User.objects.get(username='doc')
+        self.create_review_request(submitter=self.user,
+                                   publish=True)
+
+        # Load the profile to compute its counters.
+        self.site_profile = self.user.get_site_profile(local_site=None)
+        self.assertEqual(self.site_profile.pending_outgoing_request_count, 1)
+
+    def test_check_with_correct_counters(self) -> None:
+        """Testing check_site_profile_counters with correct counters"""
+        stats = check_site_profile_counters()
+
+        self.assertGreater(stats['checked'], 0)
+        self.assertEqual(stats['drifted'], 0)
+        self.assertEqual(stats['repaired'], 0)
+
+    def test_check_repairs_drift(self) -> None:
+        """Testing check_site_profile_counters repairs drifted counters"""
+        LocalSiteProfile.objects.filter(pk=self.site_profile.pk).update(
+            pending_outgoing_request_count=5)
+
+        stats = check_site_profile_counters()
+
+        self.assertEqual(stats['drifted'], 1)
+        self.assertEqual(stats['repaired'], 1)
+
+        self.site_profile.refresh_from_db()
+        self.assertEqual(self.site_profile.pending_outgoing_request_count, 1)
+
+    def test_check_without_repair(self) -> None:
+        """Testing check_site_profile_counters with repair=False"""
+        LocalSiteProfile.objects.filter(pk=self.site_profile.pk).update(
+            pending_outgoing_request_count=5)
+
+        stats = check_site_profile_counters(repair=False)
+
+        self.assertEqual(stats['drifted'], 1)
+        self.assertEqual(stats['repaired'], 0)
+
+        self.site_profile.refresh_from_db()
+        self.assertEqual(self.site_profile.pending_outgoing_request_count, 5)
+
+    def test_check_skips_uncomputed(self) -> None:
+        """Testing check_site_profile_counters skips counters that haven't
+        been computed
+        """
+        LocalSiteProfile.objects.filter(pk=self.site_profile.pk).update(
+            pending_outgoing_request_count=None)
+
+        stats = check_site_profile_counters()
+
+        self.assertEqual(stats['drifted'], 0)
+        self.assertIsNone(
+            LocalSiteProfile.objects
+            .filter(pk=self.site_profile.pk)
+            .values_list('pending_outgoing_request_count', flat=True)
+            .get())
+
+    def test_check_with_max_profiles(self) -> None:
+        """Testing check_site_profile_counters with max_profiles and
+        after_pk
+        """
+        other_profile = (
+            User.objects.get(username='grumpy')
+            .get_site_profile(local_site=None)
+        )
+        profile_ids = sorted([self.site_profile.pk, other_profile.pk])
+
+        stats = check_site_profile_counters(max_profiles=1)
+
+        self.assertEqual(stats['checked'], 1)
+        self.assertEqual(stats['last_pk'], profile_ids[0])
+
+        stats = check_site_profile_counters(after_pk=stats['last_pk'],
+                                            max_profiles=1)
+
+        self.assertEqual(stats['checked'], 1)
+        self.assertEqual(stats['last_pk'], profile_ids[1])
@@ -0,0 +1,263 @@
+"""Unit tests for reviewboard.accounts.visits.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import kgb
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from reviewboard.accounts import visits
+from reviewboard.accounts.models import ReviewRequestVisit
+from reviewboard.accounts.visits import flush_visits, record_visit
+from reviewboard.reviews.models import ReviewRequest
+from reviewboard.testing import TestCase
+
+
+class VisitTrackingTests(kgb.SpyAgency, TestCase):
+    """Unit tests for recording review request visits.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.spy_on(visits._start_flush_thread, call_original=False)
+        visits._pending_visits.clear()
+
+        self.user = User.objects.get(username='grumpy')
+        self.review_request = self.create_review_request(publish=True)
+
+    def test_record_visit_immediate(self) -> None:
+        """Testing record_visit with reviews_visit_tracking_mode=immediate"""
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'immediate'},
+            reload_settings=False):
+            visit, last_visited = record_visit(
+                user=self.user,
+                review_request=self.review_request)
+
+        self.assertIsNotNone(visit.pk)
+        self.assertEqual(
+            ReviewRequestVisit.objects.get(pk=visit.pk).timestamp,
+            visit.timestamp)
+        self.assertSpyNotCalled(visits._start_flush_thread)
+
+    def test_record_visit_deferred_new(self) -> None:
+        """Testing record_visit with reviews_visit_tracking_mode=deferred
+        and a first visit
+        """
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            with self.assertNumQueries(1):
+                visit, last_visited = record_visit(
+                    user=self.user,
+                    review_request=self.review_request)
+
+            self.assertIsNone(visit.pk)
+            self.assertEqual(visit.visibility, ReviewRequestVisit.VISIBLE)
+            self.assertFalse(ReviewRequestVisit.objects.exists())
+            self.assertSpyCalledOnce(visits._start_flush_thread)
+
+            self.assertEqual(flush_visits(), 1)
+
+        new_visit = ReviewRequestVisit.objects.get(
+            user=self.user,
+            review_request=self.review_request)
+        self.assertEqual(new_visit.timestamp, visit.timestamp)
+
+    def test_record_visit_deferred_coalesces(self) -> None:
+        """Testing record_visit with reviews_visit_tracking_mode=deferred
+        coalesces repeated visits
+        """
+        old_timestamp = timezone.now() - timedelta(days=1)
+        visit = ReviewRequestVisit.objects.create(
+            user=self.user,
+            review_request=self.review_request,
+            timestamp=old_timestamp)
+
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            visit1, last_visited1 = record_visit(
+                user=self.user,
+                review_request=self.review_request)
+            visit2, last_visited2 = record_visit(
+                user=self.user,
+                review_request=self.review_request)
+
+            self.assertEqual(last_visited1, old_timestamp)
+            self.assertEqual(last_visited2, visit1.timestamp)
+
+            visit.refresh_from_db()
+            self.assertEqual(visit.timestamp, old_timestamp)
+
+            self.assertEqual(flush_visits(), 1)
+
+        visit.refresh_from_db()
+        self.assertEqual(visit.timestamp, visit2.timestamp)
+
+    def test_record_visit_deferred_without_update_timestamp(self) -> None:
+        """Testing record_visit with reviews_visit_tracking_mode=deferred
+        and update_timestamp=False for an existing visit
+        """
+        ReviewRequestVisit.objects.create(
+            user=self.user,
+            review_request=self.review_request)
+
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            record_visit(user=self.user,
+                         review_request=self.review_request,
+                         update_timestamp=False)
+
+            self.assertSpyNotCalled(visits._start_flush_thread)
+            self.assertEqual(flush_visits(), 0)
+
+    def test_flush_visits_batches_writes(self) -> None:
+        """Testing flush_visits writes visits for many users and review
+        requests in a fixed number of queries
+        """
+        review_request2 = self.create_review_request(publish=True)
+        user2 = User.objects.get(username='dopey')
+        old_timestamp = timezone.now() - timedelta(days=1)
+
+        ReviewRequestVisit.objects.create(
+            user=self.user,
+            review_request=self.review_request,
+            timestamp=old_timestamp)
+
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            for user in (self.user, user2):
+                for review_request in (self.review_request, review_request2):
+                    record_visit(user=user,
+                                 review_request=review_request)
+
+            # Look up existing visits, check the review requests for new
+            # ones, create them, and update existing ones.
+            with self.assertNumQueries(4):
+                self.assertEqual(flush_visits(), 4)
+
+        self.assertEqual(ReviewRequestVisit.objects.count(), 4)
+        self.assertFalse(
+            ReviewRequestVisit.objects
+            .filter(timestamp=old_timestamp)
+            .exists())
+
+    def test_flush_visits_keeps_visits_recorded_during_flush(self) -> None:
+        """Testing flush_visits keeps visits recorded while writing for the
+        next flush
+        """
+        review_request2 = self.create_review_request(publish=True)
+        recorded = []
+
+        @self.spy_for(visits._write_visits)
+        def _write_visits(pending_by_user):
+            result = visits._write_visits.call_original(pending_by_user)
+
+            if not recorded:
+                # Simulate another request visiting while these are written.
+                recorded.append(record_visit(user=self.user,
+                                             review_request=review_request2))
+
+            return result
+
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            record_visit(user=self.user,
+                         review_request=self.review_request)
+            record_visit(user=self.user,
+                         review_request=review_request2)
+
+            self.assertEqual(flush_visits(), 2)
+
+            # The visit recorded during the flush is still waiting.
+            self.assertEqual(flush_visits(), 1)
+
+        visit = ReviewRequestVisit.objects.get(user=self.user,
+                                               review_request=review_request2)
+        self.assertEqual(visit.timestamp, recorded[0][0].timestamp)
+
+    def test_flush_visits_for_user_from_other_process(self) -> None:
+        """Testing flush_visits with a user writes visits recorded by other
+        processes
+        """
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            visit = record_visit(user=self.user,
+                                 review_request=self.review_request)[0]
+
+            # Simulate the visit having been recorded by another process.
+            visits._pending_visits.clear()
+
+            self.assertEqual(flush_visits(user=self.user), 1)
+
+        self.assertEqual(
+            ReviewRequestVisit.objects.get(
+                user=self.user,
+                review_request=self.review_request).timestamp,
+            visit.timestamp)
+        self.assertIsNone(cache.get(visits._get_pending_visit_cache_key(
+            self.user.pk, self.review_request.pk)))
+
+    def test_flush_visits_skips_deleted_review_requests(self) -> None:
+        """Testing flush_visits skips visits to deleted review requests"""
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            record_visit(user=self.user,
+                         review_request=self.review_request)
+            self.review_request.delete()
+
+            self.assertEqual(flush_visits(), 0)
+
+        self.assertFalse(ReviewRequestVisit.objects.exists())
+
+    def test_with_counts_flushes_user_visits(self) -> None:
+        """Testing ReviewRequest.objects.with_counts sees deferred visits for
+        the user
+        """
+        ReviewRequestVisit.objects.create(
+            user=self.user,
+            review_request=self.review_request,
+            timestamp=timezone.now() - timedelta(days=1))
+        self.create_review(self.review_request,
+                           publish=True,
+                           timestamp=timezone.now() - timedelta(hours=1))
+
+        with self.siteconfig_settings(
+            {'reviews_visit_tracking_mode': 'deferred'},
+            reload_settings=False):
+            queryset = (
+                ReviewRequest.objects
+                .filter(pk=self.review_request.pk)
+                .with_counts(self.user)
+            )
+            self.assertEqual(queryset[0].new_review_count, 1)
+
+            record_visit(user=self.user,
+                         review_request=self.review_request)
+
+            queryset = (
+                ReviewRequest.objects
+                .filter(pk=self.review_request.pk)
+                .with_counts(self.user)
+            )
+            self.assertEqual(queryset[0].new_review_count, 0)
@@ -0,0 +1,487 @@
+"""Recording of review request visits.
+
+Every time a user views a review request, the time of their visit is
+stored in a :py:class:`~reviewboard.accounts.models.ReviewRequestVisit`.
+This is used to show which review requests have new reviews.
+
+By default, the visit is written to the database during the request,
+meaning every page view performs a write. On busy servers, this can lead to
+lock contention and replication lag. Visit tracking is controlled by the
+``reviews_visit_tracking_mode`` site configuration setting, which can be one
+of the following :py:class:`VisitTrackingMode` values:
+
+``immediate``:
+    Visits are written to the database immediately. This is the default,
+    and is what unit tests use.
+
+``deferred``:
+    Visits are stored in the cache, coalescing repeated visits by the same
+    user, and written to the database in bulk every
+    ``reviews_visit_flush_interval`` seconds by a background thread in the
+    web server process.
+
+    Each visit has its own cache key, so recording a visit never overwrites
+    another visit recorded at the same time by another process. Once
+    written, a visit's cache key is only deleted if it hasn't been recorded
+    again since it was read. Otherwise, the newer visit is left to be
+    written next time.
+
+    Before a user's visits are read from the database (for instance, when
+    counting new reviews for their Dashboard), any of their visits waiting
+    in the cache are written first, so they always see their own visits.
+    These are found through a per-user list of review requests with visits
+    waiting. That list is only a hint for seeing visits recorded by other
+    processes, since each process also writes the visits it recorded.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Optional, TYPE_CHECKING
+
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+from djblets.cache.backend import make_cache_key
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.accounts.models import ReviewRequestVisit
+from reviewboard.reviews.models import ReviewRequest
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.contrib.auth.models import User
+
+
+logger = logging.getLogger(__name__)
+
+
+#: How long visits can wait in the cache, in seconds.
+#:
+#: Visits waiting longer than this (for instance, if the process recording
+#: them exits and the user doesn't return) are discarded.
+PENDING_VISITS_EXPIRATION = 24 * 60 * 60
+
+#: The number of visits to write in each database query.
+BATCH_SIZE = 500
+
+
+class VisitTrackingMode(str, Enum):
+    """How review request visits are written to the database.
+
+    Version Added:
+        8.0
+    """
+
+    #: Visits are written to the database during the request.
+    IMMEDIATE = 'immediate'
+
+    #: Visits are cached and written to the database in bulk.
+    DEFERRED = 'deferred'
+
+
+_pending_lock = threading.Lock()
+_pending_visits: set[tuple[int, int]] = set()
+_flush_thread: Optional[threading.Thread] = None
+
+
+def get_visit_tracking_mode() -> VisitTrackingMode:
+    """Return the configured visit tracking mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        VisitTrackingMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`VisitTrackingMode.IMMEDIATE`.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    value = siteconfig.get('reviews_visit_tracking_mode')
+
+    try:
+        return VisitTrackingMode(value)
+    except ValueError:
+        logger.warning('Invalid reviews_visit_tracking_mode setting %r. '
+                       'Visits will be written immediately.',
+                       value)
+
+        return VisitTrackingMode.IMMEDIATE
+
+
+def record_visit(
+    *,
+    user: User,
+    review_request: ReviewRequest,
+    update_timestamp: bool = True,
+) -> tuple[ReviewRequestVisit, datetime]:
+    """Record a user's visit to a review request.
+
+    This returns the user's visit, creating it if this is their first visit.
+    When deferring visits, a new visit is returned unsaved, and saved along
+    with the visit time later.
+
+    Version Added:
+        8.0
+
+    Args:
+        user (django.contrib.auth.models.User):
+            The logged-in user visiting the review request.
+
+        review_request (reviewboard.reviews.models.ReviewRequest):
+            The review request being visited.
+
+        update_timestamp (bool, optional):
+            Whether to update the time of the visit. If ``False``, the
+            visit will only be created if it doesn't exist.
+
+    Returns:
+        tuple:
+        A 2-tuple containing:
+
+        Tuple:
+            0 (reviewboard.accounts.models.ReviewRequestVisit):
+                The visit.
+
+            1 (datetime.datetime):
+                The time of the user's previous visit, or the current time
+                if this is their first visit.
+
+    Raises:
+        reviewboard.accounts.models.ReviewRequestVisit.DoesNotExist:
+            The visit was seen as created, but couldn't be fetched. This
+            can only happen when writing visits immediately.
+    """
+    if get_visit_tracking_mode() == VisitTrackingMode.IMMEDIATE:
+        visit = ReviewRequestVisit.objects.get_or_create(
+            user=user,
+            review_request=review_request)[0]
+        last_visited = visit.timestamp
+
+        if update_timestamp:
+            visit.timestamp = timezone.now()
+            visit.save(update_fields=('timestamp',))
+
+        return visit, last_visited
+
+    now = timezone.now()
+    cache_key = _get_pending_visit_cache_key(user.pk, review_request.pk)
+    pending_timestamp = cache.get(cache_key)
+
+    try:
+        visit = ReviewRequestVisit.objects.get(user=user,
+                                               review_request=review_request)
+
+        if pending_timestamp is not None:
+            visit.timestamp = max(visit.timestamp, pending_timestamp)
+    except ReviewRequestVisit.DoesNotExist:
+        visit = ReviewRequestVisit(user=user,
+                                   review_request=review_request,
+                                   timestamp=pending_timestamp or now)
+
+    last_visited = visit.timestamp
+
+    if update_timestamp or (visit.pk is None and pending_timestamp is None):
+        visit.timestamp = now
+        cache.set(cache_key, now, PENDING_VISITS_EXPIRATION)
+
+        if pending_timestamp is None:
+            _add_pending_review_request(user.pk, review_request.pk)
+
+        with _pending_lock:
+            _pending_visits.add((user.pk, review_request.pk))
+
+        _start_flush_thread()
+
+    return visit, last_visited
+
+
+def flush_visits(
+    *,
+    user: Optional[User] = None,
+) -> int:
+    """Write deferred visits to the database.
+
+    Version Added:
+        8.0
+
+    Args:
+        user (django.contrib.auth.models.User, optional):
+            A user to write visits for. If not provided, visits recorded by
+            this process for all users are written.
+
+    Returns:
+        int:
+        The number of visits written.
+    """
+    if user is not None:
+        if (not user.is_authenticated or
+            get_visit_tracking_mode() == VisitTrackingMode.IMMEDIATE):
+            return 0
+
+        review_request_ids = set(
+            cache.get(_get_pending_review_requests_cache_key(user.pk)) or
+            [])
+
+        with _pending_lock:
+            for user_id, review_request_id in list(_pending_visits):
+                if user_id == user.pk:
+                    review_request_ids.add(review_request_id)
+                    _pending_visits.discard((user_id, review_request_id))
+
+        visit_keys = {
+            (user.pk, review_request_id)
+            for review_request_id in review_request_ids
+        }
+    else:
+        with _pending_lock:
+            visit_keys = set(_pending_visits)
+            _pending_visits.clear()
+
+    if not visit_keys:
+        return 0
+
+    cache_keys = {
+        _get_pending_visit_cache_key(user_id, review_request_id):
+            (user_id, review_request_id)
+        for user_id, review_request_id in visit_keys
+    }
+    cached = cache.get_many(list(cache_keys.keys()))
+
+    if not cached:
+        return 0
+
+    pending_by_user: dict[int, dict[int, datetime]] = {}
+
+    for cache_key, timestamp in cached.items():
+        user_id, review_request_id = cache_keys[cache_key]
+        pending_by_user.setdefault(user_id, {})[review_request_id] = \
+            timestamp
+
+    num_written = _write_visits(pending_by_user)
+
+    # Only delete the visits that haven't been recorded again since they
+    # were read. Newer visits are left for the process that recorded them
+    # to write.
+    current = cache.get_many(list(cached.keys()))
+    cache.delete_many([
+        cache_key
+        for cache_key, timestamp in cached.items()
+        if current.get(cache_key) == timestamp
+    ])
+
+    return num_written
+
+
+def _write_visits(
+    pending_by_user: dict[int, dict[int, datetime]],
+) -> int:
+    """Write visits to the database in bulk.
+
+    Existing visits are only updated if the new time is later than the
+    stored time.
+
+    Version Added:
+        8.0
+
+    Args:
+        pending_by_user (dict):
+            A mapping of user IDs to mappings of review request IDs to visit
+            times.
+
+    Returns:
+        int:
+        The number of visits written.
+    """
+    review_request_ids: set[int] = set()
+
+    for pending_visits in pending_by_user.values():
+        review_request_ids.update(pending_visits.keys())
+
+    existing = {
+        (user_id, review_request_id): (visit_id, timestamp)
+        for visit_id, user_id, review_request_id, timestamp in (
+            ReviewRequestVisit.objects
+            .filter(user__in=list(pending_by_user.keys()),
+                    review_request__in=review_request_ids)
+            .values_list('pk', 'user', 'review_request', 'timestamp')
+        )
+    }
+
+    new_visits: list[ReviewRequestVisit] = []
+    updated_visits: list[ReviewRequestVisit] = []
+
+    for user_id, pending_visits in pending_by_user.items():
+        for review_request_id, timestamp in pending_visits.items():
+            try:
+                visit_id, old_timestamp = \
+                    existing[(user_id, review_request_id)]
+            except KeyError:
+                new_visits.append(ReviewRequestVisit(
+                    user_id=user_id,
+                    review_request_id=review_request_id,
+                    timestamp=timestamp))
+                continue
+
+            if timestamp > old_timestamp:
+                updated_visits.append(ReviewRequestVisit(
+                    pk=visit_id,
+                    timestamp=timestamp))
+
+    if new_visits:
+        # Skip any review requests that were deleted since the visit.
+        valid_review_request_ids = set(
+            ReviewRequest.objects
+            .filter(pk__in={
+                visit.review_request_id
+                for visit in new_visits
+            })
+            .values_list('pk', flat=True)
+        )
+        new_visits = [
+            visit
+            for visit in new_visits
+            if visit.review_request_id in valid_review_request_ids
+        ]
+
+        # Another request may have created the visit in the meantime, in
+        # which case it will have a current timestamp already.
+        ReviewRequestVisit.objects.bulk_create(new_visits,
+                                               batch_size=BATCH_SIZE,
+                                               ignore_conflicts=True)
+
+    if updated_visits:
+        ReviewRequestVisit.objects.bulk_update(updated_visits,
+                                               ['timestamp'],
+                                               batch_size=BATCH_SIZE)
+
+    return len(new_visits) + len(updated_visits)
+
+
+def _add_pending_review_request(
+    user_id: int,
+    review_request_id: int,
+) -> None:
+    """Add a review request to a user's list of visits waiting in the cache.
+
+    The list isn't updated atomically, so a review request added by another
+    process at the same moment may be dropped. The visit is still written
+    by the process that recorded it.
+
+    Version Added:
+        8.0
+
+    Args:
+        user_id (int):
+            The ID of the user.
+
+        review_request_id (int):
+            The ID of the review request visited.
+    """
+    cache_key = _get_pending_review_requests_cache_key(user_id)
+    review_request_ids = set(cache.get(cache_key) or [])
+
+    if review_request_id not in review_request_ids:
+        review_request_ids.add(review_request_id)
+        cache.set(cache_key, review_request_ids, PENDING_VISITS_EXPIRATION)
+
+
+def _get_pending_visit_cache_key(
+    user_id: int,
+    review_request_id: int,
+) -> str:
+    """Return the cache key for a user's deferred visit to a review request.
+
+    Version Added:
+        8.0
+
+    Args:
+        user_id (int):
+            The ID of the user.
+
+        review_request_id (int):
+            The ID of the review request.
+
+    Returns:
+        str:
+        The cache key.
+    """
+    return make_cache_key('review-request-visit-pending-%s-%s'
+                          % (user_id, review_request_id))
+
+
+def _get_pending_review_requests_cache_key(
+    user_id: int,
+) -> str:
+    """Return the cache key for a user's list of deferred visits.
+
+    Version Added:
+        8.0
+
+    Args:
+        user_id (int):
+            The ID of the user.
+
+    Returns:
+        str:
+        The cache key.
+    """
+    return make_cache_key('review-request-visits-pending-%s' % user_id)
+
+
+def _start_flush_thread() -> None:
+    """Start writing deferred visits in a background thread.
+
+    If a thread is already running, it will write the new visits once its
+    interval has passed.
+
+    Version Added:
+        8.0
+    """
+    global _flush_thread
+
+    with _pending_lock:
+        if _flush_thread is not None:
+            return
+
+        _flush_thread = threading.Thread(target=_run_flush_thread,
+                                         name='rb-visits-flush',
+                                         daemon=True)
+        thread = _flush_thread
+
+    thread.start()
+
+
+def _run_flush_thread() -> None:
+    """Write deferred visits periodically until there are none left.
+
+    Version Added:
+        8.0
+    """
+    global _flush_thread
+
+    try:
+        while True:
+            siteconfig = SiteConfiguration.objects.get_current()
+            time.sleep(max(1, siteconfig.get('reviews_visit_flush_interval')))
+
+            try:
+                flush_visits()
+            except Exception as e:
+                logger.exception('Unexpected error writing review request '
+                                 'visits: %s',
+                                 e)
+
+            with _pending_lock:
+                if not _pending_visits:
+                    _flush_thread = None
+                    break
+    finally:
+        connections.close_all()
@@ -97,6 +97,99 @@ class DiffSettingsForm(SiteSettingsForm):
         initial=10,
         widget=forms.TextInput(attrs={'size': '5'}))
 
+    diffviewer_chunk_workers = forms.IntegerField(
+        label=_('Diff generation threads'),
+        help_text=_(
+            'The number of files in a diff that can be generated at once '
+            'when viewing a diff. Values above 1 can help when fetching '
+            'files from the repository is slow.'
+        ),
+        min_value=1,
+        initial=1,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    diffviewer_prerender_mode = forms.ChoiceField(
+        label=_('Pre-render diffs'),
+        choices=(
+            ('disabled', _('Disabled')),
+            ('local', _('In the web server process')),
+            ('worker', _('In a separate worker process')),
+        ),
+        help_text=_(
+            'Render new diffs in the background as soon as they\'re '
+            'uploaded, so the first reviewer doesn\'t have to wait. When '
+            'using a separate worker process, run '
+            '<code>rb-site manage /path/to/site prerender-diffs -- '
+            '--watch</code> to process diffs.'
+        ),
+        required=True)
+
+    diffviewer_prerender_concurrency = forms.IntegerField(
+        label=_('Pre-render concurrency'),
+        help_text=_('The maximum number of files pre-rendered at a time in '
+                    'each process.'),
+        min_value=1,
+        initial=2,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    diffviewer_upload_processing_mode = forms.ChoiceField(
+        label=_('Background diff uploads'),
+        choices=(
+            ('sync', _('Disabled')),
+            ('local', _('In the web server process')),
+            ('worker', _('In a separate worker process')),
+        ),
+        help_text=_(
+            'Allow API clients to process uploaded diffs in the background, '
+            'so that very large diffs don\'t hold up the web server or time '
+            'out. When using a separate worker process, run '
+            '<code>rb-site manage /path/to/site process-diff-uploads -- '
+            '--watch</code> to process uploads.'
+        ),
+        required=True)
+
+    diffviewer_compression = forms.ChoiceField(
+        label=_('Diff compression'),
+        choices=(
+            ('auto', _('Zstandard if installed, otherwise zlib')),
+            ('bzip2', _('bzip2')),
+            ('zlib', _('zlib')),
+            ('zstd', _('Zstandard')),
+            ('zstd-dict', _('Zstandard with a trained dictionary')),
+        ),
+        help_text=_(
+            'The compression used for newly-uploaded diffs. Zstandard '
+            'requires the <code>zstandard</code> Python package. Run '
+            '<code>rb-site manage /path/to/site recompress-diffs</code> to '
+            'recompress existing diffs or train a dictionary.'
+        ),
+        required=True)
+
+    diffviewer_blob_storage = forms.ChoiceField(
+        label=_('Diff storage'),
+        choices=(
+            ('database', _('Database')),
+            ('filesystem', _('Local filesystem')),
+            ('file-storage', _('File attachment storage')),
+        ),
+        help_text=_(
+            'Where the content of newly-uploaded diffs is stored. Storing '
+            'diffs outside the database keeps it smaller. Run '
+            '<code>rb-site manage /path/to/site migrate-diff-storage</code> '
+            'to move existing diffs.'
+        ),
+        required=True)
+
+    diffviewer_blob_storage_path = forms.CharField(
+        label=_('Diff storage path'),
+        help_text=_(
+            'The directory used to store diffs on the local filesystem. '
+            'This must be shared by all servers. Defaults to the '
+            '<code>diffs</code> directory in the site\'s data directory.'
+        ),
+        required=False,
+        widget=forms.TextInput(attrs={'size': '60'}))
+
     diffviewer_max_diff_size = forms.IntegerField(
         label=_('Max diff size in bytes'),
         help_text=_(
@@ -266,6 +359,13 @@ class DiffSettingsForm(SiteSettingsForm):
                     'diffviewer_context_num_lines',
                     'diffviewer_paginate_by',
                     'diffviewer_paginate_orphans',
+                    'diffviewer_chunk_workers',
+                    'diffviewer_prerender_mode',
+                    'diffviewer_prerender_concurrency',
+                    'diffviewer_upload_processing_mode',
+                    'diffviewer_compression',
+                    'diffviewer_blob_storage',
+                    'diffviewer_blob_storage_path',
                 ),
             },
         )
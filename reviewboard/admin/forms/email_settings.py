@@ -65,6 +65,38 @@ class EMailSettingsForm(SiteSettingsForm):
                     '"Default From address" above. <strong>Always</strong> '
                     'will use it unconditionally. <strong>Never</strong> will '
                     'use the default address for every e-mail.'))
+    mail_delivery_mode = forms.ChoiceField(
+        label=_('Send e-mail'),
+        choices=(
+            ('sync', _('Immediately, while handling the request')),
+            ('local', _('In the background, in the web server process')),
+            ('worker', _('In the background, in a separate worker process')),
+        ),
+        help_text=_(
+            'Sending e-mail in the background keeps a slow mail server from '
+            'delaying publishing, sends messages over a shared connection, '
+            'and retries failed messages. When using a separate worker '
+            'process, run <code>rb-site manage /path/to/site '
+            'send-queued-email -- --watch</code> to send e-mail.'
+        ),
+        required=True)
+    mail_delivery_coalesce_secs = forms.IntegerField(
+        label=_('Group e-mail bursts for (seconds)'),
+        help_text=_('When sending in the background, e-mail for a review '
+                    'request is held until none has been generated for it '
+                    'for this many seconds, and then sent together. Set to '
+                    '0 to send right away.'),
+        min_value=0,
+        initial=5,
+        widget=forms.TextInput(attrs={'size': '5'}))
+    mail_delivery_max_attempts = forms.IntegerField(
+        label=_('Sending attempts'),
+        help_text=_('The number of times to try sending an e-mail in the '
+                    'background before giving up. Retries are spaced out '
+                    'further each time.'),
+        min_value=1,
+        initial=5,
+        widget=forms.TextInput(attrs={'size': '5'}))
     mail_host = forms.CharField(
         label=_('Mail server'),
         required=False,
@@ -177,7 +209,10 @@ class EMailSettingsForm(SiteSettingsForm):
                 'classes': ('wide',),
                 'fields': ('mail_default_from',
                            'mail_from_spoofing',
-                           'mail_enable_autogenerated_header'),
+                           'mail_enable_autogenerated_header',
+                           'mail_delivery_mode',
+                           'mail_delivery_coalesce_secs',
+                           'mail_delivery_max_attempts'),
             },
             {
                 'title': _('E-Mail Server Settings'),
@@ -282,6 +282,56 @@ class GeneralSettingsForm(SiteSettingsForm):
             'data-subform-group': 'cache-backend',
         }))
 
+    webhooks_delivery_mode = forms.ChoiceField(
+        label=_('WebHook delivery'),
+        choices=(
+            ('sync', _('Immediately, while handling the request')),
+            ('local', _('In the background, in the web server process')),
+            ('worker', _('In the background, in a separate worker process')),
+        ),
+        help_text=_(
+            'Sending WebHooks in the background keeps slow WebHook servers '
+            'from delaying publishing, and retries failed deliveries. When '
+            'using a separate worker process, run '
+            '<code>rb-site manage /path/to/site deliver-webhooks -- '
+            '--watch</code> to send WebHooks.'
+        ),
+        required=True)
+
+    webhooks_delivery_concurrency = forms.IntegerField(
+        label=_('WebHook delivery concurrency'),
+        help_text=_('The maximum number of WebHooks sent at a time in each '
+                    'process, when sending in the background.'),
+        min_value=1,
+        initial=4,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    webhooks_delivery_target_concurrency = forms.IntegerField(
+        label=_('WebHook concurrency per URL'),
+        help_text=_('The maximum number of WebHooks sent at a time to any '
+                    'one WebHook URL in each process, when sending in the '
+                    'background.'),
+        min_value=1,
+        initial=2,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    webhooks_delivery_timeout = forms.IntegerField(
+        label=_('WebHook timeout'),
+        help_text=_('The number of seconds to wait for a WebHook server to '
+                    'respond.'),
+        min_value=1,
+        initial=10,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    webhooks_delivery_max_attempts = forms.IntegerField(
+        label=_('WebHook delivery attempts'),
+        help_text=_('The number of times to try sending a WebHook in the '
+                    'background before giving up. Retries are spaced out '
+                    'further each time.'),
+        min_value=1,
+        initial=5,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
     def __init__(self, siteconfig, data=None, files=None, *args, **kwargs):
         """Initialize the settings form.
 
@@ -512,4 +562,15 @@ class GeneralSettingsForm(SiteSettingsForm):
                 'classes': ('wide',),
                 'fields': ('cache_type',),
             },
+            {
+                'title': _('WebHook Settings'),
+                'classes': ('wide',),
+                'fields': (
+                    'webhooks_delivery_mode',
+                    'webhooks_delivery_concurrency',
+                    'webhooks_delivery_target_concurrency',
+                    'webhooks_delivery_timeout',
+                    'webhooks_delivery_max_attempts',
+                ),
+            },
         )
@@ -30,6 +30,92 @@ class ReviewSettingsForm(SiteSettingsForm):
         required=False,
     )
 
+    reviews_store_rendered_markdown = forms.BooleanField(
+        label=_('Store rendered Markdown in the database'),
+        help_text=_(
+            'If selected, the rendered HTML for Markdown text in review '
+            'requests, reviews, and comments will be stored in the '
+            'database when saved. This speeds up busy pages at the cost of '
+            'more database storage. Rendered Markdown is always cached.'
+        ),
+        required=False,
+    )
+
+    reviews_cache_access_lists = forms.BooleanField(
+        label=_('Cache access lists for users'),
+        help_text=_(
+            'If selected, the repositories and review groups each user can '
+            'access are cached, saving several database queries when '
+            'listing review requests. The cache is updated when '
+            'memberships, permissions, or access settings change.'
+        ),
+        required=False,
+    )
+
+    reviews_push_updates = forms.BooleanField(
+        label=_('Push updates to open review requests'),
+        help_text=_(
+            'If selected, open review request pages are notified of new '
+            'reviews, replies, and updates as they happen, instead of '
+            'checking periodically. Each open page keeps a connection to '
+            'the server for several minutes at a time, so this requires a '
+            'web server that can handle many long-lived connections '
+            'without tying up a worker for each, such as an ASGI server.'
+        ),
+        required=False,
+    )
+
+    reviews_updates_broker = forms.ChoiceField(
+        label=_('Push updates broker'),
+        choices=(
+            ('cache', _('Cache server')),
+            ('redis', _('Redis')),
+        ),
+        help_text=_(
+            'How updates are passed between web server processes. Redis '
+            'is more efficient with many open pages, and requires the '
+            '<code>redis</code> Python package.'
+        ),
+        required=True,
+    )
+
+    reviews_updates_redis_url = forms.CharField(
+        label=_('Redis URL'),
+        help_text=_(
+            'The URL of the Redis server used for push updates, such as '
+            '<code>redis://localhost:6379/0</code>.'
+        ),
+        required=False,
+        widget=forms.TextInput(attrs={'size': '60'}),
+    )
+
+    reviews_visit_tracking_mode = forms.ChoiceField(
+        label=_('Record review request visits'),
+        choices=(
+            ('immediate', _('Immediately')),
+            ('deferred', _('In batches')),
+        ),
+        help_text=_(
+            'When users view a review request, the time of their visit is '
+            'stored so their Dashboard can show new reviews. Storing visits '
+            'in batches avoids a database write on every page view, which '
+            'helps busy servers. Visits are kept in the cache until they '
+            'are stored.'
+        ),
+        required=True,
+    )
+
+    reviews_visit_flush_interval = forms.IntegerField(
+        label=_('Visit batch interval'),
+        min_value=1,
+        help_text=_(
+            'The number of seconds between storing batches of review '
+            'request visits.'
+        ),
+        required=True,
+        widget=forms.TextInput(attrs={'size': '5'}),
+    )
+
     class Meta:
         """Metadata for the form."""
 
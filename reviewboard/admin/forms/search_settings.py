@@ -49,6 +49,42 @@ class SearchSettingsForm(SiteSettingsForm):
                    'with the Whoosh engine for large or multi-server '
                    'installs.'))
 
+    search_indexing_mode = forms.ChoiceField(
+        label=_('On-the-fly indexing mode'),
+        choices=(
+            ('immediate', _('Immediately')),
+            ('queued', _('In batches')),
+        ),
+        help_text=_(
+            'Updating the search index in batches groups changes together '
+            'and writes them in the background, so a slow search backend '
+            'doesn\'t slow down page loads. To keep the index up to date '
+            'when web server processes restart, also run '
+            '<code>rb-site manage /path/to/site process-search-index-queue '
+            '-- --watch</code> as a worker process.'
+        ),
+        required=False)
+
+    search_indexing_delay = forms.IntegerField(
+        label=_('Batch delay'),
+        min_value=0,
+        help_text=_(
+            'The number of seconds to wait for further changes before '
+            'writing a batch to the search index.'
+        ),
+        required=False,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
+    search_indexing_max_lag = forms.IntegerField(
+        label=_('Maximum batch delay'),
+        min_value=1,
+        help_text=_(
+            'The maximum number of seconds a change can wait before being '
+            'written to the search index.'
+        ),
+        required=False,
+        widget=forms.TextInput(attrs={'size': '5'}))
+
     def __init__(self, siteconfig, data=None, *args, **kwargs):
         """Initialize the search engine settings form.
 
@@ -151,6 +187,13 @@ class SearchSettingsForm(SiteSettingsForm):
         """
         cleaned_data = self.cleaned_data
 
+        # Keep the current indexing settings if they weren't provided.
+        for field_name in ('search_indexing_mode',
+                           'search_indexing_delay',
+                           'search_indexing_max_lag'):
+            if cleaned_data.get(field_name) in (None, ''):
+                cleaned_data[field_name] = self.siteconfig.get(field_name)
+
         if cleaned_data['search_enable']:
             search_backend_id = cleaned_data.get('search_backend_id')
 
@@ -136,9 +136,20 @@ defaults.update({
     # Reviews settings
     'default_use_rich_text': True,
     'reviews_allow_self_shipit': True,
+    'reviews_cache_access_lists': True,
+    'reviews_push_updates': False,
+    'reviews_store_rendered_markdown': False,
+    'reviews_updates_broker': 'cache',
+    'reviews_updates_redis_url': 'redis://localhost:6379/0',
+    'reviews_visit_flush_interval': 10,
+    'reviews_visit_tracking_mode': 'immediate',
 
     # Diff Viewer settings
     'code_safety_checkers': {},
+    'diffviewer_blob_storage': 'database',
+    'diffviewer_blob_storage_path': '',
+    'diffviewer_chunk_workers': 1,
+    'diffviewer_compression': 'auto',
     'diffviewer_context_num_lines': 5,
     'diffviewer_default_tab_size': DiffSettings.DEFAULT_TAB_SIZE,
     'diffviewer_include_space_patterns': [],
@@ -146,12 +157,18 @@ defaults.update({
     'diffviewer_max_diff_size': 2_097_152,
     'diffviewer_paginate_by': 20,
     'diffviewer_paginate_orphans': 10,
+    'diffviewer_prerender_concurrency': 2,
+    'diffviewer_prerender_mode': 'disabled',
     'diffviewer_syntax_highlighting': True,
     'diffviewer_syntax_highlighting_threshold': 20_000,
+    'diffviewer_upload_processing_mode': 'sync',
     'diffviewer_custom_pygments_lexers': {'.less': 'LessCss'},
     'diffviewer_show_trailing_whitespace': True,
 
     # E-mail settings
+    'mail_delivery_coalesce_secs': 5,
+    'mail_delivery_max_attempts': 5,
+    'mail_delivery_mode': 'sync',
     'mail_send_review_mail': False,
     'mail_send_new_user_mail': False,
     'mail_send_password_changed_mail': False,
@@ -174,6 +191,16 @@ defaults.update({
     'search_backend_id': WhooshBackend.search_backend_id,
     'search_backend_settings': {},
     'search_on_the_fly_indexing': False,
+    'search_indexing_mode': 'immediate',
+    'search_indexing_delay': 2,
+    'search_indexing_max_lag': 30,
+
+    # WebHook settings
+    'webhooks_delivery_concurrency': 4,
+    'webhooks_delivery_max_attempts': 5,
+    'webhooks_delivery_mode': 'sync',
+    'webhooks_delivery_target_concurrency': 2,
+    'webhooks_delivery_timeout': 10,
 
     # Overwrite this.
     'site_media_url': f'{settings.SITE_ROOT}media/',
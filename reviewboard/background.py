@@ -0,0 +1,229 @@
+"""Shared support for work that can be done in the background.
+
+Several features can move slow work out of the request that triggers it,
+storing it in a queue table to be handled afterward. Each is controlled by
+a site configuration setting holding one of the :py:class:`BackgroundMode`
+values:
+
+``sync``:
+    The work is done immediately, without being queued.
+
+``local``:
+    The work is queued and done by a background thread in the web server
+    process once the transaction commits, using a
+    :py:class:`LocalBackgroundRunner`.
+
+``worker``:
+    The work is queued and done by a separate worker process, such as a
+    management command run on a schedule.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from enum import Enum
+from typing import Any, Callable, Collection, Optional, TYPE_CHECKING
+
+from django.db import connections
+from djblets.siteconfig.models import SiteConfiguration
+from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.db.models import QuerySet
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundMode(str, Enum):
+    """How work that can be done in the background is handled.
+
+    Version Added:
+        8.0
+    """
+
+    #: The work is done immediately, while handling the request.
+    SYNC = 'sync'
+
+    #: The work is done by a background thread in the web server process.
+    LOCAL = 'local'
+
+    #: The work is queued and done by a separate worker process.
+    WORKER = 'worker'
+
+
+class BackgroundQueueStats(TypedDict):
+    """Statistics common to all background work queues.
+
+    Queues extend this with their own statistics.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of entries that could not be handled.
+    #:
+    #: Type:
+    #:     int
+    failed: int
+
+    #: The time the oldest entry waiting to be handled was queued.
+    #:
+    #: Type:
+    #:     datetime.datetime
+    oldest_pending: Optional[datetime]
+
+    #: The number of entries waiting to be handled.
+    #:
+    #: Type:
+    #:     int
+    pending: int
+
+
+class LocalBackgroundRunner:
+    """Runs queued work in a background thread of the current process.
+
+    At most one thread is running for each runner. Starting the runner
+    while its thread is running causes the thread to run the work again
+    once it's done, so work queued during a run isn't missed.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Any],
+        *,
+        name: str,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            func (callable):
+                The function that handles the queued work. This takes no
+                arguments, and its return value is ignored. It can call
+                :py:meth:`start` to be run again, for instance if some work
+                isn't ready yet.
+
+            name (str):
+                The name of the thread, and the description of the work used
+                when logging errors.
+        """
+        self.func = func
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._rerun = False
+
+    def start(self) -> None:
+        """Start running the work in a background thread.
+
+        If the thread is already running, it will run the work again once
+        it's done.
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._rerun = True
+                return
+
+            self._thread = threading.Thread(target=self._run,
+                                            name=self.name,
+                                            daemon=True)
+            thread = self._thread
+
+        thread.start()
+
+    def _run(self) -> None:
+        """Run the work until no more runs are requested.
+
+        The thread's database connections are closed when done.
+        """
+        try:
+            while True:
+                with self._lock:
+                    self._rerun = False
+
+                try:
+                    self.func()
+                except Exception as e:
+                    logger.exception('Unexpected error in %s: %s',
+                                     self.name, e)
+
+                with self._lock:
+                    if not self._rerun:
+                        self._thread = None
+                        break
+        finally:
+            connections.close_all()
+
+
+def get_background_mode(
+    setting_name: str,
+) -> BackgroundMode:
+    """Return the background mode set in a site configuration setting.
+
+    Version Added:
+        8.0
+
+    Args:
+        setting_name (str):
+            The name of the site configuration setting.
+
+    Returns:
+        BackgroundMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`BackgroundMode.SYNC`.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    value = siteconfig.get(setting_name)
+
+    try:
+        return BackgroundMode(value)
+    except ValueError:
+        logger.warning('Invalid %s setting %r. This work will be done '
+                       'immediately.',
+                       setting_name, value)
+
+        return BackgroundMode.SYNC
+
+
+def prune_finished_entries(
+    queryset: QuerySet,
+    *,
+    unfinished_statuses: Collection[str],
+    older_than: datetime,
+) -> int:
+    """Delete finished entries from a background work queue.
+
+    Version Added:
+        8.0
+
+    Args:
+        queryset (django.db.models.QuerySet):
+            The queryset for the queue's entries. This must have
+            ``created`` and ``status`` fields.
+
+        unfinished_statuses (list of str):
+            The statuses of entries that must be kept.
+
+        older_than (datetime.datetime):
+            Only entries created before this time will be deleted.
+
+    Returns:
+        int:
+        The number of entries deleted.
+    """
+    return (
+        queryset
+        .filter(created__lt=older_than)
+        .exclude(status__in=unfinished_statuses)
+        .delete()
+    )[0]
@@ -17,6 +17,7 @@ from djblets.siteconfig.models import SiteConfiguration
 
 from reviewboard.accounts.models import ReviewRequestVisit
 from reviewboard.avatars import avatar_services
+from reviewboard.diffviewer.models import DiffSet
 from reviewboard.reviews.models import Group, ReviewRequest
 from reviewboard.reviews.templatetags.reviewtags import render_star
 from reviewboard.site.urlresolvers import local_site_reverse
@@ -1216,20 +1217,35 @@ class DiffSizeColumn(Column):
             *args, **kwargs)
 
     def render_data(self, state, review_request):
-        """Return the rendered contents of the column."""
-        if review_request.repository_id is None:
-            return ''
-
-        diffsets = list(review_request.diffset_history.diffsets.all())
+        """Return the rendered contents of the column.
 
-        if not diffsets:
+        Version Changed:
+            8.0:
+            This now uses the line counts stored on the latest diffset,
+            rather than loading every file in the diff.
+        """
+        if review_request.repository_id is None:
             return ''
 
-        diffset = diffsets[-1]
-
-        counts = diffset.get_total_line_counts()
-        insert_count = counts.get('raw_insert_count')
-        delete_count = counts.get('raw_delete_count')
+        diffset_history = review_request.diffset_history
+        diffset = diffset_history.latest_diffset
+
+        if diffset is None:
+            if diffset_history.last_diff_updated is None:
+                # There are no diffs on this review request.
+                return ''
+
+            # The latest diffset is populated for existing histories when
+            # upgrading, and kept up-to-date when diffs are added. If it's
+            # still missing (for instance, if it was cleared manually), it
+            # can be filled in by the backfill-diff-line-counts management
+            # command.
+            try:
+                diffset = diffset_history.diffsets.latest()
+            except DiffSet.DoesNotExist:
+                return ''
+
+        insert_count, delete_count = diffset.get_raw_line_counts()
         result = []
 
         if insert_count:
@@ -1248,8 +1264,12 @@ class DiffSizeColumn(Column):
     def augment_queryset(self, state, queryset):
         """Add additional queries to the queryset.
 
-        This will prefetch the diffsets and filediffs needed to perform the
-        line calculations.
+        This will fetch the latest diffset, which stores the line counts,
+        along with the review requests.
+
+        Version Changed:
+            8.0:
+            This no longer prefetches all diffsets and files.
 
         Args:
             state (djblets.datagrid.grids.StatefulColumn):
@@ -1262,7 +1282,4 @@ class DiffSizeColumn(Column):
             django.db.models.query.QuerySet:
             The resulting queryset.
         """
-        # TODO: Update this to fetch only the specific fields when we move
-        #       to a newer version of Django.
-        return queryset.prefetch_related('diffset_history__diffsets',
-                                         'diffset_history__diffsets__files')
+        return queryset.select_related('diffset_history__latest_diffset')
@@ -0,0 +1,76 @@
+"""Unit tests for reviewboard.datagrids.columns.DiffSizeColumn.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from django.utils import timezone
+
+from reviewboard.datagrids.columns import DiffSizeColumn
+from reviewboard.datagrids.tests.base import BaseColumnTestCase
+from reviewboard.reviews.models import ReviewRequest
+
+
+class DiffSizeColumnTests(BaseColumnTestCase):
+    """Testing reviewboard.datagrids.columns.DiffSizeColumn.
+
+    Version Added:
+        8.0
+    """
+
+    column = DiffSizeColumn()
+
+    fixtures = ['test_users', 'test_scmtools']
+
+    def test_render_data(self) -> None:
+        """Testing DiffSizeColumn.render_data"""
+        review_request = self.create_review_request(create_repository=True)
+        diffset = self.create_diffset(
+            repository=review_request.repository,
+            history=review_request.diffset_history)
+        self.create_filediff(diffset)
+        diffset.update_raw_line_counts()
+
+        review_request = (
+            self.column.augment_queryset(
+                self.stateful_column,
+                ReviewRequest.objects.filter(pk=review_request.pk))
+            .get()
+        )
+
+        with self.assertNumQueries(0):
+            html = self.column.render_data(self.stateful_column,
+                                           review_request)
+
+        self.assertHTMLEqual(
+            html,
+            '<span class="diff-size-column insert">+1</span>&nbsp;'
+            '<span class="diff-size-column delete">-1</span>')
+
+    def test_render_data_without_diff(self) -> None:
+        """Testing DiffSizeColumn.render_data without a diff"""
+        review_request = self.create_review_request(create_repository=True)
+
+        self.assertEqual(
+            self.column.render_data(self.stateful_column, review_request),
+            '')
+
+    def test_render_data_without_latest_diffset(self) -> None:
+        """Testing DiffSizeColumn.render_data with a diffset history
+        without a stored latest diffset
+        """
+        review_request = self.create_review_request(create_repository=True)
+        diffset = self.create_diffset(review_request)
+        self.create_filediff(diffset)
+
+        diffset_history = review_request.diffset_history
+        diffset_history.last_diff_updated = timezone.now()
+        diffset_history.save(update_fields=('last_diff_updated',))
+
+        self.assertIsNone(diffset_history.latest_diffset)
+        self.assertHTMLEqual(
+            self.column.render_data(self.stateful_column, review_request),
+            '<span class="diff-size-column insert">+1</span>&nbsp;'
+            '<span class="diff-size-column delete">-1</span>')
@@ -0,0 +1,24 @@
+"""Diff parsing, storage, and rendering."""
+
+from reviewboard.signals import initializing
+
+
+def _build_lexer_index(**kwargs) -> None:
+    """Build the index of lexers used for syntax highlighting.
+
+    This builds the index when the process starts up, rather than when
+    the first diff is rendered.
+
+    Version Added:
+        8.0
+
+    Args:
+        **kwargs (dict, unused):
+            Keyword arguments sent by the signal.
+    """
+    from reviewboard.diffviewer.lexers import get_lexer_index
+
+    get_lexer_index()
+
+
+initializing.connect(_build_lexer_index)
@@ -125,6 +125,7 @@ class DiffSetInline(_DiffSetCommon, admin.StackedInline):
 class DiffSetHistoryAdmin(ModelAdmin):
     list_display = ('__str__', 'timestamp')
     inlines = (DiffSetInline,)
+    raw_id_fields = ('latest_diffset',)
     ordering = ('-timestamp',)
 
 
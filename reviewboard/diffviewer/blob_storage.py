@@ -0,0 +1,575 @@
+"""Storage backends for stored diff data.
+
+By default, the compressed content of each
+:py:class:`~reviewboard.diffviewer.models.raw_file_diff_data.RawFileDiffData`
+is stored in the database. On large installs, this can make up most of the
+database, slowing down backups and replication.
+
+Diff content can instead be stored outside of the database, in a
+content-addressed store keyed by the content's hash. The database row then
+only stores metadata, and the ID of the backend storing the content in its
+``storage`` field.
+
+The following backends are available:
+
+``filesystem``:
+    Stores content in a directory on the local filesystem (or a shared
+    network filesystem). This defaults to the ``diffs`` directory in the
+    site's data directory.
+
+``file-storage``:
+    Stores content in the Django file storage backend configured for file
+    attachments (such as Amazon S3 or OpenStack Swift).
+
+The backend used for new diffs is set by the ``diffviewer_blob_storage``
+site configuration setting, which defaults to ``database``. Existing diffs
+can be moved between backends using :command:`rb-site manage ...
+migrate-diff-storage`.
+
+Content read from any backend is kept in a small per-process LRU cache of
+decompressed data, bounded by :py:data:`MAX_CONTENT_CACHE_SIZE`.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import ClassVar, Optional, TYPE_CHECKING
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from djblets.siteconfig.models import SiteConfiguration
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The maximum total size of decompressed content cached in each process.
+#:
+#: Version Added:
+#:     8.0
+MAX_CONTENT_CACHE_SIZE = 32 * 1024 * 1024
+
+
+class DiffBlobStorageError(Exception):
+    """An error storing or loading diff content.
+
+    Version Added:
+        8.0
+    """
+
+
+class DiffBlobStorage:
+    """Base class for a backend storing diff content outside the database.
+
+    Content is addressed by a key made from the content's hash and
+    compression method. Content for a key never changes once stored, so
+    backends don't need to handle concurrent writes to the same key with
+    different content.
+
+    Version Added:
+        8.0
+    """
+
+    #: The ID stored in ``RawFileDiffData.storage``.
+    #:
+    #: This must not change once content has been stored.
+    storage_id: ClassVar[str]
+
+    def save(
+        self,
+        key: str,
+        data: bytes,
+    ) -> None:
+        """Store content.
+
+        If content is already stored for the key, this does nothing.
+
+        Args:
+            key (str):
+                The key for the content.
+
+            data (bytes):
+                The content to store.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be stored.
+        """
+        raise NotImplementedError
+
+    def load(
+        self,
+        key: str,
+    ) -> bytes:
+        """Return stored content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            bytes:
+            The stored content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be loaded.
+        """
+        raise NotImplementedError
+
+    def delete(
+        self,
+        key: str,
+    ) -> None:
+        """Delete stored content.
+
+        If no content is stored for the key, this does nothing.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be deleted.
+        """
+        raise NotImplementedError
+
+    def get_path(
+        self,
+        key: str,
+    ) -> str:
+        """Return the relative path for a key.
+
+        Keys are split into nested directories, to avoid storing too many
+        files in one directory.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            str:
+            The relative path for the content.
+        """
+        return '%s/%s/%s' % (key[:2], key[2:4], key)
+
+
+class FileSystemDiffBlobStorage(DiffBlobStorage):
+    """Stores diff content in a directory on the filesystem.
+
+    Version Added:
+        8.0
+    """
+
+    storage_id = 'filesystem'
+
+    def __init__(
+        self,
+        root: str,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            root (str):
+                The directory to store content in.
+        """
+        self.root = root
+
+    def save(
+        self,
+        key: str,
+        data: bytes,
+    ) -> None:
+        """Store content.
+
+        Content is written to a temporary file and then moved into place,
+        so readers never see partially-written content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+            data (bytes):
+                The content to store.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be stored.
+        """
+        path = self._get_full_path(key)
+
+        if os.path.exists(path):
+            return
+
+        dirname = os.path.dirname(path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.tmp-')
+
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    fp.write(data)
+
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            raise DiffBlobStorageError(
+                'Unable to store diff content "%s" in "%s": %s'
+                % (key, self.root, e))
+
+    def load(
+        self,
+        key: str,
+    ) -> bytes:
+        """Return stored content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            bytes:
+            The stored content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be loaded.
+        """
+        try:
+            with open(self._get_full_path(key), 'rb') as fp:
+                return fp.read()
+        except OSError as e:
+            raise DiffBlobStorageError(
+                'Unable to load diff content "%s" from "%s": %s'
+                % (key, self.root, e))
+
+    def delete(
+        self,
+        key: str,
+    ) -> None:
+        """Delete stored content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be deleted.
+        """
+        try:
+            os.unlink(self._get_full_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise DiffBlobStorageError(
+                'Unable to delete diff content "%s" from "%s": %s'
+                % (key, self.root, e))
+
+    def _get_full_path(
+        self,
+        key: str,
+    ) -> str:
+        """Return the full path to the file for a key.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            str:
+            The full path to the file.
+        """
+        return os.path.join(self.root, *self.get_path(key).split('/'))
+
+
+class FileStorageDiffBlobStorage(DiffBlobStorage):
+    """Stores diff content in the configured Django file storage backend.
+
+    This uses the same storage as file attachments, such as Amazon S3 or
+    OpenStack Swift.
+
+    Version Added:
+        8.0
+    """
+
+    storage_id = 'file-storage'
+
+    #: The directory in the file storage containing diff content.
+    base_path = 'diffviewer/blobs'
+
+    def save(
+        self,
+        key: str,
+        data: bytes,
+    ) -> None:
+        """Store content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+            data (bytes):
+                The content to store.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be stored.
+        """
+        path = self._get_storage_path(key)
+
+        try:
+            if not default_storage.exists(path):
+                saved_path = default_storage.save(path, ContentFile(data))
+
+                if saved_path != path:
+                    # Another process stored the same content at the same
+                    # time, and the storage backend chose a new name. The
+                    # content is identical, so discard this copy.
+                    default_storage.delete(saved_path)
+        except Exception as e:
+            raise DiffBlobStorageError(
+                'Unable to store diff content "%s": %s'
+                % (key, e))
+
+    def load(
+        self,
+        key: str,
+    ) -> bytes:
+        """Return stored content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            bytes:
+            The stored content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be loaded.
+        """
+        try:
+            with default_storage.open(self._get_storage_path(key),
+                                      'rb') as fp:
+                return fp.read()
+        except Exception as e:
+            raise DiffBlobStorageError(
+                'Unable to load diff content "%s": %s'
+                % (key, e))
+
+    def delete(
+        self,
+        key: str,
+    ) -> None:
+        """Delete stored content.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Raises:
+            DiffBlobStorageError:
+                The content could not be deleted.
+        """
+        try:
+            default_storage.delete(self._get_storage_path(key))
+        except Exception as e:
+            raise DiffBlobStorageError(
+                'Unable to delete diff content "%s": %s'
+                % (key, e))
+
+    def _get_storage_path(
+        self,
+        key: str,
+    ) -> str:
+        """Return the path in the file storage for a key.
+
+        Args:
+            key (str):
+                The key for the content.
+
+        Returns:
+            str:
+            The path in the file storage.
+        """
+        return '%s/%s' % (self.base_path, self.get_path(key))
+
+
+class DiffContentCache:
+    """A thread-safe LRU cache of decompressed diff content.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size (int):
+                The maximum total size of cached content, in bytes. Content
+                larger than a quarter of this won't be cached.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        key: str,
+        load_func: Callable[[], bytes],
+    ) -> bytes:
+        """Return cached content, loading it if not cached.
+
+        Args:
+            key (str):
+                The key for the content.
+
+            load_func (callable):
+                A function returning the content if it's not cached.
+
+        Returns:
+            bytes:
+            The content.
+        """
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+
+                return self._items[key]
+            except KeyError:
+                pass
+
+        data = load_func()
+        data_len = len(data)
+
+        if data_len <= self.max_size // 4:
+            with self._lock:
+                if key not in self._items:
+                    self._items[key] = data
+                    self.size += data_len
+
+                    while self.size > self.max_size:
+                        self.size -= len(self._items.popitem(last=False)[1])
+
+        return data
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+#: The cache of decompressed diff content for this process.
+#:
+#: Version Added:
+#:     8.0
+content_cache = DiffContentCache(MAX_CONTENT_CACHE_SIZE)
+
+
+def get_diff_blob_storage(
+    storage_id: str,
+) -> DiffBlobStorage:
+    """Return a storage backend by ID.
+
+    Version Added:
+        8.0
+
+    Args:
+        storage_id (str):
+            The ID of the backend.
+
+    Returns:
+        DiffBlobStorage:
+        The storage backend.
+
+    Raises:
+        DiffBlobStorageError:
+            The storage backend ID is unknown.
+    """
+    if storage_id == FileSystemDiffBlobStorage.storage_id:
+        siteconfig = SiteConfiguration.objects.get_current()
+
+        return FileSystemDiffBlobStorage(
+            siteconfig.get('diffviewer_blob_storage_path') or
+            os.path.join(settings.SITE_DATA_DIR, 'diffs'))
+    elif storage_id == FileStorageDiffBlobStorage.storage_id:
+        return FileStorageDiffBlobStorage()
+    else:
+        raise DiffBlobStorageError('Unknown diff storage backend "%s"'
+                                   % storage_id)
+
+
+def get_default_diff_blob_storage() -> Optional[DiffBlobStorage]:
+    """Return the storage backend to use for new diff content.
+
+    Version Added:
+        8.0
+
+    Returns:
+        DiffBlobStorage:
+        The storage backend, or ``None`` if content should be stored in the
+        database.
+
+    Raises:
+        DiffBlobStorageError:
+            The configured storage backend ID is unknown.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    storage_id = siteconfig.get('diffviewer_blob_storage')
+
+    if not storage_id or storage_id == 'database':
+        return None
+
+    return get_diff_blob_storage(storage_id)
+
+
+def get_blob_key(
+    binary_hash: str,
+    compression: Optional[str],
+) -> str:
+    """Return the storage key for diff content.
+
+    The key includes the compression method, so that recompressed content
+    is stored under a new key. Readers never see content that doesn't match
+    the compression method in the database.
+
+    Version Added:
+        8.0
+
+    Args:
+        binary_hash (str):
+            The hash of the uncompressed content.
+
+        compression (str):
+            The compression ID of the stored content, or ``None`` if
+            uncompressed.
+
+    Returns:
+        str:
+        The storage key.
+    """
+    return '%s.%s' % (binary_hash, compression or 'raw')
@@ -7,20 +7,17 @@ import hashlib
 import logging
 import re
 from collections.abc import Mapping
-from itertools import zip_longest
+from itertools import islice, zip_longest
 from typing import Any, Literal, TYPE_CHECKING, TypedDict
 
-import pygments.util
+import pygments
 from django.utils.encoding import force_str
 from django.utils.html import escape
 from django.utils.translation import get_language, gettext as _
 from djblets.log import log_timed
 from djblets.cache.backend import cache_memoize
 from housekeeping.functions import deprecate_non_keyword_only_args
-from pygments import highlight
 from pygments.formatters import HtmlFormatter
-from pygments.lexers import (find_lexer_class,
-                             guess_lexer_for_filename)
 
 from reviewboard.codesafety import code_safety_checker_registry
 from reviewboard.deprecation import (
@@ -35,17 +32,18 @@ from reviewboard.diffviewer.diffutils import (
     get_line_changed_regions,
     get_original_and_patched_files,
     get_original_file,
-    get_patched_file,
     get_sha256,
     split_line_endings,
 )
+from reviewboard.diffviewer.lexers import get_lexer_for_filename
 from reviewboard.diffviewer.opcode_generator import get_diff_opcode_generator
 from reviewboard.diffviewer.settings import DiffSettings
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterator, Sequence
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
     from django.http import HttpRequest
+    from pygments.lexer import Lexer
     from typing_extensions import TypeAlias
 
     from reviewboard.diffviewer.differ import Differ, DiffOpcodeTag
@@ -94,6 +92,135 @@ class NoWrapperHtmlFormatter(_HtmlFormatter):
             if tup[0]:
                 yield tup
 
+    def iter_lines(
+        self,
+        tokensource: Iterable[tuple[Any, str]],
+    ) -> Iterator[str]:
+        """Yield each line of formatted HTML as it's generated.
+
+        This produces the same lines as formatting all tokens at once and
+        splitting the result with
+        :py:func:`~reviewboard.diffviewer.diffutils.split_line_endings`, but
+        without holding the full result in memory.
+
+        Version Added:
+            8.0
+
+        Args:
+            tokensource (iterable):
+                The tokens to format, generally from
+                :py:meth:`pygments.lexer.Lexer.get_tokens`.
+
+        Yields:
+            str:
+            Each formatted line.
+        """
+        pending = ''
+
+        # This is the same pipeline used by HtmlFormatter.format_unencoded()
+        # for our options. Each piece is generally one line.
+        for t, piece in self._wrap_div(self.wrap(
+                self._format_lines(tokensource))):
+            pending += piece
+            i = pending.rfind('\n')
+
+            if i != -1:
+                yield from split_line_endings(pending[:i + 1])
+                pending = pending[i + 1:]
+
+        if pending:
+            yield from split_line_endings(pending)
+
+
+class _StreamedLines:
+    """A forward-only view of lines generated on demand.
+
+    This allows lines of markup to be sliced as if they were in a list,
+    while only generating and keeping the lines that are needed. Slices
+    must be requested in increasing order, which is the order in which
+    opcodes are processed.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        lines: Iterable[str],
+    ) -> None:
+        """Initialize the lines.
+
+        Args:
+            lines (iterable of str):
+                The lines to generate on demand.
+        """
+        self._lines = iter(lines)
+        self._buffer: list[str] = []
+        self._buffer_start = 0
+
+    def __getitem__(
+        self,
+        key: slice,
+    ) -> list[str]:
+        """Return a slice of lines.
+
+        Any lines before the start of the slice are discarded.
+
+        Args:
+            key (slice):
+                The slice of lines to return. Steps are not supported.
+
+        Returns:
+            list of str:
+            The lines in the slice.
+
+        Raises:
+            ValueError:
+                The slice starts before a previously-requested slice.
+        """
+        start = key.start or 0
+        stop = key.stop
+        assert key.step is None
+        assert stop is not None
+
+        if start < self._buffer_start:
+            raise ValueError(
+                'Line %d was requested after it was discarded.'
+                % (start + 1))
+
+        buffer = self._buffer
+
+        # Discard everything before the start of the slice, including any
+        # lines that haven't been generated yet.
+        num_skipped = start - self._buffer_start - len(buffer)
+
+        if num_skipped > 0:
+            buffer.clear()
+
+            for line in islice(self._lines, num_skipped):
+                pass
+        else:
+            del buffer[:start - self._buffer_start]
+
+        self._buffer_start = start
+
+        if stop - start > len(buffer):
+            buffer += islice(self._lines, stop - start - len(buffer))
+
+        return buffer[:stop - start]
+
+    def drain(self) -> None:
+        """Generate and discard any remaining lines.
+
+        This lets the source of the lines finish any work it does once the
+        last line has been generated, such as storing highlighted lines in
+        the cache. No further lines can be requested afterward.
+        """
+        self._buffer.clear()
+
+        for line in self._lines:
+            pass
+
 
 #: The tag for a diff chunk.
 #:
@@ -141,6 +268,30 @@ DiffLine: TypeAlias = tuple[
 ]
 
 
+class _HighlightCacheMiss(Exception):
+    """A syntax-highlighted file or segment was not found in the cache.
+
+    Version Added:
+        8.0
+    """
+
+
+def _raise_highlight_cache_miss() -> Any:
+    """Raise an exception indicating a cache miss.
+
+    This is used as the lookup function when reading syntax-highlighted
+    files from the cache, so that nothing is stored on a miss.
+
+    Version Added:
+        8.0
+
+    Raises:
+        _HighlightCacheMiss:
+            Always raised.
+    """
+    raise _HighlightCacheMiss
+
+
 class DiffChunk(TypedDict):
     """Definition for a chunk in the diff.
 
@@ -167,6 +318,43 @@ class DiffChunk(TypedDict):
     numlines: int
 
 
+class DiffChunkSegment(TypedDict):
+    """Information on a segment of cached diff chunks.
+
+    Large diffs are cached as several independent segments of chunks, so
+    that a range of lines can be loaded without loading the whole diff.
+
+    Version Added:
+        8.0
+    """
+
+    #: The first virtual line number in the segment.
+    first_line: int
+
+    #: The last virtual line number in the segment.
+    last_line: int
+
+    #: The number of chunks in the segment.
+    num_chunks: int
+
+
+class DiffChunkSegmentIndex(TypedDict):
+    """An index of the segments of cached diff chunks.
+
+    Version Added:
+        8.0
+    """
+
+    #: The chunks, if they all fit in a single segment.
+    #:
+    #: If set, the chunks are stored with the index instead of in a
+    #: separate segment.
+    chunks: list[DiffChunk] | None
+
+    #: Information on each segment, in order.
+    segments: list[DiffChunkSegment]
+
+
 #: Type for information about a header in a file.
 #:
 #: Version Added:
@@ -209,6 +397,21 @@ class RawDiffChunkGenerator:
     #: The default width for a tabstop.
     TAB_SIZE = DiffSettings.DEFAULT_TAB_SIZE
 
+    #: The approximate number of lines in each cached segment of chunks.
+    #:
+    #: Version Added:
+    #:     8.0
+    CACHE_SEGMENT_NUM_LINES = 1000
+
+    #: The version of the format of cached syntax-highlighted files.
+    #:
+    #: This should be updated when the syntax-highlighted markup changes in
+    #: a compatibility-breaking way.
+    #:
+    #: Version Added:
+    #:     8.0
+    HIGHLIGHT_CACHE_FORMAT_VERSION = 2
+
     ######################
     # Instance variables #
     ######################
@@ -276,6 +479,11 @@ class RawDiffChunkGenerator:
     #: The most recent header index used.
     _last_header_index: list[int]
 
+    #: Cached segments of chunks already loaded by this generator.
+    #:
+    #: This maps segment indexes to chunks.
+    _loaded_segments: dict[int, list[DiffChunk]]
+
     def __init__(
         self,
         old: bytes | Sequence[bytes] | None,
@@ -373,6 +581,7 @@ class RawDiffChunkGenerator:
         self.differ = None
 
         self.all_code_safety_results = {}
+        self._loaded_segments = {}
 
         # Chunk processing state.
         self._last_header = (None, None)
@@ -398,6 +607,14 @@ class RawDiffChunkGenerator:
         cache, they will be yielded. Otherwise, new chunks will be generated,
         stored in cache (given a cache key), and yielded.
 
+        Large diffs are cached in segments of about
+        :py:attr:`CACHE_SEGMENT_NUM_LINES` lines, which are loaded one at a
+        time as chunks are yielded.
+
+        Version Changed:
+            8.0:
+            Chunks are now cached in segments.
+
         Args:
             cache_key (str, optional):
                 The cache key to use.
@@ -407,13 +624,104 @@ class RawDiffChunkGenerator:
             Each chunk in the diff.
         """
         if cache_key:
-            chunks = cache_memoize(cache_key,
-                                   lambda: list(self.get_chunks_uncached()),
-                                   large_data=True)
+            segment_index = self._get_segment_index(cache_key)
+
+            for i in range(len(segment_index['segments'])):
+                yield from self._get_segment_chunks(
+                    cache_key=cache_key,
+                    segment_index=segment_index,
+                    segment_num=i)
+        else:
+            yield from self.get_chunks_uncached()
+
+    def get_chunks_in_line_range(
+        self,
+        first_line: int,
+        last_line: int,
+        cache_key: (str | None) = None,
+    ) -> Iterator[DiffChunk]:
+        """Yield the chunks containing any lines in a range.
+
+        If a cache key is provided, only the cached segments containing the
+        range will be loaded.
+
+        Version Added:
+            8.0
+
+        Args:
+            first_line (int):
+                The first virtual line number in the range.
+
+            last_line (int):
+                The last virtual line number in the range, inclusive.
+
+            cache_key (str, optional):
+                The cache key to use.
+
+        Yields:
+            DiffChunk:
+            Each chunk containing lines in the range. The full chunk is
+            yielded, including any lines outside the range.
+        """
+        if cache_key:
+            segment_index = self._get_segment_index(cache_key)
+            chunks: Iterable[DiffChunk] = (
+                chunk
+                for i, segment in enumerate(segment_index['segments'])
+                if (segment['first_line'] <= last_line and
+                    segment['last_line'] >= first_line)
+                for chunk in self._get_segment_chunks(
+                    cache_key=cache_key,
+                    segment_index=segment_index,
+                    segment_num=i)
+            )
         else:
             chunks = self.get_chunks_uncached()
 
-        yield from chunks
+        for chunk in chunks:
+            lines = chunk['lines']
+
+            if lines[0][0] > last_line:
+                break
+
+            if lines[-1][0] >= first_line:
+                yield chunk
+
+    def get_last_line_number(
+        self,
+        cache_key: (str | None) = None,
+    ) -> int | None:
+        """Return the last virtual line number in the diff.
+
+        If a cache key is provided, this will only load the index of cached
+        segments.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str, optional):
+                The cache key to use.
+
+        Returns:
+            int:
+            The last virtual line number, or ``None`` if there are no chunks.
+        """
+        if cache_key:
+            segments = self._get_segment_index(cache_key)['segments']
+
+            if segments:
+                return segments[-1]['last_line']
+        else:
+            last_chunk = None
+
+            for last_chunk in self.get_chunks_uncached():
+                pass
+
+            if last_chunk is not None:
+                return last_chunk['lines'][-1][0]
+
+        return None
 
     def get_chunks_uncached(self) -> Iterator[DiffChunk]:
         """Yield the list of chunks, bypassing the cache.
@@ -467,6 +775,12 @@ class RawDiffChunkGenerator:
             DiffChunk:
             A rendered chunk.
         """
+        # Reset the chunk processing state, in case chunks are being
+        # generated again.
+        self._last_header = (None, None)
+        self._last_header_index = [0, 0]
+        self._chunk_index = 0
+
         is_lists = isinstance(old, list)
         assert is_lists == isinstance(new, list)
 
@@ -494,23 +808,29 @@ class RawDiffChunkGenerator:
             new_str, new_lines = self.normalize_source_string(
                 new, new_encoding_list)
 
-            old_markup = None
-            new_markup = None
+            old_markup_lines = None
+            new_markup_lines = None
 
+            # The markup is generated as lines are needed, rather than all
+            # at once, to avoid keeping the full markup for large files in
+            # memory.
             if self._get_enable_syntax_highlighting(
                 old, new, old_lines, new_lines):
-                old_markup = self._apply_pygments(
+                old_markup_lines = self._iter_pygments_lines(
                     old_str,
                     self.normalize_path_for_display(self.orig_filename))
-                new_markup = self._apply_pygments(
+                new_markup_lines = self._iter_pygments_lines(
                     new_str,
                     self.normalize_path_for_display(self.modified_filename))
 
-            if not old_markup:
-                old_markup = self.NEWLINES_RE.split(escape(old_str))
+            if old_markup_lines is None:
+                old_markup_lines = (escape(line) for line in old_lines)
+
+            if new_markup_lines is None:
+                new_markup_lines = (escape(line) for line in new_lines)
 
-            if not new_markup:
-                new_markup = self.NEWLINES_RE.split(escape(new_str))
+            old_markup = _StreamedLines(old_markup_lines)
+            new_markup = _StreamedLines(new_markup_lines)
 
         old_num_lines = len(old_lines)
         new_num_lines = len(new_lines)
@@ -580,6 +900,13 @@ class RawDiffChunkGenerator:
 
             line_num += num_lines
 
+        # The opcodes only request the lines they need, so the markup
+        # generators are paused after the last line. Finish them, so that
+        # any highlighted files are completely stored in the cache.
+        for markup in (old_markup, new_markup):
+            if isinstance(markup, _StreamedLines):
+                markup.drain()
+
         self.counts = counts
 
     def check_line_code_safety(
@@ -1494,6 +1821,197 @@ class RawDiffChunkGenerator:
         else:
             self._last_header_index[0] = last_index
 
+    def _get_segment_index(
+        self,
+        cache_key: str,
+    ) -> DiffChunkSegmentIndex:
+        """Return the index of cached segments of chunks.
+
+        If the index isn't in the cache, the chunks will be generated and
+        stored in the cache.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str):
+                The cache key for the chunks.
+
+        Returns:
+            DiffChunkSegmentIndex:
+            The index of cached segments.
+        """
+        return cache_memoize(
+            cache_key,
+            lambda: self._store_chunk_segments(cache_key),
+            large_data=True)
+
+    def _get_segment_chunks(
+        self,
+        *,
+        cache_key: str,
+        segment_index: DiffChunkSegmentIndex,
+        segment_num: int,
+    ) -> list[DiffChunk]:
+        """Return the chunks in a cached segment.
+
+        If the segment is no longer in the cache, all chunks will be
+        generated and stored in the cache again.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str):
+                The cache key for the chunks.
+
+            segment_index (DiffChunkSegmentIndex):
+                The index of cached segments.
+
+            segment_num (int):
+                The index of the segment to return.
+
+        Returns:
+            list of DiffChunk:
+            The chunks in the segment.
+        """
+        chunks = segment_index['chunks']
+
+        if chunks is not None:
+            return chunks
+
+        loaded_segments = self._loaded_segments
+
+        try:
+            return loaded_segments[segment_num]
+        except KeyError:
+            pass
+
+        def _regenerate_segment() -> list[DiffChunk]:
+            # The segment was evicted from the cache. Since chunks can only
+            # be generated from the start of the file, regenerate all of
+            # them and keep them around, in case other segments were
+            # evicted as well.
+            self._store_chunk_segments(cache_key,
+                                       keep_segments=True)
+
+            return loaded_segments[segment_num]
+
+        chunks = cache_memoize(
+            self._make_segment_cache_key(cache_key, segment_num),
+            _regenerate_segment,
+            large_data=True)
+        loaded_segments[segment_num] = chunks
+
+        return chunks
+
+    def _store_chunk_segments(
+        self,
+        cache_key: str,
+        *,
+        keep_segments: bool = False,
+    ) -> DiffChunkSegmentIndex:
+        """Generate chunks and store them in the cache in segments.
+
+        Each segment is stored as soon as it's generated, so only one
+        segment's worth of chunks needs to be held in memory at a time. If
+        all the chunks fit in one segment, they're stored in the returned
+        index instead.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str):
+                The cache key for the chunks.
+
+            keep_segments (bool, optional):
+                Whether to keep the generated segments in this generator
+                for later use.
+
+        Returns:
+            DiffChunkSegmentIndex:
+            The index of the segments, to be stored in the cache by the
+            caller.
+        """
+        segment_num_lines = self.CACHE_SEGMENT_NUM_LINES
+        segments: list[DiffChunkSegment] = []
+        segment_chunks: list[list[DiffChunk]] = []
+        chunks: list[DiffChunk] = []
+
+        def _add_segment() -> None:
+            segments.append({
+                'first_line': chunks[0]['lines'][0][0],
+                'last_line': chunks[-1]['lines'][-1][0],
+                'num_chunks': len(chunks),
+            })
+
+            if keep_segments:
+                self._loaded_segments[len(segment_chunks)] = chunks
+
+            segment_chunks.append(chunks)
+
+            if len(segment_chunks) > 1:
+                # There's more than one segment, so they all need to be
+                # stored separately. Store the ones that haven't been yet,
+                # and stop holding on to them.
+                for i, stored_chunks in enumerate(segment_chunks):
+                    if stored_chunks is not None:
+                        cache_memoize(
+                            self._make_segment_cache_key(cache_key, i),
+                            lambda: stored_chunks,
+                            large_data=True,
+                            force_overwrite=True)
+                        segment_chunks[i] = None  # type:ignore
+
+        num_lines = 0
+
+        for chunk in self.get_chunks_uncached():
+            chunks.append(chunk)
+            num_lines += chunk['numlines']
+
+            if num_lines >= segment_num_lines:
+                _add_segment()
+                chunks = []
+                num_lines = 0
+
+        if chunks:
+            _add_segment()
+
+        if len(segments) > 1:
+            return {
+                'chunks': None,
+                'segments': segments,
+            }
+        else:
+            return {
+                'chunks': segment_chunks[0] if segment_chunks else [],
+                'segments': segments,
+            }
+
+    def _make_segment_cache_key(
+        self,
+        cache_key: str,
+        segment_num: int,
+    ) -> str:
+        """Return the cache key for a segment of chunks.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str):
+                The cache key for the chunks.
+
+            segment_num (int):
+                The index of the segment.
+
+        Returns:
+            str:
+            The cache key for the segment.
+        """
+        return f'{cache_key}-segment-{segment_num}'
+
     def _apply_pygments(
         self,
         data: str,
@@ -1504,6 +2022,11 @@ class RawDiffChunkGenerator:
         This will only apply syntax highlighting if a lexer is available and
         the file extension is not blacklisted.
 
+        Version Changed:
+            8.0:
+            Highlighted files are now cached and shared between generators.
+            See :py:meth:`_iter_pygments_lines`.
+
         Args:
             data (str):
                 The data to syntax highlight.
@@ -1517,38 +2040,227 @@ class RawDiffChunkGenerator:
             A list of lines, all syntax-highlighted, if a lexer is found.
             If no lexer is available, this will return ``None``.
         """
-        if filename.endswith(self.STYLED_EXT_BLACKLIST):
+        lines = self._iter_pygments_lines(data, filename)
+
+        if lines is None:
             return None
 
-        custom_pygments_lexers = self.diff_settings.custom_pygments_lexers
-        lexer = None
+        return list(lines)
 
-        for ext, lexer_name in custom_pygments_lexers.items():
-            if ext and filename.endswith(ext):
-                lexer_class = find_lexer_class(lexer_name)
+    def _iter_pygments_lines(
+        self,
+        data: str,
+        filename: str,
+    ) -> Iterator[str] | None:
+        """Return an iterator of syntax-highlighted lines for a file.
 
-                if lexer_class:
-                    lexer = lexer_class(stripnl=False,
-                                        encoding='utf-8')
-                    break
-                else:
-                    logger.error(
-                        'Pygments lexer "%s" for "%s" files in '
-                        'Diff Viewer Settings was not found.',
-                        lexer_name, ext)
-        else:
+        This works like :py:meth:`_apply_pygments`, but lines are highlighted
+        as they're consumed, rather than all at once. Tokens are still lexed
+        from the start of the file, so constructs spanning many lines (such as
+        long comments or strings) are highlighted correctly.
+
+        The highlighted file is cached based on its content, the lexer, and
+        the version of Pygments, so that it can be shared by every diff
+        containing the same file content. For instance, an interdiff, a
+        re-upload, or another review request that contains an unchanged
+        file won't need to highlight it again.
+
+        The cached lines are stored in segments of
+        :py:attr:`CACHE_SEGMENT_NUM_LINES` lines, so that only one segment
+        needs to be held in memory at a time, whether the file is being
+        highlighted or read back from the cache.
+
+        Version Added:
+            8.0
+
+        Args:
+            data (str):
+                The data to syntax highlight.
+
+            filename (str):
+                The name of the file. This is used to help determine a
+                suitable lexer.
+
+        Returns:
+            iterator of str:
+            An iterator of syntax-highlighted lines, if a lexer is found.
+            If no lexer is available, this will return ``None``.
+        """
+        lexer = self._get_pygments_lexer(data, filename)
+
+        if lexer is None:
+            return None
+
+        if not data:
+            return NoWrapperHtmlFormatter().iter_lines(
+                lexer.get_tokens(data))
+
+        return self._iter_cached_highlighted_lines(
+            cache_key=self._make_highlight_cache_key(data, lexer),
+            highlight_lines=lambda: NoWrapperHtmlFormatter().iter_lines(
+                lexer.get_tokens(data)))
+
+    def _iter_cached_highlighted_lines(
+        self,
+        *,
+        cache_key: str,
+        highlight_lines: Callable[[], Iterator[str]],
+    ) -> Iterator[str]:
+        """Yield syntax-highlighted lines, using cached segments if present.
+
+        The cache key stores the number of segments, and each segment is
+        stored under its own key as a single string of newline-separated
+        lines, which is considerably smaller in the cache than a list of
+        strings. Highlighted lines never contain newlines.
+
+        If the file isn't cached, or a segment has been evicted, the file is
+        highlighted again as lines are consumed, and stored in the cache one
+        segment at a time. The number of segments is stored last, so it's
+        only present once every segment has been stored.
+
+        Version Added:
+            8.0
+
+        Args:
+            cache_key (str):
+                The cache key for the highlighted file.
+
+            highlight_lines (callable):
+                A function returning an iterator of highlighted lines.
+
+        Yields:
+            str:
+            Each syntax-highlighted line.
+        """
+        num_yielded = 0
+
+        try:
+            num_segments = cache_memoize(cache_key,
+                                         _raise_highlight_cache_miss)
+        except _HighlightCacheMiss:
+            num_segments = None
+
+        if num_segments is not None:
             try:
-                lexer = guess_lexer_for_filename(filename,
-                                                 data,
-                                                 stripnl=False,
-                                                 encoding='utf-8')
-            except pygments.util.ClassNotFound:
-                return None
+                for segment_num in range(num_segments):
+                    segment = cache_memoize(
+                        self._make_segment_cache_key(cache_key,
+                                                     segment_num),
+                        _raise_highlight_cache_miss,
+                        large_data=True)
+                    lines = segment.split('\n')
+
+                    yield from lines
+                    num_yielded += len(lines)
+
+                return
+            except _HighlightCacheMiss:
+                # A segment was evicted. Highlight the file again, skipping
+                # the lines that were already returned.
+                pass
+
+        segment_num_lines = self.CACHE_SEGMENT_NUM_LINES
+        num_segments = 0
+        segment_lines: list[str] = []
+
+        def _store_segment() -> None:
+            segment = '\n'.join(segment_lines)
+
+            cache_memoize(
+                self._make_segment_cache_key(cache_key, num_segments),
+                lambda: segment,
+                large_data=True,
+                force_overwrite=True)
+
+        for line_num, line in enumerate(highlight_lines()):
+            if line_num >= num_yielded:
+                yield line
+
+            segment_lines.append(line)
+
+            if len(segment_lines) == segment_num_lines:
+                _store_segment()
+                num_segments += 1
+                segment_lines = []
+
+        if segment_lines:
+            _store_segment()
+            num_segments += 1
+
+        cache_memoize(cache_key,
+                      lambda: num_segments,
+                      force_overwrite=True)
+
+    def _make_highlight_cache_key(
+        self,
+        data: str,
+        lexer: Lexer,
+    ) -> str:
+        """Return a cache key for a syntax-highlighted file.
+
+        Version Added:
+            8.0
+
+        Args:
+            data (str):
+                The data being syntax highlighted.
+
+            lexer (pygments.lexer.Lexer):
+                The lexer used to syntax highlight the data.
+
+        Returns:
+            str:
+            The cache key.
+        """
+        lexer_cls = type(lexer)
+
+        return '-'.join([
+            f'diff-highlight-{self.HIGHLIGHT_CACHE_FORMAT_VERSION}',
+            get_sha256(data.encode('utf-8')),
+            f'{lexer_cls.__module__}.{lexer_cls.__name__}',
+            pygments.__version__,
+        ])
+
+    def _get_pygments_lexer(
+        self,
+        data: str,
+        filename: str,
+    ) -> Lexer | None:
+        """Return the Pygments lexer to use for a file.
+
+        Lexers are looked up using
+        :py:func:`~reviewboard.diffviewer.lexers.get_lexer_for_filename`.
+
+        Version Added:
+            8.0
+
+        Args:
+            data (str):
+                The data to syntax highlight.
+
+            filename (str):
+                The name of the file. This is used to help determine a
+                suitable lexer.
+
+        Returns:
+            pygments.lexer.Lexer:
+            The lexer to use, or ``None`` if the file should not be
+            syntax-highlighted.
+        """
+        if filename.endswith(self.STYLED_EXT_BLACKLIST):
+            return None
+
+        lexer = get_lexer_for_filename(
+            filename,
+            data,
+            custom_lexers=self.diff_settings.custom_pygments_lexers,
+            stripnl=False,
+            encoding='utf-8')
 
-        lexer.add_filter('codetagify')
+        if lexer is not None:
+            lexer.add_filter('codetagify')
 
-        return split_line_endings(
-            highlight(data, lexer, NoWrapperHtmlFormatter()))
+        return lexer
 
 
 class DiffChunkGenerator(RawDiffChunkGenerator):
@@ -1599,7 +2311,7 @@ class DiffChunkGenerator(RawDiffChunkGenerator):
     #:
     #: Version Added:
     #:     8.0
-    CACHE_FORMAT_VERSION = 1
+    CACHE_FORMAT_VERSION = 2
 
     @deprecate_non_keyword_only_args(RemovedInReviewBoard80Warning)
     def __init__(
@@ -1730,20 +2442,56 @@ class DiffChunkGenerator(RawDiffChunkGenerator):
             DiffChunk:
             Each chunk in the diff.
         """
-        filediff = self.filediff
-        counts = filediff.get_line_counts()
+        if self._has_chunks():
+            yield from super().get_chunks(self.make_cache_key())
 
-        if (filediff.binary or
-            filediff.source_revision == '' or
-            ((filediff.is_new or filediff.deleted or
-              filediff.moved or filediff.copied) and
-             counts['raw_insert_count'] == 0 and
-             counts['raw_delete_count'] == 0)):
-            return
+    def get_chunks_in_line_range(
+        self,
+        first_line: int,
+        last_line: int,
+    ) -> Iterator[DiffChunk]:
+        """Yield the chunks containing any lines in a range.
 
-        cache_key = self.make_cache_key()
+        Only the cached segments containing the range will be loaded.
 
-        yield from super().get_chunks(cache_key)
+        Version Added:
+            8.0
+
+        Args:
+            first_line (int):
+                The first virtual line number in the range.
+
+            last_line (int):
+                The last virtual line number in the range, inclusive.
+
+        Yields:
+            DiffChunk:
+            Each chunk containing lines in the range. The full chunk is
+            yielded, including any lines outside the range.
+        """
+        if self._has_chunks():
+            yield from super().get_chunks_in_line_range(
+                first_line,
+                last_line,
+                cache_key=self.make_cache_key())
+
+    def get_last_line_number(self) -> int | None:
+        """Return the last virtual line number in the diff.
+
+        This will only load the index of cached segments.
+
+        Version Added:
+            8.0
+
+        Returns:
+            int:
+            The last virtual line number, or ``None`` if there are no chunks.
+        """
+        if self._has_chunks():
+            return super().get_last_line_number(
+                cache_key=self.make_cache_key())
+
+        return None
 
     def get_chunks_uncached(self) -> Iterator[DiffChunk]:
         """Yield the list of chunks, bypassing the cache.
@@ -1775,11 +2523,10 @@ class DiffChunkGenerator(RawDiffChunkGenerator):
             #
             # We'll be diffing against the patched version of this commit's
             # version of the file.
-            old = get_original_file(filediff=base_filediff,
-                                    request=request)
-            old = get_patched_file(source_data=old,
-                                   filediff=base_filediff,
-                                   request=request)
+            old = get_original_and_patched_files(
+                filediff=base_filediff,
+                request=request,
+                update_mimetypes=False)[1]
             old_encoding_list = get_filediff_encodings(base_filediff)
         elif filediff.commit_id:
             # This diff is against a commit, but no previous FileDiff
@@ -1827,11 +2574,10 @@ class DiffChunkGenerator(RawDiffChunkGenerator):
             old = new
             old_encoding_list = new_encoding_list
 
-            interdiff_orig = get_original_file(filediff=interfilediff,
-                                               request=request)
-            new = get_patched_file(source_data=interdiff_orig,
-                                   filediff=interfilediff,
-                                   request=request)
+            interdiff_orig, new = get_original_and_patched_files(
+                filediff=interfilediff,
+                request=request,
+                update_mimetypes=False)
             new_encoding_list = get_filediff_encodings(interfilediff)
 
             # Check whether we have a SHA256 checksum first. They were
@@ -1988,6 +2734,32 @@ class DiffChunkGenerator(RawDiffChunkGenerator):
         """
         return force_str(hashlib.sha1(content).hexdigest())
 
+    def _has_chunks(self) -> bool:
+        """Return whether there are any chunks to generate for the file.
+
+        There won't be any chunks if the file is binary or is an added or
+        deleted 0-length file, or if the file has moved with no additional
+        changes.
+
+        Version Added:
+            8.0
+
+        Returns:
+            bool:
+            ``True`` if there may be chunks to generate. ``False`` if there
+            are none.
+        """
+        filediff = self.filediff
+        counts = filediff.get_line_counts()
+
+        return not (
+            filediff.binary or
+            filediff.source_revision == '' or
+            ((filediff.is_new or filediff.deleted or
+              filediff.moved or filediff.copied) and
+             counts['raw_insert_count'] == 0 and
+             counts['raw_delete_count'] == 0))
+
 
 @deprecate_non_keyword_only_args(RemovedInReviewBoard10_0Warning)
 def compute_chunk_last_header(
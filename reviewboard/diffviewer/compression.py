@@ -0,0 +1,618 @@
+"""Compression methods for stored diff data.
+
+:py:class:`~reviewboard.diffviewer.models.raw_file_diff_data.RawFileDiffData`
+stores each diff blob compressed with one of several methods, identified by
+a single-character ID in its ``compression`` field. Blobs are only
+compressed when they're first stored, and are decompressed each time their
+content is read, so decoding speed matters more than compression speed.
+
+The following methods are available:
+
+``bzip2``:
+    The method used by Review Board 2.5 through 7. This compresses well, but
+    is slow to decompress.
+
+``zlib``:
+    Faster to decompress than bzip2, with a somewhat lower compression ratio.
+
+``zstd``:
+    Zstandard compression, which compresses nearly as well as bzip2 and
+    decompresses many times faster. This requires the :pypi:`zstandard`
+    package.
+
+``zstd-dict``:
+    Zstandard compression using a dictionary trained from existing diffs.
+    This improves compression of the many small diffs typical of most
+    repositories. This requires the :pypi:`zstandard` package and a
+    dictionary created by :command:`rb-site manage ... recompress-diffs --
+    --train-dictionary`.
+
+The method used for new diffs is set by the ``diffviewer_compression`` site
+configuration setting. The default, ``auto``, uses ``zstd`` if available,
+and ``zlib`` otherwise. Dictionaries must be opted into by choosing
+``zstd-dict``.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import bz2
+import logging
+import threading
+import zlib
+from typing import ClassVar, Optional, Sequence, TYPE_CHECKING
+
+from django.core.cache import cache
+from djblets.cache.backend import cache_memoize, make_cache_key
+from djblets.siteconfig.models import SiteConfiguration
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+if TYPE_CHECKING:
+    from reviewboard.diffviewer.models import DiffCompressionDictionary
+
+
+logger = logging.getLogger(__name__)
+
+
+class DiffCompressor:
+    """Base class for a method of compressing stored diff data.
+
+    Version Added:
+        8.0
+    """
+
+    #: The ID stored in ``RawFileDiffData.compression``.
+    compression_id: ClassVar[str]
+
+    #: The name used for the method in settings and management commands.
+    name: ClassVar[str]
+
+    def is_available(self) -> bool:
+        """Return whether new data can be compressed with this method.
+
+        Returns:
+            bool:
+            ``True`` if this method can be used to compress data.
+        """
+        return True
+
+    def compress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return compressed data.
+
+        Args:
+            data (bytes):
+                The data to compress.
+
+        Returns:
+            bytes:
+            The compressed data.
+        """
+        raise NotImplementedError
+
+    def decompress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return decompressed data.
+
+        Args:
+            data (bytes):
+                The data to decompress.
+
+        Returns:
+            bytes:
+            The decompressed data.
+        """
+        raise NotImplementedError
+
+
+class Bzip2DiffCompressor(DiffCompressor):
+    """Compresses diff data using bzip2.
+
+    Version Added:
+        8.0
+    """
+
+    compression_id = 'B'
+    name = 'bzip2'
+
+    def compress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return compressed data.
+
+        Args:
+            data (bytes):
+                The data to compress.
+
+        Returns:
+            bytes:
+            The compressed data.
+        """
+        return bz2.compress(data, 9)
+
+    def decompress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return decompressed data.
+
+        Args:
+            data (bytes):
+                The data to decompress.
+
+        Returns:
+            bytes:
+            The decompressed data.
+        """
+        return bz2.decompress(data)
+
+
+class ZlibDiffCompressor(DiffCompressor):
+    """Compresses diff data using zlib.
+
+    Version Added:
+        8.0
+    """
+
+    compression_id = 'Z'
+    name = 'zlib'
+
+    def compress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return compressed data.
+
+        Args:
+            data (bytes):
+                The data to compress.
+
+        Returns:
+            bytes:
+            The compressed data.
+        """
+        return zlib.compress(data, 9)
+
+    def decompress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return decompressed data.
+
+        Args:
+            data (bytes):
+                The data to decompress.
+
+        Returns:
+            bytes:
+            The decompressed data.
+        """
+        return zlib.decompress(data)
+
+
+class ZstdDiffCompressor(DiffCompressor):
+    """Compresses diff data using Zstandard.
+
+    Version Added:
+        8.0
+    """
+
+    compression_id = 'S'
+    name = 'zstd'
+
+    #: The Zstandard compression level.
+    #:
+    #: Higher levels compress slightly better, but are too slow to use
+    #: while diffs are being uploaded.
+    level: ClassVar[int] = 12
+
+    def is_available(self) -> bool:
+        """Return whether new data can be compressed with this method.
+
+        Returns:
+            bool:
+            ``True`` if :pypi:`zstandard` is installed.
+        """
+        return zstandard is not None
+
+    def compress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return compressed data.
+
+        Args:
+            data (bytes):
+                The data to compress.
+
+        Returns:
+            bytes:
+            The compressed data.
+        """
+        return _get_zstandard().ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return decompressed data.
+
+        Args:
+            data (bytes):
+                The data to decompress.
+
+        Returns:
+            bytes:
+            The decompressed data.
+        """
+        return _get_zstandard().ZstdDecompressor().decompress(data)
+
+
+class ZstdDictDiffCompressor(ZstdDiffCompressor):
+    """Compresses diff data using Zstandard and a trained dictionary.
+
+    New data is compressed with the most recently trained
+    :py:class:`~reviewboard.diffviewer.models.DiffCompressionDictionary`.
+    The ID of the dictionary is stored in each compressed frame, so data
+    compressed with older dictionaries can still be decompressed.
+
+    Version Added:
+        8.0
+    """
+
+    compression_id = 'D'
+    name = 'zstd-dict'
+
+    def __init__(self) -> None:
+        """Initialize the compressor."""
+        self._dicts: dict[int, zstandard.ZstdCompressionDict] = {}
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Return whether new data can be compressed with this method.
+
+        Returns:
+            bool:
+            ``True`` if :pypi:`zstandard` is installed and a dictionary has
+            been trained.
+        """
+        return (zstandard is not None and
+                self.get_latest_dict_id() is not None)
+
+    def get_latest_dict_id(self) -> Optional[int]:
+        """Return the ID of the most recently trained dictionary.
+
+        This is cached, so that compressing new data doesn't require a
+        query.
+
+        Returns:
+            int:
+            The dictionary ID, or ``None`` if no dictionary has been
+            trained.
+        """
+        from reviewboard.diffviewer.models import DiffCompressionDictionary
+
+        # The ID is stored in a list, so that a missing dictionary can be
+        # cached as well.
+        return cache_memoize(
+            _LATEST_DICT_ID_CACHE_KEY,
+            lambda: [
+                DiffCompressionDictionary.objects
+                .order_by('-pk')
+                .values_list('dict_id', flat=True)
+                .first()
+            ])[0]
+
+    def compress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return compressed data.
+
+        Args:
+            data (bytes):
+                The data to compress.
+
+        Returns:
+            bytes:
+            The compressed data.
+
+        Raises:
+            ValueError:
+                No dictionary has been trained.
+        """
+        dict_id = self.get_latest_dict_id()
+
+        if dict_id is None:
+            raise ValueError('No Zstandard dictionary has been trained for '
+                             'diff compression.')
+
+        compressor = _get_zstandard().ZstdCompressor(
+            level=self.level,
+            dict_data=self._get_dict(dict_id))
+
+        return compressor.compress(data)
+
+    def decompress(
+        self,
+        data: bytes,
+    ) -> bytes:
+        """Return decompressed data.
+
+        Args:
+            data (bytes):
+                The data to decompress.
+
+        Returns:
+            bytes:
+            The decompressed data.
+        """
+        zstd = _get_zstandard()
+        dict_id = zstd.get_frame_parameters(data).dict_id
+        decompressor = zstd.ZstdDecompressor(dict_data=self._get_dict(dict_id))
+
+        return decompressor.decompress(data)
+
+    def _get_dict(
+        self,
+        dict_id: int,
+    ) -> zstandard.ZstdCompressionDict:
+        """Return a dictionary by ID.
+
+        Dictionaries never change once trained, so they're kept in memory
+        once loaded.
+
+        Args:
+            dict_id (int):
+                The ID of the dictionary.
+
+        Returns:
+            zstandard.ZstdCompressionDict:
+            The dictionary.
+
+        Raises:
+            reviewboard.diffviewer.models.DiffCompressionDictionary.
+            DoesNotExist:
+                The dictionary could not be found.
+        """
+        from reviewboard.diffviewer.models import DiffCompressionDictionary
+
+        try:
+            return self._dicts[dict_id]
+        except KeyError:
+            pass
+
+        dict_data = (
+            DiffCompressionDictionary.objects
+            .values_list('data', flat=True)
+            .get(dict_id=dict_id)
+        )
+        zstd_dict = _get_zstandard().ZstdCompressionDict(bytes(dict_data))
+
+        with self._lock:
+            self._dicts[dict_id] = zstd_dict
+
+        return zstd_dict
+
+
+_compressors: dict[str, DiffCompressor] = {
+    compressor.compression_id: compressor
+    for compressor in (Bzip2DiffCompressor(),
+                       ZlibDiffCompressor(),
+                       ZstdDiffCompressor(),
+                       ZstdDictDiffCompressor())
+}
+
+#: The methods tried, in order, when the configured method is ``auto``.
+_AUTO_COMPRESSION_NAMES = ('zstd', 'zlib')
+
+#: The cache key storing the ID of the most recently trained dictionary.
+_LATEST_DICT_ID_CACHE_KEY = 'diffviewer-compression-latest-dict-id'
+
+
+def _get_zstandard():
+    """Return the zstandard module.
+
+    Returns:
+        module:
+        The :py:mod:`zstandard` module.
+
+    Raises:
+        ImportError:
+            :pypi:`zstandard` is not installed.
+    """
+    if zstandard is None:
+        raise ImportError('The zstandard package must be installed to use '
+                          'Zstandard-compressed diffs.')
+
+    return zstandard
+
+
+def get_compressors() -> Sequence[DiffCompressor]:
+    """Return all compression methods.
+
+    Version Added:
+        8.0
+
+    Returns:
+        list of DiffCompressor:
+        All compression methods, including those that aren't available.
+    """
+    return list(_compressors.values())
+
+
+def get_compressor(
+    compression_id: str,
+) -> Optional[DiffCompressor]:
+    """Return a compression method by its stored ID.
+
+    Version Added:
+        8.0
+
+    Args:
+        compression_id (str):
+            The ID stored in ``RawFileDiffData.compression``.
+
+    Returns:
+        DiffCompressor:
+        The compression method, or ``None`` if the ID is unknown.
+    """
+    return _compressors.get(compression_id)
+
+
+def get_compressor_by_name(
+    name: str,
+) -> Optional[DiffCompressor]:
+    """Return a compression method by name.
+
+    Version Added:
+        8.0
+
+    Args:
+        name (str):
+            The name of the method, or ``auto`` for the best available
+            method.
+
+    Returns:
+        DiffCompressor:
+        The compression method, or ``None`` if the name is unknown.
+    """
+    if name == 'auto':
+        for auto_name in _AUTO_COMPRESSION_NAMES:
+            compressor = get_compressor_by_name(auto_name)
+            assert compressor is not None
+
+            if compressor.is_available():
+                return compressor
+
+    for compressor in _compressors.values():
+        if compressor.name == name:
+            return compressor
+
+    return None
+
+
+def get_default_compressor() -> DiffCompressor:
+    """Return the compression method to use for new diff data.
+
+    This is based on the ``diffviewer_compression`` site configuration
+    setting. If the configured method isn't available, zlib will be used.
+
+    Version Added:
+        8.0
+
+    Returns:
+        DiffCompressor:
+        The compression method.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    name = siteconfig.get('diffviewer_compression')
+    compressor = get_compressor_by_name(name)
+
+    if compressor is None or not compressor.is_available():
+        logger.warning('Diff compression method %r is not available. '
+                       'Falling back to zlib.',
+                       name)
+        compressor = _compressors[ZlibDiffCompressor.compression_id]
+
+    return compressor
+
+
+def compress_diff_data(
+    data: bytes,
+    compressor: Optional[DiffCompressor] = None,
+) -> tuple[bytes, Optional[str]]:
+    """Compress diff data for storage.
+
+    Version Added:
+        8.0
+
+    Args:
+        data (bytes):
+            The data to compress.
+
+        compressor (DiffCompressor, optional):
+            The compression method to use. This defaults to
+            :py:func:`get_default_compressor`.
+
+    Returns:
+        tuple:
+        A 2-tuple of:
+
+        Tuple:
+            0 (bytes):
+                The data to store.
+
+            1 (str):
+                The compression ID to store, or ``None`` if compressing
+                the data would not make it smaller.
+    """
+    if compressor is None:
+        compressor = get_default_compressor()
+
+    compressed_data = compressor.compress(data)
+
+    if len(compressed_data) < len(data):
+        return compressed_data, compressor.compression_id
+    else:
+        return data, None
+
+
+def train_compression_dictionary(
+    samples: Sequence[bytes],
+    *,
+    dict_size: int = 112_640,
+) -> DiffCompressionDictionary:
+    """Train and store a new Zstandard dictionary for diff compression.
+
+    The new dictionary will be used for all new data compressed with the
+    ``zstd-dict`` method.
+
+    Version Added:
+        8.0
+
+    Args:
+        samples (list of bytes):
+            The diff data to train from.
+
+        dict_size (int, optional):
+            The maximum size of the dictionary, in bytes.
+
+    Returns:
+        reviewboard.diffviewer.models.DiffCompressionDictionary:
+        The new dictionary, or an existing one if identical.
+
+    Raises:
+        ImportError:
+            :pypi:`zstandard` is not installed.
+
+        zstandard.ZstdError:
+            The dictionary could not be trained. There may not be enough
+            samples.
+    """
+    from reviewboard.diffviewer.models import DiffCompressionDictionary
+
+    zstd_dict = _get_zstandard().train_dictionary(dict_size, list(samples))
+
+    # Dictionary IDs are derived from their content, so training on the
+    # same samples again will produce an existing dictionary.
+    compression_dict = DiffCompressionDictionary.objects.get_or_create(
+        dict_id=zstd_dict.dict_id(),
+        defaults={
+            'data': zstd_dict.as_bytes(),
+        })[0]
+
+    cache.delete(make_cache_key(_LATEST_DICT_ID_CACHE_KEY))
+
+    return compression_dict
@@ -241,6 +241,8 @@ def get_differ(
     b: Sequence[str],
     ignore_space: bool = False,
     compat_version: int = DiffCompatVersion.DEFAULT,
+    *,
+    accelerated: bool = True,
 ) -> Differ:
     """Return a differ for with the given settings.
 
@@ -248,6 +250,14 @@ def get_differ(
     by specifying a compat_version, but this is only for *really* ancient
     diffs, currently.
 
+    If NumPy is installed, Myers-based diffs will use the
+    :py:class:`~reviewboard.diffviewer.npmyersdiff.NumPyMyersDiffer`, which
+    produces identical results much faster for large files.
+
+    Version Changed:
+        8.0:
+        Added the ``accelerated`` argument.
+
     Args:
         a (list of str):
             The original file, split into lines.
@@ -261,6 +271,13 @@ def get_differ(
         compat_version (int):
             The diff compatibility version.
 
+        accelerated (bool, optional):
+            Whether to use an accelerated differ implementation, if one is
+            available.
+
+            Version Added:
+                8.0
+
     Returns:
         Differ:
         The new differ instance.
@@ -272,8 +289,15 @@ def get_differ(
     cls = None
 
     if compat_version in DiffCompatVersion.MYERS_VERSIONS:
-        from reviewboard.diffviewer.myersdiff import MyersDiffer
-        cls = MyersDiffer
+        from reviewboard.diffviewer.npmyersdiff import (
+            NumPyMyersDiffer,
+            is_numpy_differ_available)
+
+        if accelerated and is_numpy_differ_available():
+            cls = NumPyMyersDiffer
+        else:
+            from reviewboard.diffviewer.myersdiff import MyersDiffer
+            cls = MyersDiffer
     elif compat_version == DiffCompatVersion.SMDIFFER:
         from reviewboard.diffviewer.smdiff import SMDiffer
         cls = SMDiffer
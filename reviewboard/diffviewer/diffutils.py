@@ -11,13 +11,19 @@ import shutil
 import subprocess
 import tempfile
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 from typing import (Any, AnyStr, Callable, Iterator, Optional,
                     TYPE_CHECKING, TypeVar)
 
+from django.core.cache import cache
 from django.core.files.base import ContentFile, File
+from django.db import connections
 from django.utils.encoding import force_str
-from django.utils.translation import gettext as _
+from django.utils.translation import (get_language,
+                                      gettext as _,
+                                      override as override_language)
+from djblets.cache.backend import cache_memoize, make_cache_key
 from djblets.log import log_timed
 from djblets.siteconfig.models import SiteConfiguration
 from djblets.util.contextmanagers import controlled_subprocess
@@ -32,6 +38,7 @@ from reviewboard.diffviewer.commit_utils import exclude_ancestor_filediffs
 from reviewboard.diffviewer.errors import DiffTooBigError, PatchError
 from reviewboard.diffviewer.filetypes import (HEADER_EXTENSIONS,
                                               IMPL_EXTENSIONS)
+from reviewboard.diffviewer.patcher import apply_patch
 from reviewboard.diffviewer.settings import DiffSettings
 from reviewboard.scmtools.core import FileLookupContext, PRE_CREATION, HEAD
 
@@ -40,7 +47,8 @@ if TYPE_CHECKING:
 
     from typing_extensions import TypeAlias
 
-    from reviewboard.diffviewer.chunk_generator import DiffChunk
+    from reviewboard.diffviewer.chunk_generator import (DiffChunk,
+                                                        DiffChunkGenerator)
     from reviewboard.diffviewer.models import (
         DiffCommit,
         DiffSet,
@@ -68,6 +76,16 @@ NEWLINE_UNICODE_RE = re.compile(r'(?:\n|\r(?:\r?\n)?)')
 _PATCH_GARBAGE_INPUT = 'patch: **** Only garbage was found in the patch input.'
 
 
+#: The format version for original and patched files stored in the cache.
+#:
+#: This should be updated if the way original or patched files are computed
+#: changes, so that stale content in the cache won't be used.
+#:
+#: Version Added:
+#:     8.0
+PATCHED_FILES_CACHE_VERSION = 1
+
+
 _T = TypeVar('_T')
 
 
@@ -362,8 +380,10 @@ def patch(
 ) -> bytes:
     """Apply a diff to a file.
 
-    This delegates out to ``patch`` because no one except Larry Wall knows how
-    to patch.
+    Diffs that apply cleanly (possibly at an offset or with fuzz) are applied
+    in-process by :py:func:`reviewboard.diffviewer.patcher.apply_patch`.
+    Anything else is delegated out to ``patch``, because no one except Larry
+    Wall knows how to patch.
 
     If patching fails, this may attempt to work around the patch error,
     depending on the nature of the error. The end result may be a viewable
@@ -378,6 +398,11 @@ def patch(
     original file, and patched file will be made available to the caller
     via the :py:class:`reviewboard.diffutils.errors.PatchError` exception.
 
+    Version Changed:
+        8.0:
+        Diffs are now applied in-process when possible, falling back to
+        ``patch`` only when hunks don't apply cleanly.
+
     Version Changed:
         7.0.3:
         Added mitigation workarounds for certain types of bad diffs. This
@@ -418,86 +443,148 @@ def patch(
     with log_timed(f'Patching file {filename}',
                    logger=logger,
                    request=request):
-        # Prepare the temporary directory if none is available
-        tempdir = tempfile.mkdtemp(prefix='reviewboard.')
+        orig_file = convert_line_endings(orig_file)
+        diff = convert_line_endings(diff)
 
-        try:
-            orig_file = convert_line_endings(orig_file)
-            diff = convert_line_endings(diff)
+        new_file = apply_patch(diff=diff,
+                               orig_file=orig_file)
 
-            (fd, oldfile) = tempfile.mkstemp(dir=tempdir)
-            f = os.fdopen(fd, 'w+b')
-            f.write(orig_file)
-            f.close()
+        if new_file is None:
+            logger.debug('Diff for %s could not be applied in-process. '
+                         'Falling back to patch(1).',
+                         filename,
+                         extra={'request': request})
 
-            newfile = '%s-new' % oldfile
+            new_file = run_patch_command(diff=diff,
+                                         orig_file=orig_file,
+                                         filename=filename,
+                                         request=request,
+                                         workaround_errors=workaround_errors)
 
-            process = subprocess.Popen(['patch', '-o', newfile, oldfile],
-                                       stdin=subprocess.PIPE,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       cwd=tempdir)
+        return new_file
 
-            with controlled_subprocess('patch', process) as p:
-                stdout, stderr = p.communicate(diff)
-                failure = p.returncode
 
-            try:
-                with open(newfile, 'rb') as f:
-                    new_file = f.read()
-            except Exception:
-                new_file = None
-
-            if failure and workaround_errors:
-                # Let's see if this is a diff error we can work around.
-                if (not orig_file.endswith(b'\n') and
-                    not diff.rfind(br'\ No newline at end of file') != -1):
-                    # The file doesn't end with a newline, and this isn't
-                    # reflected in the diff. See if we can patch if we add a
-                    # trailing newline. This is not going to be a completely
-                    # accurate representation of the resulting file, but it's
-                    # suitable for viewing.
-                    try:
-                        return patch(diff=diff,
-                                     orig_file=orig_file + b'\n',
-                                     filename=filename,
-                                     request=request,
-                                     workaround_errors=False)
-                    except Exception:
-                        # Ignore this and fall back to the original error.
-                        pass
-
-            if failure:
-                rejects_file = '%s.rej' % newfile
+def run_patch_command(
+    diff: bytes,
+    orig_file: bytes,
+    filename: str,
+    request: Optional[HttpRequest] = None,
+    *,
+    workaround_errors: bool = True,
+) -> bytes:
+    """Apply a diff to a file using the patch command.
+
+    This is used by :py:func:`patch` for any diffs that can't be applied
+    cleanly in-process. Most callers should use :py:func:`patch` instead.
+
+    Both the diff and file are expected to have already had their line
+    endings normalized.
+
+    Version Added:
+        8.0
 
+    Args:
+        diff (bytes):
+            The contents of the diff to apply.
+
+        orig_file (bytes):
+            The contents of the original file.
+
+        filename (str):
+            The name of the file being patched.
+
+        request (django.http.HttpRequest, optional):
+            The HTTP request, for use in logging.
+
+        workaround_errors (bool, optional):
+            Whether to attempt to work around errors encountered during
+            patching.
+
+    Returns:
+        bytes:
+        The contents of the patched file.
+
+    Raises:
+        reviewboard.diffutils.errors.PatchError:
+            An error occurred when trying to apply the patch.
+    """
+    # Prepare the temporary directory if none is available
+    tempdir = tempfile.mkdtemp(prefix='reviewboard.')
+
+    try:
+        (fd, oldfile) = tempfile.mkstemp(dir=tempdir)
+        f = os.fdopen(fd, 'w+b')
+        f.write(orig_file)
+        f.close()
+
+        newfile = '%s-new' % oldfile
+
+        process = subprocess.Popen(['patch', '-o', newfile, oldfile],
+                                   stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   cwd=tempdir)
+
+        with controlled_subprocess('patch', process) as p:
+            stdout, stderr = p.communicate(diff)
+            failure = p.returncode
+
+        try:
+            with open(newfile, 'rb') as f:
+                new_file = f.read()
+        except Exception:
+            new_file = None
+
+        if failure and workaround_errors:
+            # Let's see if this is a diff error we can work around.
+            if (not orig_file.endswith(b'\n') and
+                not diff.rfind(br'\ No newline at end of file') != -1):
+                # The file doesn't end with a newline, and this isn't
+                # reflected in the diff. See if we can patch if we add a
+                # trailing newline. This is not going to be a completely
+                # accurate representation of the resulting file, but it's
+                # suitable for viewing.
                 try:
-                    with open(rejects_file, 'rb') as f:
-                        rejects = f.read()
+                    return patch(diff=diff,
+                                 orig_file=orig_file + b'\n',
+                                 filename=filename,
+                                 request=request,
+                                 workaround_errors=False)
                 except Exception:
-                    rejects = None
+                    # Ignore this and fall back to the original error.
+                    pass
 
-                error_output = force_str(stderr.strip() or stdout.strip())
+        if failure:
+            rejects_file = '%s.rej' % newfile
 
-                # Munge the output to show the filename instead of
-                # randomly-generated tempdir locations.
-                base_filename = os.path.basename(filename)
+            try:
+                with open(rejects_file, 'rb') as f:
+                    rejects = f.read()
+            except Exception:
+                rejects = None
 
-                error_output = (
-                    error_output
-                    .replace(rejects_file, '%s.rej' % base_filename)
-                    .replace(oldfile, base_filename)
-                )
+            error_output = force_str(stderr.strip() or stdout.strip())
 
-                raise PatchError(filename=filename,
-                                 error_output=error_output,
-                                 orig_file=orig_file,
-                                 new_file=new_file,
-                                 diff=diff,
-                                 rejects=rejects)
+            # Munge the output to show the filename instead of
+            # randomly-generated tempdir locations.
+            base_filename = os.path.basename(filename)
 
-            return new_file
-        finally:
-            shutil.rmtree(tempdir)
+            error_output = (
+                error_output
+                .replace(rejects_file, '%s.rej' % base_filename)
+                .replace(oldfile, base_filename)
+            )
+
+            raise PatchError(filename=filename,
+                             error_output=error_output,
+                             orig_file=orig_file,
+                             new_file=new_file,
+                             diff=diff,
+                             rejects=rejects)
+
+        return new_file
+    finally:
+        shutil.rmtree(tempdir)
 
 
 def get_original_file_from_repo(filediff, request=None):
@@ -582,15 +669,11 @@ def get_original_file_from_repo(filediff, request=None):
         encoding, data = convert_to_unicode(data, encoding_list)
 
         # Repository.get_file doesn't know or care about how we need line
-        # endings to work. So, we'll just transform every time.
+        # endings to work. So, we'll transform it here.
         #
-        # This is mostly only a problem if the diff chunks aren't in the
-        # cache, though if several people are working off the same file,
-        # we'll be doing extra work to convert those line endings for each
-        # of those instead of once.
-        #
-        # Only other option is to cache the resulting file, but then we're
-        # duplicating the cached contents.
+        # The normalized file is cached along with the patched file by
+        # get_original_and_patched_files(), so this won't need to be
+        # repeated when diff chunks are regenerated.
         data = convert_line_endings(data)
 
         # Convert back to bytes using whichever encoding we used to decode.
@@ -744,6 +827,14 @@ def get_original_and_patched_files(
 ) -> tuple[bytes, bytes]:
     """Return the original and patched version of a file.
 
+    The results are cached, keyed off the source file and the diffs applied
+    to it, so that they can be reused when diff chunks need to be
+    regenerated.
+
+    Version Changed:
+        8.0:
+        The original and patched files are now cached.
+
     Args:
         filediff (reviewboard.diffviewer.models.filediff.FileDiff):
             The filediff to fetch versions for.
@@ -766,11 +857,23 @@ def get_original_and_patched_files(
             1 (bytes):
                 The patched version of the file.
     """
-    old = get_original_file(filediff=filediff,
-                            request=request)
-    new = get_patched_file(source_data=old,
-                           filediff=filediff,
-                           request=request)
+    def _get_files() -> list[bytes]:
+        old = get_original_file(filediff=filediff,
+                                request=request)
+        new = get_patched_file(source_data=old,
+                               filediff=filediff,
+                               request=request)
+
+        return [old, new]
+
+    cache_key = _make_patched_files_cache_key(filediff)
+
+    if cache_key:
+        # As with Repository.get_file(), the results are wrapped in a list
+        # so that the cache backend doesn't try to convert them to Unicode.
+        old, new = cache_memoize(cache_key, _get_files, large_data=True)
+    else:
+        old, new = _get_files()
 
     if update_mimetypes:
         needs_update = False
@@ -803,6 +906,81 @@ def get_original_and_patched_files(
     return (old, new)
 
 
+def _make_patched_files_cache_key(
+    filediff: FileDiff,
+) -> str | None:
+    """Return a cache key for the original and patched versions of a file.
+
+    The key is based on the identity of the source file in the repository
+    and on the hashes of every diff that must be applied to produce the
+    original and patched files, rather than on the FileDiff itself. This
+    allows the results to be shared by any FileDiffs built from the same
+    source file and diffs, and keeps them separate from the rendered diff
+    chunks, which are invalidated whenever diff settings change.
+
+    Version Added:
+        8.0
+
+    Args:
+        filediff (reviewboard.diffviewer.models.filediff.FileDiff):
+            The FileDiff to return the cache key for.
+
+    Returns:
+        str:
+        The cache key, or ``None`` if the results can't be cached (for
+        instance, if the diff is still stored in a legacy format).
+    """
+    if filediff.diff_hash_id is None:
+        return None
+
+    # The encodings are sorted, since the FileDiff's detected encoding will
+    # be moved to the front of the list after the first fetch. That won't
+    # change the resulting files.
+    key_parts: list[str] = [
+        str(filediff.diffset.repository_id),
+        ','.join(sorted(set(get_filediff_encodings(filediff)))),
+    ]
+
+    # This mirrors the logic in get_original_file(). If there's a parent
+    # diff, there are no ancestors to apply. Otherwise, the original file
+    # is based on the oldest ancestor's source file.
+    source_filediff = filediff
+    ancestors: Sequence[FileDiff] = []
+
+    if not filediff.parent_diff:
+        ancestors = filediff.get_ancestors(minimal=True)
+
+        if ancestors:
+            source_filediff = ancestors[0]
+
+    extra_data = source_filediff.extra_data or {}
+    key_parts += [
+        source_filediff.diffset.base_commit_id or '',
+        extra_data.get('parent_source_filename',
+                       source_filediff.source_file),
+        extra_data.get('parent_source_revision',
+                       source_filediff.source_revision),
+    ]
+
+    if source_filediff.parent_diff_hash_id is not None:
+        key_parts.append(source_filediff.parent_diff_hash.binary_hash)
+
+    for ancestor in ancestors:
+        if ancestor.diff_hash_id is None:
+            return None
+
+        key_parts.append(ancestor.diff_hash.binary_hash)
+
+    key_parts.append(filediff.diff_hash.binary_hash)
+
+    key_hash = hashlib.sha256('\0'.join(key_parts).encode('utf-8'))
+
+    return (
+        f'diff-patched-files-{PATCHED_FILES_CACHE_VERSION}-'
+        f'{key_hash.hexdigest()}'
+    )
+
+
 def get_revision_str(revision):
     if revision == HEAD:
         return 'HEAD'
@@ -1552,6 +1730,7 @@ def populate_diff_chunks(
     *,
     request: (HttpRequest | None) = None,
     diff_settings: DiffSettings,
+    max_workers: (int | None) = None,
 ) -> None:
     """Populate a list of diff files with chunk data.
 
@@ -1559,6 +1738,18 @@ def populate_diff_chunks(
     generates diff chunk data for each file in the list. The chunk data is
     stored in memory in the file state.
 
+    If ``max_workers`` (or the ``diffviewer_chunk_workers`` site
+    configuration setting) is greater than 1, any files whose chunks aren't
+    already in the cache will be generated concurrently in a thread pool.
+    This mostly helps when fetching files from the repository is slow. Files
+    are still populated in order, and an error generating one file won't
+    prevent the others from being populated. The first error (in file
+    order) will be raised once all files have been processed.
+
+    Version Changed:
+        8.0:
+        Added the ``max_workers`` argument.
+
     Version Changed:
         6.0:
         * Made all arguments other than ``files`` keyword-only.
@@ -1576,44 +1767,155 @@ def populate_diff_chunks(
 
             Version Added:
                 5.0.2
+
+        max_workers (int, optional):
+            The maximum number of files to generate chunks for at once. This
+            defaults to the ``diffviewer_chunk_workers`` site configuration
+            setting.
+
+            Version Added:
+                8.0
     """
     from reviewboard.diffviewer.chunk_generator import get_diff_chunk_generator
 
-    for diff_file in files:
-        chunk_generator = get_diff_chunk_generator(
+    if max_workers is None:
+        siteconfig = SiteConfiguration.objects.get_current()
+        max_workers = siteconfig.get('diffviewer_chunk_workers')
+
+    chunk_generators = [
+        get_diff_chunk_generator(
             request=request,
             filediff=diff_file['filediff'],
             interfilediff=diff_file['interfilediff'],
             force_interdiff=diff_file['force_interdiff'],
             base_filediff=diff_file.get('base_filediff'),
             diff_settings=diff_settings)
-        chunks = list(chunk_generator.get_chunks())
+        for diff_file in files
+    ]
+
+    if max_workers > 1 and len(files) > 1:
+        uncached_generators = [
+            chunk_generator
+            for chunk_generator in chunk_generators
+            if not cache.has_key(make_cache_key(
+                chunk_generator.make_cache_key()))
+        ]
+    else:
+        uncached_generators = []
+
+    if len(uncached_generators) < 2:
+        # There's nothing to gain from a thread pool, so generate everything
+        # in order.
+        for diff_file, chunk_generator in zip(files, chunk_generators):
+            _populate_diff_file_chunks(
+                diff_file=diff_file,
+                chunk_generator=chunk_generator,
+                chunks=list(chunk_generator.get_chunks()))
 
-        diff_file.update({
-            'chunks': chunks,
-            'num_chunks': len(chunks),
-            'changed_chunk_indexes': [],
-            'whitespace_only': len(chunks) > 0,
-        })
+        return
+
+    # Chunk cache keys depend on the active language, which is set per-thread.
+    language = get_language()
+
+    def _generate_chunks(
+        chunk_generator: DiffChunkGenerator,
+    ) -> list[DiffChunk]:
+        try:
+            with override_language(language):
+                return list(chunk_generator.get_chunks())
+        finally:
+            # Don't leave database connections open in the pool's threads.
+            connections.close_all()
 
-        if chunk_generator.all_code_safety_results:
-            diff_file['code_safety_results'] = \
-                chunk_generator.all_code_safety_results
+    with log_timed(f'Generating diff chunks for {len(uncached_generators)} '
+                   f'file(s) using {max_workers} threads',
+                   logger=logger,
+                   request=request):
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(uncached_generators)),
+            thread_name_prefix='rb-diff-chunks') as executor:
+            futures = {
+                chunk_generator: executor.submit(_generate_chunks,
+                                                 chunk_generator)
+                for chunk_generator in uncached_generators
+            }
 
-        for j, chunk in enumerate(chunks):
-            chunk['index'] = j
+    first_error: (Exception | None) = None
 
-            if chunk['change'] != 'equal':
-                diff_file['changed_chunk_indexes'].append(j)
-                meta = chunk.get('meta', {})
+    for diff_file, chunk_generator in zip(files, chunk_generators):
+        try:
+            future = futures.get(chunk_generator)
 
-                if not meta.get('whitespace_chunk', False):
-                    diff_file['whitespace_only'] = False
+            if future is None:
+                chunks = list(chunk_generator.get_chunks())
+            else:
+                chunks = future.result()
+        except Exception as e:
+            logger.exception('Error generating diff chunks for FileDiff %s: '
+                             '%s',
+                             diff_file['filediff'].pk, e,
+                             extra={'request': request})
 
-        diff_file.update({
-            'num_changes': len(diff_file['changed_chunk_indexes']),
-            'chunks_loaded': True,
-        })
+            if first_error is None:
+                first_error = e
+
+            continue
+
+        _populate_diff_file_chunks(diff_file=diff_file,
+                                   chunk_generator=chunk_generator,
+                                   chunks=chunks)
+
+    if first_error is not None:
+        raise first_error
+
+
+def _populate_diff_file_chunks(
+    *,
+    diff_file: SerializedDiffFile,
+    chunk_generator: DiffChunkGenerator,
+    chunks: list[DiffChunk],
+) -> None:
+    """Populate a diff file with generated chunk data.
+
+    Version Added:
+        8.0
+
+    Args:
+        diff_file (SerializedDiffFile):
+            The diff file to populate.
+
+        chunk_generator (reviewboard.diffviewer.chunk_generator.
+                         DiffChunkGenerator):
+            The chunk generator that generated the chunks.
+
+        chunks (list of reviewboard.diffviewer.chunk_generator.DiffChunk):
+            The generated chunks.
+    """
+    diff_file.update({
+        'chunks': chunks,
+        'num_chunks': len(chunks),
+        'changed_chunk_indexes': [],
+        'whitespace_only': len(chunks) > 0,
+    })
+
+    if chunk_generator.all_code_safety_results:
+        diff_file['code_safety_results'] = \
+            chunk_generator.all_code_safety_results
+
+    for j, chunk in enumerate(chunks):
+        chunk['index'] = j
+
+        if chunk['change'] != 'equal':
+            diff_file['changed_chunk_indexes'].append(j)
+            meta = chunk.get('meta', {})
+
+            if not meta.get('whitespace_chunk', False):
+                diff_file['whitespace_only'] = False
+
+    diff_file.update({
+        'num_changes': len(diff_file['changed_chunk_indexes']),
+        'chunks_loaded': True,
+    })
 
 
 def get_file_from_filediff(
@@ -1747,6 +2049,107 @@ def get_file_from_filediff(
     return None
 
 
+def _get_chunk_generator_from_filediff(
+    context: dict[str, Any],
+    filediff: FileDiff,
+    interfilediff: Optional[FileDiff],
+    *,
+    diff_settings: DiffSettings,
+    base_filediff: Optional[FileDiff] = None,
+    base_commit: Optional[DiffCommit] = None,
+    tip_commit: Optional[DiffCommit] = None,
+) -> Optional[DiffChunkGenerator]:
+    """Return a chunk generator for the filediff/interfilediff.
+
+    Unlike :py:func:`get_file_from_filediff`, this doesn't load any chunks.
+    The caller can then load only the chunks it needs from the generator.
+    The generator is cached in the context, so that chunks already loaded
+    can be reused.
+
+    Version Added:
+        8.0
+
+    Args:
+        context (dict):
+            Template context being used to render the diff.
+
+        filediff (reviewboard.diffviewer.models.filediff.FileDiff):
+            The filediff being rendered.
+
+        interfilediff (reviewboard.diffviewer.models.filediff.FileDiff,
+                       optional):
+            The optional filediff being used to render an interdiff.
+
+        diff_settings (reviewboard.diffviewer.settings.DiffSettings):
+            The settings used to control the display of diffs.
+
+        base_filediff (reviewbaord.diffviewer.models.filediff.FileDiff,
+                       optional):
+            The base FileDiff to use.
+
+        base_commit (reviewboard.diffviewer.models.diffcommit.DiffCommit,
+                     optional):
+            An optional base commit.
+
+        tip_commit (reviewboard.diffviewer.models.diffcommit.DiffCommit,
+                    optional):
+            An optional tip commit.
+
+    Returns:
+        reviewboard.diffviewer.chunk_generator.DiffChunkGenerator:
+        The chunk generator, or ``None`` if the file was not found.
+    """
+    from reviewboard.diffviewer.chunk_generator import get_diff_chunk_generator
+
+    interdiffset = None
+
+    key = f'_diff_chunk_generator_{filediff.diffset.pk}_{filediff.pk}'
+
+    if base_filediff:
+        key += f'_base{base_filediff.pk}'
+
+    if interfilediff:
+        key += f'_{interfilediff.pk}'
+        interdiffset = interfilediff.diffset
+
+    try:
+        return context[key]
+    except KeyError:
+        pass
+
+    assert 'user' in context
+
+    request = context.get('request')
+    files = get_diff_files(
+        diffset=filediff.diffset,
+        filediff=filediff,
+        interdiffset=interdiffset,
+        interfilediff=interfilediff,
+        base_filediff=base_filediff,
+        request=request,
+        base_commit=base_commit,
+        tip_commit=tip_commit,
+        diff_settings=diff_settings)
+
+    if files:
+        assert len(files) == 1
+        diff_file = files[0]
+
+        chunk_generator = get_diff_chunk_generator(
+            request=request,
+            filediff=diff_file['filediff'],
+            interfilediff=diff_file['interfilediff'],
+            force_interdiff=diff_file['force_interdiff'],
+            base_filediff=diff_file.get('base_filediff'),
+            diff_settings=diff_settings)
+    else:
+        chunk_generator = None
+
+    context[key] = chunk_generator
+
+    return chunk_generator
+
+
 def get_last_line_number_in_diff(
     context: dict[str, Any],
     filediff: FileDiff,
@@ -1762,6 +2165,12 @@ def get_last_line_number_in_diff(
     This returns the virtual line number to be used in expandable diff
     fragments.
 
+    Version Changed:
+        8.0:
+        * This now only loads the index of cached chunks, rather than all
+          chunks.
+        * ``base_filediff`` is now used when looking up the file.
+
     Version Changed:
         7.0:
         * Added ``base_filediff`, ``base_commit`` and ``tip_commit``
@@ -1830,18 +2239,20 @@ def get_last_line_number_in_diff(
         int:
         The last virtual line number.
     """
-    diff_file = get_file_from_filediff(context=context,
-                                       filediff=filediff,
-                                       interfilediff=interfilediff,
-                                       diff_settings=diff_settings,
-                                       base_commit=base_commit,
-                                       tip_commit=tip_commit)
-    assert diff_file is not None
+    chunk_generator = _get_chunk_generator_from_filediff(
+        context=context,
+        filediff=filediff,
+        interfilediff=interfilediff,
+        diff_settings=diff_settings,
+        base_filediff=base_filediff,
+        base_commit=base_commit,
+        tip_commit=tip_commit)
+    assert chunk_generator is not None
 
-    last_chunk = diff_file['chunks'][-1]
-    last_line = last_chunk['lines'][-1]
+    last_line = chunk_generator.get_last_line_number()
+    assert last_line is not None
 
-    return last_line[0]
+    return last_line
 
 
 def _get_last_header_in_chunks_before_line(chunks, target_line):
@@ -1947,6 +2358,11 @@ def get_last_header_before_line(
 ) -> dict:
     """Return the last header that occurs before the given line.
 
+    Version Changed:
+        8.0:
+        This now only loads the cached chunks up to the given line, rather
+        than all chunks.
+
     Version Changed:
         7.0:
         * Added the ``base_filediff``, ``base_commit``, and ``tip_commit``
@@ -2018,7 +2434,7 @@ def get_last_header_before_line(
         Information on any headers found. See
         :py:class:`DiffSideBySideHeadersInfo` for details.
     """
-    diff_file = get_file_from_filediff(
+    chunk_generator = _get_chunk_generator_from_filediff(
         context=context,
         filediff=filediff,
         interfilediff=interfilediff,
@@ -2026,10 +2442,11 @@ def get_last_header_before_line(
         base_filediff=base_filediff,
         base_commit=base_commit,
         tip_commit=tip_commit)
-    assert diff_file is not None
+    assert chunk_generator is not None
 
-    return _get_last_header_in_chunks_before_line(chunks=diff_file['chunks'],
-                                                  target_line=target_line)
+    return _get_last_header_in_chunks_before_line(
+        chunks=chunk_generator.get_chunks(),
+        target_line=target_line)
 
 
 def get_file_chunks_in_range(
@@ -2054,6 +2471,11 @@ def get_file_chunks_in_range(
     See :py:func:`get_chunks_in_range` for information on the returned state
     of the chunks.
 
+    Version Changed:
+        8.0:
+        This now only loads the cached chunks containing the range, rather
+        than all chunks.
+
     Version Changed:
         7.0:
         * Added ``base_filediff``, ``base_commit`` and ``tip_commit``
@@ -2127,18 +2549,22 @@ def get_file_chunks_in_range(
         DiffChunk:
         Each chunk in the range.
     """
-    diff_file = get_file_from_filediff(context=context,
-                                       filediff=filediff,
-                                       interfilediff=interfilediff,
-                                       diff_settings=diff_settings,
-                                       base_filediff=base_filediff,
-                                       base_commit=base_commit,
-                                       tip_commit=tip_commit)
+    chunk_generator = _get_chunk_generator_from_filediff(
+        context=context,
+        filediff=filediff,
+        interfilediff=interfilediff,
+        diff_settings=diff_settings,
+        base_filediff=base_filediff,
+        base_commit=base_commit,
+        tip_commit=tip_commit)
 
-    if diff_file:
-        yield from get_chunks_in_range(chunks=diff_file['chunks'],
-                                       first_line=first_line,
-                                       num_lines=num_lines)
+    if chunk_generator is not None:
+        yield from get_chunks_in_range(
+            chunks=chunk_generator.get_chunks_in_line_range(
+                first_line=first_line,
+                last_line=max(first_line, first_line + num_lines - 1)),
+            first_line=first_line,
+            num_lines=num_lines)
 
 
 def get_chunks_in_range(chunks, first_line, num_lines):
@@ -2173,6 +2599,11 @@ def get_chunks_in_range(chunks, first_line, num_lines):
     6        Changed regions of the patched line (for "replace" chunks)
     7        True if line consists of only whitespace changes
     ======== =============================================================
+
+    Version Changed:
+        8.0:
+        The ``index`` of each chunk is now taken from the chunk, if
+        available, so that ``chunks`` may be a subset of a file's chunks.
     """
     for i, chunk in enumerate(chunks):
         lines = chunk['lines']
@@ -2186,7 +2617,7 @@ def get_chunks_in_range(chunks, first_line, num_lines):
                 last_index = len(lines)
 
             new_chunk = {
-                'index': i,
+                'index': chunk.get('index', i),
                 'lines': chunk['lines'][start_index:last_index],
                 'numlines': last_index - start_index,
                 'change': chunk['change'],
@@ -12,4 +12,7 @@ SEQUENCE = [
     'raw_diff_file_data',
     'diffcommit_relations',
     'delete_file_count_fields',
+    'raw_file_diff_data_storage',
+    'diffset_line_counts',
+    'diffsethistory_latest_diffset',
 ]
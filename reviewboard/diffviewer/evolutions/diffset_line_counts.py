@@ -0,0 +1,14 @@
+"""Add DiffSet.raw_insert_count and DiffSet.raw_delete_count.
+
+Version Added:
+    8.0
+"""
+
+from django.db import models
+from django_evolution.mutations import AddField
+
+
+MUTATIONS = [
+    AddField('DiffSet', 'raw_insert_count', models.IntegerField, null=True),
+    AddField('DiffSet', 'raw_delete_count', models.IntegerField, null=True),
+]
@@ -0,0 +1,25 @@
+"""Add DiffSetHistory.latest_diffset and populate it.
+
+Version Added:
+    8.0
+"""
+
+from django.db import models
+from django_evolution.mutations import AddField, SQLMutation
+
+
+MUTATIONS = [
+    AddField('DiffSetHistory', 'latest_diffset', models.ForeignKey,
+             null=True, related_model='diffviewer.DiffSet'),
+    SQLMutation('populate_latest_diffset', ["""
+        UPDATE diffviewer_diffsethistory
+           SET latest_diffset_id = (
+               SELECT diffviewer_diffset.id
+                 FROM diffviewer_diffset
+                WHERE diffviewer_diffset.history_id =
+                      diffviewer_diffsethistory.id
+                ORDER BY diffviewer_diffset.revision DESC,
+                         diffviewer_diffset.timestamp DESC
+                LIMIT 1)
+"""])
+]
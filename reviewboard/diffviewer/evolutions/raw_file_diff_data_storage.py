@@ -0,0 +1,14 @@
+"""Add RawFileDiffData.storage.
+
+Version Added:
+    8.0
+"""
+
+from django.db import models
+from django_evolution.mutations import AddField
+
+
+MUTATIONS = [
+    AddField('RawFileDiffData', 'storage', models.CharField, max_length=32,
+             null=True),
+]
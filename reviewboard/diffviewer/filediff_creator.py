@@ -2,21 +2,29 @@
 
 from __future__ import annotations
 
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import (Iterator, Mapping, Optional, Protocol, Sequence,
                     TYPE_CHECKING, Union)
 
+from django.db import connections
+from django.db.models import F
 from django.utils.encoding import force_bytes, force_str
 from django.utils.translation import gettext as _
+from djblets.log import log_timed
 from housekeeping import deprecate_non_keyword_only_args
 from typing_extensions import TypedDict
 
 from reviewboard.deprecation import RemovedInReviewBoard90Warning
 from reviewboard.diffviewer.errors import EmptyDiffError
-from reviewboard.scmtools.core import (FileLookupContext,
+from reviewboard.hostingsvcs.base.hosting_service import BaseHostingService
+from reviewboard.scmtools.core import (FileLookup,
+                                       FileLookupContext,
                                        PRE_CREATION,
                                        Revision,
+                                       SCMTool,
                                        UNKNOWN)
 from reviewboard.scmtools.errors import FileNotFoundError
 
@@ -27,7 +35,6 @@ if TYPE_CHECKING:
     from reviewboard.diffviewer.parser import (BaseDiffParser,
                                                ParsedDiff,
                                                ParsedDiffFile)
-    from reviewboard.scmtools.core import SCMTool
     from reviewboard.scmtools.models import Repository
 
     class _GetFileExistsFunc(Protocol):
@@ -41,6 +48,9 @@ if TYPE_CHECKING:
             ...
 
 
+logger = logging.getLogger(__name__)
+
+
 class _PreparedDiffInfo(TypedDict):
     """Intermediary information on a prepared diff.
 
@@ -143,7 +153,7 @@ def create_filediffs(
         If ``validate_only`` is ``True``, the returned list will be empty.
     """
     from reviewboard.diffviewer.diffutils import convert_to_unicode
-    from reviewboard.diffviewer.models import FileDiff
+    from reviewboard.diffviewer.models import DiffSet, FileDiff
 
     diff_info = _prepare_diff_info(
         diff_file_contents=diff_file_contents,
@@ -327,10 +337,46 @@ def create_filediffs(
         filediffs.append(filediff)
 
     if not validate_only:
-        FileDiff.objects.bulk_create(filediffs)
+        with log_timed(f'Saving {len(filediffs)} FileDiffs for {repository}',
+                       logger=logger,
+                       request=request):
+            FileDiff.objects.bulk_create(filediffs)
+
+        diffset_update_fields: list[str] = []
 
         if diffset.extra_data:
-            diffset.save(update_fields=('extra_data',))
+            diffset_update_fields.append('extra_data')
+
+        if (diffset.raw_insert_count is not None and
+            diffset.raw_delete_count is not None):
+            # Keep the stored totals up-to-date. If they haven't been
+            # calculated yet, they'll be calculated from all the files when
+            # first needed.
+            #
+            # Files may be added to this diffset by other processes at the
+            # same time, so the totals are incremented in the database
+            # rather than written from this copy.
+            insert_count = 0
+            delete_count = 0
+
+            for filediff in filediffs:
+                counts = filediff.get_line_counts()
+                insert_count += counts['raw_insert_count']
+                delete_count += counts['raw_delete_count']
+
+            DiffSet.objects.filter(
+                pk=diffset.pk,
+                raw_insert_count__isnull=False,
+                raw_delete_count__isnull=False,
+            ).update(
+                raw_insert_count=F('raw_insert_count') + insert_count,
+                raw_delete_count=F('raw_delete_count') + delete_count)
+
+            diffset.raw_insert_count += insert_count
+            diffset.raw_delete_count += delete_count
+
+        if diffset_update_fields:
+            diffset.save(update_fields=diffset_update_fields)
 
         if diffcommit is not None and diffcommit.extra_data:
             diffcommit.save(update_fields=('extra_data',))
@@ -403,8 +449,12 @@ def _prepare_diff_info(
                          'is True')
 
     tool = repository.get_scmtool()
-    parsed_diff = _parse_diff(tool=tool,
-                              diff_content=diff_file_contents)
+
+    with log_timed(f'Parsing diff for {repository}',
+                   logger=logger,
+                   request=request):
+        parsed_diff = _parse_diff(tool=tool,
+                                  diff_content=diff_file_contents)
 
     files = list(_process_files(
         parsed_diff=parsed_diff,
@@ -428,9 +478,13 @@ def _prepare_diff_info(
             for f in files
             if f.orig_filename
         }
-        parsed_parent_diff = _parse_diff(
-            tool=tool,
-            diff_content=parent_diff_file_contents)
+
+        with log_timed(f'Parsing parent diff for {repository}',
+                       logger=logger,
+                       request=request):
+            parsed_parent_diff = _parse_diff(
+                tool=tool,
+                diff_content=parent_diff_file_contents)
 
         # If the user supplied a base diff, we need to parse it and later
         # apply each of the files that are in main diff.
@@ -557,6 +611,10 @@ def _process_files(
 
     tool = repository.get_scmtool()
     parsed_change = parsed_diff.changes[0]
+    processed_files: list[tuple[ParsedDiffFile, bytes, Union[bytes, Revision],
+                                bytes]] = []
+    lookups: list[FileLookup] = []
+    lookup_indexes: list[int] = []
 
     for f in parsed_change.files:
         # This will either be a Revision or bytes. Either way, convert it
@@ -597,40 +655,62 @@ def _process_files(
             not f.deleted and
             not f.moved and
             not f.copied):
-            assert get_file_exists is not None
-
-            context = FileLookupContext(
-                request=request,
-                base_commit_id=base_commit_id,
-                diff_extra_data=parsed_diff.extra_data,
-                commit_extra_data=parsed_change.extra_data,
-                file_extra_data=f.extra_data)
-
-            if not get_file_exists(path=force_str(source_filename),
-                                   revision=force_str(source_revision),
-                                   context=context):
-                raise FileNotFoundError(path=force_str(source_filename),
-                                        revision=force_str(source_revision),
-                                        base_commit_id=base_commit_id,
-                                        context=context)
-
-            # If validation found a more suitable source revision, then set
-            # that instead of what was parsed out of the diff. This is
-            # important for SCMs like Mercurial, which support multiple
-            # commits but don't have per-file revision information in diffs,
-            # so we don't even know the commit that introduced the last change
-            # to a file. We can only resolve this during the validation
-            # phase.
-            #
-            # This was added in Review Board 7.0.2.
-            validated_parent_id = \
-                f.extra_data.pop('__validated_parent_id', None)
-
-            if validated_parent_id is not None:
-                assert isinstance(validated_parent_id, str)
-
-                source_revision = validated_parent_id.encode('utf-8')
-
+            lookups.append(FileLookup(
+                path=force_str(source_filename),
+                revision=force_str(source_revision),
+                context=FileLookupContext(
+                    request=request,
+                    base_commit_id=base_commit_id,
+                    diff_extra_data=parsed_diff.extra_data,
+                    commit_extra_data=parsed_change.extra_data,
+                    file_extra_data=f.extra_data)))
+            lookup_indexes.append(len(processed_files))
+
+        processed_files.append((f, source_filename, source_revision,
+                                dest_filename))
+
+    if lookups:
+        assert get_file_exists is not None
+
+        with log_timed(f'Checking existence of {len(lookups)} files in '
+                       f'{repository}',
+                       logger=logger,
+                       request=request):
+            exists = _check_files_exist(repository=repository,
+                                        lookups=lookups,
+                                        get_file_exists=get_file_exists)
+
+            for i, lookup, file_exists in zip(lookup_indexes, lookups,
+                                              exists):
+                if not file_exists:
+                    raise FileNotFoundError(path=lookup.path,
+                                            revision=lookup.revision,
+                                            base_commit_id=base_commit_id,
+                                            context=lookup.context)
+
+                f, source_filename, source_revision, dest_filename = \
+                    processed_files[i]
+
+                # If validation found a more suitable source revision, then
+                # set that instead of what was parsed out of the diff. This
+                # is important for SCMs like Mercurial, which support
+                # multiple commits but don't have per-file revision
+                # information in diffs, so we don't even know the commit
+                # that introduced the last change to a file. We can only
+                # resolve this during the validation phase.
+                #
+                # This was added in Review Board 7.0.2.
+                validated_parent_id = \
+                    f.extra_data.pop('__validated_parent_id', None)
+
+                if validated_parent_id is not None:
+                    assert isinstance(validated_parent_id, str)
+
+                    processed_files[i] = (f, source_filename,
+                                          validated_parent_id.encode('utf-8'),
+                                          dest_filename)
+
+    for f, source_filename, source_revision, dest_filename in processed_files:
         f.orig_filename = source_filename
         f.orig_file_details = source_revision
         f.modified_filename = dest_filename
@@ -638,6 +718,108 @@ def _process_files(
         yield f
 
 
+def _check_files_exist(
+    *,
+    repository: Repository,
+    lookups: Sequence[FileLookup],
+    get_file_exists: _GetFileExistsFunc,
+) -> Iterator[bool]:
+    """Check whether several files in a diff exist in the repository.
+
+    Each file is checked using ``get_file_exists``. To speed this up for
+    large diffs:
+
+    * If the repository has a native way of checking several files at once,
+      the files are first checked in one batch through
+      :py:meth:`Repository.files_exist()
+      <reviewboard.scmtools.models.Repository.files_exist>`. This caches the
+      files that exist, so the checks that follow don't need to contact the
+      repository again.
+
+    * If files are checked through a hosting service's API, the checks are
+      made concurrently, using up to :py:attr:`SCMTool.max_http_fetch_workers
+      <reviewboard.scmtools.core.SCMTool.max_http_fetch_workers>` threads.
+
+    Other repositories are checked one file at a time, since their clients
+    can't be shared between threads. These checks are made as the results
+    are consumed, so that they stop at the first missing file.
+
+    Version Added:
+        8.0
+
+    Args:
+        repository (reviewboard.scmtools.models.Repository):
+            The repository that the diff was created against.
+
+        lookups (list of reviewboard.scmtools.core.FileLookup):
+            The files to check.
+
+        get_file_exists (callable):
+            A callable to use to determine if a given file exists in the
+            repository.
+
+    Yields:
+        bool:
+        Whether each file exists, in the same order as ``lookups``.
+    """
+    tool = repository.get_scmtool()
+    hosting_service = repository.hosting_service
+
+    if hosting_service is None:
+        has_batch_lookup = type(tool).files_exist is not SCMTool.files_exist
+        has_api_lookup = False
+    else:
+        hosting_service_cls = type(hosting_service)
+        has_api_lookup = (hosting_service_cls.get_file_exists is not
+                          BaseHostingService.get_file_exists)
+        has_batch_lookup = (
+            hosting_service_cls.get_files_exist is not
+            BaseHostingService.get_files_exist or
+            (not has_api_lookup and
+             type(tool).files_exist is not SCMTool.files_exist))
+
+    def _get_file_exists(
+        lookup: FileLookup,
+    ) -> bool:
+        assert lookup.context is not None
+
+        return get_file_exists(path=lookup.path,
+                               revision=str(lookup.revision),
+                               context=lookup.context)
+
+    if len(lookups) > 1:
+        if has_batch_lookup:
+            try:
+                repository.files_exist(lookups)
+            except Exception as e:
+                # The files will be checked individually below, which will
+                # report any errors for the file that caused them.
+                logger.warning('Unable to check existence of %d files in '
+                               'repository %s in one batch: %s',
+                               len(lookups), repository.pk, e,
+                               extra={'request': lookups[0].context and
+                                      lookups[0].context.request})
+        elif has_api_lookup:
+            def _get_file_exists_in_thread(
+                lookup: FileLookup,
+            ) -> bool:
+                try:
+                    return _get_file_exists(lookup)
+                finally:
+                    connections.close_all()
+
+            max_workers = min(len(lookups), tool.max_http_fetch_workers)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                yield from list(executor.map(_get_file_exists_in_thread,
+                                             lookups))
+
+            return
+
+    for lookup in lookups:
+        yield _get_file_exists(lookup)
+
+
 def _normalize_filename(
     *,
     filename: bytes,
@@ -0,0 +1,360 @@
+"""Lexer lookup for syntax highlighting in the diff viewer.
+
+Pygments' :py:func:`~pygments.lexers.guess_lexer_for_filename` checks the
+filename against the patterns of every registered lexer, and then runs
+content analysis over the entire file for each lexer that matches. This is
+done for both sides of every file in a diff, and can take longer than the
+highlighting itself.
+
+This module builds an index of filename patterns to lexers once per process,
+caches the candidate lexers for each filename, and only analyzes a bounded
+prefix of the file's content when there's more than one candidate. The time
+spent looking up lexers is tracked, and can be retrieved through
+:py:func:`get_lexer_lookup_stats`.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Optional, TYPE_CHECKING
+
+from pygments.lexers import _iter_lexerclasses, find_lexer_class
+from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from pygments.lexer import Lexer
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The maximum number of characters of content used to choose a lexer.
+#:
+#: This is only used when more than one lexer matches a filename.
+#:
+#: Version Added:
+#:     8.0
+MAX_ANALYZED_TEXT_LENGTH = 16 * 1024
+
+
+class LexerLookupStats(TypedDict):
+    """Statistics on lexer lookups in this process.
+
+    Version Added:
+        8.0
+    """
+
+    #: The longest time spent on a single lookup, in seconds.
+    max_secs: float
+
+    #: The number of lookups performed.
+    num_lookups: int
+
+    #: The total time spent on lookups, in seconds.
+    total_secs: float
+
+
+class LexerIndex:
+    """An index of filename patterns to Pygments lexer classes.
+
+    This resolves lexers for filenames the same way as
+    :py:func:`pygments.lexers.guess_lexer_for_filename`, but without checking
+    every lexer's patterns on each lookup.
+
+    Version Added:
+        8.0
+    """
+
+    #: Lexers matching simple ``*.ext`` patterns, keyed by suffix.
+    #:
+    #: Each value is a list of tuples of the lexer class and whether the
+    #: pattern is a primary (rather than alias) filename pattern.
+    _lexers_by_suffix: dict[str, list[tuple[type[Lexer], bool]]]
+
+    #: All other patterns, and the lexers they match.
+    #:
+    #: Each item is a tuple of the compiled pattern, lexer class, and
+    #: whether the pattern is a primary filename pattern.
+    _pattern_lexers: list[tuple[re.Pattern[str], type[Lexer], bool]]
+
+    def __init__(self) -> None:
+        """Initialize the index.
+
+        This will load and index all available lexers, including plugins.
+        """
+        lexers_by_suffix: defaultdict[
+            str, list[tuple[type[Lexer], bool]]] = defaultdict(list)
+        pattern_lexers: list[tuple[re.Pattern[str], type[Lexer], bool]] = []
+
+        for lexer_cls in _iter_lexerclasses():
+            for patterns, is_primary in ((lexer_cls.filenames, True),
+                                         (lexer_cls.alias_filenames, False)):
+                for pattern in patterns:
+                    suffix = pattern[1:]
+
+                    if (pattern.startswith('*.') and
+                        not any(c in suffix for c in '*?[')):
+                        lexers_by_suffix[suffix].append(
+                            (lexer_cls, is_primary))
+                    else:
+                        pattern_lexers.append(
+                            (re.compile(fnmatch.translate(pattern)),
+                             lexer_cls, is_primary))
+
+        self._lexers_by_suffix = dict(lexers_by_suffix)
+        self._pattern_lexers = pattern_lexers
+
+        # Each index caches its own candidates.
+        self.get_candidates = lru_cache(maxsize=4096)(self._get_candidates)
+
+    def get_lexer_class(
+        self,
+        filename: str,
+        data: str,
+    ) -> Optional[type[Lexer]]:
+        """Return the lexer class to use for a file.
+
+        If more than one lexer matches the filename, the lexers will analyze
+        up to :py:data:`MAX_ANALYZED_TEXT_LENGTH` characters of the content
+        to determine the best match.
+
+        Args:
+            filename (str):
+                The name of the file.
+
+            data (str):
+                The content of the file.
+
+        Returns:
+            type:
+            The lexer class, or ``None`` if no lexer matches the file.
+        """
+        candidates = self.get_candidates(os.path.basename(filename))
+
+        if not candidates:
+            return None
+        elif len(candidates) == 1:
+            return candidates[0][0]
+
+        text = data[:MAX_ANALYZED_TEXT_LENGTH]
+        results: list[tuple[float, bool, int, str, type[Lexer]]] = []
+
+        for lexer_cls, is_primary in candidates:
+            rv = lexer_cls.analyse_text(text)
+
+            if rv == 1.0:
+                return lexer_cls
+
+            results.append((rv, is_primary, lexer_cls.priority,
+                            lexer_cls.__name__, lexer_cls))
+
+        # This is the same order used by guess_lexer_for_filename().
+        results.sort(key=lambda result: result[:4])
+
+        return results[-1][-1]
+
+    def _get_candidates(
+        self,
+        basename: str,
+    ) -> tuple[tuple[type[Lexer], bool], ...]:
+        """Return the lexers matching a filename.
+
+        Args:
+            basename (str):
+                The filename, without any directories.
+
+        Returns:
+            tuple:
+            A tuple of the matching lexer classes and whether each was
+            matched by a primary filename pattern, sorted by lexer name.
+        """
+        primary: dict[type[Lexer], bool] = {}
+
+        def _add(
+            lexer_cls: type[Lexer],
+            is_primary: bool,
+        ) -> None:
+            # As in guess_lexer_for_filename(), a lexer is only considered a
+            # primary match if none of its alias patterns match.
+            primary[lexer_cls] = primary.get(lexer_cls, True) and is_primary
+
+        lexers_by_suffix = self._lexers_by_suffix
+        i = basename.find('.')
+
+        while i != -1:
+            for lexer_cls, is_primary in lexers_by_suffix.get(basename[i:],
+                                                              []):
+                _add(lexer_cls, is_primary)
+
+            i = basename.find('.', i + 1)
+
+        for pattern, lexer_cls, is_primary in self._pattern_lexers:
+            if pattern.match(basename):
+                _add(lexer_cls, is_primary)
+
+        return tuple(sorted(primary.items(),
+                            key=lambda item: item[0].__name__))
+
+
+_index: Optional[LexerIndex] = None
+_index_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats: LexerLookupStats = {
+    'max_secs': 0.0,
+    'num_lookups': 0,
+    'total_secs': 0.0,
+}
+
+
+def get_lexer_index() -> LexerIndex:
+    """Return the lexer index for this process.
+
+    The index will be built the first time this is called.
+
+    Version Added:
+        8.0
+
+    Returns:
+        LexerIndex:
+        The lexer index.
+    """
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LexerIndex()
+
+    return _index
+
+
+@lru_cache(maxsize=256)
+def find_lexer_class_by_name(
+    name: str,
+) -> Optional[type[Lexer]]:
+    """Return the lexer class with the given name.
+
+    This is a cached version of :py:func:`pygments.lexers.find_lexer_class`.
+
+    Version Added:
+        8.0
+
+    Args:
+        name (str):
+            The name of the lexer.
+
+    Returns:
+        type:
+        The lexer class, or ``None`` if not found.
+    """
+    return find_lexer_class(name)
+
+
+def get_lexer_for_filename(
+    filename: str,
+    data: str,
+    *,
+    custom_lexers: Mapping[str, str],
+    **options,
+) -> Optional[Lexer]:
+    """Return a lexer for a file.
+
+    Any custom lexer configured for the file's extension will be used
+    first. Otherwise, a lexer will be guessed based on the filename and
+    content.
+
+    Version Added:
+        8.0
+
+    Args:
+        filename (str):
+            The name of the file.
+
+        data (str):
+            The content of the file.
+
+        custom_lexers (dict):
+            A mapping of file extensions to custom lexer names, from
+            :py:attr:`DiffSettings.custom_pygments_lexers
+            <reviewboard.diffviewer.settings.DiffSettings.
+            custom_pygments_lexers>`.
+
+        **options (dict):
+            Options to pass to the lexer.
+
+    Returns:
+        pygments.lexer.Lexer:
+        The lexer, or ``None`` if no lexer could be found.
+    """
+    start = time.perf_counter()
+    lexer_cls: Optional[type[Lexer]] = None
+
+    for ext, lexer_name in custom_lexers.items():
+        if ext and filename.endswith(ext):
+            lexer_cls = find_lexer_class_by_name(lexer_name)
+
+            if lexer_cls:
+                break
+            else:
+                logger.error(
+                    'Pygments lexer "%s" for "%s" files in '
+                    'Diff Viewer Settings was not found.',
+                    lexer_name, ext)
+    else:
+        lexer_cls = get_lexer_index().get_lexer_class(filename, data)
+
+    secs = time.perf_counter() - start
+
+    with _stats_lock:
+        _stats['num_lookups'] += 1
+        _stats['total_secs'] += secs
+        _stats['max_secs'] = max(_stats['max_secs'], secs)
+
+    logger.debug('Looked up Pygments lexer %r for "%s" in %.2fms',
+                 lexer_cls, filename, secs * 1000)
+
+    if lexer_cls is None:
+        return None
+
+    return lexer_cls(**options)
+
+
+def get_lexer_lookup_stats() -> LexerLookupStats:
+    """Return statistics on lexer lookups in this process.
+
+    Version Added:
+        8.0
+
+    Returns:
+        LexerLookupStats:
+        The lookup statistics.
+    """
+    with _stats_lock:
+        return _stats.copy()
+
+
+def reset_lexer_lookup_stats() -> None:
+    """Reset the statistics on lexer lookups in this process.
+
+    Version Added:
+        8.0
+    """
+    with _stats_lock:
+        _stats.update({
+            'max_secs': 0.0,
+            'num_lookups': 0,
+            'total_secs': 0.0,
+        })
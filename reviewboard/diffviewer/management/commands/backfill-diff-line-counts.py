@@ -0,0 +1,158 @@
+"""Management command to store line counts and latest diffsets.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.translation import gettext as _
+
+from reviewboard.diffviewer.models import DiffSet, DiffSetHistory
+
+
+class Command(BaseCommand):
+    """Management command to store line counts and latest diffsets.
+
+    Review Board 8 stores the total line counts of each diffset and the
+    latest diffset of each review request, so that dashboards don't need
+    to load every file in every diff. These are calculated when first
+    needed for older diffs. This command calculates them ahead of time, in
+    batches.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Store the total line counts of existing diffs and the latest diff '
+        'of each review request, speeding up dashboards.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help=_('Number of diffs to process at a time. Defaults to 100.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                The batch size was invalid.
+        """
+        batch_size: int = options['batch_size']
+
+        if batch_size < 1:
+            raise CommandError(_('--batch-size must be at least 1.'))
+
+        # Don't allow queries to be stored.
+        settings.DEBUG = False
+
+        self._backfill_latest_diffsets(batch_size)
+        self._backfill_line_counts(batch_size)
+
+    def _backfill_latest_diffsets(
+        self,
+        batch_size: int,
+    ) -> None:
+        """Store the latest diffset of each diffset history.
+
+        Args:
+            batch_size (int):
+                The number of histories to update at a time.
+        """
+        latest_diffset_ids = (
+            DiffSet.objects
+            .filter(history=OuterRef('pk'))
+            .order_by('-revision', '-timestamp')
+            .values('pk')[:1]
+        )
+        queryset = (
+            DiffSetHistory.objects
+            .filter(latest_diffset__isnull=True,
+                    last_diff_updated__isnull=False)
+            .order_by('pk')
+        )
+
+        last_pk = 0
+        num_updated = 0
+
+        while True:
+            pks = list(queryset.filter(pk__gt=last_pk)
+                       .values_list('pk', flat=True)[:batch_size])
+
+            if not pks:
+                break
+
+            num_updated += (
+                DiffSetHistory.objects
+                .filter(pk__in=pks)
+                .update(latest_diffset=Subquery(latest_diffset_ids))
+            )
+            last_pk = pks[-1]
+
+        self.stdout.write(_('Stored the latest diff for %d review requests.')
+                          % num_updated)
+
+    def _backfill_line_counts(
+        self,
+        batch_size: int,
+    ) -> None:
+        """Store the total line counts of each diffset.
+
+        Args:
+            batch_size (int):
+                The number of diffsets to update at a time.
+        """
+        queryset = (
+            DiffSet.objects
+            .filter(Q(raw_insert_count__isnull=True) |
+                    Q(raw_delete_count__isnull=True))
+            .prefetch_related('files')
+            .order_by('pk')
+        )
+
+        last_pk = 0
+        num_updated = 0
+
+        while True:
+            diffsets = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+
+            if not diffsets:
+                break
+
+            for diffset in diffsets:
+                diffset.update_raw_line_counts()
+
+            last_pk = diffsets[-1].pk
+            num_updated += len(diffsets)
+
+            self.stdout.write(_('Stored line counts for %d diffs')
+                              % num_updated)
+
+        self.stdout.write(_('Stored line counts for %d diffs in total.')
+                          % num_updated)
@@ -0,0 +1,206 @@
+"""Management command to benchmark the diff compression methods.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+
+from reviewboard.diffviewer.compression import get_compressors
+from reviewboard.diffviewer.models import RawFileDiffData
+
+
+class Command(BaseCommand):
+    """Management command to benchmark the diff compression methods.
+
+    This compresses and decompresses a set of diffs with each available
+    compression method, reporting the compression ratio and speeds. The
+    diffs are either the most recent ones stored in the database, or files
+    on disk.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Benchmark the compression ratio and speed of each available diff '
+        'compression method.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help=_('Number of recent diffs to load from the database. '
+                   'Defaults to 1000.'))
+        parser.add_argument(
+            '--path',
+            action='append',
+            default=[],
+            dest='paths',
+            metavar='PATH',
+            help=_(
+                'A diff file, or a directory of diff files, to benchmark '
+                'instead of diffs from the database. This can be specified '
+                'multiple times.'
+            ))
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=3,
+            help=_('Number of times to decompress each diff. Defaults to 3.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There were no diffs to benchmark.
+        """
+        iterations: int = max(1, options['iterations'])
+
+        if options['paths']:
+            samples = self._load_files(options['paths'])
+        else:
+            samples = [
+                raw_file_diff_data.content
+                for raw_file_diff_data in (
+                    RawFileDiffData.objects
+                    .only('pk', 'binary', 'binary_hash', 'compression',
+                          'storage')
+                    .order_by('-pk')[:options['limit']]
+                )
+            ]
+
+        total_size = sum(len(sample) for sample in samples)
+
+        if total_size == 0:
+            raise CommandError(_('There are no diffs to benchmark.'))
+
+        self.stdout.write(_('Benchmarking %(count)d diffs (%(size)d bytes)')
+                          % {
+                              'count': len(samples),
+                              'size': total_size,
+                          })
+        self.stdout.write('')
+        self.stdout.write('%-12s %8s %16s %16s'
+                          % ('Method', 'Ratio', 'Compress MB/s',
+                             'Decompress MB/s'))
+
+        for compressor in get_compressors():
+            if not compressor.is_available():
+                self.stdout.write('%-12s %s'
+                                  % (compressor.name, _('(not available)')))
+                continue
+
+            start = time.perf_counter()
+            compressed = [
+                compressor.compress(sample)
+                for sample in samples
+            ]
+            compress_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            for i in range(iterations):
+                for data in compressed:
+                    compressor.decompress(data)
+
+            decompress_secs = time.perf_counter() - start
+
+            compressed_size = sum(len(data) for data in compressed)
+
+            self.stdout.write('%-12s %7.2fx %16.1f %16.1f' % (
+                compressor.name,
+                total_size / compressed_size,
+                self._get_mb_per_sec(total_size, compress_secs),
+                self._get_mb_per_sec(total_size * iterations,
+                                     decompress_secs),
+            ))
+
+    def _load_files(
+        self,
+        paths: list[str],
+    ) -> list[bytes]:
+        """Load diffs from files on disk.
+
+        Args:
+            paths (list of str):
+                The files or directories to load.
+
+        Returns:
+            list of bytes:
+            The contents of each file.
+
+        Raises:
+            django.core.management.CommandError:
+                One of the paths could not be found.
+        """
+        filenames: list[str] = []
+
+        for path in paths:
+            if os.path.isdir(path):
+                for dirpath, dirnames, dir_filenames in os.walk(path):
+                    filenames += [
+                        os.path.join(dirpath, filename)
+                        for filename in sorted(dir_filenames)
+                    ]
+            elif os.path.isfile(path):
+                filenames.append(path)
+            else:
+                raise CommandError(_('"%s" does not exist.') % path)
+
+        samples: list[bytes] = []
+
+        for filename in filenames:
+            with open(filename, 'rb') as fp:
+                samples.append(fp.read())
+
+        return samples
+
+    def _get_mb_per_sec(
+        self,
+        num_bytes: int,
+        secs: float,
+    ) -> float:
+        """Return a speed in megabytes per second.
+
+        Args:
+            num_bytes (int):
+                The number of bytes processed.
+
+            secs (float):
+                The time spent processing, in seconds.
+
+        Returns:
+            float:
+            The speed in megabytes per second.
+        """
+        if secs <= 0:
+            return 0.0
+
+        return num_bytes / secs / (1024 * 1024)
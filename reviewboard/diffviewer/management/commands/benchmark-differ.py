@@ -0,0 +1,239 @@
+"""Management command to benchmark the diff algorithm implementations.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+
+from reviewboard.diffviewer.myersdiff import MyersDiffer
+from reviewboard.diffviewer.npmyersdiff import (NumPyMyersDiffer,
+                                                is_numpy_differ_available)
+
+
+class Command(BaseCommand):
+    """Management command to benchmark the diff algorithm implementations.
+
+    This compares the NumPy-based Myers differ against the pure Python
+    implementation, using generated files of different sizes with different
+    amounts of changes. The results of both are checked to make sure they
+    match.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Benchmark the NumPy-based Myers differ against the pure Python '
+        'implementation.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--lines',
+            action='append',
+            type=int,
+            default=[],
+            dest='line_counts',
+            metavar='LINES',
+            help=_(
+                'Number of lines in each generated file. This can be '
+                'specified multiple times. Defaults to 5000, 20000, and '
+                '50000.'
+            ))
+        parser.add_argument(
+            '--edit-rate',
+            action='append',
+            type=float,
+            default=[],
+            dest='edit_rates',
+            metavar='RATE',
+            help=_(
+                'Fraction of lines to change in each generated file. This '
+                'can be specified multiple times. Defaults to 0.01, 0.1, '
+                'and 0.3.'
+            ))
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1,
+            help=_('Number of times to diff each file. Defaults to 1.'))
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help=_('Seed used to generate the files. Defaults to 0.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                NumPy is not installed.
+        """
+        if not is_numpy_differ_available():
+            raise CommandError(
+                _('NumPy must be installed to benchmark the NumPy-based '
+                  'differ.'))
+
+        line_counts: list[int] = options['line_counts'] or [5000, 20000,
+                                                            50000]
+        edit_rates: list[float] = options['edit_rates'] or [0.01, 0.1, 0.3]
+        iterations: int = options['iterations']
+        rng = random.Random(options['seed'])
+
+        self.stdout.write('%-20s %12s %12s %8s'
+                          % ('File', 'Python', 'NumPy', 'Speedup'))
+
+        total_python = 0.0
+        total_numpy = 0.0
+        num_mismatches = 0
+
+        for num_lines in line_counts:
+            for edit_rate in edit_rates:
+                a, b = self._generate_files(rng=rng,
+                                            num_lines=num_lines,
+                                            edit_rate=edit_rate)
+
+                start = time.perf_counter()
+
+                for i in range(iterations):
+                    python_opcodes = list(MyersDiffer(a, b).get_opcodes())
+
+                python_secs = time.perf_counter() - start
+
+                start = time.perf_counter()
+
+                for i in range(iterations):
+                    numpy_opcodes = list(
+                        NumPyMyersDiffer(a, b).get_opcodes())
+
+                numpy_secs = time.perf_counter() - start
+
+                if python_opcodes != numpy_opcodes:
+                    num_mismatches += 1
+
+                total_python += python_secs
+                total_numpy += numpy_secs
+
+                self.stdout.write(self._format_row(
+                    name=f'{num_lines} @ {edit_rate:g}',
+                    python_secs=python_secs,
+                    numpy_secs=numpy_secs))
+
+        self.stdout.write(self._format_row(name=_('Total'),
+                                           python_secs=total_python,
+                                           numpy_secs=total_numpy))
+        self.stdout.write('')
+        self.stdout.write(
+            _('%d file(s) produced different results.')
+            % num_mismatches)
+
+    def _generate_files(
+        self,
+        *,
+        rng: random.Random,
+        num_lines: int,
+        edit_rate: float,
+    ) -> tuple[list[str], list[str]]:
+        """Generate an original and modified file.
+
+        Lines are deleted, replaced, or followed by new lines at random.
+
+        Args:
+            rng (random.Random):
+                The random number generator to use.
+
+            num_lines (int):
+                The number of lines in the original file.
+
+            edit_rate (float):
+                The fraction of lines to change.
+
+        Returns:
+            tuple:
+            A 2-tuple of the original and modified lines.
+        """
+        vocab_size = max(50, num_lines // 3)
+        a = [
+            f'line {rng.randrange(vocab_size)}\n'
+            for i in range(num_lines)
+        ]
+        b: list[str] = []
+
+        for line in a:
+            r = rng.random()
+
+            if r < edit_rate / 3:
+                # Delete the line.
+                continue
+            elif r < edit_rate * 2 / 3:
+                b.append(f'changed {rng.randrange(vocab_size)}\n')
+            elif r < edit_rate:
+                b.append(line)
+                b += [
+                    f'inserted {rng.randrange(vocab_size)}\n'
+                    for i in range(rng.randrange(1, 5))
+                ]
+            else:
+                b.append(line)
+
+        return a, b
+
+    def _format_row(
+        self,
+        *,
+        name: str,
+        python_secs: float,
+        numpy_secs: float,
+    ) -> str:
+        """Return a formatted row of results.
+
+        Args:
+            name (str):
+                The name of the row.
+
+            python_secs (float):
+                The time spent diffing with the pure Python differ.
+
+            numpy_secs (float):
+                The time spent diffing with the NumPy-based differ.
+
+        Returns:
+            str:
+            The formatted row.
+        """
+        if numpy_secs > 0:
+            speedup = '%.1fx' % (python_secs / numpy_secs)
+        else:
+            speedup = '-'
+
+        return '%-20s %11.3fs %11.3fs %8s' % (
+            name,
+            python_secs,
+            numpy_secs,
+            speedup,
+        )
@@ -0,0 +1,235 @@
+"""Management command to benchmark applying diffs to files.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+
+import reviewboard
+from reviewboard.diffviewer.diffutils import run_patch_command
+from reviewboard.diffviewer.errors import PatchError
+from reviewboard.diffviewer.patcher import apply_patch, parse_hunks
+
+
+_FILE_DIFF_SPLIT_RE = re.compile(br'^(?=diff --git )', re.M)
+
+
+class Command(BaseCommand):
+    """Management command to benchmark applying diffs to files.
+
+    This compares the in-process patcher against the :program:`patch`
+    command, using a directory of sample diffs. The original file for each
+    file in a diff is synthesized from the diff's own hunks, so no
+    repository is needed.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Benchmark applying diffs in-process against the patch command.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--diffs-dir',
+            default=os.path.join(os.path.dirname(reviewboard.__file__),
+                                 'reviews', 'management', 'commands',
+                                 'diffs'),
+            help=_(
+                'Directory of sample .diff files to benchmark. Defaults to '
+                'the sample diffs used by fill-database.'
+            ))
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help=_('Number of times to apply each diff. Defaults to 10.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                The diffs directory could not be read.
+        """
+        diffs_dir: str = options['diffs_dir']
+        iterations: int = options['iterations']
+
+        try:
+            filenames = sorted(
+                filename
+                for filename in os.listdir(diffs_dir)
+                if filename.endswith('.diff')
+            )
+        except OSError as e:
+            raise CommandError(
+                _('Unable to read diffs from %(path)s: %(error)s')
+                % {
+                    'error': e,
+                    'path': diffs_dir,
+                })
+
+        self.stdout.write('%-30s %6s %12s %12s %8s'
+                          % ('Diff', 'Files', 'In-process', 'patch(1)',
+                             'Speedup'))
+
+        total_in_process = 0.0
+        total_subprocess = 0.0
+        num_fallbacks = 0
+        num_mismatches = 0
+
+        for filename in filenames:
+            with open(os.path.join(diffs_dir, filename), 'rb') as fp:
+                diff_data = fp.read()
+
+            file_diffs = [
+                file_diff
+                for file_diff in _FILE_DIFF_SPLIT_RE.split(diff_data)
+                if file_diff.strip()
+            ]
+            in_process_secs = 0.0
+            subprocess_secs = 0.0
+
+            for file_diff in file_diffs:
+                orig_file = self._build_orig_file(file_diff)
+
+                start = time.perf_counter()
+
+                for i in range(iterations):
+                    in_process_result = apply_patch(diff=file_diff,
+                                                    orig_file=orig_file)
+
+                in_process_secs += time.perf_counter() - start
+
+                start = time.perf_counter()
+
+                for i in range(iterations):
+                    try:
+                        subprocess_result = run_patch_command(
+                            diff=file_diff,
+                            orig_file=orig_file,
+                            filename=filename)
+                    except PatchError:
+                        subprocess_result = None
+
+                subprocess_secs += time.perf_counter() - start
+
+                if in_process_result is None:
+                    num_fallbacks += 1
+                elif in_process_result != subprocess_result:
+                    num_mismatches += 1
+
+            total_in_process += in_process_secs
+            total_subprocess += subprocess_secs
+
+            self.stdout.write(self._format_row(
+                name=filename,
+                num_files=len(file_diffs),
+                in_process_secs=in_process_secs,
+                subprocess_secs=subprocess_secs))
+
+        self.stdout.write(self._format_row(name=_('Total'),
+                                           num_files=None,
+                                           in_process_secs=total_in_process,
+                                           subprocess_secs=total_subprocess))
+        self.stdout.write('')
+        self.stdout.write(
+            _('%(fallbacks)d file diff(s) required the patch command. '
+              '%(mismatches)d file diff(s) produced different results.')
+            % {
+                'fallbacks': num_fallbacks,
+                'mismatches': num_mismatches,
+            })
+
+    def _build_orig_file(
+        self,
+        file_diff: bytes,
+    ) -> bytes:
+        """Return an original file that a diff applies to.
+
+        Any lines not covered by the diff's hunks are filled in with
+        placeholder content.
+
+        Args:
+            file_diff (bytes):
+                The diff for a single file.
+
+        Returns:
+            bytes:
+            The synthesized original file.
+        """
+        lines: list[bytes] = []
+
+        for hunk in parse_hunks(file_diff) or []:
+            while len(lines) + 1 < hunk.orig_first:
+                lines.append(b'placeholder line %d\n' % (len(lines) + 1))
+
+            lines += hunk.pattern
+
+        return b''.join(lines)
+
+    def _format_row(
+        self,
+        *,
+        name: str,
+        num_files: (int | None),
+        in_process_secs: float,
+        subprocess_secs: float,
+    ) -> str:
+        """Return a formatted row of results.
+
+        Args:
+            name (str):
+                The name of the row.
+
+            num_files (int):
+                The number of file diffs, if applicable.
+
+            in_process_secs (float):
+                The time spent applying diffs in-process.
+
+            subprocess_secs (float):
+                The time spent applying diffs using the patch command.
+
+        Returns:
+            str:
+            The formatted row.
+        """
+        if in_process_secs > 0:
+            speedup = '%.1fx' % (subprocess_secs / in_process_secs)
+        else:
+            speedup = '-'
+
+        return '%-30s %6s %11.3fs %11.3fs %8s' % (
+            name,
+            '' if num_files is None else num_files,
+            in_process_secs,
+            subprocess_secs,
+            speedup,
+        )
@@ -0,0 +1,228 @@
+"""Management command to move stored diffs between storage backends.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.humanize.templatetags.humanize import intcomma
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.diffviewer.blob_storage import (DiffBlobStorage,
+                                                 DiffBlobStorageError,
+                                                 get_blob_key,
+                                                 get_diff_blob_storage)
+from reviewboard.diffviewer.models import RawFileDiffData
+
+
+class Command(BaseCommand):
+    """Management command to move stored diffs between storage backends.
+
+    Diffs are moved in batches. Each entry is only updated if it hasn't
+    been changed since it was read, and the old content is only deleted
+    once the entry points to the new location, so this is safe to run
+    while Review Board is in use.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Move stored diffs between the database and a diff storage backend.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--to',
+            default=None,
+            dest='storage_id',
+            metavar='STORAGE',
+            help=_(
+                'Where to move diffs: database, filesystem, or '
+                'file-storage. Defaults to the diff storage in the diff '
+                'viewer settings.'
+            ))
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help=_('Number of diffs to move at a time. Defaults to 200.'))
+        parser.add_argument(
+            '--max-diffs',
+            type=int,
+            default=None,
+            help=_(
+                'The maximum number of diffs to move. This is useful if you '
+                'have a lot of diffs and want to move them over several '
+                'sessions.'
+            ))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the options or with moving a diff.
+        """
+        batch_size: int = options['batch_size']
+        max_diffs: Optional[int] = options['max_diffs']
+        storage_id: Optional[str] = options['storage_id']
+
+        if batch_size < 1:
+            raise CommandError(_('--batch-size must be at least 1.'))
+
+        if storage_id is None:
+            siteconfig = SiteConfiguration.objects.get_current()
+            storage_id = siteconfig.get('diffviewer_blob_storage')
+
+        new_storage: Optional[DiffBlobStorage]
+
+        if not storage_id or storage_id == 'database':
+            new_storage = None
+            new_storage_id = None
+            queryset = RawFileDiffData.objects.filter(storage__isnull=False)
+        else:
+            try:
+                new_storage = get_diff_blob_storage(storage_id)
+            except DiffBlobStorageError as e:
+                raise CommandError(str(e))
+
+            # This includes entries stored in the database.
+            new_storage_id = new_storage.storage_id
+            queryset = RawFileDiffData.objects.exclude(storage=new_storage_id)
+
+        queryset = (
+            queryset
+            .only('pk', 'binary', 'binary_hash', 'compression', 'storage')
+            .order_by('pk')
+        )
+
+        # Don't allow queries to be stored.
+        settings.DEBUG = False
+
+        self.stdout.write(_('Moving diffs to %s...')
+                          % (new_storage_id or 'database'))
+
+        last_pk = 0
+        num_diffs = 0
+        num_bytes = 0
+
+        while max_diffs is None or num_diffs < max_diffs:
+            limit = batch_size
+
+            if max_diffs is not None:
+                limit = min(limit, max_diffs - num_diffs)
+
+            batch = list(queryset.filter(pk__gt=last_pk)[:limit])
+
+            if not batch:
+                break
+
+            for raw_file_diff_data in batch:
+                try:
+                    num_bytes += self._move(raw_file_diff_data, new_storage)
+                except DiffBlobStorageError as e:
+                    raise CommandError(
+                        _('Unable to move RawFileDiffData %(pk)s: %(error)s')
+                        % {
+                            'error': e,
+                            'pk': raw_file_diff_data.pk,
+                        })
+
+            last_pk = batch[-1].pk
+            num_diffs += len(batch)
+
+            self.stdout.write(_('Moved %d diffs') % num_diffs)
+
+        if num_diffs == 0:
+            self.stdout.write(_('All diffs have already been moved.'))
+        else:
+            self.stdout.write(_('Moved %(count)d diffs (%(size)s bytes)')
+                              % {
+                                  'count': num_diffs,
+                                  'size': intcomma(num_bytes),
+                              })
+
+    def _move(
+        self,
+        raw_file_diff_data: RawFileDiffData,
+        new_storage: Optional[DiffBlobStorage],
+    ) -> int:
+        """Move the content of an entry to a new storage backend.
+
+        Args:
+            raw_file_diff_data (reviewboard.diffviewer.models.
+                                RawFileDiffData):
+                The entry to move.
+
+            new_storage (reviewboard.diffviewer.blob_storage.
+                         DiffBlobStorage):
+                The backend to move the content to, or ``None`` to move it
+                into the database.
+
+        Returns:
+            int:
+            The number of bytes moved, or 0 if the entry changed while being
+            moved.
+
+        Raises:
+            reviewboard.diffviewer.blob_storage.DiffBlobStorageError:
+                The content could not be moved.
+        """
+        old_storage_id = raw_file_diff_data.storage
+        key = get_blob_key(raw_file_diff_data.binary_hash,
+                           raw_file_diff_data.compression)
+        data = raw_file_diff_data.get_stored_data()
+
+        if new_storage is None:
+            new_values = {
+                'binary': data,
+                'storage': None,
+            }
+        else:
+            new_storage.save(key, data)
+            new_values = {
+                'binary': b'',
+                'storage': new_storage.storage_id,
+            }
+
+        # Only update the entry if it wasn't recompressed or moved by
+        # something else in the meantime.
+        updated = (
+            RawFileDiffData.objects
+            .filter(pk=raw_file_diff_data.pk,
+                    compression=raw_file_diff_data.compression,
+                    storage=old_storage_id)
+            .update(**new_values)
+        )
+
+        if not updated:
+            return 0
+
+        if old_storage_id:
+            get_diff_blob_storage(old_storage_id).delete(key)
+
+        return len(data)
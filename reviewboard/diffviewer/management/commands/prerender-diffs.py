@@ -0,0 +1,183 @@
+"""Management command to pre-render diffs in the background.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from reviewboard.diffviewer.models import DiffSet
+from reviewboard.diffviewer.prerender import (get_prerender_concurrency,
+                                              get_prerender_queue_stats,
+                                              prerender_diffset,
+                                              process_prerender_jobs)
+
+
+class Command(BaseCommand):
+    """Management command to pre-render diffs in the background.
+
+    By default, this processes any diffs queued for pre-rendering and then
+    exits. With ``--watch``, it keeps running and processes new diffs as
+    they're queued, acting as a worker process.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Pre-render diffs queued for rendering, so they load quickly the '
+        'first time they are viewed.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help=_(
+                'Keep running, processing diffs as they are queued.'
+            ))
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help=_(
+                'Number of seconds to wait between checks for new diffs when '
+                'using --watch. Defaults to 5.'
+            ))
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help=_(
+                'Maximum number of files to render at once. Defaults to the '
+                'pre-render concurrency in the diff viewer settings.'
+            ))
+        parser.add_argument(
+            '--diffset-id',
+            action='append',
+            type=int,
+            default=[],
+            dest='diffset_ids',
+            metavar='DIFFSET_ID',
+            help=_(
+                'Pre-render a specific diffset, whether or not it is queued. '
+                'This can be specified multiple times.'
+            ))
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help=_('Show the number of diffs queued for pre-rendering.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        concurrency = options['concurrency']
+
+        if concurrency is None:
+            concurrency = get_prerender_concurrency()
+        elif concurrency < 1:
+            raise CommandError(_('--concurrency must be at least 1.'))
+
+        if options['stats']:
+            self._show_stats()
+        elif options['diffset_ids']:
+            self._prerender_diffsets(diffset_ids=options['diffset_ids'],
+                                     concurrency=concurrency)
+        elif options['watch']:
+            poll_interval = options['poll_interval']
+
+            while True:
+                if not process_prerender_jobs(concurrency=concurrency):
+                    time.sleep(poll_interval)
+        else:
+            num_processed = process_prerender_jobs(concurrency=concurrency)
+
+            self.stdout.write(_('Pre-rendered %d queued diff(s).')
+                              % num_processed)
+
+    def _prerender_diffsets(
+        self,
+        *,
+        diffset_ids: list[int],
+        concurrency: int,
+    ) -> None:
+        """Pre-render specific diffsets.
+
+        Args:
+            diffset_ids (list of int):
+                The IDs of the diffsets to pre-render.
+
+            concurrency (int):
+                The maximum number of files to render at once.
+
+        Raises:
+            django.core.management.CommandError:
+                One or more diffsets could not be found.
+        """
+        diffsets = {
+            diffset.pk: diffset
+            for diffset in (
+                DiffSet.objects
+                .filter(pk__in=diffset_ids)
+                .select_related('repository')
+            )
+        }
+        missing_ids = sorted(set(diffset_ids) - set(diffsets))
+
+        if missing_ids:
+            raise CommandError(
+                _('The following diffsets could not be found: %s')
+                % ', '.join(str(diffset_id) for diffset_id in missing_ids))
+
+        for diffset_id in diffset_ids:
+            num_files = prerender_diffset(diffsets[diffset_id],
+                                          concurrency=concurrency)
+
+            self.stdout.write(
+                _('Pre-rendered %(num_files)d file(s) for diffset '
+                  '%(diffset_id)d.')
+                % {
+                    'diffset_id': diffset_id,
+                    'num_files': num_files,
+                })
+
+    def _show_stats(self) -> None:
+        """Show statistics on the pre-rendering queue."""
+        stats = get_prerender_queue_stats()
+        oldest_queued = stats['oldest_queued']
+
+        self.stdout.write(_('Queued diffs: %d') % stats['queued_jobs'])
+
+        if oldest_queued is not None:
+            self.stdout.write(
+                _('Oldest queued diff: %d second(s) ago')
+                % (timezone.now() - oldest_queued).total_seconds())
@@ -0,0 +1,282 @@
+"""Management command to recompress stored diffs.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from django.conf import settings
+from django.contrib.humanize.templatetags.humanize import intcomma
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.diffviewer.blob_storage import (get_blob_key,
+                                                 get_diff_blob_storage)
+from reviewboard.diffviewer.compression import (compress_diff_data,
+                                                get_compressor,
+                                                get_compressor_by_name,
+                                                train_compression_dictionary)
+from reviewboard.diffviewer.models import RawFileDiffData
+
+
+class Command(BaseCommand):
+    """Management command to recompress stored diffs.
+
+    This converts stored diff data to a new compression method in batches,
+    and can train a Zstandard dictionary from existing diffs for use with
+    the ``zstd-dict`` method. Uncompressed diff data is left alone, since it
+    didn't benefit from compression when it was stored.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Recompress the diffs stored in the database using a new '
+        'compression method.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--compression',
+            default=None,
+            metavar='METHOD',
+            help=_(
+                'The compression method to use: auto, bzip2, zlib, zstd, or '
+                'zstd-dict. Defaults to the diff compression in the diff '
+                'viewer settings.'
+            ))
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help=_('Number of diffs to recompress at a time. Defaults to '
+                   '500.'))
+        parser.add_argument(
+            '--max-diffs',
+            type=int,
+            default=None,
+            help=_(
+                'The maximum number of diffs to recompress. This is useful '
+                'if you have a lot of diffs and want to recompress them '
+                'over several sessions.'
+            ))
+        parser.add_argument(
+            '--train-dictionary',
+            action='store_true',
+            default=False,
+            help=_(
+                'Train a new Zstandard dictionary from the most recent '
+                'diffs before recompressing. The dictionary will be used '
+                'for all new diffs compressed with zstd-dict.'
+            ))
+        parser.add_argument(
+            '--dictionary-samples',
+            type=int,
+            default=2000,
+            help=_('Number of recent diffs to train the dictionary from. '
+                   'Defaults to 2000.'))
+        parser.add_argument(
+            '--dictionary-size',
+            type=int,
+            default=112_640,
+            help=_('Maximum size of the dictionary, in bytes. Defaults to '
+                   '112640.'))
+        parser.add_argument(
+            '--train-only',
+            action='store_true',
+            default=False,
+            help=_("Train a new dictionary, but don't recompress any "
+                   "diffs."))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the options or with training the
+                dictionary.
+        """
+        batch_size: int = options['batch_size']
+        max_diffs: (int | None) = options['max_diffs']
+
+        if batch_size < 1:
+            raise CommandError(_('--batch-size must be at least 1.'))
+
+        # Don't allow queries to be stored.
+        settings.DEBUG = False
+
+        if options['train_dictionary'] or options['train_only']:
+            self._train_dictionary(num_samples=options['dictionary_samples'],
+                                   dict_size=options['dictionary_size'])
+
+            if options['train_only']:
+                return
+
+        name: (str | None) = options['compression']
+
+        if name is None:
+            siteconfig = SiteConfiguration.objects.get_current()
+            name = siteconfig.get('diffviewer_compression')
+
+        compressor = get_compressor_by_name(name)
+
+        if compressor is None:
+            raise CommandError(_('Unknown compression method "%s".') % name)
+        elif not compressor.is_available():
+            raise CommandError(
+                _('The "%s" compression method is not available. Make sure '
+                  'zstandard is installed, and that a dictionary has been '
+                  'trained for zstd-dict.')
+                % compressor.name)
+
+        self.stdout.write(_('Recompressing diffs using %s...')
+                          % compressor.name)
+
+        queryset = (
+            RawFileDiffData.objects
+            .filter(compression__isnull=False)
+            .exclude(compression=compressor.compression_id)
+            .only('pk', 'binary', 'binary_hash', 'compression', 'storage')
+            .order_by('pk')
+        )
+
+        last_pk = 0
+        num_diffs = 0
+        old_size = 0
+        new_size = 0
+
+        while max_diffs is None or num_diffs < max_diffs:
+            limit = batch_size
+
+            if max_diffs is not None:
+                limit = min(limit, max_diffs - num_diffs)
+
+            batch = list(queryset.filter(pk__gt=last_pk)[:limit])
+
+            if not batch:
+                break
+
+            old_blobs: list[tuple[str, str]] = []
+
+            for raw_file_diff_data in batch:
+                binary_hash = raw_file_diff_data.binary_hash
+                storage_id = raw_file_diff_data.storage
+                old_data = raw_file_diff_data.get_stored_data()
+                old_size += len(old_data)
+
+                old_compressor = get_compressor(
+                    raw_file_diff_data.compression)
+                assert old_compressor is not None
+
+                new_data, new_compression = compress_diff_data(
+                    old_compressor.decompress(old_data),
+                    compressor)
+                new_size += len(new_data)
+
+                if storage_id:
+                    # Recompressed content is stored under a new key, so
+                    # the old content remains readable until the entry is
+                    # updated.
+                    get_diff_blob_storage(storage_id).save(
+                        get_blob_key(binary_hash, new_compression),
+                        new_data)
+                    old_blobs.append((
+                        storage_id,
+                        get_blob_key(binary_hash,
+                                     raw_file_diff_data.compression),
+                    ))
+                    new_data = b''
+
+                raw_file_diff_data.binary = new_data
+                raw_file_diff_data.compression = new_compression
+
+            RawFileDiffData.objects.bulk_update(batch,
+                                                ['binary', 'compression'])
+
+            for storage_id, key in old_blobs:
+                get_diff_blob_storage(storage_id).delete(key)
+
+            last_pk = batch[-1].pk
+            num_diffs += len(batch)
+
+            self.stdout.write(_('Recompressed %d diffs') % num_diffs)
+
+        if num_diffs == 0:
+            self.stdout.write(_('All diffs already use %s.')
+                              % compressor.name)
+        else:
+            self.stdout.write(
+                _('Recompressed %(count)d diffs from %(old_size)s bytes to '
+                  '%(new_size)s bytes (%(savings_pct)0.2f%% savings)')
+                % {
+                    'count': num_diffs,
+                    'old_size': intcomma(old_size),
+                    'new_size': intcomma(new_size),
+                    'savings_pct': ((old_size - new_size) / old_size * 100
+                                    if old_size else 0.0),
+                })
+
+    def _train_dictionary(
+        self,
+        *,
+        num_samples: int,
+        dict_size: int,
+    ) -> None:
+        """Train a new Zstandard dictionary from recent diffs.
+
+        Args:
+            num_samples (int):
+                The number of recent diffs to train from.
+
+            dict_size (int):
+                The maximum size of the dictionary, in bytes.
+
+        Raises:
+            django.core.management.CommandError:
+                The dictionary could not be trained.
+        """
+        samples = [
+            raw_file_diff_data.content
+            for raw_file_diff_data in (
+                RawFileDiffData.objects
+                .only('pk', 'binary', 'binary_hash', 'compression', 'storage')
+                .order_by('-pk')[:num_samples]
+            )
+        ]
+
+        self.stdout.write(_('Training a dictionary from %d diffs...')
+                          % len(samples))
+
+        try:
+            compression_dict = train_compression_dictionary(
+                samples,
+                dict_size=dict_size)
+        except Exception as e:
+            raise CommandError(_('Unable to train a dictionary: %s') % e)
+
+        self.stdout.write(_('Created dictionary %(dict_id)d (%(size)s bytes)')
+                          % {
+                              'dict_id': compression_dict.dict_id,
+                              'size': intcomma(len(compression_dict.data)),
+                          })
@@ -2,12 +2,11 @@
 
 from __future__ import annotations
 
-import bz2
 import gc
 import hashlib
 import logging
 from functools import partial
-from typing import Mapping, Sequence, TYPE_CHECKING
+from typing import Mapping, Optional, Sequence, TYPE_CHECKING
 
 from django.conf import settings
 from django.db import models, reset_queries, connection, connections
@@ -15,7 +14,10 @@ from django.db.models import Count, Q
 from django.db.utils import IntegrityError
 from django.utils.translation import gettext as _
 
+from reviewboard.diffviewer.blob_storage import (get_blob_key,
+                                                 get_default_diff_blob_storage)
 from reviewboard.diffviewer.commit_utils import get_file_exists_in_history
+from reviewboard.diffviewer.compression import compress_diff_data
 from reviewboard.diffviewer.differ import DiffCompatVersion
 from reviewboard.diffviewer.diffutils import check_diff_size
 from reviewboard.diffviewer.filediff_creator import create_filediffs
@@ -603,13 +605,14 @@ class RawFileDiffDataManager(models.Manager):
         If the content would benefit from being compressed, this will
         return the compressed content and the value for the compression
         flag. Otherwise, it will return the raw content.
-        """
-        compressed_data = bz2.compress(data, 9)
 
-        if len(compressed_data) < len(data):
-            return compressed_data, self.model.COMPRESSION_BZIP2
-        else:
-            return data, None
+        Version Changed:
+            8.0:
+            This now uses the compression method configured in the
+            ``diffviewer_compression`` site configuration setting, rather
+            than always using bzip2.
+        """
+        return compress_diff_data(data)
 
     def get_or_create_from_data(self, data):
         """Return or create a new stored entry for diff data.
@@ -625,6 +628,10 @@ class RawFileDiffDataManager(models.Manager):
         Raises:
             TypeError:
                 The data passed in was not a bytes string.
+
+            reviewboard.diffviewer.blob_storage.DiffBlobStorageError:
+                The data could not be stored in the configured storage
+                backend.
         """
         if not isinstance(data, bytes):
             raise TypeError(
@@ -633,13 +640,36 @@ class RawFileDiffDataManager(models.Manager):
                 % type(data))
 
         binary_hash = self._hash_hexdigest(data)
-        processed_data, compression = self.process_diff_data(data)
-
+        stored: Optional[tuple[bytes, Optional[str], Optional[str]]] = None
+
+        def _store() -> tuple[bytes, Optional[str], Optional[str]]:
+            nonlocal stored
+
+            if stored is None:
+                processed_data, compression = self.process_diff_data(data)
+                storage = get_default_diff_blob_storage()
+
+                if storage is None:
+                    stored = (processed_data, compression, None)
+                else:
+                    # The content is stored before the entry is created. If
+                    # another process creates the entry first, the content
+                    # it stored will be identical.
+                    storage.save(get_blob_key(binary_hash, compression),
+                                 processed_data)
+                    stored = (b'', compression, storage.storage_id)
+
+            return stored
+
+        # The data is only compressed and stored if a new entry needs to be
+        # created. Callable defaults aren't evaluated when an entry already
+        # exists.
         return self.get_or_create(
             binary_hash=binary_hash,
             defaults={
-                'binary': processed_data,
-                'compression': compression,
+                'binary': lambda: _store()[0],
+                'compression': lambda: _store()[1],
+                'storage': lambda: _store()[2],
             })
 
     def create_from_legacy(self, legacy, save=True):
@@ -1059,7 +1089,9 @@ class DiffSetManager(BaseDiffManager):
             history=diffset_history,
             repository=repository,
             diffcompat=DiffCompatVersion.DEFAULT,
-            base_commit_id=base_commit_id)
+            base_commit_id=base_commit_id,
+            raw_insert_count=0,
+            raw_delete_count=0)
 
         if not validate_only:
             diffset.save()
@@ -1107,6 +1139,9 @@ class DiffSetManager(BaseDiffManager):
             The created DiffSet.
         """
         kwargs.setdefault('revision', 0)
+        kwargs.setdefault('raw_insert_count', 0)
+        kwargs.setdefault('raw_delete_count', 0)
+
         return super(DiffSetManager, self).create(
             name='diff',
             history=diffset_history,
@@ -1,8 +1,12 @@
 """Model re-exports for reviewboard.diffviewer.*."""
 
+from reviewboard.diffviewer.models.diff_compression_dictionary import \
+    DiffCompressionDictionary
 from reviewboard.diffviewer.models.diffcommit import DiffCommit
 from reviewboard.diffviewer.models.diffset import DiffSet
 from reviewboard.diffviewer.models.diffset_history import DiffSetHistory
+from reviewboard.diffviewer.models.diffset_prerender_job import \
+    DiffSetPrerenderJob
 from reviewboard.diffviewer.models.filediff import FileDiff
 from reviewboard.diffviewer.models.legacy_file_diff_data import \
     LegacyFileDiffData
@@ -11,8 +15,10 @@ from reviewboard.diffviewer.models.raw_file_diff_data import RawFileDiffData
 
 __all__ = [
     'DiffCommit',
+    'DiffCompressionDictionary',
     'DiffSet',
     'DiffSetHistory',
+    'DiffSetPrerenderJob',
     'FileDiff',
     'LegacyFileDiffData',
     'RawFileDiffData',
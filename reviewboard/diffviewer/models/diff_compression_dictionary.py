@@ -0,0 +1,49 @@
+"""DiffCompressionDictionary model definition.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class DiffCompressionDictionary(models.Model):
+    """A trained Zstandard dictionary used to compress stored diffs.
+
+    These are created by the :command:`recompress-diffs` management command,
+    and used by the ``zstd-dict`` compression method. See
+    :py:mod:`reviewboard.diffviewer.compression` for details.
+
+    Dictionaries must never be deleted while any diff data compressed with
+    them still exists.
+
+    Version Added:
+        8.0
+    """
+
+    dict_id = models.BigIntegerField(
+        _('dictionary ID'),
+        unique=True)
+    data = models.BinaryField()
+    created = models.DateTimeField(
+        _('created'),
+        default=timezone.now)
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return f'Diff compression dictionary {self.dict_id}'
+
+    class Meta:
+        app_label = 'diffviewer'
+        db_table = 'diffviewer_diffcompressiondictionary'
+        verbose_name = _('Diff Compression Dictionary')
+        verbose_name_plural = _('Diff Compression Dictionaries')
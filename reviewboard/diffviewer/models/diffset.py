@@ -47,6 +47,24 @@ class DiffSet(models.Model):
 
     commit_count = RelationCounterField('commits')
 
+    #: The total number of lines inserted in the raw diffs of all files.
+    #:
+    #: This is ``None`` if it hasn't been calculated yet. Use
+    #: :py:meth:`get_raw_line_counts` to retrieve it.
+    #:
+    #: Version Added:
+    #:     8.0
+    raw_insert_count = models.IntegerField(null=True, blank=True)
+
+    #: The total number of lines deleted in the raw diffs of all files.
+    #:
+    #: This is ``None`` if it hasn't been calculated yet. Use
+    #: :py:meth:`get_raw_line_counts` to retrieve it.
+    #:
+    #: Version Added:
+    #:     8.0
+    raw_delete_count = models.IntegerField(null=True, blank=True)
+
     extra_data = JSONField(null=True)
 
     objects: ClassVar[DiffSetManager] = DiffSetManager()
@@ -186,6 +204,50 @@ class DiffSet(models.Model):
         """
         return get_total_line_counts(self.files.all())
 
+    def get_raw_line_counts(self) -> tuple[int, int]:
+        """Return the total raw insert and delete counts of all files.
+
+        These are stored on the DiffSet, and only calculated from the
+        FileDiffs if they haven't been stored yet.
+
+        Version Added:
+            8.0
+
+        Returns:
+            tuple:
+            A 2-tuple of:
+
+            Tuple:
+                0 (int):
+                    The total number of inserted lines.
+
+                1 (int):
+                    The total number of deleted lines.
+        """
+        if self.raw_insert_count is None or self.raw_delete_count is None:
+            self.update_raw_line_counts()
+
+        assert self.raw_insert_count is not None
+        assert self.raw_delete_count is not None
+
+        return self.raw_insert_count, self.raw_delete_count
+
+    def update_raw_line_counts(self) -> None:
+        """Calculate and store the total raw insert and delete counts.
+
+        Version Added:
+            8.0
+        """
+        counts = self.get_total_line_counts()
+        self.raw_insert_count = counts['raw_insert_count']
+        self.raw_delete_count = counts['raw_delete_count']
+
+        if self.pk:
+            # This avoids the side effects of save() on the history.
+            DiffSet.objects.filter(pk=self.pk).update(
+                raw_insert_count=self.raw_insert_count,
+                raw_delete_count=self.raw_delete_count)
+
     @property
     def per_commit_files(self):
         """The files limited to per-commit diffs.
@@ -300,19 +362,47 @@ class DiffSet(models.Model):
         in the history, and will set it to on more than the most recent
         diffset otherwise.
 
+        Version Changed:
+            8.0:
+            This now sets :py:attr:`DiffSetHistory.latest_diffset
+            <reviewboard.diffviewer.models.diffset_history.DiffSetHistory.
+            latest_diffset>` when the diffset is added to a history.
+
         Args:
             **kwargs (dict):
                 Extra arguments for the save call.
         """
-        if self.history is not None:
+        history = self.history
+        update_fields = kwargs.get('update_fields')
+
+        # A diffset being added to a history always has the newest revision.
+        is_latest = (
+            history is not None and
+            (self._state.adding or
+             (update_fields is not None and 'history' in update_fields))
+        )
+
+        history_saved = False
+
+        if history is not None:
             if self.revision == 0:
-                self.update_revision_from_history(self.history)
+                self.update_revision_from_history(history)
+
+            history.last_diff_updated = self.timestamp
 
-            self.history.last_diff_updated = self.timestamp
-            self.history.save()
+            if history.pk is None:
+                # The history must exist before the diffset can reference it.
+                history.save()
+                history_saved = True
 
         super(DiffSet, self).save(**kwargs)
 
+        if history is not None and (is_latest or not history_saved):
+            if is_latest:
+                history.latest_diffset = self
+
+            history.save()
+
     def __str__(self):
         """Return a human-readable representation of the DiffSet.
 
@@ -21,6 +21,22 @@ class DiffSetHistory(models.Model):
         null=True,
         default=None)
 
+    #: The most recent diffset in the history.
+    #:
+    #: This may be ``None`` for histories created before Review Board 8.
+    #: It can be populated with the ``backfill-diff-line-counts`` management
+    #: command.
+    #:
+    #: Version Added:
+    #:     8.0
+    latest_diffset = models.ForeignKey(
+        'DiffSet',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('latest diff set'))
+
     extra_data = JSONField(null=True)
 
     def __str__(self):
@@ -0,0 +1,49 @@
+"""DiffSetPrerenderJob model definition.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class DiffSetPrerenderJob(models.Model):
+    """A queued request to pre-render the diff chunks for a DiffSet.
+
+    These are created when pre-rendering is set to run in a separate worker
+    process, and are consumed by the :command:`prerender-diffs` management
+    command. See :py:mod:`reviewboard.diffviewer.prerender` for details.
+
+    Version Added:
+        8.0
+    """
+
+    diffset = models.OneToOneField(
+        'DiffSet',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('diff set'))
+    queued = models.DateTimeField(
+        _('queued'),
+        default=timezone.now,
+        db_index=True)
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return f'Pre-render job for DiffSet {self.diffset_id}'
+
+    class Meta:
+        app_label = 'diffviewer'
+        db_table = 'diffviewer_diffsetprerenderjob'
+        ordering = ('queued',)
+        verbose_name = _('Diff Set Pre-Render Job')
+        verbose_name_plural = _('Diff Set Pre-Render Jobs')
@@ -14,6 +14,7 @@ from djblets.db.fields import Base64Field, JSONField
 
 from reviewboard.diffviewer.managers import FileDiffManager
 from reviewboard.diffviewer.models.diffcommit import DiffCommit
+from reviewboard.diffviewer.models.diffset import DiffSet
 from reviewboard.diffviewer.models.legacy_file_diff_data import \
     LegacyFileDiffData
 from reviewboard.diffviewer.models.raw_file_diff_data import RawFileDiffData
@@ -670,6 +671,15 @@ class FileDiff(models.Model):
             # New raw counts have been provided. These apply to the actual
             # diff file itself, and will be common across all diffs sharing
             # the diff_hash instance. Set it there.
+            old_raw_insert_count = self.extra_data.get('raw_insert_count')
+            old_raw_delete_count = self.extra_data.get('raw_delete_count')
+            raw_counts_changed = (
+                (raw_insert_count is not None and
+                 raw_insert_count != old_raw_insert_count) or
+                (raw_delete_count is not None and
+                 raw_delete_count != old_raw_delete_count)
+            )
+
             if raw_insert_count is not None:
                 self.diff_hash.insert_count = raw_insert_count
                 self.extra_data['raw_insert_count'] = raw_insert_count
@@ -682,6 +692,13 @@ class FileDiff(models.Model):
 
             self.diff_hash.save()
 
+            if raw_counts_changed and self.pk:
+                # The totals stored on the DiffSet are now out of date. They
+                # will be recalculated when next needed.
+                DiffSet.objects.filter(pk=self.diffset_id).update(
+                    raw_insert_count=None,
+                    raw_delete_count=None)
+
         for key, cur_value in (('insert_count', insert_count),
                                ('delete_count', delete_count),
                                ('replace_count', replace_count),
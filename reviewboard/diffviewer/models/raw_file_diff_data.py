@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import bz2
 import logging
 from typing import ClassVar
 
@@ -10,6 +9,14 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from djblets.db.fields import JSONField
 
+from reviewboard.diffviewer.blob_storage import (content_cache,
+                                                 get_blob_key,
+                                                 get_diff_blob_storage)
+from reviewboard.diffviewer.compression import (Bzip2DiffCompressor,
+                                                ZlibDiffCompressor,
+                                                ZstdDictDiffCompressor,
+                                                ZstdDiffCompressor,
+                                                get_compressor)
 from reviewboard.diffviewer.errors import DiffParserError
 from reviewboard.diffviewer.managers import RawFileDiffDataManager
 
@@ -22,14 +29,36 @@ class RawFileDiffData(models.Model):
 
     This is the class used in Review Board 2.5+ to store diff content.
     Unlike in previous versions, the content is not base64-encoded. Instead,
-    it is stored either as bzip2-compressed data (if the resulting
-    compressed data is smaller than the raw data), or as the raw data itself.
+    it is stored either as compressed data (if the resulting compressed data
+    is smaller than the raw data), or as the raw data itself.
+
+    Version Changed:
+        8.0:
+        * Added support for zlib and Zstandard compression. See
+          :py:mod:`reviewboard.diffviewer.compression` for details.
+        * Added support for storing content outside the database. See
+          :py:mod:`reviewboard.diffviewer.blob_storage` for details.
     """
 
-    COMPRESSION_BZIP2 = 'B'
+    COMPRESSION_BZIP2 = Bzip2DiffCompressor.compression_id
+
+    #: Version Added:
+    #:     8.0
+    COMPRESSION_ZLIB = ZlibDiffCompressor.compression_id
+
+    #: Version Added:
+    #:     8.0
+    COMPRESSION_ZSTD = ZstdDiffCompressor.compression_id
+
+    #: Version Added:
+    #:     8.0
+    COMPRESSION_ZSTD_DICT = ZstdDictDiffCompressor.compression_id
 
     COMPRESSION_CHOICES = (
         (COMPRESSION_BZIP2, _('BZip2-compressed')),
+        (COMPRESSION_ZLIB, _('zlib-compressed')),
+        (COMPRESSION_ZSTD, _('Zstandard-compressed')),
+        (COMPRESSION_ZSTD_DICT, _('Zstandard-compressed with dictionary')),
     )
 
     binary_hash = models.CharField(_('hash'), max_length=40, unique=True)
@@ -38,6 +67,14 @@ class RawFileDiffData(models.Model):
                                    null=True, blank=True)
     extra_data = JSONField(null=True)
 
+    #: The ID of the backend storing the content.
+    #:
+    #: If ``None``, the content is stored in :py:attr:`binary`.
+    #:
+    #: Version Added:
+    #:     8.0
+    storage = models.CharField(max_length=32, null=True, blank=True)
+
     objects: ClassVar[RawFileDiffDataManager] = RawFileDiffDataManager()
 
     @property
@@ -46,16 +83,67 @@ class RawFileDiffData(models.Model):
 
         The content will be uncompressed (if necessary) and returned as the
         raw set of bytes originally uploaded.
+
+        Version Changed:
+            8.0:
+            Content is now cached in memory after being loaded, and may be
+            loaded from a storage backend outside the database.
         """
-        if self.compression == self.COMPRESSION_BZIP2:
-            return bz2.decompress(self.binary)
-        elif self.compression is None:
-            return bytes(self.binary)
-        else:
+        if not self.binary_hash:
+            return self._load_content()
+
+        return content_cache.get_or_load(
+            get_blob_key(self.binary_hash, self.compression),
+            self._load_content)
+
+    def get_stored_data(self) -> bytes:
+        """Return the stored data, without decompressing it.
+
+        Version Added:
+            8.0
+
+        Returns:
+            bytes:
+            The stored data.
+
+        Raises:
+            reviewboard.diffviewer.blob_storage.DiffBlobStorageError:
+                The data could not be loaded from the storage backend.
+        """
+        if self.storage:
+            return get_diff_blob_storage(self.storage).load(
+                get_blob_key(self.binary_hash, self.compression))
+
+        return bytes(self.binary)
+
+    def _load_content(self) -> bytes:
+        """Load and decompress the content.
+
+        Returns:
+            bytes:
+            The uncompressed content.
+
+        Raises:
+            NotImplementedError:
+                The compression method is not supported.
+
+            reviewboard.diffviewer.blob_storage.DiffBlobStorageError:
+                The data could not be loaded from the storage backend.
+        """
+        data = self.get_stored_data()
+
+        if self.compression is None:
+            return data
+
+        compressor = get_compressor(self.compression)
+
+        if compressor is None:
             raise NotImplementedError(
                 'Unsupported compression method %s for RawFileDiffData %s'
                 % (self.compression, self.pk))
 
+        return compressor.decompress(data)
+
     @property
     def insert_count(self):
         return self.extra_data.get('insert_count')
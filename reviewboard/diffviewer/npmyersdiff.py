@@ -0,0 +1,704 @@
+"""Accelerated Myers differ implementation using NumPy.
+
+This is an optional backend for :py:class:`~reviewboard.diffviewer.myersdiff.
+MyersDiffer`. It produces exactly the same opcodes, but runs most of the
+shortest middle snake search on NumPy arrays, which is faster for large files
+with many changes. It's only available if NumPy is installed.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from reviewboard.diffviewer.differ import DiffCompatVersion
+from reviewboard.diffviewer.myersdiff import MyersDiffer
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+
+def is_numpy_differ_available() -> bool:
+    """Return whether the NumPy-based differ can be used.
+
+    Version Added:
+        8.0
+
+    Returns:
+        bool:
+        ``True`` if NumPy is installed.
+    """
+    return np is not None
+
+
+class NumPyMyersDiffer(MyersDiffer):
+    """Myers differ that uses NumPy to speed up large searches.
+
+    Once the shortest middle snake search covers enough diagonals, each step
+    extends all of them at once using array operations, rather than looping
+    over them in Python. Searches over few diagonals, where the overhead of
+    NumPy would outweigh the gains, run in pure Python.
+
+    The results are identical to those of :py:class:`~reviewboard.diffviewer.
+    myersdiff.MyersDiffer` for all Myers-based
+    :py:class:`~reviewboard.diffviewer.differ.DiffCompatVersion` values.
+
+    Version Added:
+        8.0
+    """
+
+    #: The minimum combined size of a search region to use NumPy for.
+    #:
+    #: Smaller regions are searched in pure Python.
+    MIN_NUMPY_REGION_SIZE = 500
+
+    #: The number of diagonals to search before switching to NumPy.
+    #:
+    #: Searches along fewer diagonals are faster in pure Python.
+    MIN_NUMPY_DIAGONALS = 200
+
+    #: The number of snakes below which they're followed in blocks.
+    MIN_VECTOR_SNAKES = 16
+
+    #: The number of lines to compare at a time when following long snakes.
+    SNAKE_BLOCK_SIZE = 32
+
+    ######################
+    # Instance variables #
+    ######################
+
+    #: The undiscarded codes for the original side of the diff.
+    _a_codes: Optional[NDArray[np.int64]]
+
+    #: The undiscarded codes for the modified side of the diff.
+    _b_codes: Optional[NDArray[np.int64]]
+
+    #: Storage for computing the backward diagonal.
+    _bdiag_array: Optional[NDArray[np.int64]]
+
+    #: Storage for computing the forward diagonal.
+    _fdiag_array: Optional[NDArray[np.int64]]
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the differ.
+
+        Args:
+            *args (tuple):
+                Positional arguments to pass through to the parent class.
+
+            **kwargs (dict):
+                Keyword arguments to pass through to the parent class.
+
+        Raises:
+            ImportError:
+                NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError('NumPy must be installed to use '
+                              'NumPyMyersDiffer.')
+
+        super().__init__(*args, **kwargs)
+
+        self._a_codes = None
+        self._b_codes = None
+        self._bdiag_array = None
+        self._fdiag_array = None
+
+    def _discard_confusing_lines(self) -> None:
+        """Discard lines that may make the diff confusing.
+
+        This will also store the remaining lines as arrays for the search.
+        """
+        super()._discard_confusing_lines()
+
+        a_data = self.a_data
+        b_data = self.b_data
+
+        # The codes are padded on both sides, so that blocks of codes can be
+        # read near the start or end without going out of bounds.
+        padding = [0] * self.SNAKE_BLOCK_SIZE
+
+        self._a_codes = np.array(
+            padding + a_data.undiscarded[:a_data.undiscarded_lines] + padding,
+            dtype=np.int64)
+        self._b_codes = np.array(
+            padding + b_data.undiscarded[:b_data.undiscarded_lines] + padding,
+            dtype=np.int64)
+
+    def _find_sms(
+        self,
+        a_lower: int,
+        a_upper: int,
+        b_lower: int,
+        b_upper: int,
+        find_minimal: bool,
+    ) -> tuple[int, int, bool, bool]:
+        """Find the Shortest Middle Snake within given bounds.
+
+        Args:
+            a_lower (int):
+                The lower bound on the original data.
+
+            a_upper (int):
+                The upper bound on the original data.
+
+            b_lower (int):
+                The lower bound on the modified data.
+
+            b_upper (int):
+                The upper bound on the modified data.
+
+            find_minimal (bool):
+                Whether to iterate until a minimal diff is found.
+
+        Returns:
+            tuple:
+            A 4-tuple of:
+
+            Tuple:
+                0 (int):
+                    The best dividing point for the original data to use for
+                    the next step.
+
+                1 (int):
+                    The best dividing point for the modified data to use for
+                    the next step.
+
+                2 (bool):
+                    Whether to search for a minimal diff in the lower half for
+                    the next step.
+
+                3 (bool):
+                    Whether to search for a minimal diff in the upper half for
+                    the next step.
+        """
+        if (a_upper - a_lower) + (b_upper - b_lower) < \
+           self.MIN_NUMPY_REGION_SIZE:
+            return super()._find_sms(a_lower, a_upper, b_lower, b_upper,
+                                     find_minimal)
+
+        if self._fdiag_array is None:
+            self._fdiag_array = np.zeros(len(self.fdiag), dtype=np.int64)
+            self._bdiag_array = np.zeros(len(self.bdiag), dtype=np.int64)
+
+        a_codes = self._a_codes
+        b_codes = self._b_codes
+        assert a_codes is not None
+        assert b_codes is not None
+
+        downoff = self.downoff
+        upoff = self.upoff
+        max_lines = self.max_lines
+        snake_limit = self.SNAKE_LIMIT
+        max_python_diagonals = self.MIN_NUMPY_DIAGONALS * 2
+
+        down_k = a_lower - b_lower  # The k-line to start the forward search
+        up_k = a_upper - b_upper    # The k-line to start the reverse search
+        odd_delta = (down_k - up_k) % 2 != 0
+
+        dmin = a_lower - b_upper
+        dmax = a_upper - b_lower
+
+        down_min = down_max = down_k
+        up_min = up_max = up_k
+
+        cost = 0
+        max_cost = max(256, self._very_approx_sqrt(max_lines * 4))
+
+        # Each round of the search only checks a few diagonals to begin
+        # with, which is faster to do in Python. This is the same as the
+        # start of MyersDiffer._find_sms(). None of the heuristics apply
+        # until the cost is over 200, so they're left to the NumPy search.
+        down_list = self.fdiag
+        up_list = self.bdiag
+        a_undiscarded = self.a_data.undiscarded
+        b_undiscarded = self.b_data.undiscarded
+
+        down_list[downoff + down_k] = a_lower
+        up_list[upoff + up_k] = a_upper
+
+        while (cost < 200 and
+               down_max - down_min < max_python_diagonals and
+               up_max - up_min < max_python_diagonals):
+            cost += 1
+
+            if down_min > dmin:
+                down_min -= 1
+                down_list[downoff + down_min - 1] = -1
+            else:
+                down_min += 1
+
+            if down_max < dmax:
+                down_max += 1
+                down_list[downoff + down_max + 1] = -1
+            else:
+                down_max -= 1
+
+            for k in range(down_max, down_min - 1, -2):
+                tlo = down_list[downoff + k - 1]
+                thi = down_list[downoff + k + 1]
+
+                if tlo >= thi:
+                    x = tlo + 1
+                else:
+                    x = thi
+
+                y = x - k
+
+                while (x < a_upper and y < b_upper and
+                       a_undiscarded[x] == b_undiscarded[y]):
+                    x += 1
+                    y += 1
+
+                if (odd_delta and up_min <= k <= up_max and
+                    up_list[upoff + k] <= x):
+                    return x, y, True, True
+
+                down_list[downoff + k] = x
+
+            if up_min > dmin:
+                up_min -= 1
+                up_list[upoff + up_min - 1] = max_lines
+            else:
+                up_min += 1
+
+            if up_max < dmax:
+                up_max += 1
+                up_list[upoff + up_max + 1] = max_lines
+            else:
+                up_max -= 1
+
+            for k in range(up_max, up_min - 1, -2):
+                tlo = up_list[upoff + k - 1]
+                thi = up_list[upoff + k + 1]
+
+                if tlo < thi:
+                    x = tlo
+                else:
+                    x = thi - 1
+
+                y = x - k
+
+                while (x > a_lower and y > b_lower and
+                       a_undiscarded[x - 1] == b_undiscarded[y - 1]):
+                    x -= 1
+                    y -= 1
+
+                if (not odd_delta and down_min <= k <= down_max and
+                    x <= down_list[downoff + k]):
+                    return x, y, True, True
+
+                up_list[upoff + k] = x
+
+        # Continue the search using NumPy.
+        down_vector = self._fdiag_array
+        up_vector = self._bdiag_array
+        assert up_vector is not None
+
+        start = downoff + down_min - 1
+        end = downoff + down_max + 2
+        down_vector[start:end] = down_list[start:end]
+
+        start = upoff + up_min - 1
+        end = upoff + up_max + 2
+        up_vector[start:end] = up_list[start:end]
+
+        while True:
+            cost += 1
+
+            if down_min > dmin:
+                down_min -= 1
+                down_vector[downoff + down_min - 1] = -1
+            else:
+                down_min += 1
+
+            if down_max < dmax:
+                down_max += 1
+                down_vector[downoff + down_max + 1] = -1
+            else:
+                down_max -= 1
+
+            # Extend the forward path along every diagonal at once. The
+            # diagonals read here all have the opposite parity of the ones
+            # written, so the order doesn't matter.
+            ks = np.arange(down_max, down_min - 1, -2, dtype=np.int64)
+            tlo = _get_diagonals(down_vector, downoff + down_min - 1,
+                                 downoff + down_max - 1)
+            thi = _get_diagonals(down_vector, downoff + down_min + 1,
+                                 downoff + down_max + 1)
+            x = np.where(tlo >= thi, tlo + 1, thi)
+            snake_lengths = self._follow_snakes(
+                x=x,
+                ks=ks,
+                limits=np.minimum(a_upper - x, b_upper - x + ks),
+                forward=True)
+            x += snake_lengths
+
+            if odd_delta:
+                overlaps = (
+                    (ks >= up_min) &
+                    (ks <= up_max) &
+                    (_get_diagonals(up_vector, upoff + down_min,
+                                    upoff + down_max) <= x)
+                )
+
+                if overlaps.any():
+                    i = int(overlaps.argmax())
+
+                    return int(x[i]), int(x[i] - ks[i]), True, True
+
+            big_snake = bool((snake_lengths > snake_limit).any())
+            _get_diagonals(down_vector, downoff + down_min,
+                           downoff + down_max)[:] = x
+
+            # Extend the reverse path.
+            if up_min > dmin:
+                up_min -= 1
+                up_vector[upoff + up_min - 1] = max_lines
+            else:
+                up_min += 1
+
+            if up_max < dmax:
+                up_max += 1
+                up_vector[upoff + up_max + 1] = max_lines
+            else:
+                up_max -= 1
+
+            ks = np.arange(up_max, up_min - 1, -2, dtype=np.int64)
+            tlo = _get_diagonals(up_vector, upoff + up_min - 1,
+                                 upoff + up_max - 1)
+            thi = _get_diagonals(up_vector, upoff + up_min + 1,
+                                 upoff + up_max + 1)
+            x = np.where(tlo < thi, tlo, thi - 1)
+            snake_lengths = self._follow_snakes(
+                x=x,
+                ks=ks,
+                limits=np.minimum(x - a_lower, x - ks - b_lower),
+                forward=False)
+            x -= snake_lengths
+
+            if not odd_delta:
+                overlaps = (
+                    (ks >= down_min) &
+                    (ks <= down_max) &
+                    (x <= _get_diagonals(down_vector, downoff + up_min,
+                                         downoff + up_max))
+                )
+
+                if overlaps.any():
+                    i = int(overlaps.argmax())
+
+                    return int(x[i]), int(x[i] - ks[i]), True, True
+
+            if (snake_lengths > snake_limit).any():
+                big_snake = True
+
+            _get_diagonals(up_vector, upoff + up_min,
+                           upoff + up_max)[:] = x
+
+            if find_minimal:
+                continue
+
+            # Heuristics to improve diff results. See MyersDiffer._find_sms().
+            if cost > 200 and big_snake:
+                result = self._find_diagonal_array(
+                    ds=np.arange(down_max, down_min - 1, -2, dtype=np.int64),
+                    k=down_k,
+                    x=_get_diagonals(down_vector, downoff + down_min,
+                                     downoff + down_max),
+                    cost=cost,
+                    forward=True,
+                    a_lower=a_lower,
+                    a_upper=a_upper,
+                    b_lower=b_lower,
+                    b_upper=b_upper)
+
+                if result is not None:
+                    return result[0], result[1], True, False
+
+                result = self._find_diagonal_array(
+                    ds=np.arange(up_max, up_min - 1, -2, dtype=np.int64),
+                    k=up_k,
+                    x=_get_diagonals(up_vector, upoff + up_min,
+                                     upoff + up_max),
+                    cost=cost,
+                    forward=False,
+                    a_lower=a_lower,
+                    a_upper=a_upper,
+                    b_lower=b_lower,
+                    b_upper=b_upper)
+
+                if result is not None:
+                    return result[0], result[1], False, True
+
+            if (cost >= max_cost and
+                self.compat_version >= DiffCompatVersion.MYERS_SMS_COST_BAIL):
+                # We've reached or gone past the max cost. Just give up now
+                # and report the halfway point between our best results.
+                #
+                # Find the forward diagonal that maximized x + y.
+                ds = np.arange(down_max, down_min - 1, -2, dtype=np.int64)
+                x = np.minimum(_get_diagonals(down_vector, downoff + down_min,
+                                              downoff + down_max),
+                               a_upper)
+                y = x - ds
+                clamped = b_upper < y
+                x = np.where(clamped, b_upper + ds, x)
+                y = np.where(clamped, b_upper, y)
+                i = int((x + y).argmax())
+                fx_best = int(x[i])
+                fxy_best = int(x[i] + y[i])
+
+                # Find the backward diagonal that minimizes x + y.
+                ds = np.arange(up_max, up_min - 1, -2, dtype=np.int64)
+                x = np.maximum(_get_diagonals(up_vector, upoff + up_min,
+                                              upoff + up_max),
+                               a_lower)
+                y = x - ds
+                clamped = y < b_lower
+                x = np.where(clamped, b_lower + ds, x)
+                y = np.where(clamped, b_lower, y)
+                i = int((x + y).argmin())
+
+                if x[i] + y[i] < max_lines:
+                    bx_best = int(x[i])
+                    bxy_best = int(x[i] + y[i])
+                else:
+                    bx_best = 0
+                    bxy_best = max_lines
+
+                # Use the better of the two diagonals
+                if a_upper + b_upper - bxy_best < \
+                   fxy_best - (a_lower + b_lower):
+                    return fx_best, fxy_best - fx_best, True, False
+                else:
+                    return bx_best, bxy_best - bx_best, False, True
+
+    def _follow_snakes(
+        self,
+        *,
+        x: NDArray[np.int64],
+        ks: NDArray[np.int64],
+        limits: NDArray[np.int64],
+        forward: bool,
+    ) -> NDArray[np.int64]:
+        """Follow the snakes along a set of diagonals.
+
+        Most snakes are short, so all snakes are first followed one line at
+        a time. Once only a few remain, they're followed in blocks of
+        :py:attr:`SNAKE_BLOCK_SIZE` lines.
+
+        Args:
+            x (numpy.ndarray):
+                The starting X position on each diagonal.
+
+            ks (numpy.ndarray):
+                The diagonals to follow.
+
+            limits (numpy.ndarray):
+                The maximum length of the snake on each diagonal.
+
+            forward (bool):
+                Whether to follow the snakes forward. If ``False``, they'll
+                be followed backward.
+
+        Returns:
+            numpy.ndarray:
+            The length of the snake on each diagonal.
+        """
+        a_codes = self._a_codes
+        b_codes = self._b_codes
+        assert a_codes is not None
+        assert b_codes is not None
+
+        block_size = self.SNAKE_BLOCK_SIZE
+        min_vector_snakes = self.MIN_VECTOR_SNAKES
+
+        if forward:
+            step = 1
+            a_positions = x + block_size
+        else:
+            step = -1
+            a_positions = x + (block_size - 1)
+
+        b_positions = a_positions - ks
+        lengths = np.zeros(len(x), dtype=np.int64)
+        active = np.flatnonzero(limits > 0)
+
+        while len(active) >= min_vector_snakes:
+            active = active[a_codes[a_positions[active]] ==
+                            b_codes[b_positions[active]]]
+            a_positions[active] += step
+            b_positions[active] += step
+            lengths[active] += 1
+            active = active[lengths[active] < limits[active]]
+
+        if len(active) > 0:
+            # Any codes compared past the end of a snake are ignored when
+            # clamping the results below.
+            offsets = np.arange(0, block_size * step, step, dtype=np.int64)
+
+            while len(active) > 0:
+                matches = (
+                    a_codes[a_positions[active][:, None] + offsets] ==
+                    b_codes[b_positions[active][:, None] + offsets]
+                )
+                run_lengths = np.where(matches.all(axis=1),
+                                       block_size,
+                                       matches.argmin(axis=1))
+                a_positions[active] += run_lengths * step
+                b_positions[active] += run_lengths * step
+                lengths[active] += run_lengths
+                active = active[(run_lengths == block_size) &
+                                (lengths[active] < limits[active])]
+
+        return np.minimum(lengths, limits)
+
+    def _find_diagonal_array(
+        self,
+        *,
+        ds: NDArray[np.int64],
+        k: int,
+        x: NDArray[np.int64],
+        cost: int,
+        forward: bool,
+        a_lower: int,
+        a_upper: int,
+        b_lower: int,
+        b_upper: int,
+    ) -> Optional[tuple[int, int]]:
+        """Find the best diagonal in a region of the graph.
+
+        This is equivalent to :py:meth:`MyersDiffer._find_diagonal
+        <reviewboard.diffviewer.myersdiff.MyersDiffer._find_diagonal>`, but
+        checks all diagonals at once.
+
+        Args:
+            ds (numpy.ndarray):
+                The diagonals to check, in search order.
+
+            k (int):
+                The k-line the search started on.
+
+            x (numpy.ndarray):
+                The furthest X position reached on each diagonal.
+
+            cost (int):
+                The current edit cost.
+
+            forward (bool):
+                Whether this is checking the forward search.
+
+            a_lower (int):
+                The lower bound on the original data.
+
+            a_upper (int):
+                The upper bound on the original data.
+
+            b_lower (int):
+                The lower bound on the modified data.
+
+            b_upper (int):
+                The upper bound on the modified data.
+
+        Returns:
+            tuple:
+            A 2-tuple of the X and Y positions of the diagonal, or ``None``
+            if no suitable diagonal was found.
+        """
+        a_codes = self._a_codes
+        b_codes = self._b_codes
+        assert a_codes is not None
+        assert b_codes is not None
+
+        snake_limit = self.SNAKE_LIMIT
+        y = x - ds
+
+        if forward:
+            progress = x - a_lower
+            in_range = (
+                (x >= a_lower + snake_limit) & (x < a_upper) &
+                (y >= b_lower + snake_limit) & (y < b_upper)
+            )
+            k_offset = 1
+        else:
+            progress = a_upper - x
+            in_range = (
+                (x > a_lower) & (x <= a_upper - snake_limit) &
+                (y > b_lower) & (y <= b_upper - snake_limit)
+            )
+            k_offset = 0
+
+        def _get_candidates(
+            start: int,
+            k: int,
+        ) -> NDArray[np.intp]:
+            dd = ds[start:] - k
+            v = progress[start:] * 2 + dd
+
+            return np.flatnonzero(
+                in_range[start:] &
+                (v > 0) &
+                (v > 12 * (cost + np.abs(dd)))) + start
+
+        def _is_match(
+            i: NDArray[np.intp],
+        ) -> NDArray[np.bool_]:
+            return (a_codes[x[i] + code_offset] ==
+                    b_codes[y[i] + code_offset])
+
+        code_offset = self.SNAKE_BLOCK_SIZE - k_offset
+        candidates = _get_candidates(0, k)
+
+        if len(candidates) == 0:
+            return None
+
+        i = candidates[0]
+
+        if not _is_match(i):
+            # MyersDiffer._find_diagonal() replaces k with k_offset once it
+            # finds a candidate, so later diagonals are measured from there.
+            # This must be matched to produce the same results.
+            candidates = _get_candidates(i + 1, k_offset)
+            candidates = candidates[_is_match(candidates)]
+
+            if len(candidates) == 0:
+                return None
+
+            i = candidates[0]
+
+        return int(x[i]), int(y[i])
+
+
+def _get_diagonals(
+    vector: NDArray[np.int64],
+    start: int,
+    end: int,
+) -> NDArray[np.int64]:
+    """Return a view of every second diagonal in a vector, in reverse order.
+
+    This matches the order that diagonals are searched in, from ``end`` down
+    to ``start``.
+
+    Args:
+        vector (numpy.ndarray):
+            The vector storing the diagonals.
+
+        start (int):
+            The index of the first diagonal.
+
+        end (int):
+            The index of the last diagonal, inclusive.
+
+    Returns:
+        numpy.ndarray:
+        A view of the diagonals, which can be written to.
+    """
+    return vector[start:end + 1:2][::-1]
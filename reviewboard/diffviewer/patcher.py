@@ -0,0 +1,614 @@
+"""In-process application of unified diffs.
+
+This implements the subset of :program:`patch` needed to apply a single
+file's unified diff to the contents of a file held in memory, without
+writing anything to disk or spawning a process.
+
+Hunks are located the same way GNU :program:`patch` locates them: first at
+the expected line (adjusted by the offset of any prior hunks), then at
+increasing offsets forward and backward from there, and then with up to
+:py:data:`MAX_FUZZ` lines of leading and trailing context ignored.
+
+Anything that can't be applied cleanly this way (rejected hunks, reversed
+patches, binary patches, or diff content this module doesn't understand)
+is reported back to the caller, which is expected to fall back to the
+:program:`patch` command for the final result and error reporting.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+#: The maximum fuzz factor used when locating hunks.
+#:
+#: This matches the default used by GNU patch.
+#:
+#: Version Added:
+#:     8.0
+MAX_FUZZ = 2
+
+
+#: A regex matching a hunk header and the body of the hunk.
+#:
+#: The body is every following line starting with a hunk operation
+#: character, a "\ No newline at end of file" marker, or a blank line.
+_HUNK_RE = re.compile(
+    br'^@@ -(?P<orig_start>\d+)(?:,(?P<orig_len>\d+))? '
+    br'\+(?P<new_start>\d+)(?:,(?P<new_len>\d+))? @@[^\n]*(?:\n|\Z)'
+    br'(?P<body>(?:[ +\-\\][^\n]*\n|\n)*(?:[ +\-\\][^\n]*\Z)?)',
+    re.M)
+
+#: A regex matching a run of changed lines in a hunk's operations.
+_CHANGE_RUN_RE = re.compile(br'[-+]+')
+
+#: A regex matching header lines for content that must be handled by
+#: patch(1).
+_UNSUPPORTED_HEADER_RE = re.compile(
+    br'^(?:Binary files |GIT binary patch|\+\+\+ /dev/null)',
+    re.M)
+
+
+class UnifiedHunk:
+    """A parsed hunk from a unified diff.
+
+    Version Added:
+        8.0
+    """
+
+    __slots__ = (
+        'changes',
+        'lines',
+        'new_start',
+        'num_new_lines',
+        'orig_first',
+        'orig_start',
+        'pattern',
+        'prefix_context',
+        'suffix_context',
+    )
+
+    ######################
+    # Instance variables #
+    ######################
+
+    #: The changes made by the hunk.
+    #:
+    #: Each is a tuple of the index into :py:attr:`pattern` where the change
+    #: applies, the number of lines being removed at that index, and the
+    #: list of lines being inserted in their place.
+    changes: Sequence[tuple[int, int, Sequence[bytes]]]
+
+    #: The lines of the hunk, including the leading operation character.
+    lines: Sequence[bytes]
+
+    #: The modified file start line listed in the hunk header.
+    new_start: int
+
+    #: The number of lines the hunk produces in the modified file.
+    num_new_lines: int
+
+    #: The 1-based line in the original file where the hunk should apply.
+    orig_first: int
+
+    #: The original file start line listed in the hunk header.
+    orig_start: int
+
+    #: The lines from the original file that the hunk expects to find.
+    pattern: Sequence[bytes]
+
+    #: The number of lines of context before the first change.
+    prefix_context: int
+
+    #: The number of lines of context after the last change.
+    suffix_context: int
+
+    def __init__(
+        self,
+        *,
+        orig_start: int,
+        new_start: int,
+        lines: Sequence[bytes],
+    ) -> None:
+        """Initialize the hunk.
+
+        Args:
+            orig_start (int):
+                The original file start line listed in the hunk header.
+
+            new_start (int):
+                The modified file start line listed in the hunk header.
+
+            lines (list of bytes):
+                The lines of the hunk, each starting with ``b' '``, ``b'-'``,
+                or ``b'+'``.
+        """
+        # Work off a string of the operation characters, so that locating
+        # the changes doesn't require processing each line in Python.
+        ops = b''.join([line[:1] for line in lines])
+        changes: list[tuple[int, int, Sequence[bytes]]] = []
+        num_inserted = 0
+
+        for m in _CHANGE_RUN_RE.finditer(ops):
+            run_start, run_end = m.span()
+            run = m.group()
+            num_removed = run.count(b'-')
+
+            if num_removed == len(run):
+                inserted = []
+            else:
+                inserted = [
+                    line[1:]
+                    for line in lines[run_start:run_end]
+                    if line[:1] == b'+'
+                ]
+
+            changes.append((run_start - num_inserted, num_removed, inserted))
+            num_inserted += len(inserted)
+
+        self.orig_start = orig_start
+        self.new_start = new_start
+        self.lines = lines
+        self.changes = changes
+        self.pattern = [
+            line[1:]
+            for line in lines
+            if line[:1] != b'+'
+        ]
+        self.num_new_lines = len(lines) - (len(self.pattern) -
+                                           ops.count(b' '))
+
+        if changes:
+            self.prefix_context = len(ops) - len(ops.lstrip(b' '))
+            self.suffix_context = len(ops) - len(ops.rstrip(b' '))
+        else:
+            self.prefix_context = len(ops)
+            self.suffix_context = len(ops)
+
+        # A hunk that removes nothing is inserted after the listed line,
+        # rather than at it.
+        if self.pattern:
+            self.orig_first = orig_start
+        else:
+            self.orig_first = orig_start + 1
+
+    def get_reversed(self) -> UnifiedHunk:
+        """Return a version of this hunk with the changes reversed.
+
+        Returns:
+            UnifiedHunk:
+            The reversed hunk.
+        """
+        swapped_ops = {
+            b'+': b'-',
+            b'-': b'+',
+        }
+
+        return UnifiedHunk(
+            orig_start=self.new_start,
+            new_start=self.orig_start,
+            lines=[
+                swapped_ops.get(line[:1], b' ') + line[1:]
+                for line in self.lines
+            ])
+
+
+def split_patch_lines(
+    data: bytes,
+) -> list[bytes]:
+    r"""Split data into lines, keeping the trailing newlines.
+
+    Unlike :py:meth:`bytes.splitlines`, this only splits on ``\n``, which
+    is what :program:`patch` considers to be a line ending.
+
+    Args:
+        data (bytes):
+            The data to split.
+
+    Returns:
+        list of bytes:
+        The lines of data. Every line but the last is guaranteed to end
+        with a newline.
+    """
+    if b'\r' not in data:
+        # This is the common case, since callers normalize line endings.
+        return data.splitlines(True)
+
+    lines = data.split(b'\n')
+    last_line = lines.pop()
+
+    result = [
+        line + b'\n'
+        for line in lines
+    ]
+
+    if last_line:
+        result.append(last_line)
+
+    return result
+
+
+def parse_hunks(
+    diff: bytes,
+) -> Optional[list[UnifiedHunk]]:
+    r"""Parse the hunks from a single file's unified diff.
+
+    Any headers before the first hunk are skipped.
+
+    Args:
+        diff (bytes):
+            The diff to parse. This must only contain ``\n`` newlines.
+
+    Returns:
+        list of UnifiedHunk:
+        The list of parsed hunks, or ``None`` if the diff contains content
+        that can't be applied in-process.
+    """
+    if diff.startswith(b'@@ '):
+        hunks_start = 0
+    else:
+        hunks_start = diff.find(b'\n@@ ') + 1
+
+    if hunks_start == 0 and not diff.startswith(b'@@ '):
+        # There were no hunks at all. Leave it to patch(1) to report on
+        # the garbage input.
+        return None
+
+    if _UNSUPPORTED_HEADER_RE.search(diff, 0, hunks_start):
+        return None
+
+    hunks: list[UnifiedHunk] = []
+    pos = hunks_start
+    diff_len = len(diff)
+
+    while pos < diff_len:
+        m = _HUNK_RE.match(diff, pos)
+
+        if not m:
+            # This is trailing content after the last hunk. It may be the
+            # start of another file's diff, so let patch(1) decide.
+            return None
+
+        hunk_data = m.group(0)
+        lines = split_patch_lines(m.group('body'))
+        pos = m.end()
+
+        if b'\n\\' in hunk_data:
+            lines = _apply_no_newline_markers(lines)
+
+            if lines is None:
+                return None
+
+        if b'\n\n' in hunk_data:
+            # Some tools strip the trailing whitespace from blank context
+            # lines. patch(1) accepts these as context.
+            lines = [
+                b' \n' if line == b'\n' else line
+                for line in lines
+            ]
+
+        hunk = UnifiedHunk(orig_start=int(m.group('orig_start')),
+                           new_start=int(m.group('new_start')),
+                           lines=lines)
+
+        # If the hunk's line counts don't match the header, there's either
+        # a malformed hunk or trailing content that looks like part of the
+        # hunk (such as the start of another file's diff).
+        orig_len = m.group('orig_len')
+        new_len = m.group('new_len')
+
+        if (len(hunk.pattern) != (1 if orig_len is None else int(orig_len)) or
+            hunk.num_new_lines != (1 if new_len is None else int(new_len))):
+            return None
+
+        hunks.append(hunk)
+
+    return hunks
+
+
+def _apply_no_newline_markers(
+    lines: Sequence[bytes],
+) -> Optional[list[bytes]]:
+    """Apply "No newline at end of file" markers to the lines of a hunk.
+
+    Each marker applies to the line before it, and is removed.
+
+    Args:
+        lines (list of bytes):
+            The lines of the hunk.
+
+    Returns:
+        list of bytes:
+        The new lines of the hunk, or ``None`` if a marker was found that
+        didn't follow a line.
+    """
+    result: list[bytes] = []
+
+    for line in lines:
+        if line.startswith(b'\\'):
+            if not result:
+                return None
+
+            result[-1] = result[-1].removesuffix(b'\n')
+        else:
+            result.append(line)
+
+    return result
+
+
+def apply_patch(
+    diff: bytes,
+    orig_file: bytes,
+    *,
+    max_fuzz: int = MAX_FUZZ,
+) -> Optional[bytes]:
+    """Apply a single file's unified diff to a file in memory.
+
+    Both the diff and file are expected to have already had their line
+    endings normalized (see
+    :py:func:`reviewboard.diffviewer.diffutils.convert_line_endings`).
+
+    Args:
+        diff (bytes):
+            The diff to apply.
+
+        orig_file (bytes):
+            The contents of the file to patch.
+
+        max_fuzz (int, optional):
+            The maximum number of lines of leading or trailing context that
+            may be ignored when locating a hunk.
+
+    Returns:
+        bytes:
+        The patched file contents, or ``None`` if the diff couldn't be
+        cleanly applied in-process. In that case, the caller should fall
+        back to :program:`patch`.
+    """
+    hunks = parse_hunks(diff)
+
+    if not hunks:
+        return None
+
+    input_lines = split_patch_lines(orig_file)
+    num_input_lines = len(input_lines)
+    result: list[bytes] = []
+
+    # Both of these are in terms of 1-based line numbers, matching patch(1).
+    last_frozen_line = 0
+    in_offset = 0
+
+    for hunk_num, hunk in enumerate(hunks):
+        context = max(hunk.prefix_context, hunk.suffix_context)
+        where: Optional[int] = None
+
+        for fuzz in range(min(max_fuzz, context) + 1):
+            where = _locate_hunk(
+                hunk=hunk,
+                input_lines=input_lines,
+                first_guess=hunk.orig_first + in_offset,
+                last_frozen_line=last_frozen_line,
+                prefix_fuzz=fuzz + hunk.prefix_context - context,
+                suffix_fuzz=fuzz + hunk.suffix_context - context)
+
+            if where is not None:
+                break
+
+            if hunk_num == 0:
+                # patch(1) checks whether a failed first hunk looks like it
+                # was already applied, and if so, skips the whole file
+                # rather than fuzzing. Leave that decision to patch(1).
+                reversed_hunk = hunk.get_reversed()
+
+                if _locate_hunk(
+                    hunk=reversed_hunk,
+                    input_lines=input_lines,
+                    first_guess=reversed_hunk.orig_first,
+                    last_frozen_line=0,
+                    prefix_fuzz=fuzz + hunk.prefix_context - context,
+                    suffix_fuzz=fuzz + hunk.suffix_context - context,
+                ) is not None:
+                    return None
+
+        if where is None:
+            return None
+
+        in_offset = where - hunk.orig_first
+
+        # Apply the hunk. Lines from the file are only written out once a
+        # change is reached, so context lines are taken from the file rather
+        # than the diff (they may have been skipped over by fuzzing), and
+        # trailing context remains available for the next hunk to match.
+        base = where - 1
+
+        for pattern_i, num_removed, inserted in hunk.changes:
+            input_i = base + pattern_i
+
+            if input_i < last_frozen_line:
+                # The hunks are out of order, which patch(1) treats as a
+                # fatal error.
+                return None
+
+            result += input_lines[last_frozen_line:input_i]
+            result += inserted
+            last_frozen_line = input_i + num_removed
+
+    if last_frozen_line < num_input_lines:
+        result += input_lines[last_frozen_line:]
+
+    new_file = b''.join(result)
+
+    # Every line should end with a newline, apart from the last. If a line
+    # missing its newline ended up anywhere else, the diff and file disagree
+    # about where the file ends. patch(1) has its own handling for this,
+    # which callers may depend on.
+    if result:
+        num_newlines = len(result)
+
+        if not result[-1].endswith(b'\n'):
+            num_newlines -= 1
+
+        if new_file.count(b'\n') != num_newlines:
+            return None
+
+    return new_file
+
+
+def _locate_hunk(
+    *,
+    hunk: UnifiedHunk,
+    input_lines: Sequence[bytes],
+    first_guess: int,
+    last_frozen_line: int,
+    prefix_fuzz: int,
+    suffix_fuzz: int,
+) -> Optional[int]:
+    """Locate the line where a hunk should be applied.
+
+    A negative fuzz value means the hunk has less context on that side than
+    the other, which diff only generates at the start or end of a file. In
+    that case, the hunk is anchored to that end of the file.
+
+    Args:
+        hunk (UnifiedHunk):
+            The hunk to locate.
+
+        input_lines (list of bytes):
+            The lines of the file being patched.
+
+        first_guess (int):
+            The 1-based line number to try first.
+
+        last_frozen_line (int):
+            The last line consumed by a prior hunk.
+
+        prefix_fuzz (int):
+            The number of leading context lines to ignore.
+
+        suffix_fuzz (int):
+            The number of trailing context lines to ignore.
+
+    Returns:
+        int:
+        The 1-based line number where the hunk applies, or ``None`` if it
+        couldn't be located.
+    """
+    num_input_lines = len(input_lines)
+    num_pattern_lines = len(hunk.pattern)
+
+    if num_pattern_lines == 0:
+        # There's nothing to match. The hunk applies where it says it does,
+        # as long as that's within the file.
+        if last_frozen_line < first_guess <= num_input_lines + 1:
+            return first_guess
+
+        return None
+
+    # Fuzzed trailing context is allowed to run past the end of the file.
+    min_where = last_frozen_line + 1
+    max_where = num_input_lines - (num_pattern_lines - suffix_fuzz) + 1
+    max_pos_offset = max_where - first_guess
+    max_neg_offset = min(first_guess - min_where, first_guess - 1)
+
+    if prefix_fuzz < 0 and hunk.orig_first <= 1:
+        # This can only match the start of the file.
+        if suffix_fuzz < 0 and (num_pattern_lines != num_input_lines or
+                                hunk.prefix_context < last_frozen_line):
+            # This can only match the entire file.
+            return None
+
+        offset = 1 - first_guess
+
+        if (last_frozen_line <= hunk.prefix_context and
+            offset <= max_pos_offset and
+            _match_hunk(hunk=hunk,
+                        input_lines=input_lines,
+                        where=1,
+                        prefix_fuzz=0,
+                        suffix_fuzz=max(suffix_fuzz, 0))):
+            return 1
+
+        return None
+
+    prefix_fuzz = max(prefix_fuzz, 0)
+
+    if suffix_fuzz < 0:
+        # This can only match the end of the file.
+        where = num_input_lines - num_pattern_lines + 1
+
+        if (first_guess - where <= max_neg_offset and
+            _match_hunk(hunk=hunk,
+                        input_lines=input_lines,
+                        where=where,
+                        prefix_fuzz=prefix_fuzz,
+                        suffix_fuzz=0)):
+            return where
+
+        return None
+
+    for offset in range(max(max_pos_offset, max_neg_offset) + 1):
+        if (offset <= max_pos_offset and
+            _match_hunk(hunk=hunk,
+                        input_lines=input_lines,
+                        where=first_guess + offset,
+                        prefix_fuzz=prefix_fuzz,
+                        suffix_fuzz=suffix_fuzz)):
+            return first_guess + offset
+
+        if (0 < offset <= max_neg_offset and
+            _match_hunk(hunk=hunk,
+                        input_lines=input_lines,
+                        where=first_guess - offset,
+                        prefix_fuzz=prefix_fuzz,
+                        suffix_fuzz=suffix_fuzz)):
+            return first_guess - offset
+
+    return None
+
+
+def _match_hunk(
+    *,
+    hunk: UnifiedHunk,
+    input_lines: Sequence[bytes],
+    where: int,
+    prefix_fuzz: int,
+    suffix_fuzz: int,
+) -> bool:
+    """Return whether a hunk's expected lines match the file at a location.
+
+    Args:
+        hunk (UnifiedHunk):
+            The hunk to match.
+
+        input_lines (list of bytes):
+            The lines of the file being patched.
+
+        where (int):
+            The 1-based line number to match at.
+
+        prefix_fuzz (int):
+            The number of leading context lines to ignore.
+
+        suffix_fuzz (int):
+            The number of trailing context lines to ignore.
+
+    Returns:
+        bool:
+        ``True`` if the lines match. ``False`` if they do not.
+    """
+    pattern = hunk.pattern
+    start = prefix_fuzz
+    end = len(pattern) - suffix_fuzz
+    base = where - 1
+
+    if base < 0 or base + end > len(input_lines):
+        return False
+
+    return input_lines[base + start:base + end] == pattern[start:end]
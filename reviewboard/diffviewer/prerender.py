@@ -0,0 +1,421 @@
+"""Background pre-rendering of diff chunks.
+
+When a new diff is uploaded, the first person to view it normally pays the
+full cost of generating its chunks: fetching files from the repository,
+patching, syntax highlighting, and diffing. Pre-rendering does this work in
+the background ahead of time, populating the same cache the diff viewer
+reads from.
+
+Pre-rendering is controlled by the ``diffviewer_prerender_mode`` site
+configuration setting, which can be one of the following
+:py:class:`PrerenderMode` values:
+
+``disabled``:
+    No pre-rendering takes place.
+
+``local``:
+    Diffs are rendered by a thread pool in the web server process. This
+    requires no setup, but is lost if the process exits.
+
+``worker``:
+    Diffs are queued in the database as
+    :py:class:`~reviewboard.diffviewer.models.diffset_prerender_job.
+    DiffSetPrerenderJob` entries and rendered by the :command:`prerender-diffs`
+    management command, which can be run on a schedule or left running with
+    ``--watch``.
+
+The number of files rendered at once by each process is limited by the
+``diffviewer_prerender_concurrency`` setting.
+
+Diffs are rendered using the site's default diff settings, so users who
+have changed their own settings may still need to generate their own
+chunks.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Optional, TYPE_CHECKING
+
+from django.db import connections, transaction
+from django.db.models import Min
+from djblets.log import log_timed
+from djblets.siteconfig.models import SiteConfiguration
+from typing_extensions import TypedDict
+
+from reviewboard.diffviewer.diffutils import (get_diff_files,
+                                              populate_diff_chunks)
+from reviewboard.diffviewer.models import DiffSet, DiffSetPrerenderJob
+from reviewboard.diffviewer.settings import DiffSettings
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from reviewboard.diffviewer.diffutils import SerializedDiffFile
+
+
+logger = logging.getLogger(__name__)
+
+
+class PrerenderMode(str, Enum):
+    """Where diffs are pre-rendered.
+
+    Version Added:
+        8.0
+    """
+
+    #: Diffs are not pre-rendered.
+    DISABLED = 'disabled'
+
+    #: Diffs are pre-rendered in a thread pool in the web server process.
+    LOCAL = 'local'
+
+    #: Diffs are queued and pre-rendered by a separate worker process.
+    WORKER = 'worker'
+
+
+class PrerenderQueueStats(TypedDict):
+    """Statistics on the diff pre-rendering queue.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of DiffSets waiting in this process's local thread pool.
+    #:
+    #: Type:
+    #:     int
+    local_pending: int
+
+    #: The timestamp of the oldest job queued for worker processes.
+    #:
+    #: Type:
+    #:     datetime.datetime
+    oldest_queued: Optional[datetime]
+
+    #: The number of jobs queued for worker processes.
+    #:
+    #: Type:
+    #:     int
+    queued_jobs: int
+
+
+_local_executor: Optional[ThreadPoolExecutor] = None
+_local_lock = threading.Lock()
+_local_pending = 0
+
+
+def get_prerender_mode() -> PrerenderMode:
+    """Return the configured pre-rendering mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        PrerenderMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`PrerenderMode.DISABLED`.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    value = siteconfig.get('diffviewer_prerender_mode')
+
+    try:
+        return PrerenderMode(value)
+    except ValueError:
+        logger.warning('Invalid diffviewer_prerender_mode setting %r. '
+                       'Diff pre-rendering will be disabled.',
+                       value)
+
+        return PrerenderMode.DISABLED
+
+
+def get_prerender_concurrency() -> int:
+    """Return the number of files each process may pre-render at once.
+
+    Version Added:
+        8.0
+
+    Returns:
+        int:
+        The configured concurrency limit.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    return max(1, int(siteconfig.get('diffviewer_prerender_concurrency')))
+
+
+def queue_diffset_prerender(
+    diffset: DiffSet,
+) -> None:
+    """Queue a DiffSet for pre-rendering.
+
+    Depending on the configured :py:class:`PrerenderMode`, this will either
+    hand the DiffSet off to the local thread pool once the current
+    transaction commits, or create a job for worker processes. If
+    pre-rendering is disabled, this does nothing.
+
+    Version Added:
+        8.0
+
+    Args:
+        diffset (reviewboard.diffviewer.models.diffset.DiffSet):
+            The DiffSet to pre-render.
+    """
+    mode = get_prerender_mode()
+
+    if mode == PrerenderMode.LOCAL:
+        diffset_id = diffset.pk
+
+        transaction.on_commit(lambda: _submit_local_prerender(diffset_id))
+    elif mode == PrerenderMode.WORKER:
+        DiffSetPrerenderJob.objects.get_or_create(diffset=diffset)
+
+
+def prerender_diffset(
+    diffset: DiffSet,
+    *,
+    concurrency: int = 1,
+) -> int:
+    """Generate and cache the diff chunks for all files in a DiffSet.
+
+    This renders the files as they'd be shown by default in the diff
+    viewer, using the site's default diff settings. A failure in one file
+    is logged and won't prevent the others from being rendered.
+
+    Version Added:
+        8.0
+
+    Args:
+        diffset (reviewboard.diffviewer.models.diffset.DiffSet):
+            The DiffSet to pre-render.
+
+        concurrency (int, optional):
+            The maximum number of files to render at once.
+
+    Returns:
+        int:
+        The number of files successfully rendered.
+    """
+    diff_settings = DiffSettings.create(
+        local_site=diffset.repository.local_site)
+    diff_files = get_diff_files(diffset=diffset,
+                                diff_settings=diff_settings)
+
+    with log_timed(f'Pre-rendering {len(diff_files)} file(s) for DiffSet '
+                   f'{diffset.pk}',
+                   logger=logger):
+        if concurrency > 1 and len(diff_files) > 1:
+            def _prerender_file_in_thread(
+                diff_file: SerializedDiffFile,
+            ) -> bool:
+                try:
+                    return _prerender_file(diff_file=diff_file,
+                                           diff_settings=diff_settings)
+                finally:
+                    connections.close_all()
+
+            with ThreadPoolExecutor(
+                max_workers=concurrency,
+                thread_name_prefix='rb-diff-prerender') as executor:
+                results = list(executor.map(_prerender_file_in_thread,
+                                            diff_files))
+        else:
+            results = [
+                _prerender_file(diff_file=diff_file,
+                                diff_settings=diff_settings)
+                for diff_file in diff_files
+            ]
+
+    return sum(results)
+
+
+def process_prerender_jobs(
+    *,
+    concurrency: Optional[int] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """Process jobs queued for worker processes.
+
+    Each job is claimed by deleting it from the database, so several worker
+    processes can safely run at once. A job whose worker exits before
+    finishing won't be retried, which only means its diff will be rendered
+    when first viewed.
+
+    Version Added:
+        8.0
+
+    Args:
+        concurrency (int, optional):
+            The maximum number of files to render at once. This defaults to
+            the ``diffviewer_prerender_concurrency`` setting.
+
+        max_jobs (int, optional):
+            The maximum number of jobs to process. By default, this will
+            process jobs until the queue is empty.
+
+    Returns:
+        int:
+        The number of jobs processed.
+    """
+    if concurrency is None:
+        concurrency = get_prerender_concurrency()
+
+    num_processed = 0
+
+    while max_jobs is None or num_processed < max_jobs:
+        job = (
+            DiffSetPrerenderJob.objects
+            .order_by('queued', 'pk')
+            .values_list('pk', 'diffset_id')
+            .first()
+        )
+
+        if job is None:
+            break
+
+        job_id, diffset_id = job
+        num_deleted = DiffSetPrerenderJob.objects.filter(pk=job_id).delete()[0]
+
+        if num_deleted == 0:
+            # Another worker claimed this job first.
+            continue
+
+        num_processed += 1
+
+        try:
+            diffset = (
+                DiffSet.objects
+                .select_related('repository')
+                .get(pk=diffset_id)
+            )
+            prerender_diffset(diffset, concurrency=concurrency)
+        except Exception as e:
+            logger.exception('Unexpected error pre-rendering DiffSet %s: %s',
+                             diffset_id, e)
+
+    return num_processed
+
+
+def get_prerender_queue_stats() -> PrerenderQueueStats:
+    """Return statistics on the pre-rendering queue.
+
+    This can be used to monitor how far behind pre-rendering is, and to
+    decide how many worker processes are needed.
+
+    Version Added:
+        8.0
+
+    Returns:
+        PrerenderQueueStats:
+        The queue statistics.
+    """
+    with _local_lock:
+        local_pending = _local_pending
+
+    return {
+        'local_pending': local_pending,
+        'oldest_queued': (
+            DiffSetPrerenderJob.objects
+            .aggregate(oldest=Min('queued'))['oldest']
+        ),
+        'queued_jobs': DiffSetPrerenderJob.objects.count(),
+    }
+
+
+def _prerender_file(
+    *,
+    diff_file: SerializedDiffFile,
+    diff_settings: DiffSettings,
+) -> bool:
+    """Generate and cache the diff chunks for a file.
+
+    Version Added:
+        8.0
+
+    Args:
+        diff_file (reviewboard.diffviewer.diffutils.SerializedDiffFile):
+            The file to render.
+
+        diff_settings (reviewboard.diffviewer.settings.DiffSettings):
+            The settings used to render the file.
+
+    Returns:
+        bool:
+        ``True`` if the file was rendered. ``False`` if it failed.
+    """
+    try:
+        populate_diff_chunks([diff_file],
+                             diff_settings=diff_settings)
+    except Exception as e:
+        logger.exception('Unexpected error pre-rendering FileDiff %s: %s',
+                         diff_file['filediff'].pk, e)
+
+        return False
+
+    return True
+
+
+def _submit_local_prerender(
+    diffset_id: int,
+) -> None:
+    """Submit a DiffSet to the local thread pool for pre-rendering.
+
+    Version Added:
+        8.0
+
+    Args:
+        diffset_id (int):
+            The ID of the DiffSet to pre-render.
+    """
+    global _local_executor, _local_pending
+
+    with _local_lock:
+        if _local_executor is None:
+            _local_executor = ThreadPoolExecutor(
+                max_workers=get_prerender_concurrency(),
+                thread_name_prefix='rb-diff-prerender')
+
+        _local_pending += 1
+        executor = _local_executor
+
+    executor.submit(_run_local_prerender, diffset_id)
+
+
+def _run_local_prerender(
+    diffset_id: int,
+) -> None:
+    """Pre-render a DiffSet in the local thread pool.
+
+    Version Added:
+        8.0
+
+    Args:
+        diffset_id (int):
+            The ID of the DiffSet to pre-render.
+    """
+    global _local_pending
+
+    try:
+        diffset = (
+            DiffSet.objects
+            .select_related('repository')
+            .get(pk=diffset_id)
+        )
+        prerender_diffset(diffset)
+    except DiffSet.DoesNotExist:
+        # The DiffSet was deleted before we got to it.
+        pass
+    except Exception as e:
+        logger.exception('Unexpected error pre-rendering DiffSet %s: %s',
+                         diffset_id, e)
+    finally:
+        with _local_lock:
+            _local_pending -= 1
+
+        connections.close_all()
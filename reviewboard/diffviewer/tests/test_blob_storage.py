@@ -0,0 +1,196 @@
+"""Unit tests for reviewboard.diffviewer.blob_storage.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+
+import kgb
+
+from reviewboard.diffviewer.blob_storage import (DiffBlobStorageError,
+                                                 DiffContentCache,
+                                                 FileSystemDiffBlobStorage,
+                                                 content_cache,
+                                                 get_blob_key)
+from reviewboard.diffviewer.models import RawFileDiffData
+from reviewboard.testing import TestCase
+
+
+class FileSystemDiffBlobStorageTests(TestCase):
+    """Unit tests for FileSystemDiffBlobStorage.
+
+    Version Added:
+        8.0
+    """
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.tempdir = tempfile.mkdtemp(prefix='rb-tests-diffs-')
+        self.storage = FileSystemDiffBlobStorage(self.tempdir)
+
+    def tearDown(self) -> None:
+        """Tear down the test case."""
+        shutil.rmtree(self.tempdir)
+
+        super().tearDown()
+
+    def test_save_and_load(self) -> None:
+        """Testing FileSystemDiffBlobStorage.save and load"""
+        self.storage.save('abcdef.Z', b'data')
+
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tempdir, 'ab', 'cd', 'abcdef.Z')))
+        self.assertEqual(self.storage.load('abcdef.Z'), b'data')
+
+    def test_save_existing(self) -> None:
+        """Testing FileSystemDiffBlobStorage.save with existing content"""
+        self.storage.save('abcdef.Z', b'data')
+        self.storage.save('abcdef.Z', b'data')
+
+        self.assertEqual(os.listdir(os.path.join(self.tempdir, 'ab', 'cd')),
+                         ['abcdef.Z'])
+        self.assertEqual(self.storage.load('abcdef.Z'), b'data')
+
+    def test_load_missing(self) -> None:
+        """Testing FileSystemDiffBlobStorage.load with missing content"""
+        with self.assertRaises(DiffBlobStorageError):
+            self.storage.load('abcdef.Z')
+
+    def test_delete(self) -> None:
+        """Testing FileSystemDiffBlobStorage.delete"""
+        self.storage.save('abcdef.Z', b'data')
+        self.storage.delete('abcdef.Z')
+        self.storage.delete('abcdef.Z')
+
+        with self.assertRaises(DiffBlobStorageError):
+            self.storage.load('abcdef.Z')
+
+
+class DiffContentCacheTests(TestCase):
+    """Unit tests for DiffContentCache.
+
+    Version Added:
+        8.0
+    """
+
+    def test_get_or_load(self) -> None:
+        """Testing DiffContentCache.get_or_load"""
+        cache = DiffContentCache(max_size=100)
+        calls = []
+
+        def _load() -> bytes:
+            calls.append(True)
+
+            return b'data'
+
+        self.assertEqual(cache.get_or_load('key', _load), b'data')
+        self.assertEqual(cache.get_or_load('key', _load), b'data')
+        self.assertEqual(len(calls), 1)
+
+    def test_get_or_load_evicts_least_recent(self) -> None:
+        """Testing DiffContentCache.get_or_load evicts least recently used
+        content
+        """
+        cache = DiffContentCache(max_size=100)
+        cache.get_or_load('key1', lambda: b'1' * 25)
+        cache.get_or_load('key2', lambda: b'2' * 25)
+        cache.get_or_load('key3', lambda: b'3' * 25)
+        cache.get_or_load('key1', lambda: b'x')
+        cache.get_or_load('key4', lambda: b'4' * 25)
+
+        self.assertEqual(cache.size, 100)
+
+        cache.get_or_load('key5', lambda: b'5' * 25)
+
+        self.assertEqual(cache.size, 100)
+        self.assertEqual(cache.get_or_load('key1', lambda: b'x'), b'1' * 25)
+        self.assertEqual(cache.get_or_load('key2', lambda: b'x'), b'x')
+
+    def test_get_or_load_large(self) -> None:
+        """Testing DiffContentCache.get_or_load with content too large to
+        cache
+        """
+        cache = DiffContentCache(max_size=100)
+
+        self.assertEqual(cache.get_or_load('key', lambda: b'1' * 26),
+                         b'1' * 26)
+        self.assertEqual(cache.size, 0)
+
+
+class RawFileDiffDataStorageTests(kgb.SpyAgency, TestCase):
+    """Unit tests for storing RawFileDiffData outside the database.
+
+    Version Added:
+        8.0
+    """
+
+    diff = (
+        b'diff --git a/README b/README\n'
+        b'index d6613f5..5b50866 100644\n'
+        b'--- README\n'
+        b'+++ README\n'
+        b'@ -1,1 +1,10 @@\n'
+        b'-blah blah\n'
+    ) + b'+blah!\n' * 20
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.tempdir = tempfile.mkdtemp(prefix='rb-tests-diffs-')
+        content_cache.clear()
+
+    def tearDown(self) -> None:
+        """Tear down the test case."""
+        shutil.rmtree(self.tempdir)
+        content_cache.clear()
+
+        super().tearDown()
+
+    def test_get_or_create_from_data(self) -> None:
+        """Testing RawFileDiffDataManager.get_or_create_from_data with
+        filesystem storage
+        """
+        with self.siteconfig_settings(
+            {
+                'diffviewer_blob_storage': 'filesystem',
+                'diffviewer_blob_storage_path': self.tempdir,
+            },
+            reload_settings=False):
+            raw_file_diff_data = \
+                RawFileDiffData.objects.get_or_create_from_data(
+                    self.diff)[0]
+
+            raw_file_diff_data = RawFileDiffData.objects.get(
+                pk=raw_file_diff_data.pk)
+
+            self.assertEqual(raw_file_diff_data.storage, 'filesystem')
+            self.assertEqual(bytes(raw_file_diff_data.binary), b'')
+
+            storage = FileSystemDiffBlobStorage(self.tempdir)
+            key = get_blob_key(raw_file_diff_data.binary_hash,
+                               raw_file_diff_data.compression)
+
+            self.assertEqual(raw_file_diff_data.get_stored_data(),
+                             storage.load(key))
+            self.assertEqual(raw_file_diff_data.content, self.diff)
+
+    def test_content_cached(self) -> None:
+        """Testing RawFileDiffData.content caches loaded content"""
+        raw_file_diff_data = \
+            RawFileDiffData.objects.get_or_create_from_data(self.diff)[0]
+        raw_file_diff_data = RawFileDiffData.objects.get(
+            pk=raw_file_diff_data.pk)
+
+        self.spy_on(raw_file_diff_data.get_stored_data)
+
+        self.assertEqual(raw_file_diff_data.content, self.diff)
+        self.assertEqual(raw_file_diff_data.content, self.diff)
+        self.assertSpyCallCount(raw_file_diff_data.get_stored_data, 1)
@@ -0,0 +1,200 @@
+"""Unit tests for reviewboard.diffviewer.compression.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from unittest import SkipTest
+
+from reviewboard.diffviewer.compression import (Bzip2DiffCompressor,
+                                                ZlibDiffCompressor,
+                                                ZstdDictDiffCompressor,
+                                                ZstdDiffCompressor,
+                                                compress_diff_data,
+                                                get_compressor,
+                                                get_compressor_by_name,
+                                                get_default_compressor,
+                                                train_compression_dictionary)
+from reviewboard.diffviewer.models import (DiffCompressionDictionary,
+                                           RawFileDiffData)
+from reviewboard.testing import TestCase
+
+
+class CompressionTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.compression.
+
+    Version Added:
+        8.0
+    """
+
+    diff = b''.join(
+        b'diff --git a/file%d b/file%d\n'
+        b'index d6613f5..5b50866 100644\n'
+        b'--- a/file%d\n'
+        b'+++ b/file%d\n'
+        b'@@ -1,3 +1,3 @@\n'
+        b' context\n'
+        b'-old line %d\n'
+        b'+new line %d\n'
+        b' context\n'
+        % ((i,) * 6)
+        for i in range(50)
+    )
+
+    def test_bzip2(self) -> None:
+        """Testing Bzip2DiffCompressor"""
+        self._test_compressor(Bzip2DiffCompressor())
+
+    def test_zlib(self) -> None:
+        """Testing ZlibDiffCompressor"""
+        self._test_compressor(ZlibDiffCompressor())
+
+    def test_zstd(self) -> None:
+        """Testing ZstdDiffCompressor"""
+        compressor = ZstdDiffCompressor()
+        self._check_zstd_available(compressor)
+        self._test_compressor(compressor)
+
+    def test_zstd_dict(self) -> None:
+        """Testing ZstdDictDiffCompressor"""
+        self._check_zstd_available(ZstdDiffCompressor())
+
+        compressor = ZstdDictDiffCompressor()
+        self.assertFalse(compressor.is_available())
+
+        compression_dict = self._train_dictionary()
+
+        self.assertTrue(compressor.is_available())
+        self.assertEqual(compressor.get_latest_dict_id(),
+                         compression_dict.dict_id)
+
+        self._test_compressor(compressor)
+
+    def test_zstd_dict_with_older_dict(self) -> None:
+        """Testing ZstdDictDiffCompressor.decompress with data compressed
+        using an older dictionary
+        """
+        self._check_zstd_available(ZstdDiffCompressor())
+
+        compressor = ZstdDictDiffCompressor()
+        self._train_dictionary()
+        compressed = compressor.compress(self.diff)
+
+        # Train a newer dictionary for new data.
+        new_dict_id = self._train_dictionary(num_samples=100).dict_id
+        self.assertEqual(compressor.get_latest_dict_id(), new_dict_id)
+
+        self.assertEqual(compressor.decompress(compressed), self.diff)
+
+    def test_get_compressor(self) -> None:
+        """Testing get_compressor"""
+        self.assertIsInstance(get_compressor('B'), Bzip2DiffCompressor)
+        self.assertIsInstance(get_compressor('Z'), ZlibDiffCompressor)
+        self.assertIsInstance(get_compressor('S'), ZstdDiffCompressor)
+        self.assertIsInstance(get_compressor('D'), ZstdDictDiffCompressor)
+        self.assertIsNone(get_compressor('X'))
+
+    def test_get_compressor_by_name_auto(self) -> None:
+        """Testing get_compressor_by_name with "auto\""""
+        compressor = get_compressor_by_name('auto')
+
+        if ZstdDiffCompressor().is_available():
+            self.assertIsInstance(compressor, ZstdDiffCompressor)
+        else:
+            self.assertIsInstance(compressor, ZlibDiffCompressor)
+
+    def test_get_default_compressor(self) -> None:
+        """Testing get_default_compressor with site configuration"""
+        with self.siteconfig_settings({'diffviewer_compression': 'bzip2'},
+                                      reload_settings=False):
+            self.assertIsInstance(get_default_compressor(),
+                                  Bzip2DiffCompressor)
+
+    def test_get_default_compressor_unavailable(self) -> None:
+        """Testing get_default_compressor with unavailable compression
+        method falls back to zlib
+        """
+        with self.siteconfig_settings({'diffviewer_compression': 'zstd-dict'},
+                                      reload_settings=False):
+            self.assertIsInstance(get_default_compressor(),
+                                  ZlibDiffCompressor)
+
+    def test_compress_diff_data_small(self) -> None:
+        """Testing compress_diff_data with data that doesn't benefit from
+        compression
+        """
+        self.assertEqual(compress_diff_data(b'abc', ZlibDiffCompressor()),
+                         (b'abc', None))
+
+    def test_raw_file_diff_data_content(self) -> None:
+        """Testing RawFileDiffData.content with each compression method"""
+        for compressor in (Bzip2DiffCompressor(), ZlibDiffCompressor()):
+            binary, compression = compress_diff_data(self.diff, compressor)
+            raw_file_diff_data = RawFileDiffData(binary=binary,
+                                                 compression=compression)
+
+            self.assertEqual(compression, compressor.compression_id)
+            self.assertEqual(raw_file_diff_data.content, self.diff)
+
+    def _check_zstd_available(
+        self,
+        compressor: ZstdDiffCompressor,
+    ) -> None:
+        """Skip the test if zstandard is not installed.
+
+        Args:
+            compressor (reviewboard.diffviewer.compression.
+                        ZstdDiffCompressor):
+                The compressor to check.
+
+        Raises:
+            unittest.SkipTest:
+                zstandard is not installed.
+        """
+        if not compressor.is_available():
+            raise SkipTest('zstandard is not installed')
+
+    def _test_compressor(
+        self,
+        compressor,
+    ) -> None:
+        """Test compressing and decompressing data with a compressor.
+
+        Args:
+            compressor (reviewboard.diffviewer.compression.DiffCompressor):
+                The compressor to test.
+        """
+        compressed = compressor.compress(self.diff)
+
+        self.assertLess(len(compressed), len(self.diff))
+        self.assertEqual(compressor.decompress(compressed), self.diff)
+
+    def _train_dictionary(
+        self,
+        num_samples: int = 200,
+    ) -> DiffCompressionDictionary:
+        """Train a dictionary from generated diffs.
+
+        Args:
+            num_samples (int, optional):
+                The number of diffs to generate.
+
+        Returns:
+            reviewboard.diffviewer.models.DiffCompressionDictionary:
+            The new dictionary.
+        """
+        return train_compression_dictionary(
+            [
+                b'diff --git a/src/module%d.py b/src/module%d.py\n'
+                b'--- a/src/module%d.py\n'
+                b'+++ b/src/module%d.py\n'
+                b'@@ -%d,3 +%d,3 @@\n'
+                b' def function_%d():\n'
+                b'-    return %d\n'
+                b'+    return %d\n'
+                % ((i,) * 9)
+                for i in range(num_samples)
+            ],
+            dict_size=4096)
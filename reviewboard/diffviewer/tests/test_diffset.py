@@ -41,6 +41,66 @@ class DiffSetTests(TestCase):
         with self.assertRaises(ValueError):
             diffset.update_revision_from_history(diffset_history)
 
+    def test_get_raw_line_counts(self):
+        """Testing DiffSet.get_raw_line_counts with stored counts"""
+        diffset = DiffSet(raw_insert_count=5, raw_delete_count=3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(diffset.get_raw_line_counts(), (5, 3))
+
+    def test_get_raw_line_counts_not_stored(self):
+        """Testing DiffSet.get_raw_line_counts without stored counts"""
+        repository = self.create_repository(tool_name='Test')
+        diffset = self.create_diffset(repository=repository)
+        self.create_filediff(diffset)
+        self.create_filediff(diffset, source_file='/test-file-2',
+                             dest_file='/test-file-2')
+
+        self.assertIsNone(diffset.raw_insert_count)
+        self.assertEqual(diffset.get_raw_line_counts(), (2, 2))
+
+        diffset = DiffSet.objects.get(pk=diffset.pk)
+        self.assertEqual(diffset.raw_insert_count, 2)
+        self.assertEqual(diffset.raw_delete_count, 2)
+
+    def test_save_sets_latest_diffset(self):
+        """Testing DiffSet.save sets DiffSetHistory.latest_diffset for new
+        diffsets
+        """
+        repository = self.create_repository(tool_name='Test')
+        diffset_history = DiffSetHistory.objects.create()
+
+        diffset1 = DiffSet.objects.create_empty(
+            repository=repository,
+            diffset_history=diffset_history)
+        diffset2 = DiffSet.objects.create_empty(
+            repository=repository,
+            diffset_history=diffset_history)
+
+        diffset_history.refresh_from_db()
+        self.assertEqual(diffset_history.latest_diffset, diffset2)
+
+        # Saving an older diffset shouldn't change the latest diffset.
+        diffset1 = DiffSet.objects.get(pk=diffset1.pk)
+        diffset1.save()
+
+        diffset_history.refresh_from_db()
+        self.assertEqual(diffset_history.latest_diffset, diffset2)
+
+    def test_save_with_history_in_update_fields(self):
+        """Testing DiffSet.save with history in update_fields sets
+        DiffSetHistory.latest_diffset
+        """
+        repository = self.create_repository(tool_name='Test')
+        diffset_history = DiffSetHistory.objects.create()
+        diffset = self.create_diffset(repository=repository)
+
+        diffset.history = diffset_history
+        diffset.save(update_fields=('history',))
+
+        diffset_history.refresh_from_db()
+        self.assertEqual(diffset_history.latest_diffset, diffset)
+
     def test_per_commit_files_unpopulated(self):
         """Testing DiffSet.per_commit_files without pre-fetching files"""
         repository = self.create_repository()
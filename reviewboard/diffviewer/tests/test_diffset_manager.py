@@ -67,6 +67,24 @@ class DiffSetManagerTests(kgb.SpyAgency, TestCase):
         self.assertEqual(filediff.source_file, 'trunk/README')
         self.assertEqual(filediff.dest_file, 'trunk/README')
 
+    def test_create_from_data_stores_line_counts(self):
+        """Testing DiffSetManager.create_from_data stores total line counts
+        """
+        repository = self.create_repository(tool_name='Test')
+
+        self.spy_on(repository.get_file_exists,
+                    call_fake=lambda *args, **kwargs: True)
+
+        diffset = DiffSet.objects.create_from_data(
+            repository=repository,
+            diff_file_name='diff',
+            diff_file_contents=self.DEFAULT_GIT_FILEDIFF_DATA_DIFF,
+            basedir='/')
+
+        diffset = DiffSet.objects.get(pk=diffset.pk)
+        self.assertEqual(diffset.raw_insert_count, 1)
+        self.assertEqual(diffset.raw_delete_count, 1)
+
     def test_create_from_data_with_validate_only_true(self):
         """Testing DiffSetManager.create_from_data with validate_only=True"""
         repository = self.create_repository(tool_name='Test')
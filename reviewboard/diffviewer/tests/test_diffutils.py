@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import kgb
+from concurrent.futures import ThreadPoolExecutor
 from itertools import zip_longest
 from typing import TYPE_CHECKING, NoReturn
 
@@ -10,6 +11,7 @@ from django.contrib.auth.models import User
 from django.test.client import RequestFactory
 from djblets.testing.decorators import add_fixtures
 
+from reviewboard.diffviewer.chunk_generator import DiffChunkGenerator
 from reviewboard.diffviewer.diffutils import (
     convert_line_endings,
     convert_to_unicode,
@@ -23,10 +25,13 @@ from reviewboard.diffviewer.diffutils import (
     get_last_line_number_in_diff,
     get_line_changed_regions,
     get_matched_interdiff_files,
+    get_original_and_patched_files,
     get_original_file,
     get_original_file_from_repo,
     get_sorted_filediffs,
     patch,
+    populate_diff_chunks,
+    run_patch_command,
     split_line_endings,
     _PATCH_GARBAGE_INPUT,
     _get_last_header_in_chunks_before_line)
@@ -39,7 +44,7 @@ from reviewboard.scmtools.core import PRE_CREATION
 from reviewboard.testing.testcase import BaseFileDiffAncestorTests, TestCase
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping, Sequence
+    from collections.abc import Iterator, Mapping, Sequence
     from typing import Any
 
     from django.http import HttpRequest
@@ -3293,6 +3298,113 @@ class DiffExpansionHeaderTests(TestCase):
                          lines[header['left']['line'] - 1][2])
 
 
+class PopulateDiffChunksTests(kgb.SpyAgency, TestCase):
+    """Unit tests for populate_diff_chunks."""
+
+    fixtures = ['test_scmtools']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        diffset = self.create_diffset(repository=self.create_repository())
+
+        for i in range(3):
+            self.create_filediff(diffset,
+                                 source_file=f'/file{i}',
+                                 dest_file=f'/file{i}')
+
+        self.diff_settings = DiffSettings.create()
+        self.files = get_diff_files(diffset=diffset,
+                                    diff_settings=self.diff_settings)
+
+    def test_with_max_workers(self) -> None:
+        """Testing populate_diff_chunks with max_workers"""
+        def _get_chunks(_self: DiffChunkGenerator) -> Iterator[DiffChunk]:
+            yield {
+                'change': 'insert',
+                'collapsable': False,
+                'index': 0,
+                'lines': [],
+                'meta': {
+                    'filediff': _self.filediff.pk,
+                },
+                'numlines': 0,
+            }
+
+        self.spy_on(DiffChunkGenerator.get_chunks,
+                    owner=DiffChunkGenerator,
+                    call_fake=_get_chunks)
+        self.spy_on(ThreadPoolExecutor.submit,
+                    owner=ThreadPoolExecutor)
+
+        populate_diff_chunks(self.files,
+                             diff_settings=self.diff_settings,
+                             max_workers=2)
+
+        self.assertSpyCallCount(ThreadPoolExecutor.submit, 3)
+
+        for diff_file in self.files:
+            self.assertTrue(diff_file['chunks_loaded'])
+            self.assertEqual(diff_file['num_chunks'], 1)
+            self.assertEqual(diff_file['num_changes'], 1)
+            self.assertEqual(diff_file['chunks'][0]['meta']['filediff'],
+                             diff_file['filediff'].pk)
+
+    def test_with_max_workers_and_error(self) -> None:
+        """Testing populate_diff_chunks with max_workers and an error
+        generating one file
+        """
+        error_filediff = self.files[1]['filediff']
+
+        def _get_chunks(_self: DiffChunkGenerator) -> Iterator[DiffChunk]:
+            if _self.filediff == error_filediff:
+                raise Exception('Oh no')
+
+            yield from []
+
+        self.spy_on(DiffChunkGenerator.get_chunks,
+                    owner=DiffChunkGenerator,
+                    call_fake=_get_chunks)
+
+        with self.assertRaisesMessage(Exception, 'Oh no'):
+            populate_diff_chunks(self.files,
+                                 diff_settings=self.diff_settings,
+                                 max_workers=2)
+
+        self.assertTrue(self.files[0]['chunks_loaded'])
+        self.assertFalse(self.files[1]['chunks_loaded'])
+        self.assertTrue(self.files[2]['chunks_loaded'])
+
+    def test_without_max_workers(self) -> None:
+        """Testing populate_diff_chunks without max_workers generates files
+        in order without a thread pool
+        """
+        generated_filediffs: list[FileDiff] = []
+
+        def _get_chunks(_self: DiffChunkGenerator) -> Iterator[DiffChunk]:
+            generated_filediffs.append(_self.filediff)
+
+            yield from []
+
+        self.spy_on(DiffChunkGenerator.get_chunks,
+                    owner=DiffChunkGenerator,
+                    call_fake=_get_chunks)
+        self.spy_on(ThreadPoolExecutor.submit,
+                    owner=ThreadPoolExecutor)
+
+        populate_diff_chunks(self.files,
+                             diff_settings=self.diff_settings)
+
+        self.assertSpyNotCalled(ThreadPoolExecutor.submit)
+        self.assertEqual(
+            generated_filediffs,
+            [
+                diff_file['filediff']
+                for diff_file in self.files
+            ])
+
+
 class PatchTests(kgb.SpyAgency, TestCase):
     """Unit tests for patch."""
 
@@ -3347,6 +3459,65 @@ class PatchTests(kgb.SpyAgency, TestCase):
                   orig_file=old,
                   filename='foo.c')
 
+    def test_patch_in_process(self) -> None:
+        """Testing patch with a diff that applies cleanly does not run the
+        patch command
+        """
+        old = (b'line 1\n'
+               b'line 2\n'
+               b'line 3\n')
+
+        diff = (b'--- README\n'
+                b'+++ README\n'
+                b'@@ -1,3 +1,3 @@\n'
+                b' line 1\n'
+                b'-line 2\n'
+                b'+new line 2\n'
+                b' line 3\n')
+
+        self.spy_on(run_patch_command)
+
+        patched = patch(diff=diff,
+                        orig_file=old,
+                        filename='README')
+        self.assertEqual(patched,
+                         b'line 1\n'
+                         b'new line 2\n'
+                         b'line 3\n')
+
+        self.assertSpyNotCalled(run_patch_command)
+
+    def test_patch_with_rejects(self) -> None:
+        """Testing patch with a diff that doesn't apply falls back to the
+        patch command for rejects
+        """
+        old = (b'line 1\n'
+               b'line 2\n'
+               b'line 3\n')
+
+        diff = (b'--- README\n'
+                b'+++ README\n'
+                b'@@ -1,3 +1,3 @@\n'
+                b' line 1\n'
+                b'-missing line\n'
+                b'+new line 2\n'
+                b' line 3\n')
+
+        self.spy_on(run_patch_command)
+
+        with self.assertRaises(PatchError) as ctx:
+            patch(diff=diff,
+                  orig_file=old,
+                  filename='README')
+
+        e = ctx.exception
+        self.assertEqual(e.orig_file, old)
+        self.assertEqual(e.diff, diff)
+        self.assertIsNotNone(e.rejects)
+        self.assertIn('1 out of 1 hunk FAILED', e.error_output)
+
+        self.assertSpyCallCount(run_patch_command, 1)
+
     def test_empty_patch(self) -> None:
         """Testing patch with an empty diff"""
         old = b'This is a test'
@@ -3969,6 +4140,95 @@ class GetOriginalFileTests(BaseFileDiffAncestorTests):
                          'filediff_value')
 
 
+class GetOriginalAndPatchedFilesTests(kgb.SpyAgency, TestCase):
+    """Unit tests for get_original_and_patched_files."""
+
+    fixtures = ['test_scmtools']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.repository = self.create_repository()
+        self.spy_on(self.repository.get_file,
+                    op=kgb.SpyOpReturn(b'Hello, world!\r\n'))
+        self.spy_on(patch)
+
+    def test_caches_results(self) -> None:
+        """Testing get_original_and_patched_files caches the original and
+        patched files
+        """
+        diffset = self.create_diffset(repository=self.repository)
+        filediff = self.create_filediff(diffset)
+
+        self.assertEqual(
+            get_original_and_patched_files(filediff=filediff),
+            (b'Hello, world!\n', b'Hello, everybody!\n'))
+        self.assertSpyCallCount(self.repository.get_file, 1)
+        self.assertSpyCallCount(patch, 1)
+
+        self.assertEqual(
+            get_original_and_patched_files(filediff=filediff),
+            (b'Hello, world!\n', b'Hello, everybody!\n'))
+        self.assertSpyCallCount(self.repository.get_file, 1)
+        self.assertSpyCallCount(patch, 1)
+
+    def test_shares_results_between_filediffs(self) -> None:
+        """Testing get_original_and_patched_files shares cached results
+        between FileDiffs with the same source file and diff
+        """
+        filediff1 = self.create_filediff(
+            self.create_diffset(repository=self.repository))
+        filediff2 = self.create_filediff(
+            self.create_diffset(repository=self.repository))
+
+        get_original_and_patched_files(filediff=filediff1)
+
+        self.assertEqual(
+            get_original_and_patched_files(filediff=filediff2),
+            (b'Hello, world!\n', b'Hello, everybody!\n'))
+        self.assertSpyCallCount(self.repository.get_file, 1)
+        self.assertSpyCallCount(patch, 1)
+
+    def test_with_different_diff(self) -> None:
+        """Testing get_original_and_patched_files with FileDiffs with the same
+        source file and different diffs
+        """
+        filediff1 = self.create_filediff(
+            self.create_diffset(repository=self.repository))
+        filediff2 = self.create_filediff(
+            self.create_diffset(repository=self.repository),
+            diff=(
+                b'--- README\trevision 123\n'
+                b'+++ README\trevision 123\n'
+                b'@@ -1 +1 @@\n'
+                b'-Hello, world!\n'
+                b'+Goodbye, world!\n'
+            ))
+
+        get_original_and_patched_files(filediff=filediff1)
+
+        self.assertEqual(
+            get_original_and_patched_files(filediff=filediff2),
+            (b'Hello, world!\n', b'Goodbye, world!\n'))
+        self.assertSpyCallCount(patch, 2)
+
+    def test_with_different_source_revision(self) -> None:
+        """Testing get_original_and_patched_files with FileDiffs with the same
+        diff and different source revisions
+        """
+        filediff1 = self.create_filediff(
+            self.create_diffset(repository=self.repository))
+        filediff2 = self.create_filediff(
+            self.create_diffset(repository=self.repository),
+            source_revision='456')
+
+        get_original_and_patched_files(filediff=filediff1)
+        get_original_and_patched_files(filediff=filediff2)
+
+        self.assertSpyCallCount(patch, 2)
+
+
 class SplitLineEndingsTests(TestCase):
     """Unit tests for reviewboard.diffviewer.diffutils.split_line_endings."""
 
@@ -84,6 +84,21 @@ class FileDiffTests(TestCase):
         self.assertEqual(diff_hash.insert_count, 1)
         self.assertEqual(diff_hash.delete_count, 2)
 
+    def test_set_line_counts_resets_diffset_totals(self):
+        """Testing FileDiff.set_line_counts with new raw counts resets the
+        DiffSet's stored totals
+        """
+        self.filediff.save()
+        self.diffset.update_raw_line_counts()
+        self.assertIsNotNone(self.diffset.raw_insert_count)
+
+        self.filediff.set_line_counts(raw_insert_count=10,
+                                      raw_delete_count=20)
+
+        diffset = DiffSet.objects.get(pk=self.diffset.pk)
+        self.assertIsNone(diffset.raw_insert_count)
+        self.assertIsNone(diffset.raw_delete_count)
+
     def test_long_filenames(self):
         """Testing FileDiff with long filenames (1024 characters)"""
         long_filename = 'x' * 1024
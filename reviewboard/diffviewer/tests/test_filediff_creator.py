@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 import unittest
 from typing import TYPE_CHECKING, Union
 
@@ -10,9 +11,13 @@ from django.utils.timezone import now
 
 from reviewboard.diffviewer.filediff_creator import create_filediffs
 from reviewboard.diffviewer.models import DiffCommit, DiffSet
+from reviewboard.hostingsvcs.models import HostingServiceAccount
 from reviewboard.scmtools.core import Revision
+from reviewboard.scmtools.errors import FileNotFoundError
 from reviewboard.scmtools.git import GitTool
+from reviewboard.scmtools.models import Repository
 from reviewboard.testing import TestCase
+from reviewboard.testing.hosting_services import TestService
 
 if TYPE_CHECKING:
     from reviewboard.scmtools.core import FileLookupContext
@@ -23,6 +28,23 @@ class FileDiffCreatorTests(kgb.SpyAgency, TestCase):
 
     fixtures = ['test_scmtools']
 
+    _MULTI_FILE_DIFF = (
+        b'diff --git a/README b/README\n'
+        b'index 1234567..7654321 100644\n'
+        b'--- a/README\n'
+        b'+++ b/README\n'
+        b'@@ -1 +1 @@\n'
+        b'-Hello\n'
+        b'+Hello, world!\n'
+        b'diff --git a/docs/index.txt b/docs/index.txt\n'
+        b'index abcdef0..0fedcba 100644\n'
+        b'--- a/docs/index.txt\n'
+        b'+++ b/docs/index.txt\n'
+        b'@@ -1 +1 @@\n'
+        b'-Index\n'
+        b'+Table of contents\n'
+    )
+
     def test_create_filediffs_file_count(self):
         """Testing create_filediffs() with a DiffSet"""
         repository = self.create_repository()
@@ -344,3 +366,163 @@ class FileDiffCreatorTests(kgb.SpyAgency, TestCase):
             'raw_delete_count': 0,
             'raw_insert_count': 0,
         })
+
+    def test_create_filediffs_with_batch_file_exists(self) -> None:
+        """Testing create_filediffs() checks file existence in one batch
+        when the SCMTool supports it
+        """
+        repository = self.create_repository(tool_name='Git')
+        diffset = self.create_diffset(repository=repository)
+
+        self.spy_on(Repository.files_exist,
+                    owner=Repository,
+                    op=kgb.SpyOpReturn([True, True]))
+
+        checked_paths: list[str] = []
+
+        def get_file_exists(
+            *,
+            path: str,
+            **kwargs,
+        ) -> bool:
+            checked_paths.append(path)
+
+            return True
+
+        create_filediffs(
+            diff_file_contents=self._MULTI_FILE_DIFF,
+            parent_diff_file_contents=None,
+            repository=repository,
+            basedir='/',
+            base_commit_id='0' * 40,
+            diffset=diffset,
+            get_file_exists=get_file_exists)
+
+        self.assertEqual(diffset.files.count(), 2)
+        self.assertSpyCallCount(Repository.files_exist, 1)
+
+        lookups = Repository.files_exist.last_call.args[0]
+        self.assertEqual(
+            [
+                (lookup.path, lookup.revision)
+                for lookup in lookups
+            ],
+            [
+                ('/README', '1234567'),
+                ('/docs/index.txt', 'abcdef0'),
+            ])
+
+        self.assertEqual(checked_paths, ['/README', '/docs/index.txt'])
+
+    def test_create_filediffs_increments_line_counts(self) -> None:
+        """Testing create_filediffs() increments the stored line counts in
+        the database
+        """
+        repository = self.create_repository(tool_name='Git')
+        diffset = self.create_diffset(repository=repository)
+        diffset.raw_insert_count = 0
+        diffset.raw_delete_count = 0
+        diffset.save(update_fields=('raw_insert_count', 'raw_delete_count'))
+
+        # Simulate files being added by another process after this copy
+        # of the diffset was loaded.
+        DiffSet.objects.filter(pk=diffset.pk).update(raw_insert_count=10,
+                                                     raw_delete_count=20)
+
+        filediffs = create_filediffs(
+            diff_file_contents=self._MULTI_FILE_DIFF,
+            parent_diff_file_contents=None,
+            repository=repository,
+            basedir='/',
+            base_commit_id='0' * 40,
+            diffset=diffset,
+            check_existence=False)
+
+        insert_count = sum(
+            filediff.get_line_counts()['raw_insert_count']
+            for filediff in filediffs
+        )
+        delete_count = sum(
+            filediff.get_line_counts()['raw_delete_count']
+            for filediff in filediffs
+        )
+
+        self.assertEqual(diffset.raw_insert_count, insert_count)
+        self.assertEqual(diffset.raw_delete_count, delete_count)
+
+        diffset = DiffSet.objects.get(pk=diffset.pk)
+        self.assertEqual(diffset.raw_insert_count, 10 + insert_count)
+        self.assertEqual(diffset.raw_delete_count, 20 + delete_count)
+
+    def test_create_filediffs_with_hosting_service_file_exists(self) -> None:
+        """Testing create_filediffs() checks file existence concurrently
+        through a hosting service API
+        """
+        class _APITestService(TestService):
+            def get_file_exists(self, *args, **kwargs) -> bool:
+                return True
+
+        repository = self.create_repository(tool_name='Git')
+        repository.hosting_service = _APITestService(
+            HostingServiceAccount.objects.create(service_name='test',
+                                                 username='test'))
+        diffset = self.create_diffset(repository=repository)
+
+        self.spy_on(Repository.files_exist, owner=Repository)
+
+        checked_threads: list[threading.Thread] = []
+
+        def get_file_exists(**kwargs) -> bool:
+            checked_threads.append(threading.current_thread())
+
+            return True
+
+        create_filediffs(
+            diff_file_contents=self._MULTI_FILE_DIFF,
+            parent_diff_file_contents=None,
+            repository=repository,
+            basedir='/',
+            base_commit_id='0' * 40,
+            diffset=diffset,
+            get_file_exists=get_file_exists)
+
+        self.assertEqual(diffset.files.count(), 2)
+        self.assertSpyNotCalled(Repository.files_exist)
+        self.assertEqual(len(checked_threads), 2)
+        self.assertNotIn(threading.current_thread(), checked_threads)
+
+    def test_create_filediffs_with_file_not_found(self) -> None:
+        """Testing create_filediffs() with a file missing from the
+        repository
+        """
+        repository = self.create_repository(tool_name='Git')
+        diffset = self.create_diffset(repository=repository)
+
+        self.spy_on(Repository.files_exist,
+                    owner=Repository,
+                    op=kgb.SpyOpReturn([True, False]))
+
+        def get_file_exists(
+            *,
+            path: str,
+            **kwargs,
+        ) -> bool:
+            return path == '/README'
+
+        message = (
+            'The file "/docs/index.txt" (revision abcdef0, commit %s) could '
+            'not be found in the repository'
+            % ('0' * 40)
+        )
+
+        with self.assertRaisesMessage(FileNotFoundError, message):
+            create_filediffs(
+                diff_file_contents=self._MULTI_FILE_DIFF,
+                parent_diff_file_contents=None,
+                repository=repository,
+                basedir='/',
+                base_commit_id='0' * 40,
+                diffset=diffset,
+                get_file_exists=get_file_exists)
+
+        self.assertEqual(diffset.files.count(), 0)
@@ -0,0 +1,136 @@
+"""Unit tests for reviewboard.diffviewer.lexers."""
+
+from __future__ import annotations
+
+from pygments.lexers import guess_lexer_for_filename
+from pygments.lexers.markup import MarkdownLexer
+from pygments.lexers.matlab import MatlabLexer
+from pygments.lexers.objective import ObjectiveCLexer
+from pygments.lexers.python import PythonLexer
+
+from reviewboard.diffviewer import lexers
+from reviewboard.diffviewer.lexers import (LexerIndex,
+                                           get_lexer_for_filename,
+                                           get_lexer_lookup_stats,
+                                           reset_lexer_lookup_stats)
+from reviewboard.testing import TestCase
+
+
+class LexerIndexTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.lexers.LexerIndex."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up the test case class."""
+        super().setUpClass()
+
+        cls.index = LexerIndex()
+
+    def test_get_lexer_class(self) -> None:
+        """Testing LexerIndex.get_lexer_class matches
+        guess_lexer_for_filename
+        """
+        tests = [
+            ('file.py', 'import os\n'),
+            ('/path/to/file.md', 'This is **bold**\n'),
+            ('Makefile', 'all:\n\techo hi\n'),
+            ('CMakeLists.txt', 'project(test)\n'),
+            ('file.h', '#include <stdio.h>\n'),
+            ('file.html', '<html>{% block content %}{% endblock %}</html>'),
+            ('file.html', '<html><body></body></html>'),
+            ('file.m', '@interface Foo : NSObject\n@end\n'),
+            ('file.m', 'function y = f(x)\n  y = x;\nend\n'),
+        ]
+
+        for filename, data in tests:
+            with self.subTest(filename=filename, data=data):
+                self.assertIs(
+                    self.index.get_lexer_class(filename, data),
+                    type(guess_lexer_for_filename(filename, data)))
+
+    def test_get_lexer_class_without_match(self) -> None:
+        """Testing LexerIndex.get_lexer_class with no matching lexers"""
+        self.assertIsNone(self.index.get_lexer_class('file.xyz123', 'test'))
+
+    def test_get_lexer_class_with_single_match(self) -> None:
+        """Testing LexerIndex.get_lexer_class with a single matching lexer
+        ignores content
+        """
+        self.assertIs(
+            self.index.get_lexer_class('file.md',
+                                       '#!/usr/bin/env python\nimport os\n'),
+            MarkdownLexer)
+
+    def test_get_lexer_class_analyzes_bounded_text(self) -> None:
+        """Testing LexerIndex.get_lexer_class only analyzes a prefix of the
+        content
+        """
+        objc_data = '@interface Foo : NSObject\n@end\n'
+
+        self.assertIs(
+            self.index.get_lexer_class('file.m', f'% comment\n{objc_data}'),
+            ObjectiveCLexer)
+        self.assertIs(
+            self.index.get_lexer_class(
+                'file.m',
+                '%s%s' % ('% comment\n' * lexers.MAX_ANALYZED_TEXT_LENGTH,
+                          objc_data)),
+            MatlabLexer)
+
+
+class GetLexerForFilenameTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.lexers.get_lexer_for_filename.
+    """
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        reset_lexer_lookup_stats()
+
+    def test_with_guessed_lexer(self) -> None:
+        """Testing get_lexer_for_filename with a guessed lexer"""
+        lexer = get_lexer_for_filename('file.md', 'This is **bold**\n',
+                                       custom_lexers={},
+                                       stripnl=False)
+
+        self.assertIsInstance(lexer, MarkdownLexer)
+        self.assertFalse(lexer.stripnl)
+
+    def test_with_custom_lexer(self) -> None:
+        """Testing get_lexer_for_filename with a custom lexer"""
+        lexer = get_lexer_for_filename('file.md', 'This is **bold**\n',
+                                       custom_lexers={'.md': 'Python'})
+
+        self.assertIsInstance(lexer, PythonLexer)
+
+    def test_with_bad_custom_lexer(self) -> None:
+        """Testing get_lexer_for_filename with a custom lexer that doesn't
+        exist
+        """
+        with self.assertLogs(lexers.logger) as captured:
+            lexer = get_lexer_for_filename(
+                'file.md', 'This is **bold**\n',
+                custom_lexers={'.md': 'NonExistentClass'})
+
+        self.assertIsInstance(lexer, MarkdownLexer)
+        self.assertEqual(
+            captured.records[0].getMessage(),
+            'Pygments lexer "NonExistentClass" for ".md" files in Diff '
+            'Viewer Settings was not found.')
+
+    def test_without_lexer(self) -> None:
+        """Testing get_lexer_for_filename without a matching lexer"""
+        self.assertIsNone(get_lexer_for_filename('file.xyz123', 'test',
+                                                 custom_lexers={}))
+
+    def test_records_stats(self) -> None:
+        """Testing get_lexer_for_filename records lookup statistics"""
+        get_lexer_for_filename('file.md', 'test', custom_lexers={})
+        get_lexer_for_filename('file.xyz123', 'test', custom_lexers={})
+
+        stats = get_lexer_lookup_stats()
+
+        self.assertEqual(stats['num_lookups'], 2)
+        self.assertGreater(stats['total_secs'], 0)
+        self.assertGreaterEqual(stats['total_secs'], stats['max_secs'])
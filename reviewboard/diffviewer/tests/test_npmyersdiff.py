@@ -0,0 +1,202 @@
+"""Unit tests for NumPyMyersDiffer."""
+
+from __future__ import annotations
+
+import random
+
+from reviewboard.diffviewer.differ import DiffCompatVersion, get_differ
+from reviewboard.diffviewer.myersdiff import MyersDiffer
+from reviewboard.diffviewer.npmyersdiff import (NumPyMyersDiffer,
+                                                is_numpy_differ_available)
+from reviewboard.testing import TestCase
+
+
+class NumPyMyersDifferTests(TestCase):
+    """Unit tests for NumPyMyersDiffer."""
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        if not is_numpy_differ_available():
+            self.skipTest('NumPy is not installed')
+
+    def test_get_differ(self) -> None:
+        """Testing get_differ returns NumPyMyersDiffer"""
+        self.assertIsInstance(get_differ(['a\n'], ['b\n']), NumPyMyersDiffer)
+
+    def test_get_differ_with_accelerated_false(self) -> None:
+        """Testing get_differ with accelerated=False returns MyersDiffer"""
+        differ = get_differ(['a\n'], ['b\n'], accelerated=False)
+
+        self.assertIs(type(differ), MyersDiffer)
+
+    def test_matches_myers_differ_with_scattered_changes(self) -> None:
+        """Testing NumPyMyersDiffer matches MyersDiffer with scattered
+        changes
+        """
+        rng = random.Random(1)
+
+        for num_lines, edit_rate in ((2000, 0.01),
+                                     (2000, 0.6),
+                                     (5000, 0.3),
+                                     (10000, 0.1)):
+            a, b = self._make_scattered_changes(rng=rng,
+                                                num_lines=num_lines,
+                                                edit_rate=edit_rate)
+            self._check_matches(a, b)
+
+    def test_matches_myers_differ_with_changed_blocks(self) -> None:
+        """Testing NumPyMyersDiffer matches MyersDiffer with large changed
+        blocks
+        """
+        rng = random.Random(2)
+
+        for vocab_size in (10, 100000):
+            a, b = self._make_changed_blocks(rng=rng,
+                                             num_blocks=10,
+                                             vocab_size=vocab_size)
+            self._check_matches(a, b)
+
+    def test_matches_myers_differ_with_ignore_space(self) -> None:
+        """Testing NumPyMyersDiffer matches MyersDiffer with ignore_space=True
+        """
+        rng = random.Random(3)
+        a, b = self._make_scattered_changes(rng=rng,
+                                            num_lines=2000,
+                                            edit_rate=0.2)
+        b = [
+            line.replace(' ', '  ')
+            for line in b
+        ]
+
+        self._check_matches(a, b, ignore_space=True)
+
+    def _check_matches(
+        self,
+        a: list[str],
+        b: list[str],
+        ignore_space: bool = False,
+    ) -> None:
+        """Check that both differs produce the same opcodes.
+
+        This is checked for every Myers-based compatibility version.
+
+        Args:
+            a (list of str):
+                The original lines.
+
+            b (list of str):
+                The modified lines.
+
+            ignore_space (bool, optional):
+                Whether to ignore whitespace.
+
+        Raises:
+            AssertionError:
+                The opcodes did not match.
+        """
+        for compat_version in DiffCompatVersion.MYERS_VERSIONS:
+            expected = list(MyersDiffer(
+                a, b,
+                ignore_space=ignore_space,
+                compat_version=compat_version).get_opcodes())
+            result = list(NumPyMyersDiffer(
+                a, b,
+                ignore_space=ignore_space,
+                compat_version=compat_version).get_opcodes())
+
+            self.assertEqual(result, expected)
+
+    def _make_scattered_changes(
+        self,
+        *,
+        rng: random.Random,
+        num_lines: int,
+        edit_rate: float,
+    ) -> tuple[list[str], list[str]]:
+        """Return files with changes scattered throughout.
+
+        Args:
+            rng (random.Random):
+                The random number generator to use.
+
+            num_lines (int):
+                The number of lines in the original file.
+
+            edit_rate (float):
+                The fraction of lines to change.
+
+        Returns:
+            tuple:
+            A 2-tuple of the original and modified lines.
+        """
+        vocab_size = num_lines // 3
+        a = [
+            f'line {rng.randrange(vocab_size)}\n'
+            for i in range(num_lines)
+        ]
+        b: list[str] = []
+
+        for line in a:
+            r = rng.random()
+
+            if r < edit_rate / 3:
+                # Delete the line.
+                continue
+            elif r < edit_rate * 2 / 3:
+                b.append(f'changed {rng.randrange(vocab_size)}\n')
+            elif r < edit_rate:
+                b.append(line)
+                b += [
+                    f'inserted {rng.randrange(vocab_size)}\n'
+                    for i in range(rng.randrange(1, 5))
+                ]
+            else:
+                b.append(line)
+
+        return a, b
+
+    def _make_changed_blocks(
+        self,
+        *,
+        rng: random.Random,
+        num_blocks: int,
+        vocab_size: int,
+    ) -> tuple[list[str], list[str]]:
+        """Return files with large changed blocks between common lines.
+
+        Args:
+            rng (random.Random):
+                The random number generator to use.
+
+            num_blocks (int):
+                The number of changed blocks.
+
+            vocab_size (int):
+                The number of distinct lines in the changed blocks.
+
+        Returns:
+            tuple:
+            A 2-tuple of the original and modified lines.
+        """
+        a: list[str] = []
+        b: list[str] = []
+
+        for i in range(num_blocks):
+            common = [
+                f'common {rng.randrange(100000)}\n'
+                for j in range(rng.randrange(1, 80))
+            ]
+            a += common
+            b += common
+            a += [
+                f'block {rng.randrange(vocab_size)}\n'
+                for j in range(rng.randrange(300))
+            ]
+            b += [
+                f'block {rng.randrange(vocab_size)}\n'
+                for j in range(rng.randrange(300))
+            ]
+
+        return a, b
@@ -0,0 +1,226 @@
+"""Unit tests for reviewboard.diffviewer.patcher."""
+
+from __future__ import annotations
+
+from reviewboard.diffviewer.patcher import (apply_patch,
+                                            parse_hunks,
+                                            split_patch_lines)
+from reviewboard.testing import TestCase
+
+
+class ApplyPatchTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.patcher.apply_patch."""
+
+    ORIG_FILE = b''.join(
+        b'line %d\n' % i
+        for i in range(1, 21)
+    )
+
+    def test_with_exact_match(self) -> None:
+        """Testing apply_patch with hunks matching at their listed lines"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -2,3 +2,4 @@\n'
+            b' line 2\n'
+            b' line 3\n'
+            b'+new line\n'
+            b' line 4\n'
+            b'@@ -15,3 +16,2 @@\n'
+            b' line 15\n'
+            b'-line 16\n'
+            b' line 17\n'
+        )
+
+        self.assertEqual(
+            apply_patch(diff=diff, orig_file=self.ORIG_FILE),
+            self.ORIG_FILE
+            .replace(b'line 3\n', b'line 3\nnew line\n')
+            .replace(b'line 16\n', b''))
+
+    def test_with_offset(self) -> None:
+        """Testing apply_patch with a hunk matching at an offset"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -5,3 +5,3 @@\n'
+            b' line 10\n'
+            b'-line 11\n'
+            b'+changed line\n'
+            b' line 12\n'
+        )
+
+        self.assertEqual(
+            apply_patch(diff=diff, orig_file=self.ORIG_FILE),
+            self.ORIG_FILE.replace(b'line 11\n', b'changed line\n'))
+
+    def test_with_fuzz(self) -> None:
+        """Testing apply_patch with a hunk needing fuzz to match"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -7,7 +7,7 @@\n'
+            b' outdated context\n'
+            b' line 8\n'
+            b' line 9\n'
+            b'-line 10\n'
+            b'+changed line\n'
+            b' line 11\n'
+            b' line 12\n'
+            b' line 13\n'
+        )
+
+        # The fuzzed context line is taken from the file, not the diff.
+        self.assertEqual(
+            apply_patch(diff=diff, orig_file=self.ORIG_FILE),
+            self.ORIG_FILE.replace(b'line 10\n', b'changed line\n'))
+
+    def test_with_no_newline_markers(self) -> None:
+        """Testing apply_patch with "No newline at end of file" markers"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -1,2 +1,2 @@\n'
+            b' line 1\n'
+            b'-line 2\n'
+            b'\\ No newline at end of file\n'
+            b'+changed line\n'
+        )
+
+        self.assertEqual(
+            apply_patch(diff=diff, orig_file=b'line 1\nline 2'),
+            b'line 1\nchanged line\n')
+
+    def test_with_new_file(self) -> None:
+        """Testing apply_patch with a newly-created file"""
+        diff = (
+            b'--- /dev/null\n'
+            b'+++ README\n'
+            b'@@ -0,0 +1,2 @@\n'
+            b'+line 1\n'
+            b'+line 2\n'
+        )
+
+        self.assertEqual(apply_patch(diff=diff, orig_file=b''),
+                         b'line 1\nline 2\n')
+
+    def test_with_rejected_hunk(self) -> None:
+        """Testing apply_patch with a hunk that doesn't apply"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -5,3 +5,3 @@\n'
+            b' line 5\n'
+            b'-missing line\n'
+            b'+changed line\n'
+            b' line 7\n'
+        )
+
+        self.assertIsNone(apply_patch(diff=diff, orig_file=self.ORIG_FILE))
+
+    def test_with_reversed_patch(self) -> None:
+        """Testing apply_patch with a previously-applied patch"""
+        diff = (
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -5,3 +5,3 @@\n'
+            b' line 4\n'
+            b'-old line\n'
+            b'+line 5\n'
+            b' line 6\n'
+        )
+
+        self.assertIsNone(apply_patch(diff=diff, orig_file=self.ORIG_FILE))
+
+    def test_with_garbage(self) -> None:
+        """Testing apply_patch with a diff containing no hunks"""
+        self.assertIsNone(apply_patch(diff=b'This is not a diff.\n',
+                                      orig_file=self.ORIG_FILE))
+
+    def test_with_deleted_file(self) -> None:
+        """Testing apply_patch with a deleted file"""
+        diff = (
+            b'--- README\n'
+            b'+++ /dev/null\n'
+            b'@@ -1,2 +0,0 @@\n'
+            b'-line 1\n'
+            b'-line 2\n'
+        )
+
+        self.assertIsNone(apply_patch(diff=diff,
+                                      orig_file=b'line 1\nline 2\n'))
+
+
+class ParseHunksTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.patcher.parse_hunks."""
+
+    def test_parse_hunks(self) -> None:
+        """Testing parse_hunks"""
+        hunks = parse_hunks(
+            b'diff --git a/README b/README\n'
+            b'--- a/README\n'
+            b'+++ b/README\n'
+            b'@@ -1,3 +1,3 @@\n'
+            b' line 1\n'
+            b'-line 2\n'
+            b'+new line 2\n'
+            b'\n'
+            b'@@ -10 +10,2 @@\n'
+            b' line 10\n'
+            b'+line 11\n'
+        )
+
+        assert hunks is not None
+        self.assertEqual(len(hunks), 2)
+
+        hunk = hunks[0]
+        self.assertEqual(hunk.orig_first, 1)
+        self.assertEqual(hunk.pattern, [b'line 1\n', b'line 2\n', b'\n'])
+        self.assertEqual(hunk.prefix_context, 1)
+        self.assertEqual(hunk.suffix_context, 1)
+
+        hunk = hunks[1]
+        self.assertEqual(hunk.orig_first, 10)
+        self.assertEqual(hunk.pattern, [b'line 10\n'])
+        self.assertEqual(hunk.prefix_context, 1)
+        self.assertEqual(hunk.suffix_context, 0)
+
+    def test_parse_hunks_with_truncated_hunk(self) -> None:
+        """Testing parse_hunks with a truncated hunk"""
+        self.assertIsNone(parse_hunks(
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -1,3 +1,3 @@\n'
+            b' line 1\n'
+            b'-line 2\n'
+        ))
+
+    def test_parse_hunks_with_trailing_file(self) -> None:
+        """Testing parse_hunks with a second file's diff following the hunks
+        """
+        self.assertIsNone(parse_hunks(
+            b'--- README\n'
+            b'+++ README\n'
+            b'@@ -1 +1 @@\n'
+            b'-line 1\n'
+            b'+line 2\n'
+            b'--- README2\n'
+            b'+++ README2\n'
+            b'@@ -1 +1 @@\n'
+            b'-line 1\n'
+            b'+line 2\n'
+        ))
+
+
+class SplitPatchLinesTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.patcher.split_patch_lines."""
+
+    def test_split_patch_lines(self) -> None:
+        """Testing split_patch_lines"""
+        self.assertEqual(split_patch_lines(b'a\nb\x0c\r\nc'),
+                         [b'a\n', b'b\x0c\r\n', b'c'])
+
+    def test_split_patch_lines_with_trailing_newline(self) -> None:
+        """Testing split_patch_lines with a trailing newline"""
+        self.assertEqual(split_patch_lines(b'a\nb\n'),
+                         [b'a\n', b'b\n'])
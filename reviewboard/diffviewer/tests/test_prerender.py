@@ -0,0 +1,189 @@
+"""Unit tests for reviewboard.diffviewer.prerender."""
+
+from __future__ import annotations
+
+import kgb
+
+from reviewboard.diffviewer import prerender
+from reviewboard.diffviewer.diffutils import populate_diff_chunks
+from reviewboard.diffviewer.models import DiffSetPrerenderJob
+from reviewboard.diffviewer.prerender import (get_prerender_queue_stats,
+                                              prerender_diffset,
+                                              process_prerender_jobs,
+                                              queue_diffset_prerender)
+from reviewboard.reviews.signals import review_request_diffset_uploaded
+from reviewboard.testing import TestCase
+
+
+class QueueDiffSetPrerenderTests(kgb.SpyAgency, TestCase):
+    """Unit tests for reviewboard.diffviewer.prerender.
+    queue_diffset_prerender.
+    """
+
+    fixtures = ['test_scmtools']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.diffset = self.create_diffset(
+            repository=self.create_repository())
+
+    def test_with_disabled(self) -> None:
+        """Testing queue_diffset_prerender with pre-rendering disabled"""
+        self.spy_on(prerender._submit_local_prerender, call_original=False)
+
+        with self.siteconfig_settings({'diffviewer_prerender_mode':
+                                       'disabled'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_diffset_prerender(self.diffset)
+
+        self.assertFalse(DiffSetPrerenderJob.objects.exists())
+        self.assertSpyNotCalled(prerender._submit_local_prerender)
+
+    def test_with_local(self) -> None:
+        """Testing queue_diffset_prerender with local pre-rendering"""
+        self.spy_on(prerender._submit_local_prerender, call_original=False)
+
+        with self.siteconfig_settings({'diffviewer_prerender_mode': 'local'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_diffset_prerender(self.diffset)
+
+        self.assertFalse(DiffSetPrerenderJob.objects.exists())
+        self.assertSpyCalledWith(prerender._submit_local_prerender,
+                                 self.diffset.pk)
+
+    def test_with_worker(self) -> None:
+        """Testing queue_diffset_prerender with worker pre-rendering"""
+        with self.siteconfig_settings({'diffviewer_prerender_mode':
+                                       'worker'}):
+            queue_diffset_prerender(self.diffset)
+            queue_diffset_prerender(self.diffset)
+
+        self.assertQuerySetEqual(
+            DiffSetPrerenderJob.objects.values_list('diffset', flat=True),
+            [self.diffset.pk])
+
+    def test_on_diffset_uploaded(self) -> None:
+        """Testing pre-rendering is queued when a diffset is uploaded"""
+        with self.siteconfig_settings({'diffviewer_prerender_mode':
+                                       'worker'}):
+            review_request_diffset_uploaded.send(
+                sender=self.__class__,
+                diffset=self.diffset,
+                review_request_draft=None)
+
+        self.assertTrue(DiffSetPrerenderJob.objects.filter(
+            diffset=self.diffset).exists())
+
+
+class PrerenderDiffSetTests(kgb.SpyAgency, TestCase):
+    """Unit tests for reviewboard.diffviewer.prerender.prerender_diffset."""
+
+    fixtures = ['test_scmtools']
+
+    def test_prerender_diffset(self) -> None:
+        """Testing prerender_diffset"""
+        diffset = self.create_diffset(repository=self.create_repository())
+        filediff1 = self.create_filediff(diffset,
+                                         source_file='/file1',
+                                         dest_file='/file1')
+        filediff2 = self.create_filediff(diffset,
+                                         source_file='/file2',
+                                         dest_file='/file2')
+
+        self.spy_on(populate_diff_chunks, call_original=False)
+
+        self.assertEqual(prerender_diffset(diffset), 2)
+        self.assertSpyCallCount(populate_diff_chunks, 2)
+        self.assertEqual(
+            {
+                call.args[0][0]['filediff']
+                for call in populate_diff_chunks.calls
+            },
+            {filediff1, filediff2})
+
+    def test_prerender_diffset_with_error(self) -> None:
+        """Testing prerender_diffset with an error rendering one file"""
+        diffset = self.create_diffset(repository=self.create_repository())
+        self.create_filediff(diffset,
+                             source_file='/file1',
+                             dest_file='/file1')
+        self.create_filediff(diffset,
+                             source_file='/file2',
+                             dest_file='/file2')
+
+        self.spy_on(populate_diff_chunks, op=kgb.SpyOpMatchInOrder([
+            {
+                'op': kgb.SpyOpRaise(Exception('Oh no')),
+            },
+            {
+                'call_original': False,
+            },
+        ]))
+
+        self.assertEqual(prerender_diffset(diffset), 1)
+        self.assertSpyCallCount(populate_diff_chunks, 2)
+
+
+class ProcessPrerenderJobsTests(kgb.SpyAgency, TestCase):
+    """Unit tests for reviewboard.diffviewer.prerender.process_prerender_jobs.
+    """
+
+    fixtures = ['test_scmtools']
+
+    def test_process_prerender_jobs(self) -> None:
+        """Testing process_prerender_jobs"""
+        repository = self.create_repository()
+        diffset1 = self.create_diffset(repository=repository)
+        diffset2 = self.create_diffset(repository=repository, revision=2)
+        DiffSetPrerenderJob.objects.create(diffset=diffset1)
+        DiffSetPrerenderJob.objects.create(diffset=diffset2)
+
+        self.spy_on(prerender_diffset, call_original=False)
+
+        self.assertEqual(process_prerender_jobs(concurrency=1), 2)
+        self.assertFalse(DiffSetPrerenderJob.objects.exists())
+        self.assertEqual(
+            [
+                call.args[0]
+                for call in prerender_diffset.calls
+            ],
+            [diffset1, diffset2])
+
+    def test_process_prerender_jobs_with_max_jobs(self) -> None:
+        """Testing process_prerender_jobs with max_jobs"""
+        repository = self.create_repository()
+        diffset1 = self.create_diffset(repository=repository)
+        diffset2 = self.create_diffset(repository=repository, revision=2)
+        DiffSetPrerenderJob.objects.create(diffset=diffset1)
+        DiffSetPrerenderJob.objects.create(diffset=diffset2)
+
+        self.spy_on(prerender_diffset, call_original=False)
+
+        self.assertEqual(process_prerender_jobs(concurrency=1, max_jobs=1), 1)
+        self.assertSpyCalledWith(prerender_diffset, diffset1)
+        self.assertQuerySetEqual(
+            DiffSetPrerenderJob.objects.values_list('diffset', flat=True),
+            [diffset2.pk])
+
+
+class GetPrerenderQueueStatsTests(TestCase):
+    """Unit tests for reviewboard.diffviewer.prerender.
+    get_prerender_queue_stats.
+    """
+
+    fixtures = ['test_scmtools']
+
+    def test_get_prerender_queue_stats(self) -> None:
+        """Testing get_prerender_queue_stats"""
+        job = DiffSetPrerenderJob.objects.create(
+            diffset=self.create_diffset(repository=self.create_repository()))
+
+        self.assertEqual(
+            get_prerender_queue_stats(),
+            {
+                'local_pending': 0,
+                'oldest_queued': job.queued,
+                'queued_jobs': 1,
+            })
@@ -1,9 +1,14 @@
-from reviewboard.diffviewer.chunk_generator import RawDiffChunkGenerator
+import kgb
+from django.core.cache import cache
+from djblets.cache.backend import make_cache_key
+
+from reviewboard.diffviewer.chunk_generator import (NoWrapperHtmlFormatter,
+                                                    RawDiffChunkGenerator)
 from reviewboard.diffviewer.settings import DiffSettings
 from reviewboard.testing import TestCase
 
 
-class RawDiffChunkGeneratorTests(TestCase):
+class RawDiffChunkGeneratorTests(kgb.SpyAgency, TestCase):
     """Unit tests for RawDiffChunkGenerator."""
 
     @property
@@ -502,6 +507,190 @@ class RawDiffChunkGeneratorTests(TestCase):
             },
         })
 
+    def test_get_chunks_twice(self):
+        """Testing RawDiffChunkGenerator.get_chunks called twice on the same
+        generator
+        """
+        generator = self._create_segmented_generator()
+
+        self.assertEqual(list(generator.get_chunks()),
+                         list(generator.get_chunks()))
+
+    def test_get_chunks_with_cache_key(self):
+        """Testing RawDiffChunkGenerator.get_chunks with cache_key stores
+        chunks in segments
+        """
+        generator = self._create_segmented_generator()
+        expected_chunks = list(generator.get_chunks_uncached())
+
+        self.assertEqual(list(generator.get_chunks(cache_key='test-key')),
+                         expected_chunks)
+
+        # There should be several segments, and the chunks should now be
+        # loaded entirely from the cache.
+        self.assertTrue(cache.has_key(make_cache_key('test-key-segment-0')))
+        self.assertTrue(cache.has_key(make_cache_key('test-key-segment-1')))
+
+        generator = self._create_segmented_generator()
+        self.spy_on(generator.get_chunks_uncached)
+
+        self.assertEqual(list(generator.get_chunks(cache_key='test-key')),
+                         expected_chunks)
+        self.assertSpyNotCalled(generator.get_chunks_uncached)
+
+    def test_get_chunks_with_cache_key_and_single_segment(self):
+        """Testing RawDiffChunkGenerator.get_chunks with cache_key and chunks
+        fitting in a single segment
+        """
+        generator = self._create_segmented_generator()
+        generator.CACHE_SEGMENT_NUM_LINES = 1000
+        expected_chunks = list(generator.get_chunks_uncached())
+
+        self.assertEqual(list(generator.get_chunks(cache_key='test-key')),
+                         expected_chunks)
+        self.assertFalse(cache.has_key(make_cache_key('test-key-segment-0')))
+
+    def test_get_chunks_with_cache_key_and_evicted_segment(self):
+        """Testing RawDiffChunkGenerator.get_chunks with cache_key and a
+        segment evicted from the cache
+        """
+        generator = self._create_segmented_generator()
+        expected_chunks = list(generator.get_chunks(cache_key='test-key'))
+
+        cache.delete(make_cache_key('test-key-segment-1'))
+
+        generator = self._create_segmented_generator()
+        self.spy_on(generator.get_chunks_uncached)
+
+        self.assertEqual(list(generator.get_chunks(cache_key='test-key')),
+                         expected_chunks)
+        self.assertSpyCallCount(generator.get_chunks_uncached, 1)
+        self.assertTrue(cache.has_key(make_cache_key('test-key-segment-1')))
+
+    def test_get_chunks_in_line_range(self):
+        """Testing RawDiffChunkGenerator.get_chunks_in_line_range"""
+        generator = self._create_segmented_generator()
+        all_chunks = list(generator.get_chunks_uncached())
+
+        self.assertEqual(
+            list(generator.get_chunks_in_line_range(first_line=30,
+                                                    last_line=45)),
+            [
+                chunk
+                for chunk in all_chunks
+                if (chunk['lines'][0][0] <= 45 and
+                    chunk['lines'][-1][0] >= 30)
+            ])
+
+    def test_get_chunks_in_line_range_with_cache_key(self):
+        """Testing RawDiffChunkGenerator.get_chunks_in_line_range with
+        cache_key only loads the needed segments
+        """
+        generator = self._create_segmented_generator()
+        all_chunks = list(generator.get_chunks(cache_key='test-key'))
+
+        generator = self._create_segmented_generator()
+        self.spy_on(generator.get_chunks_uncached)
+
+        chunks = list(generator.get_chunks_in_line_range(
+            first_line=30,
+            last_line=45,
+            cache_key='test-key'))
+
+        self.assertEqual(
+            chunks,
+            [
+                chunk
+                for chunk in all_chunks
+                if (chunk['lines'][0][0] <= 45 and
+                    chunk['lines'][-1][0] >= 30)
+            ])
+        self.assertSpyNotCalled(generator.get_chunks_uncached)
+        self.assertEqual(set(generator._loaded_segments), {1, 2})
+
+    def test_get_last_line_number(self):
+        """Testing RawDiffChunkGenerator.get_last_line_number"""
+        generator = self._create_segmented_generator()
+
+        self.assertEqual(generator.get_last_line_number(), 100)
+        self.assertEqual(generator.get_last_line_number(cache_key='test-key'),
+                         100)
+
+    def test_get_last_line_number_without_chunks(self):
+        """Testing RawDiffChunkGenerator.get_last_line_number without chunks
+        """
+        self.assertIsNone(self.generator.get_last_line_number())
+        self.assertIsNone(
+            self.generator.get_last_line_number(cache_key='test-key'))
+
+    def test_generate_chunks_with_multiline_tokens(self):
+        """Testing RawDiffChunkGenerator.generate_chunks with syntax
+        highlighting and tokens spanning several lines
+        """
+        old = (
+            b'"""A docstring.\n'
+            b'\n'
+            b'It spans several lines.\n'
+            b'"""\n'
+            b'\n'
+            b'x = 1\n'
+        )
+        new = old.replace(b'x = 1', b'x = 2')
+
+        generator = RawDiffChunkGenerator(
+            old=old,
+            new=new,
+            orig_filename='file.py',
+            modified_filename='file.py',
+            diff_settings=DiffSettings.create(syntax_highlighting=True))
+        chunks = list(generator.get_chunks())
+
+        expected_markup = generator._apply_pygments(data=old.decode(),
+                                                    filename='file.py')
+
+        self.assertEqual(
+            [
+                line[2]
+                for chunk in chunks
+                for line in chunk['lines']
+            ],
+            expected_markup)
+        self.assertEqual(chunks[0]['lines'][2][2],
+                         '<span class="sd">It spans several lines.</span>')
+
+    def test_get_chunks_with_cached_highlighting(self):
+        """Testing RawDiffChunkGenerator.get_chunks reuses syntax-highlighted
+        files cached by a previous render
+        """
+        self.spy_on(NoWrapperHtmlFormatter.iter_lines,
+                    owner=NoWrapperHtmlFormatter)
+
+        old = b''.join(
+            b'x%d = %d\n' % (i, i)
+            for i in range(10)
+        )
+        new = old.replace(b'x9 = 9', b'x9 = 10')
+        expected_chunks = None
+
+        for i in range(2):
+            generator = RawDiffChunkGenerator(
+                old=old,
+                new=new,
+                orig_filename='file.py',
+                modified_filename='file.py',
+                diff_settings=DiffSettings.create(syntax_highlighting=True))
+            generator.CACHE_SEGMENT_NUM_LINES = 3
+            chunks = list(generator.get_chunks())
+
+            if expected_chunks is None:
+                expected_chunks = chunks
+            else:
+                self.assertEqual(chunks, expected_chunks)
+
+            # The old and new files are only highlighted by the first
+            # render.
+            self.assertSpyCallCount(NoWrapperHtmlFormatter.iter_lines, 2)
+
     def test_apply_pygments_with_lexer(self):
         """Testing RawDiffChunkGenerator._apply_pygments with valid lexer"""
         chunk_generator = RawDiffChunkGenerator(
@@ -515,6 +704,109 @@ class RawDiffChunkGeneratorTests(TestCase):
                                             filename='test.md'),
             ['This is <span class="gs">**bold**</span>'])
 
+    def test_apply_pygments_with_cached_result(self):
+        """Testing RawDiffChunkGenerator._apply_pygments shares cached results
+        between generators for the same content
+        """
+        self.spy_on(NoWrapperHtmlFormatter.iter_lines,
+                    owner=NoWrapperHtmlFormatter)
+
+        for filename in ('file1.md', 'file2.md'):
+            chunk_generator = RawDiffChunkGenerator(
+                old=[],
+                new=[],
+                orig_filename=filename,
+                modified_filename=filename,
+                diff_settings=DiffSettings.create())
+
+            self.assertEqual(
+                chunk_generator._apply_pygments(data='This is **bold**\n',
+                                                filename=filename),
+                ['This is <span class="gs">**bold**</span>'])
+
+        self.assertSpyCallCount(NoWrapperHtmlFormatter.iter_lines, 1)
+
+    def test_apply_pygments_with_cached_segments(self):
+        """Testing RawDiffChunkGenerator._apply_pygments caches highlighted
+        files in segments
+        """
+        self.spy_on(NoWrapperHtmlFormatter.iter_lines,
+                    owner=NoWrapperHtmlFormatter)
+
+        chunk_generator = self.generator
+        chunk_generator.CACHE_SEGMENT_NUM_LINES = 2
+        data = ''.join(
+            'Line **%s**\n' % i
+            for i in range(5)
+        )
+        expected = [
+            'Line <span class="gs">**%s**</span>' % i
+            for i in range(5)
+        ]
+
+        self.assertEqual(
+            chunk_generator._apply_pygments(data=data, filename='test.md'),
+            expected)
+
+        lexer = chunk_generator._get_pygments_lexer(data, 'test.md')
+        cache_key = chunk_generator._make_highlight_cache_key(data, lexer)
+        self.assertEqual(cache.get(make_cache_key(cache_key)), 3)
+
+        self.assertEqual(
+            chunk_generator._apply_pygments(data=data, filename='test.md'),
+            expected)
+        self.assertSpyCallCount(NoWrapperHtmlFormatter.iter_lines, 1)
+
+    def test_apply_pygments_with_evicted_segment(self):
+        """Testing RawDiffChunkGenerator._apply_pygments with a cached
+        segment evicted
+        """
+        self.spy_on(NoWrapperHtmlFormatter.iter_lines,
+                    owner=NoWrapperHtmlFormatter)
+
+        chunk_generator = self.generator
+        chunk_generator.CACHE_SEGMENT_NUM_LINES = 2
+        data = ''.join(
+            'Line **%s**\n' % i
+            for i in range(5)
+        )
+        expected = [
+            'Line <span class="gs">**%s**</span>' % i
+            for i in range(5)
+        ]
+
+        chunk_generator._apply_pygments(data=data, filename='test.md')
+
+        lexer = chunk_generator._get_pygments_lexer(data, 'test.md')
+        cache_key = chunk_generator._make_highlight_cache_key(data, lexer)
+        cache.delete(make_cache_key(
+            chunk_generator._make_segment_cache_key(cache_key, 1)))
+
+        self.assertEqual(
+            chunk_generator._apply_pygments(data=data, filename='test.md'),
+            expected)
+        self.assertSpyCallCount(NoWrapperHtmlFormatter.iter_lines, 2)
+
+    def test_apply_pygments_with_cached_result_and_different_lexer(self):
+        """Testing RawDiffChunkGenerator._apply_pygments doesn't share cached
+        results between different lexers
+        """
+        self.spy_on(NoWrapperHtmlFormatter.iter_lines,
+                    owner=NoWrapperHtmlFormatter)
+
+        chunk_generator = self.generator
+
+        self.assertEqual(
+            chunk_generator._apply_pygments(data='This is **bold**\n',
+                                            filename='test.md'),
+            ['This is <span class="gs">**bold**</span>'])
+        self.assertNotEqual(
+            chunk_generator._apply_pygments(data='This is **bold**\n',
+                                            filename='test.py'),
+            ['This is <span class="gs">**bold**</span>'])
+
+        self.assertSpyCallCount(NoWrapperHtmlFormatter.iter_lines, 2)
+
     def test_apply_pygments_without_lexer(self):
         """Testing RawDiffChunkGenerator._apply_pygments without valid lexer"""
         chunk_generator = RawDiffChunkGenerator(
@@ -904,3 +1196,32 @@ class RawDiffChunkGeneratorTests(TestCase):
                     'warnings': {'bidi', 'zws'},
                 }),
             ])
+
+    def _create_segmented_generator(self):
+        """Return a generator for a file with several segments of chunks.
+
+        The generated chunks will span 100 lines, stored in segments of
+        20 lines.
+
+        Returns:
+            reviewboard.diffviewer.chunk_generator.RawDiffChunkGenerator:
+            The new generator.
+        """
+        old = b''.join(
+            b'Line %d\n' % i
+            for i in range(100)
+        )
+        new = b''.join(
+            b'Line %d\n' % i if i % 10 else b'New line %d\n' % i
+            for i in range(100)
+        )
+
+        generator = RawDiffChunkGenerator(
+            old=old,
+            new=new,
+            orig_filename='file1',
+            modified_filename='file2',
+            diff_settings=DiffSettings.create())
+        generator.CACHE_SEGMENT_NUM_LINES = 20
+
+        return generator
@@ -1,10 +1,13 @@
 import bz2
+import zlib
+
+import kgb
 
 from reviewboard.diffviewer.models import RawFileDiffData
 from reviewboard.testing import TestCase
 
 
-class RawFileDiffDataManagerTests(TestCase):
+class RawFileDiffDataManagerTests(kgb.SpyAgency, TestCase):
     """Unit tests for RawFileDiffDataManager."""
 
     small_diff = (
@@ -48,8 +51,59 @@ class RawFileDiffDataManagerTests(TestCase):
         """Testing RawFileDiffDataManager.process_diff_data with large diff
         results in bzip2-compressed storage
         """
-        data, compression = \
-            RawFileDiffData.objects.process_diff_data(self.large_diff)
+        with self.siteconfig_settings({'diffviewer_compression': 'bzip2'},
+                                      reload_settings=False):
+            data, compression = \
+                RawFileDiffData.objects.process_diff_data(self.large_diff)
 
         self.assertEqual(data, bz2.compress(self.large_diff, 9))
         self.assertEqual(compression, RawFileDiffData.COMPRESSION_BZIP2)
+
+    def test_process_diff_data_large_diff_zlib(self):
+        """Testing RawFileDiffDataManager.process_diff_data with large diff
+        and zlib compression
+        """
+        with self.siteconfig_settings({'diffviewer_compression': 'zlib'},
+                                      reload_settings=False):
+            data, compression = \
+                RawFileDiffData.objects.process_diff_data(self.large_diff)
+
+        self.assertEqual(data, zlib.compress(self.large_diff, 9))
+        self.assertEqual(compression, RawFileDiffData.COMPRESSION_ZLIB)
+
+    def test_get_or_create_from_data_new(self):
+        """Testing RawFileDiffDataManager.get_or_create_from_data with new
+        data
+        """
+        self.spy_on(RawFileDiffData.objects.process_diff_data)
+
+        raw_file_diff_data, is_new = \
+            RawFileDiffData.objects.get_or_create_from_data(self.large_diff)
+
+        self.assertTrue(is_new)
+        self.assertIsNotNone(raw_file_diff_data.compression)
+        self.assertEqual(raw_file_diff_data.content, self.large_diff)
+        self.assertSpyCallCount(RawFileDiffData.objects.process_diff_data, 1)
+
+        raw_file_diff_data = RawFileDiffData.objects.get(
+            pk=raw_file_diff_data.pk)
+        self.assertEqual(raw_file_diff_data.content, self.large_diff)
+
+    def test_get_or_create_from_data_existing(self):
+        """Testing RawFileDiffDataManager.get_or_create_from_data with
+        existing data does not compress the data again
+        """
+        raw_file_diff_data = \
+            RawFileDiffData.objects.get_or_create_from_data(
+                self.large_diff)[0]
+
+        self.spy_on(RawFileDiffData.objects.process_diff_data)
+
+        with self.assertNumQueries(1):
+            existing, is_new = \
+                RawFileDiffData.objects.get_or_create_from_data(
+                    self.large_diff)
+
+        self.assertFalse(is_new)
+        self.assertEqual(existing, raw_file_diff_data)
+        self.assertSpyNotCalled(RawFileDiffData.objects.process_diff_data)
@@ -36,7 +36,8 @@ if TYPE_CHECKING:
     from reviewboard.hostingsvcs.base.paginator import BasePaginator
     from reviewboard.hostingsvcs.models import HostingServiceAccount
     from reviewboard.hostingsvcs.repository import RemoteRepository
-    from reviewboard.scmtools.core import Branch, Commit, SCMTool
+    from reviewboard.scmtools.core import (Branch, Commit, FileLookup,
+                                           FileResult, SCMTool)
     from reviewboard.scmtools.models import Repository
 
 
@@ -686,6 +687,109 @@ class BaseHostingService:
 
         return repository.get_scmtool().file_exists(path, revision, **kwargs)
 
+    def get_files(
+        self,
+        repository: Repository,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return the contents of several files.
+
+        If the hosting service doesn't override :py:meth:`get_file`, this
+        will fetch the files in one batch through the SCMTool. Otherwise,
+        each file is fetched in turn using :py:meth:`get_file`. Subclasses
+        can override this if their API can return several files at once.
+
+        An error fetching one file must not prevent the other files from
+        being fetched. Instead, the exception is returned in place of that
+        file's contents.
+
+        Version Added:
+            8.0
+
+        Args:
+            repository (reviewboard.scmtools.models.Repository):
+                The repository to retrieve the files from.
+
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+
+        Raises:
+            NotImplementedError:
+                If this hosting service does not support repositories.
+        """
+        if not self.supports_repositories:
+            raise NotImplementedError
+
+        if type(self).get_file is BaseHostingService.get_file:
+            return repository.get_scmtool().get_files(lookups)
+
+        results: list[FileResult] = []
+
+        for path, revision, context in lookups:
+            try:
+                results.append(self.get_file(
+                    repository,
+                    path,
+                    str(revision),
+                    base_commit_id=context and context.base_commit_id,
+                    context=context))
+            except Exception as e:
+                results.append(e)
+
+        return results
+
+    def get_files_exist(
+        self,
+        repository: Repository,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[bool]:
+        """Return whether several files exist in the repository.
+
+        If the hosting service doesn't override :py:meth:`get_file_exists`,
+        this will check the files in one batch through the SCMTool.
+        Otherwise, each file is checked in turn using
+        :py:meth:`get_file_exists`. Subclasses can override this if their API
+        can check several files at once.
+
+        Version Added:
+            8.0
+
+        Args:
+            repository (reviewboard.scmtools.models.Repository):
+                The repository to check for file existence.
+
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to check.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+
+        Raises:
+            NotImplementedError:
+                If this hosting service does not support repositories.
+        """
+        if not self.supports_repositories:
+            raise NotImplementedError
+
+        if type(self).get_file_exists is BaseHostingService.get_file_exists:
+            return repository.get_scmtool().files_exist(lookups)
+
+        return [
+            self.get_file_exists(
+                repository,
+                path,
+                str(revision),
+                base_commit_id=context and context.base_commit_id,
+                context=context)
+            for path, revision, context in lookups
+        ]
+
     def get_branches(
         self,
         repository: Repository,
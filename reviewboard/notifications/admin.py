@@ -1,8 +1,17 @@
-from django.utils.translation import gettext_lazy as _
+from datetime import timedelta
+
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.html import format_html_join
+from django.utils.translation import gettext, gettext_lazy as _
 
 from reviewboard.admin import ModelAdmin, admin_site
 from reviewboard.notifications.forms import WebHookTargetForm
-from reviewboard.notifications.models import WebHookTarget
+from reviewboard.notifications.models import (OutgoingEmail,
+                                              WebHookDelivery,
+                                              WebHookTarget)
+from reviewboard.notifications.webhook_delivery import \
+    get_webhook_delivery_stats
 
 
 class WebHookTargetAdmin(ModelAdmin):
@@ -28,6 +37,11 @@ class WebHookTargetAdmin(ModelAdmin):
                 'secret',
             ),
         }),
+        (_('Delivery'), {
+            'fields': (
+                'delivery_stats',
+            ),
+        }),
         (_('Advanced'), {
             'fields': (
                 'local_site',
@@ -37,6 +51,111 @@ class WebHookTargetAdmin(ModelAdmin):
         }),
     )
     raw_id_fields = ('local_site',)
+    readonly_fields = ('delivery_stats',)
+
+    @admin.display(description=_('Last 24 hours'))
+    def delivery_stats(self, obj):
+        """Return statistics on recent deliveries to the WebHook.
+
+        Version Added:
+            8.0
+
+        Args:
+            obj (reviewboard.notifications.models.WebHookTarget):
+                The WebHook being shown.
+
+        Returns:
+            django.utils.safestring.SafeString:
+            The HTML for the statistics.
+        """
+        if obj is None or obj.pk is None:
+            return ''
+
+        stats = get_webhook_delivery_stats(
+            target=obj,
+            since=timezone.now() - timedelta(days=1))
+        rows = [
+            (gettext('Delivered'), stats['delivered']),
+            (gettext('Failed'), stats['failed']),
+            (gettext('Pending'), stats['pending']),
+        ]
+
+        if stats['avg_latency_ms'] is not None:
+            rows += [
+                (gettext('Average latency'),
+                 '%d ms' % stats['avg_latency_ms']),
+                (gettext('Maximum latency'),
+                 '%d ms' % stats['max_latency_ms']),
+            ]
+
+        return format_html_join('', '<p>{}: {}</p>', rows)
+
+
+class WebHookDeliveryAdmin(ModelAdmin):
+    """Administration for the WebHook delivery log.
+
+    Version Added:
+        8.0
+    """
+
+    list_display = ('event', 'url', 'status', 'attempts', 'response_status',
+                    'latency_ms', 'created', 'completed')
+    list_filter = ('status', 'event')
+    date_hierarchy = 'created'
+    fields = ('target', 'event', 'url', 'status', 'attempts',
+              'response_status', 'latency_ms', 'last_error', 'created',
+              'next_attempt', 'completed')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        """Return whether deliveries can be added.
+
+        Deliveries are only created when WebHooks are dispatched.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+        Returns:
+            bool:
+            ``False``, always.
+        """
+        return False
+
+
+class OutgoingEmailAdmin(ModelAdmin):
+    """Administration for the e-mail outbox.
+
+    Version Added:
+        8.0
+    """
+
+    list_display = ('subject', 'status', 'attempts', 'queue_latency_ms',
+                    'created', 'sent')
+    list_filter = ('status',)
+    date_hierarchy = 'created'
+    search_fields = ('subject', 'message_id')
+    fields = ('subject', 'from_email', 'recipients', 'message_id', 'status',
+              'attempts', 'queue_latency_ms', 'last_error', 'created',
+              'next_attempt', 'sent', 'review_request', 'review')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        """Return whether messages can be added.
+
+        Messages are only created when e-mail is sent.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+        Returns:
+            bool:
+            ``False``, always.
+        """
+        return False
 
 
+admin_site.register(OutgoingEmail, OutgoingEmailAdmin)
 admin_site.register(WebHookTarget, WebHookTargetAdmin)
+admin_site.register(WebHookDelivery, WebHookDeliveryAdmin)
@@ -1,9 +1,12 @@
 """Review Board e-mail module."""
 
-from django.db.models.signals import post_delete
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from djblets.auth.signals import user_registered
 
+from reviewboard.accounts.models import Profile
 from reviewboard.notifications.email.signal_handlers import (
+    invalidate_group_recipients,
     send_reply_published_mail,
     send_review_published_mail,
     send_review_request_closed_mail,
@@ -15,10 +18,11 @@ from reviewboard.notifications.email.signal_handlers import (
     send_webapi_token_updated_mail)
 from reviewboard.notifications.email.hooks import (register_email_hook,
                                                    unregister_email_hook)
-from reviewboard.reviews.models import ReviewRequest, Review
+from reviewboard.reviews.models import Group, ReviewRequest, Review
 from reviewboard.reviews.signals import (review_request_published,
                                          review_published, reply_published,
                                          review_request_closed)
+from reviewboard.site.models import LocalSite
 from reviewboard.webapi.models import WebAPIToken
 from djblets.webapi.signals import (webapi_token_created,
                                     webapi_token_expired,
@@ -39,6 +43,14 @@ def connect_signals() -> None:
         (webapi_token_expired, send_webapi_token_expired_mail, WebAPIToken),
         (webapi_token_updated, send_webapi_token_updated_mail, WebAPIToken),
         (post_delete, send_webapi_token_deleted_mail, WebAPIToken),
+        (m2m_changed, invalidate_group_recipients, Group.users.through),
+        (m2m_changed, invalidate_group_recipients, LocalSite.users.through),
+        (m2m_changed, invalidate_group_recipients, LocalSite.admins.through),
+        (post_save, invalidate_group_recipients, Group),
+        (post_save, invalidate_group_recipients, Profile),
+        (post_save, invalidate_group_recipients, User),
+        (post_delete, invalidate_group_recipients, Group),
+        (post_delete, invalidate_group_recipients, User),
     ]
 
     for signal, handler, sender in signal_table:
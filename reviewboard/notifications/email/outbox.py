@@ -0,0 +1,806 @@
+"""Background sending of e-mail through a persistent outbox.
+
+By default, e-mail is sent from within the signal handler that triggered
+it, opening a new connection to the mail server for each message. When
+publishing to a large review group, this holds up the request on the mail
+server. Background sending instead stores each message in an
+:py:class:`~reviewboard.notifications.models.OutgoingEmail` outbox entry as
+part of the same transaction, and sends it afterward.
+
+Sending is controlled by the ``mail_delivery_mode`` site configuration
+setting, which can be one of the following
+:py:class:`~reviewboard.background.BackgroundMode` values:
+
+``sync``:
+    E-mail is sent immediately, without being stored. This is the default,
+    and is what unit tests use.
+
+``local``:
+    E-mail is sent by a background thread in the web server process once
+    the transaction commits. Messages that need to be retried are sent the
+    next time e-mail is queued by the process, or by the
+    :command:`send-queued-email` management command.
+
+``worker``:
+    E-mail is sent by the :command:`send-queued-email` management command,
+    which can be run on a schedule or left running with ``--watch``.
+
+Queued messages are sent one after another over a single connection to the
+mail server, which is kept open while there's mail to send. This works
+with Amazon SES as well, with the Message IDs assigned by SES being stored
+just as they would when sending immediately.
+
+Bursts of e-mail for the same review request are coalesced: once a message
+is queued for a review request, sending waits until no new messages have
+been queued for it for ``mail_delivery_coalesce_secs`` seconds (up to a
+limit), and then sends them all together, in order.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Optional, TYPE_CHECKING
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.background import (BackgroundMode,
+                                    BackgroundQueueStats,
+                                    LocalBackgroundRunner,
+                                    get_background_mode,
+                                    prune_finished_entries)
+from reviewboard.notifications.models import OutgoingEmail
+from reviewboard.reviews.models import Review, ReviewRequest
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.core.mail.backends.base import BaseEmailBackend
+
+    from reviewboard.notifications.email.message import EmailMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The maximum time a burst of e-mail for a review request can be held.
+MAX_COALESCE_DELAY_SECS = 60
+
+#: The delay before the first retry of a failed message, in seconds.
+#:
+#: This doubles with each attempt.
+RETRY_BASE_DELAY_SECS = 60
+
+#: The maximum delay between retries of a failed message, in seconds.
+RETRY_MAX_DELAY_SECS = 60 * 60
+
+#: How long a claimed message is reserved for the process sending it.
+CLAIM_LEASE_SECS = 5 * 60
+
+#: How long a mail server connection can sit idle before it's reopened.
+MAX_CONNECTION_IDLE_SECS = 30
+
+#: The number of queued messages to look at in each batch.
+BATCH_SIZE = 100
+
+
+class EmailOutboxStats(BackgroundQueueStats):
+    """Statistics on the e-mail outbox.
+
+    Version Added:
+        8.0
+    """
+
+    #: The average time messages waited before being sent, in milliseconds.
+    #:
+    #: Type:
+    #:     float
+    avg_queue_latency_ms: Optional[float]
+
+    #: The longest time a message waited before being sent, in milliseconds.
+    #:
+    #: Type:
+    #:     int
+    max_queue_latency_ms: Optional[int]
+
+    #: The number of messages that were sent.
+    #:
+    #: Type:
+    #:     int
+    sent: int
+
+
+class QueuedEmailMessage:
+    """A queued e-mail message, ready to be passed to an e-mail backend.
+
+    This provides the parts of :py:class:`django.core.mail.EmailMessage`
+    that e-mail backends use when sending, using the message as it was
+    generated when it was queued.
+
+    Version Added:
+        8.0
+    """
+
+    #: The encoding for addresses. The default encoding will be used.
+    encoding = None
+
+    def __init__(
+        self,
+        outgoing_email: OutgoingEmail,
+    ) -> None:
+        """Initialize the message.
+
+        Args:
+            outgoing_email (reviewboard.notifications.models.OutgoingEmail):
+                The queued message.
+        """
+        self.from_email = outgoing_email.from_email
+        self.message_id = outgoing_email.message_id
+        self.subject = outgoing_email.subject
+        self._recipients = list(outgoing_email.recipients)
+        self._data = bytes(outgoing_email.message_data)
+
+    def recipients(self) -> list[str]:
+        """Return the addresses to send the message to.
+
+        Returns:
+            list of str:
+            The recipient addresses.
+        """
+        return self._recipients
+
+    def message(self) -> _RawMessage:
+        """Return the generated message.
+
+        Returns:
+            _RawMessage:
+            The generated message.
+        """
+        return _RawMessage(self._data)
+
+
+class _RawMessage:
+    """A generated e-mail message that was stored for later sending.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+    ) -> None:
+        """Initialize the message.
+
+        Args:
+            data (bytes):
+                The message data, using ``\\n`` line endings.
+        """
+        self._data = data
+
+    def as_bytes(
+        self,
+        unixfrom: bool = False,
+        linesep: str = '\n',
+    ) -> bytes:
+        """Return the message data.
+
+        Args:
+            unixfrom (bool, optional):
+                Unused. This is here for API compatibility.
+
+            linesep (str, optional):
+                The line endings to use.
+
+        Returns:
+            bytes:
+            The message data.
+        """
+        if linesep == '\n':
+            return self._data
+
+        return self._data.replace(b'\n', linesep.encode('ascii'))
+
+    def as_string(
+        self,
+        unixfrom: bool = False,
+        linesep: str = '\n',
+    ) -> str:
+        """Return the message data as a string.
+
+        Args:
+            unixfrom (bool, optional):
+                Unused. This is here for API compatibility.
+
+            linesep (str, optional):
+                The line endings to use.
+
+        Returns:
+            str:
+            The message data.
+        """
+        return self.as_bytes(linesep=linesep).decode('utf-8', 'replace')
+
+
+class EmailConnection:
+    """A connection to the mail server that's reused between messages.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(self) -> None:
+        """Initialize the connection."""
+        self._backend: Optional[BaseEmailBackend] = None
+        self._last_used = 0.0
+
+    def send(
+        self,
+        message: QueuedEmailMessage,
+    ) -> None:
+        """Send a message.
+
+        If the mail server closed a connection that was left open, a new
+        connection will be opened and the message sent again.
+
+        Args:
+            message (QueuedEmailMessage):
+                The message to send.
+
+        Raises:
+            Exception:
+                The message could not be sent. This may be any error raised
+                by the e-mail backend.
+        """
+        if time.monotonic() - self._last_used > MAX_CONNECTION_IDLE_SECS:
+            self.close()
+
+        reused = self._backend is not None
+
+        try:
+            self._send(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+
+            if not reused:
+                raise
+
+            self._send(message)
+
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        """Close the connection, if open."""
+        backend = self._backend
+
+        if backend is not None:
+            self._backend = None
+
+            try:
+                backend.close()
+            except Exception as e:
+                logger.debug('Error closing e-mail connection: %s', e)
+
+    def _send(
+        self,
+        message: QueuedEmailMessage,
+    ) -> None:
+        """Send a message using the current connection.
+
+        Args:
+            message (QueuedEmailMessage):
+                The message to send.
+
+        Raises:
+            Exception:
+                The message could not be sent.
+        """
+        if self._backend is None:
+            backend = get_connection(fail_silently=False)
+            backend.open()
+            self._backend = backend
+
+        self._backend.send_messages([message])
+
+
+_connection = EmailConnection()
+_process_lock = threading.Lock()
+
+
+def get_email_delivery_mode() -> BackgroundMode:
+    """Return the configured e-mail delivery mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        reviewboard.background.BackgroundMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`BackgroundMode.SYNC
+        <reviewboard.background.BackgroundMode.SYNC>`.
+    """
+    return get_background_mode('mail_delivery_mode')
+
+
+def queue_email(
+    message: EmailMessage,
+    *,
+    review_request: Optional[ReviewRequest] = None,
+    review: Optional[Review] = None,
+) -> OutgoingEmail:
+    """Queue an e-mail message for sending in the background.
+
+    The message is generated immediately, setting its
+    :py:attr:`~djblets.mail.message.EmailMessage.message_id`, and saved as
+    part of the current transaction, so it will only be sent if the
+    transaction commits.
+
+    Version Added:
+        8.0
+
+    Args:
+        message (reviewboard.notifications.email.message.EmailMessage):
+            The message to queue.
+
+        review_request (reviewboard.reviews.models.ReviewRequest, optional):
+            The review request the message is about. Messages for the same
+            review request are sent together.
+
+        review (reviewboard.reviews.models.Review, optional):
+            The review or reply the message is about.
+
+    Returns:
+        reviewboard.notifications.models.OutgoingEmail:
+        The queued message.
+    """
+    mime_message = message.message()
+
+    outgoing_email = OutgoingEmail.objects.create(
+        from_email=message.from_email,
+        recipients=list(message.recipients()),
+        subject=message.subject,
+        message_id=message.message_id or '',
+        message_data=mime_message.as_bytes(linesep='\n'),
+        review_request=review_request,
+        review=review)
+
+    if get_email_delivery_mode() == BackgroundMode.LOCAL:
+        transaction.on_commit(_local_runner.start)
+
+    return outgoing_email
+
+
+def process_email_outbox(
+    *,
+    max_messages: Optional[int] = None,
+    close_connection: bool = True,
+) -> int:
+    """Send queued e-mail that is due.
+
+    Each message is claimed before it's sent, so several processes can
+    safely send queued e-mail at once. Within a process, messages are sent
+    one at a time over a shared connection.
+
+    Version Added:
+        8.0
+
+    Args:
+        max_messages (int, optional):
+            The maximum number of messages to send. By default, this will
+            send messages until none are due.
+
+        close_connection (bool, optional):
+            Whether to close the connection to the mail server when done.
+            Worker processes can leave this open to reuse for the next
+            messages.
+
+    Returns:
+        int:
+        The number of messages attempted.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    coalesce_secs = max(0, int(siteconfig.get('mail_delivery_coalesce_secs')))
+    max_attempts = max(1, int(siteconfig.get('mail_delivery_max_attempts')))
+    num_processed = 0
+    last_pk = 0
+
+    with _process_lock:
+        try:
+            while max_messages is None or num_processed < max_messages:
+                result = _get_ready_messages(after_pk=last_pk,
+                                             coalesce_secs=coalesce_secs)
+
+                if result is None:
+                    break
+
+                messages, last_pk = result
+
+                for email_id, next_attempt in _order_batch(messages):
+                    if (max_messages is not None and
+                        num_processed >= max_messages):
+                        break
+
+                    if not _claim_message(email_id, next_attempt):
+                        # Another process claimed this message first.
+                        continue
+
+                    _send_message(email_id, max_attempts=max_attempts)
+                    num_processed += 1
+        finally:
+            if close_connection:
+                _connection.close()
+
+    return num_processed
+
+
+def get_email_outbox_stats(
+    *,
+    since: Optional[datetime] = None,
+) -> EmailOutboxStats:
+    """Return statistics on the e-mail outbox.
+
+    Version Added:
+        8.0
+
+    Args:
+        since (datetime.datetime, optional):
+            Only include messages queued after this time. Pending messages
+            are always included.
+
+    Returns:
+        EmailOutboxStats:
+        The outbox statistics.
+    """
+    queryset = OutgoingEmail.objects.all()
+
+    if since is not None:
+        queryset = queryset.filter(
+            Q(created__gte=since) |
+            Q(status=OutgoingEmail.STATUS_PENDING))
+
+    pending_q = Q(status=OutgoingEmail.STATUS_PENDING)
+    sent_q = Q(status=OutgoingEmail.STATUS_SENT)
+
+    stats = queryset.aggregate(
+        avg_queue_latency_ms=Avg('queue_latency_ms', filter=sent_q),
+        failed=Count('pk', filter=Q(status=OutgoingEmail.STATUS_FAILED)),
+        max_queue_latency_ms=Max('queue_latency_ms', filter=sent_q),
+        oldest_pending=Min('created', filter=pending_q),
+        pending=Count('pk', filter=pending_q),
+        sent=Count('pk', filter=sent_q))
+
+    return {
+        'avg_queue_latency_ms': stats['avg_queue_latency_ms'],
+        'failed': stats['failed'],
+        'max_queue_latency_ms': stats['max_queue_latency_ms'],
+        'oldest_pending': stats['oldest_pending'],
+        'pending': stats['pending'],
+        'sent': stats['sent'],
+    }
+
+
+def prune_email_outbox(
+    *,
+    older_than: datetime,
+) -> int:
+    """Delete sent and failed messages from the outbox.
+
+    Version Added:
+        8.0
+
+    Args:
+        older_than (datetime.datetime):
+            Only messages queued before this time will be deleted.
+
+    Returns:
+        int:
+        The number of messages deleted.
+    """
+    return prune_finished_entries(
+        OutgoingEmail.objects.all(),
+        unfinished_statuses={OutgoingEmail.STATUS_PENDING},
+        older_than=older_than)
+
+
+def _get_ready_messages(
+    *,
+    after_pk: int,
+    coalesce_secs: int,
+) -> Optional[tuple[list[tuple[int, Optional[int], datetime]], int]]:
+    """Return a batch of queued messages that are ready to send.
+
+    Messages for review requests that have had new e-mail queued within
+    the coalescing period are held back, unless they've already been held
+    for the maximum time.
+
+    Version Added:
+        8.0
+
+    Args:
+        after_pk (int):
+            Only messages with IDs after this will be returned.
+
+        coalesce_secs (int):
+            The number of seconds to wait for bursts of e-mail to finish.
+
+    Returns:
+        tuple:
+        A 2-tuple containing:
+
+        Tuple:
+            0 (list of tuple):
+                The ID, review request ID, and next attempt time of each
+                ready message. This may be empty if none of the batch is
+                ready.
+
+            1 (int):
+                The ID of the last message looked at, for fetching the next
+                batch.
+
+        This will be ``None`` if there are no more queued messages.
+    """
+    now = timezone.now()
+    batch = list(
+        OutgoingEmail.objects
+        .filter(pk__gt=after_pk,
+                status=OutgoingEmail.STATUS_PENDING,
+                next_attempt__lte=now)
+        .order_by('pk')
+        .values_list('pk', 'review_request_id', 'created', 'next_attempt')
+        [:BATCH_SIZE])
+
+    if not batch:
+        return None
+
+    held_ids: set[int] = set()
+
+    if coalesce_secs > 0:
+        oldest_created: dict[int, datetime] = {}
+
+        for pk, review_request_id, created, next_attempt in batch:
+            if review_request_id is not None:
+                oldest_created.setdefault(review_request_id, created)
+
+        if oldest_created:
+            max_held = now - timedelta(seconds=MAX_COALESCE_DELAY_SECS)
+            held_ids = {
+                review_request_id
+                for review_request_id in (
+                    OutgoingEmail.objects
+                    .filter(status=OutgoingEmail.STATUS_PENDING,
+                            review_request__in=list(oldest_created),
+                            created__gt=(now -
+                                         timedelta(seconds=coalesce_secs)))
+                    .values_list('review_request_id', flat=True)
+                    .distinct()
+                )
+                if oldest_created[review_request_id] > max_held
+            }
+
+    return (
+        [
+            (pk, review_request_id, next_attempt)
+            for pk, review_request_id, created, next_attempt in batch
+            if review_request_id not in held_ids
+        ],
+        batch[-1][0],
+    )
+
+
+def _order_batch(
+    messages: list[tuple[int, Optional[int], datetime]],
+) -> list[tuple[int, datetime]]:
+    """Return messages in the order they should be sent.
+
+    Messages for the same review request are sent together, in the order
+    they were queued, starting from the review request with the oldest
+    message.
+
+    Version Added:
+        8.0
+
+    Args:
+        messages (list of tuple):
+            The ready messages returned from :py:func:`_get_ready_messages`.
+
+    Returns:
+        list of tuple:
+        The ID and next attempt time of each message to send.
+    """
+    groups: dict[tuple[str, int], list[tuple[int, datetime]]] = {}
+
+    for pk, review_request_id, next_attempt in messages:
+        if review_request_id is None:
+            key = ('message', pk)
+        else:
+            key = ('review-request', review_request_id)
+
+        groups.setdefault(key, []).append((pk, next_attempt))
+
+    return [
+        message
+        for group in groups.values()
+        for message in group
+    ]
+
+
+def _claim_message(
+    email_id: int,
+    next_attempt: datetime,
+) -> bool:
+    """Claim a queued message for sending.
+
+    Version Added:
+        8.0
+
+    Args:
+        email_id (int):
+            The ID of the message to claim.
+
+        next_attempt (datetime.datetime):
+            The time the message was due, as last read.
+
+    Returns:
+        bool:
+        ``True`` if the message was claimed. ``False`` if another process
+        claimed it first.
+    """
+    return bool(
+        OutgoingEmail.objects
+        .filter(pk=email_id,
+                status=OutgoingEmail.STATUS_PENDING,
+                next_attempt=next_attempt)
+        .update(next_attempt=(timezone.now() +
+                              timedelta(seconds=CLAIM_LEASE_SECS)))
+    )
+
+
+def _send_message(
+    email_id: int,
+    *,
+    max_attempts: int,
+) -> None:
+    """Send a claimed message and record the result.
+
+    Version Added:
+        8.0
+
+    Args:
+        email_id (int):
+            The ID of the message to send.
+
+        max_attempts (int):
+            The maximum number of attempts before the message fails.
+    """
+    try:
+        outgoing_email = OutgoingEmail.objects.get(pk=email_id)
+    except OutgoingEmail.DoesNotExist:
+        return
+
+    message = QueuedEmailMessage(outgoing_email)
+    attempts = outgoing_email.attempts + 1
+    now = timezone.now()
+
+    try:
+        _connection.send(message)
+    except Exception as e:
+        retry = not (isinstance(e, smtplib.SMTPResponseException) and
+                     e.smtp_code >= 500)
+        error = str(e) or type(e).__name__
+
+        if retry and attempts < max_attempts:
+            logger.warning('Could not send e-mail %s with subject "%s" '
+                           '(attempt %d of %d): %s',
+                           email_id, outgoing_email.subject, attempts,
+                           max_attempts, error)
+
+            delay = min(RETRY_BASE_DELAY_SECS * (2 ** (attempts - 1)),
+                        RETRY_MAX_DELAY_SECS)
+            values: dict[str, Any] = {
+                'next_attempt': now + timedelta(seconds=delay),
+            }
+        else:
+            logger.error('Could not send e-mail %s with subject "%s" to '
+                         '"%s" after %d attempt(s): %s',
+                         email_id, outgoing_email.subject,
+                         outgoing_email.recipients, attempts, error)
+
+            values = {
+                'status': OutgoingEmail.STATUS_FAILED,
+            }
+
+        values.update({
+            'attempts': attempts,
+            'last_error': error,
+        })
+    else:
+        latency = now - outgoing_email.created
+        values = {
+            'attempts': attempts,
+            'last_error': '',
+            'message_data': b'',
+            'queue_latency_ms': max(0, int(latency.total_seconds() * 1000)),
+            'sent': now,
+            'status': OutgoingEmail.STATUS_SENT,
+        }
+
+        old_message_id = outgoing_email.message_id
+        new_message_id = message.message_id
+
+        if new_message_id and new_message_id != old_message_id:
+            # The mail server (such as Amazon SES) assigned a new Message
+            # ID. Store it so replies are threaded correctly.
+            values['message_id'] = new_message_id
+            _update_message_id(outgoing_email, old_message_id,
+                               new_message_id)
+
+    OutgoingEmail.objects.filter(pk=email_id).update(**values)
+
+
+def _update_message_id(
+    outgoing_email: OutgoingEmail,
+    old_message_id: str,
+    new_message_id: str,
+) -> None:
+    """Update the Message ID stored for the subject of a message.
+
+    Version Added:
+        8.0
+
+    Args:
+        outgoing_email (reviewboard.notifications.models.OutgoingEmail):
+            The message that was sent.
+
+        old_message_id (str):
+            The Message ID the message was generated with.
+
+        new_message_id (str):
+            The Message ID assigned by the mail server.
+    """
+    if outgoing_email.review_id is not None:
+        queryset = Review.objects.filter(pk=outgoing_email.review_id)
+    elif outgoing_email.review_request_id is not None:
+        queryset = ReviewRequest.objects.filter(
+            pk=outgoing_email.review_request_id)
+    else:
+        return
+
+    queryset.filter(email_message_id=old_message_id).update(
+        email_message_id=new_message_id)
+
+
+def _process_local_outbox() -> None:
+    """Send queued e-mail from the process's background thread.
+
+    If messages are being held back to coalesce a burst of e-mail, this
+    waits briefly and has the thread run again, so they're sent before it
+    exits.
+
+    Version Added:
+        8.0
+    """
+    process_email_outbox()
+
+    if (OutgoingEmail.objects
+        .filter(status=OutgoingEmail.STATUS_PENDING,
+                review_request__isnull=False,
+                attempts=0,
+                next_attempt__lte=timezone.now())
+        .exists()):
+        # Messages are being held back. Check again shortly.
+        time.sleep(1)
+        _local_runner.start()
+
+
+_local_runner = LocalBackgroundRunner(_process_local_outbox,
+                                     name='rb-email-local')
@@ -1,6 +1,6 @@
 """E-mail notification callbacks."""
 
-from typing import Union
+from typing import Collection, Optional, Union
 
 from django.contrib.auth.models import User
 from django.http import HttpRequest
@@ -15,11 +15,24 @@ from reviewboard.notifications.email.message import (
     prepare_review_request_mail,
     prepare_user_registered_mail,
     prepare_webapi_token_mail)
-from reviewboard.notifications.email.utils import send_email
+from reviewboard.notifications.email.utils import (
+    invalidate_group_recipients_cache,
+    send_email)
 from reviewboard.reviews.models import Review, ReviewRequest
 from reviewboard.webapi.models import WebAPIToken
 
 
+#: Fields of groups, users, and profiles that affect group recipients.
+_GROUP_RECIPIENT_FIELDS = {
+    'email',
+    'first_name',
+    'is_active',
+    'last_name',
+    'local_site',
+    'should_send_email',
+}
+
+
 def _update_email_info(
     obj: Union[Review, ReviewRequest],
     message_id: str,
@@ -371,3 +384,40 @@ def send_webapi_token_updated_mail(
     send_email(prepare_webapi_token_mail,
                webapi_token=instance,
                op='updated')
+
+
+def invalidate_group_recipients(
+    action: Optional[str] = None,
+    update_fields: Optional[Collection[str]] = None,
+    **kwargs,
+) -> None:
+    """Invalidate cached group recipients when they may have changed.
+
+    This is called when review group or Local Site membership changes, and
+    when review groups, users, or profiles are saved or deleted. Saves that
+    only update fields that don't affect recipients (such as a user's last
+    login time) are ignored.
+
+    Version Added:
+        8.0
+
+    Args:
+        action (str, optional):
+            The membership change action, for
+            :py:data:`~django.db.models.signals.m2m_changed` signals.
+
+        update_fields (set of str, optional):
+            The fields that were saved, for
+            :py:data:`~django.db.models.signals.post_save` signals.
+
+        **kwargs (dict):
+            Unused keyword arguments provided by the signal.
+    """
+    if action is not None and not action.startswith('post_'):
+        return
+
+    if (update_fields is not None and
+        not _GROUP_RECIPIENT_FIELDS.intersection(update_fields)):
+        return
+
+    invalidate_group_recipients_cache()
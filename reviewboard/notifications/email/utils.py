@@ -3,24 +3,33 @@
 from __future__ import annotations
 
 import logging
+from itertools import chain
 from typing import (Callable,
                     Collection,
+                    Dict,
                     List,
                     Optional,
                     Set,
                     Tuple,
                     Union,
                     TYPE_CHECKING)
+from uuid import uuid4
 
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from djblets.cache.backend import cache_memoize, make_cache_key
 from djblets.mail.utils import (build_email_address,
                                 build_email_address_for_user)
 from typing_extensions import TypeAlias
 
-from reviewboard.accounts.models import ReviewRequestVisit
+from reviewboard.accounts.models import Profile, ReviewRequestVisit
+from reviewboard.background import BackgroundMode
 from reviewboard.changedescs.models import ChangeDescription
+from reviewboard.notifications.email.outbox import (get_email_delivery_mode,
+                                                    queue_email)
 from reviewboard.reviews.models import Group, ReviewRequest
+from reviewboard.site.models import LocalSite
 
 if TYPE_CHECKING:
     from reviewboard.notifications.email.message import EmailMessage
@@ -33,6 +42,15 @@ Recipient: TypeAlias = Union[User, Group]
 RecipientList: TypeAlias = Collection[Recipient]
 
 
+#: How long the members of a review request's groups are cached, in seconds.
+#:
+#: Version Added:
+#:     8.0
+GROUP_RECIPIENTS_CACHE_EXPIRATION = 60
+
+_GROUP_RECIPIENTS_GENERATION_KEY = 'email-group-recipients-generation'
+
+
 def build_recipients(
     user: User,
     review_request: ReviewRequest,
@@ -213,6 +231,10 @@ def get_email_addresses_for_group(
 ) -> List[str]:
     """Build a list of e-mail addresses for the group.
 
+    Version Changed:
+        8.0:
+        This now uses :py:func:`get_email_addresses_for_groups`.
+
     Args:
         group (reviewboard.reviews.models.Group):
             The review group to build the e-mail addresses for.
@@ -226,52 +248,182 @@ def get_email_addresses_for_group(
         A list of properly formatted e-mail addresses for all users in the
         review group.
     """
-    addresses: List[str] = []
-
-    if group.mailing_list:
-        if ',' not in group.mailing_list:
-            # The mailing list field has only one e-mail address in it,
-            # so we can just use that and the group's display name.
-            addresses = [build_email_address(full_name=group.display_name,
-                                             email=group.mailing_list)]
-        else:
-            # The mailing list field has multiple e-mail addresses in it.
-            # We don't know which one should have the group's display name
-            # attached to it, so just return their custom list as-is.
-            addresses = group.mailing_list.split(',')
+    return get_email_addresses_for_groups([group], review_request_id)[group.pk]
+
+
+def get_email_addresses_for_groups(
+    groups: Collection[Group],
+    review_request_id: Optional[int] = None,
+) -> Dict[int, List[str]]:
+    """Build lists of e-mail addresses for several groups.
+
+    The members of all groups are looked up together, so the number of
+    queries does not depend on the number or size of the groups.
+
+    When a review request ID is provided, the members are cached for
+    :py:data:`GROUP_RECIPIENTS_CACHE_EXPIRATION` seconds, so that the
+    e-mails sent in quick succession for a review request don't look them
+    up again. The cache is invalidated whenever group membership or the
+    e-mail settings of a user change. Users who have muted the review
+    request are always filtered out against the database.
+
+    Version Added:
+        8.0
+
+    Args:
+        groups (list of reviewboard.reviews.models.Group):
+            The review groups to build the e-mail addresses for.
 
-    if not (group.mailing_list and group.email_list_only):
-        users_q = Q(is_active=True)
+        review_request_id (int, optional):
+            The ID of the review request being used for the notification. This
+            is used to filter out users who have muted the review request.
 
-        local_site = group.local_site
+    Returns:
+        dict:
+        A mapping of group IDs to lists of properly formatted e-mail
+        addresses for all users in the review group.
+    """
+    result: Dict[int, List[str]] = {}
+    member_group_ids: Set[int] = set()
+
+    for group in groups:
+        addresses: List[str] = []
+
+        if group.mailing_list:
+            if ',' not in group.mailing_list:
+                # The mailing list field has only one e-mail address in it,
+                # so we can just use that and the group's display name.
+                addresses = [build_email_address(full_name=group.display_name,
+                                                 email=group.mailing_list)]
+            else:
+                # The mailing list field has multiple e-mail addresses in it.
+                # We don't know which one should have the group's display
+                # name attached to it, so just return their custom list
+                # as-is.
+                addresses = group.mailing_list.split(',')
 
-        if local_site:
-            users_q = users_q & (Q(local_site=local_site) |
-                                 Q(local_site_admins=local_site))
+        if not (group.mailing_list and group.email_list_only):
+            member_group_ids.add(group.pk)
 
-        users = group.users.filter(users_q).select_related('profile')
+        result[group.pk] = addresses
 
+    if member_group_ids:
         if review_request_id:
-            users = users.extra(select={
-                'visibility': """
-                    SELECT accounts_reviewrequestvisit.visibility
-                      FROM accounts_reviewrequestvisit
-                     WHERE accounts_reviewrequestvisit.review_request_id =
-                           %s
-                       AND accounts_reviewrequestvisit.user_id =
-                           reviews_group_users.user_id
-                """ % review_request_id
-            })
-
-        addresses.extend([
-            build_email_address_for_user(u)
-            for u in users
-            if (u.should_send_email() and
-                (not review_request_id or
-                 u.visibility != ReviewRequestVisit.MUTED))
-        ])
+            members = cache_memoize(
+                'email-group-recipients-%s-%s-%s' % (
+                    _get_group_recipients_generation(),
+                    review_request_id,
+                    ','.join(
+                        str(group_id)
+                        for group_id in sorted(member_group_ids)
+                    )),
+                lambda: _get_group_members(member_group_ids),
+                expiration=GROUP_RECIPIENTS_CACHE_EXPIRATION)
+        else:
+            members = _get_group_members(member_group_ids)
+
+        muted_user_ids: Set[int] = set()
+
+        if review_request_id and members:
+            muted_user_ids = set(
+                ReviewRequestVisit.objects
+                .filter(review_request=review_request_id,
+                        user__in={
+                            user_id
+                            for user_id, address in chain.from_iterable(
+                                members.values())
+                        },
+                        visibility=ReviewRequestVisit.MUTED)
+                .values_list('user', flat=True)
+            )
 
-    return addresses
+        for group_id, group_members in members.items():
+            result[group_id].extend(
+                address
+                for user_id, address in group_members
+                if user_id not in muted_user_ids
+            )
+
+    return result
+
+
+def invalidate_group_recipients_cache() -> None:
+    """Invalidate all cached review group recipients.
+
+    Version Added:
+        8.0
+    """
+    cache.delete(make_cache_key(_GROUP_RECIPIENTS_GENERATION_KEY))
+
+
+def _get_group_recipients_generation() -> str:
+    """Return the current generation of cached review group recipients.
+
+    Version Added:
+        8.0
+
+    Returns:
+        str:
+        An identifier that changes every time the cache is invalidated.
+    """
+    return cache_memoize(_GROUP_RECIPIENTS_GENERATION_KEY,
+                         lambda: uuid4().hex)
+
+
+def _get_group_members(
+    group_ids: Collection[int],
+) -> Dict[int, List[Tuple[int, str]]]:
+    """Return the members of review groups who should receive e-mail.
+
+    Only active users who want to receive e-mail are included. Members of
+    groups on a Local Site must also be members or administrators of that
+    Local Site. All of this is filtered in a single query.
+
+    Version Added:
+        8.0
+
+    Args:
+        group_ids (list of int):
+            The IDs of the review groups.
+
+    Returns:
+        dict:
+        A mapping of group IDs to lists of member user IDs and formatted
+        e-mail addresses.
+    """
+    members: Dict[int, List[Tuple[int, str]]] = {
+        group_id: []
+        for group_id in group_ids
+    }
+
+    memberships = (
+        Group.users.through.objects
+        .filter(
+            Q(group__local_site__isnull=True) |
+            Q(Exists(
+                LocalSite.users.through.objects.filter(
+                    localsite=OuterRef('group__local_site'),
+                    user=OuterRef('user')))) |
+            Q(Exists(
+                LocalSite.admins.through.objects.filter(
+                    localsite=OuterRef('group__local_site'),
+                    user=OuterRef('user')))),
+            # Users without a profile use the default settings, which send
+            # e-mail.
+            ~Exists(Profile.objects.filter(user=OuterRef('user'),
+                                           should_send_email=False)),
+            group__in=group_ids,
+            user__is_active=True)
+        .select_related('user')
+        .order_by('user__username')
+    )
+
+    for membership in memberships:
+        user = membership.user
+        members[membership.group_id].append(
+            (user.pk, build_email_address_for_user(user)))
+
+    return members
 
 
 def recipients_to_addresses(
@@ -280,6 +432,10 @@ def recipients_to_addresses(
 ) -> Set[str]:
     """Return the set of e-mail addresses for the recipients.
 
+    Version Changed:
+        8.0:
+        The members of all groups are now looked up together.
+
     Args:
         recipients (list):
             A list of :py:class:`Users <django.contrib.auth.models.User>` and
@@ -294,6 +450,7 @@ def recipients_to_addresses(
         The e-mail addresses for all recipients.
     """
     addresses = set()
+    groups: List[Group] = []
 
     for recipient in recipients:
         assert isinstance(recipient, User) or isinstance(recipient, Group)
@@ -301,8 +458,12 @@ def recipients_to_addresses(
         if isinstance(recipient, User):
             addresses.add(build_email_address_for_user(recipient))
         else:
-            addresses.update(get_email_addresses_for_group(recipient,
-                                                           review_request_id))
+            groups.append(recipient)
+
+    if groups:
+        for group_addresses in get_email_addresses_for_groups(
+                groups, review_request_id).values():
+            addresses.update(group_addresses)
 
     return addresses
 
@@ -313,6 +474,14 @@ def send_email(
 ) -> Tuple[Optional[EmailMessage], bool]:
     """Attempt to send an e-mail, logging any exceptions that occur.
 
+    Depending on the configured e-mail delivery mode, the message will
+    either be sent immediately or queued for sending in the background. See
+    :py:mod:`reviewboard.notifications.email.outbox` for details.
+
+    Version Changed:
+        8.0:
+        Added support for sending e-mail in the background.
+
     Args:
         email_builder (callable):
             A function that generates an :py:class:`EmailMessage`.
@@ -320,12 +489,16 @@ def send_email(
         **kwargs (dict):
             Keyword arguments to provide to ``email_builder``.
 
+            If these contain a ``review_request``, and a ``reply`` or
+            ``review``, queued messages will be associated with them.
+
     Returns:
         tuple:
         A tuple of:
 
         * The message that was generated (:py:class`EmailMessage`).
-        * Whether or not the message was sent successfully (:py:class:`bool`).
+        * Whether or not the message was sent (or queued) successfully
+          (:py:class:`bool`).
     """
     message = email_builder(**kwargs)
 
@@ -333,7 +506,12 @@ def send_email(
         return None, False
 
     try:
-        message.send()
+        if get_email_delivery_mode() == BackgroundMode.SYNC:
+            message.send()
+        elif message.recipients():
+            queue_email(message,
+                        review_request=kwargs.get('review_request'),
+                        review=kwargs.get('reply') or kwargs.get('review'))
     except Exception:
         logger.exception(
             'Could not send e-mail message with subject "%s" from "%s" to '
@@ -0,0 +1,171 @@
+"""Management command to deliver queued WebHooks.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from reviewboard.notifications.webhook_delivery import (
+    get_webhook_delivery_stats,
+    process_webhook_deliveries,
+    prune_webhook_deliveries)
+
+
+class Command(BaseCommand):
+    """Management command to deliver queued WebHooks.
+
+    By default, this sends any WebHooks that are due and then exits. With
+    ``--watch``, it keeps running and sends WebHooks as they're queued,
+    acting as a worker process.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Send WebHooks queued for delivery in the background, and retry '
+        'failed deliveries.'
+    )
+
+    #: How often the delivery log is pruned when using --watch, in seconds.
+    PRUNE_INTERVAL_SECS = 60 * 60
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help=_(
+                'Keep running, sending WebHooks as they are queued.'
+            ))
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help=_(
+                'Number of seconds to wait between checks for new WebHooks '
+                'when using --watch. Defaults to 2.'
+            ))
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help=_(
+                'Maximum number of WebHooks to send at once. Defaults to '
+                'the WebHook delivery concurrency in the general settings.'
+            ))
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=30,
+            help=_(
+                'Number of days to keep delivered and failed WebHooks in '
+                'the delivery log. Defaults to 30.'
+            ))
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help=_('Show statistics on WebHook deliveries.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        concurrency = options['concurrency']
+        keep_days = options['keep_days']
+
+        if concurrency is not None and concurrency < 1:
+            raise CommandError(_('--concurrency must be at least 1.'))
+
+        if keep_days < 1:
+            raise CommandError(_('--keep-days must be at least 1.'))
+
+        if options['stats']:
+            self._show_stats()
+        elif options['watch']:
+            poll_interval = options['poll_interval']
+            last_pruned = 0.0
+
+            while True:
+                if time.monotonic() - last_pruned >= self.PRUNE_INTERVAL_SECS:
+                    self._prune(keep_days)
+                    last_pruned = time.monotonic()
+
+                if not process_webhook_deliveries(concurrency=concurrency):
+                    time.sleep(poll_interval)
+        else:
+            self._prune(keep_days)
+            num_processed = process_webhook_deliveries(
+                concurrency=concurrency)
+
+            self.stdout.write(_('Attempted delivery of %d WebHook(s).')
+                              % num_processed)
+
+    def _prune(
+        self,
+        keep_days: int,
+    ) -> None:
+        """Delete old entries from the delivery log.
+
+        Args:
+            keep_days (int):
+                The number of days of entries to keep.
+        """
+        prune_webhook_deliveries(
+            older_than=timezone.now() - timedelta(days=keep_days))
+
+    def _show_stats(self) -> None:
+        """Show statistics on WebHook deliveries."""
+        stats = get_webhook_delivery_stats(
+            since=timezone.now() - timedelta(days=1))
+        oldest_pending = stats['oldest_pending']
+
+        self.stdout.write(_('Pending WebHooks: %d') % stats['pending'])
+
+        if oldest_pending is not None:
+            self.stdout.write(
+                _('Oldest pending WebHook: %d second(s) ago')
+                % (timezone.now() - oldest_pending).total_seconds())
+
+        self.stdout.write(_('Delivered in the last 24 hours: %d')
+                          % stats['delivered'])
+        self.stdout.write(_('Failed in the last 24 hours: %d')
+                          % stats['failed'])
+
+        if stats['avg_latency_ms'] is not None:
+            self.stdout.write(
+                _('Latency in the last 24 hours: %(avg)d ms average, '
+                  '%(max)d ms maximum')
+                % {
+                    'avg': stats['avg_latency_ms'],
+                    'max': stats['max_latency_ms'],
+                })
@@ -0,0 +1,157 @@
+"""Management command to send queued e-mail.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from reviewboard.notifications.email.outbox import (get_email_outbox_stats,
+                                                    process_email_outbox,
+                                                    prune_email_outbox)
+
+
+class Command(BaseCommand):
+    """Management command to send queued e-mail.
+
+    By default, this sends any queued e-mail that is due and then exits.
+    With ``--watch``, it keeps running and sends e-mail as it's queued,
+    acting as a worker process. The connection to the mail server is kept
+    open between messages.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Send e-mail queued for sending in the background, and retry '
+        'failed messages.'
+    )
+
+    #: How often the outbox is pruned when using --watch, in seconds.
+    PRUNE_INTERVAL_SECS = 60 * 60
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help=_(
+                'Keep running, sending e-mail as it is queued.'
+            ))
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help=_(
+                'Number of seconds to wait between checks for new e-mail '
+                'when using --watch. Defaults to 1.'
+            ))
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help=_(
+                'Number of days to keep sent and failed e-mail in the '
+                'outbox. Defaults to 7.'
+            ))
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help=_('Show statistics on queued e-mail.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        keep_days = options['keep_days']
+
+        if keep_days < 1:
+            raise CommandError(_('--keep-days must be at least 1.'))
+
+        if options['stats']:
+            self._show_stats()
+        elif options['watch']:
+            poll_interval = options['poll_interval']
+            last_pruned = 0.0
+
+            while True:
+                if time.monotonic() - last_pruned >= self.PRUNE_INTERVAL_SECS:
+                    self._prune(keep_days)
+                    last_pruned = time.monotonic()
+
+                if not process_email_outbox(close_connection=False):
+                    time.sleep(poll_interval)
+        else:
+            self._prune(keep_days)
+            num_processed = process_email_outbox()
+
+            self.stdout.write(_('Attempted to send %d e-mail(s).')
+                              % num_processed)
+
+    def _prune(
+        self,
+        keep_days: int,
+    ) -> None:
+        """Delete old messages from the outbox.
+
+        Args:
+            keep_days (int):
+                The number of days of messages to keep.
+        """
+        prune_email_outbox(
+            older_than=timezone.now() - timedelta(days=keep_days))
+
+    def _show_stats(self) -> None:
+        """Show statistics on queued e-mail."""
+        stats = get_email_outbox_stats(
+            since=timezone.now() - timedelta(days=1))
+        oldest_pending = stats['oldest_pending']
+
+        self.stdout.write(_('Queued e-mails: %d') % stats['pending'])
+
+        if oldest_pending is not None:
+            self.stdout.write(
+                _('Oldest queued e-mail: %d second(s) ago')
+                % (timezone.now() - oldest_pending).total_seconds())
+
+        self.stdout.write(_('Sent in the last 24 hours: %d') % stats['sent'])
+        self.stdout.write(_('Failed in the last 24 hours: %d')
+                          % stats['failed'])
+
+        if stats['avg_queue_latency_ms'] is not None:
+            self.stdout.write(
+                _('Time queued in the last 24 hours: %(avg)d ms average, '
+                  '%(max)d ms maximum')
+                % {
+                    'avg': stats['avg_queue_latency_ms'],
+                    'max': stats['max_queue_latency_ms'],
+                })
@@ -6,6 +6,7 @@ from typing import ClassVar
 
 from django.core.validators import URLValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from djblets.db.fields import CommaSeparatedValuesField, JSONField
 
@@ -177,3 +178,188 @@ class WebHookTarget(models.Model):
         db_table = 'notifications_webhooktarget'
         verbose_name = _('Webhook')
         verbose_name_plural = _('Webhooks')
+
+
+class WebHookDelivery(models.Model):
+    """A queued delivery of a WebHook payload to a target.
+
+    These act as a persistent outbox for WebHooks when delivery is set to
+    run in the background, and as a log of past deliveries and how long
+    they took. See :py:mod:`reviewboard.notifications.webhook_delivery` for
+    details.
+
+    Version Added:
+        8.0
+    """
+
+    STATUS_PENDING = 'P'
+    STATUS_DELIVERED = 'D'
+    STATUS_FAILED = 'F'
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_DELIVERED, _('Delivered')),
+        (STATUS_FAILED, _('Failed')),
+    )
+
+    target = models.ForeignKey(
+        WebHookTarget,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name=_('WebHook'))
+    event = models.CharField(
+        _('event'),
+        max_length=64)
+    url = models.URLField(
+        'URL',
+        max_length=512)
+    headers = JSONField(
+        _('headers'))
+    body = models.BinaryField(
+        _('body'))
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True)
+    attempts = models.PositiveIntegerField(
+        _('attempts'),
+        default=0)
+    created = models.DateTimeField(
+        _('created'),
+        default=timezone.now,
+        db_index=True)
+    next_attempt = models.DateTimeField(
+        _('next attempt'),
+        default=timezone.now,
+        db_index=True)
+    completed = models.DateTimeField(
+        _('completed'),
+        null=True,
+        blank=True)
+    response_status = models.PositiveIntegerField(
+        _('response status'),
+        null=True,
+        blank=True)
+    latency_ms = models.PositiveIntegerField(
+        _('latency (ms)'),
+        null=True,
+        blank=True,
+        help_text=_('The time taken by the most recent attempt, in '
+                    'milliseconds.'))
+    last_error = models.TextField(
+        _('last error'),
+        blank=True)
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return f'{self.event} to {self.url}'
+
+    class Meta:
+        db_table = 'notifications_webhookdelivery'
+        ordering = ('-created',)
+        verbose_name = _('Webhook Delivery')
+        verbose_name_plural = _('Webhook Deliveries')
+
+
+class OutgoingEmail(models.Model):
+    """An e-mail message queued for sending in the background.
+
+    These act as a persistent outbox for e-mail when delivery is set to run
+    in the background, and as a record of how long messages waited to be
+    sent. See :py:mod:`reviewboard.notifications.email.outbox` for details.
+
+    Version Added:
+        8.0
+    """
+
+    STATUS_PENDING = 'P'
+    STATUS_SENT = 'S'
+    STATUS_FAILED = 'F'
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_SENT, _('Sent')),
+        (STATUS_FAILED, _('Failed')),
+    )
+
+    from_email = models.TextField(
+        _('from address'))
+    recipients = JSONField(
+        _('recipients'))
+    subject = models.TextField(
+        _('subject'),
+        blank=True)
+    message_id = models.CharField(
+        _('message ID'),
+        max_length=255,
+        blank=True)
+    message_data = models.BinaryField(
+        _('message data'))
+
+    review_request = models.ForeignKey(
+        'reviews.ReviewRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('review request'))
+    review = models.ForeignKey(
+        'reviews.Review',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('review'))
+
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True)
+    attempts = models.PositiveIntegerField(
+        _('attempts'),
+        default=0)
+    created = models.DateTimeField(
+        _('created'),
+        default=timezone.now,
+        db_index=True)
+    next_attempt = models.DateTimeField(
+        _('next attempt'),
+        default=timezone.now,
+        db_index=True)
+    sent = models.DateTimeField(
+        _('sent'),
+        null=True,
+        blank=True)
+    queue_latency_ms = models.PositiveIntegerField(
+        _('queue latency (ms)'),
+        null=True,
+        blank=True,
+        help_text=_('The time between queuing and sending the message, in '
+                    'milliseconds.'))
+    last_error = models.TextField(
+        _('last error'),
+        blank=True)
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return self.subject
+
+    class Meta:
+        db_table = 'notifications_outgoingemail'
+        ordering = ('-created',)
+        verbose_name = _('Outgoing E-Mail')
+        verbose_name_plural = _('Outgoing E-Mails')
@@ -0,0 +1,358 @@
+"""Unit tests for reviewboard.notifications.email.outbox.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import smtplib
+from datetime import timedelta
+from typing import Optional
+
+import kgb
+from django.conf import settings
+from django.core import mail
+from django.utils import timezone
+
+from reviewboard.notifications.email import outbox
+from reviewboard.notifications.email.message import EmailMessage
+from reviewboard.notifications.email.outbox import (EmailConnection,
+                                                    get_email_outbox_stats,
+                                                    process_email_outbox,
+                                                    prune_email_outbox,
+                                                    queue_email)
+from reviewboard.notifications.email.utils import send_email
+from reviewboard.notifications.models import OutgoingEmail
+from reviewboard.reviews.models import ReviewRequest
+from reviewboard.testing import TestCase
+
+
+class EmailOutboxTests(kgb.SpyAgency, TestCase):
+    """Unit tests for sending e-mail through the outbox.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        mail.outbox = []
+
+    def tearDown(self) -> None:
+        """Tear down the test case."""
+        outbox._connection.close()
+
+        super().tearDown()
+
+    def test_send_email_with_sync(self) -> None:
+        """Testing send_email with mail_delivery_mode=sync"""
+        with self.siteconfig_settings({'mail_delivery_mode': 'sync'},
+                                      reload_settings=False):
+            message, sent = send_email(self._build_message)
+
+        self.assertTrue(sent)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_send_email_with_worker(self) -> None:
+        """Testing send_email with mail_delivery_mode=worker"""
+        self.spy_on(outbox._local_runner.start, call_original=False)
+
+        review_request = self.create_review_request()
+
+        with self.siteconfig_settings({'mail_delivery_mode': 'worker'},
+                                      reload_settings=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                message, sent = send_email(self._build_message,
+                                           review_request=review_request)
+
+        self.assertTrue(sent)
+        self.assertEqual(mail.outbox, [])
+        self.assertSpyNotCalled(outbox._local_runner.start)
+
+        assert message is not None
+        outgoing_email = OutgoingEmail.objects.get()
+        self.assertEqual(outgoing_email.subject, 'Test subject')
+        self.assertEqual(outgoing_email.from_email,
+                         settings.DEFAULT_FROM_EMAIL)
+        self.assertEqual(outgoing_email.recipients, ['doc@example.com'])
+        self.assertEqual(outgoing_email.review_request, review_request)
+        self.assertEqual(outgoing_email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertIsNotNone(message.message_id)
+        self.assertEqual(outgoing_email.message_id, message.message_id)
+        self.assertIn(b'Subject: Test subject\n',
+                      bytes(outgoing_email.message_data))
+
+    def test_send_email_with_local(self) -> None:
+        """Testing send_email with mail_delivery_mode=local"""
+        self.spy_on(outbox._local_runner.start, call_original=False)
+
+        with self.siteconfig_settings({'mail_delivery_mode': 'local'},
+                                      reload_settings=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                send_email(self._build_message)
+
+        self.assertSpyCallCount(outbox._local_runner.start, 1)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_process_email_outbox(self) -> None:
+        """Testing process_email_outbox"""
+        outgoing_email = queue_email(self._build_message())
+
+        self.assertEqual(process_email_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+        sent_message = mail.outbox[0]
+        self.assertEqual(sent_message.recipients(), ['doc@example.com'])
+        self.assertIn(b'Subject: Test subject\r\n',
+                      sent_message.message().as_bytes(linesep='\r\n'))
+
+        outgoing_email.refresh_from_db()
+        self.assertEqual(outgoing_email.status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(outgoing_email.attempts, 1)
+        self.assertEqual(bytes(outgoing_email.message_data), b'')
+        self.assertIsNotNone(outgoing_email.queue_latency_ms)
+        self.assertIsNotNone(outgoing_email.sent)
+
+    def test_process_email_outbox_reuses_connection(self) -> None:
+        """Testing process_email_outbox sends messages over one connection
+        """
+        queue_email(self._build_message())
+        queue_email(self._build_message())
+
+        self.spy_on(outbox.get_connection)
+
+        self.assertEqual(process_email_outbox(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertSpyCallCount(outbox.get_connection, 1)
+
+    def test_process_email_outbox_with_coalescing(self) -> None:
+        """Testing process_email_outbox holds back bursts of e-mail for a
+        review request
+        """
+        review_request = self.create_review_request()
+        email1 = queue_email(self._build_message(subject='Message 1'),
+                             review_request=review_request)
+        email2 = self._queue_email(subject='Message 2',
+                                   review_request=None,
+                                   created=timezone.now())
+        queue_email(self._build_message(subject='Message 3'),
+                    review_request=review_request)
+
+        with self.siteconfig_settings({'mail_delivery_coalesce_secs': 10},
+                                      reload_settings=False):
+            self.assertEqual(process_email_outbox(), 1)
+
+            self.assertEqual(
+                [message.subject for message in mail.outbox],
+                ['Message 2'])
+
+            # Once the burst is over, they're sent together, in order.
+            OutgoingEmail.objects.filter(review_request=review_request).update(
+                created=timezone.now() - timedelta(seconds=20))
+
+            self.assertEqual(process_email_outbox(), 2)
+
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ['Message 2', 'Message 1', 'Message 3'])
+
+        email1.refresh_from_db()
+        email2.refresh_from_db()
+        self.assertEqual(email1.status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(email2.status, OutgoingEmail.STATUS_SENT)
+
+    def test_process_email_outbox_with_coalescing_max_delay(self) -> None:
+        """Testing process_email_outbox sends bursts of e-mail held for the
+        maximum time
+        """
+        review_request = self.create_review_request()
+        self._queue_email(subject='Message 1',
+                          review_request=review_request,
+                          created=timezone.now() - timedelta(minutes=2))
+        queue_email(self._build_message(subject='Message 2'),
+                    review_request=review_request)
+
+        with self.siteconfig_settings({'mail_delivery_coalesce_secs': 10},
+                                      reload_settings=False):
+            self.assertEqual(process_email_outbox(), 2)
+
+    def test_process_email_outbox_with_error(self) -> None:
+        """Testing process_email_outbox with a connection error schedules a
+        retry
+        """
+        outgoing_email = queue_email(self._build_message())
+
+        self.spy_on(EmailConnection._send,
+                    owner=EmailConnection,
+                    op=kgb.SpyOpRaise(smtplib.SMTPConnectError(
+                        421, 'Try again')))
+
+        self.assertEqual(process_email_outbox(), 1)
+
+        outgoing_email.refresh_from_db()
+        self.assertEqual(outgoing_email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(outgoing_email.attempts, 1)
+        self.assertIn('Try again', outgoing_email.last_error)
+        self.assertGreater(outgoing_email.next_attempt, timezone.now())
+        self.assertNotEqual(bytes(outgoing_email.message_data), b'')
+
+        # The retry isn't due yet.
+        self.assertEqual(process_email_outbox(), 0)
+
+    def test_process_email_outbox_with_permanent_error(self) -> None:
+        """Testing process_email_outbox with a permanent SMTP error fails
+        without retrying
+        """
+        outgoing_email = queue_email(self._build_message())
+
+        self.spy_on(EmailConnection._send,
+                    owner=EmailConnection,
+                    op=kgb.SpyOpRaise(smtplib.SMTPDataError(
+                        554, 'Rejected')))
+
+        process_email_outbox()
+
+        outgoing_email.refresh_from_db()
+        self.assertEqual(outgoing_email.status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(outgoing_email.attempts, 1)
+
+    def test_process_email_outbox_with_max_attempts(self) -> None:
+        """Testing process_email_outbox fails after the maximum number of
+        attempts
+        """
+        outgoing_email = self._queue_email(attempts=2)
+
+        self.spy_on(EmailConnection._send,
+                    owner=EmailConnection,
+                    op=kgb.SpyOpRaise(ConnectionRefusedError('Refused')))
+
+        with self.siteconfig_settings({'mail_delivery_max_attempts': 3},
+                                      reload_settings=False):
+            process_email_outbox()
+
+        outgoing_email.refresh_from_db()
+        self.assertEqual(outgoing_email.status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(outgoing_email.attempts, 3)
+
+    def test_process_email_outbox_with_new_message_id(self) -> None:
+        """Testing process_email_outbox stores Message IDs assigned by the
+        mail server
+        """
+        review_request = self.create_review_request()
+        message = self._build_message()
+        outgoing_email = queue_email(message, review_request=review_request)
+
+        ReviewRequest.objects.filter(pk=review_request.pk).update(
+            email_message_id=message.message_id)
+
+        def _send(_self, message):
+            message.message_id = '<1234@email.amazonses.com>'
+
+        self.spy_on(EmailConnection._send,
+                    owner=EmailConnection,
+                    call_fake=_send)
+
+        process_email_outbox()
+
+        outgoing_email.refresh_from_db()
+        review_request.refresh_from_db()
+        self.assertEqual(outgoing_email.message_id,
+                         '<1234@email.amazonses.com>')
+        self.assertEqual(review_request.email_message_id,
+                         '<1234@email.amazonses.com>')
+
+    def test_get_email_outbox_stats(self) -> None:
+        """Testing get_email_outbox_stats"""
+        self._queue_email()
+        self._queue_email(status=OutgoingEmail.STATUS_SENT,
+                          queue_latency_ms=100)
+        self._queue_email(status=OutgoingEmail.STATUS_SENT,
+                          queue_latency_ms=300)
+        self._queue_email(status=OutgoingEmail.STATUS_FAILED)
+        self._queue_email(status=OutgoingEmail.STATUS_SENT,
+                          queue_latency_ms=1000,
+                          created=timezone.now() - timedelta(days=2))
+
+        stats = get_email_outbox_stats(
+            since=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['avg_queue_latency_ms'], 200)
+        self.assertEqual(stats['max_queue_latency_ms'], 300)
+        self.assertIsNotNone(stats['oldest_pending'])
+
+    def test_prune_email_outbox(self) -> None:
+        """Testing prune_email_outbox"""
+        old = timezone.now() - timedelta(days=30)
+        pending = self._queue_email(created=old)
+        self._queue_email(status=OutgoingEmail.STATUS_SENT,
+                          created=old)
+        recent = self._queue_email(status=OutgoingEmail.STATUS_SENT)
+
+        self.assertEqual(
+            prune_email_outbox(older_than=timezone.now() - timedelta(days=7)),
+            1)
+        self.assertQuerySetEqual(
+            OutgoingEmail.objects.order_by('pk'),
+            [pending, recent])
+
+    def _build_message(
+        self,
+        subject: str = 'Test subject',
+    ) -> EmailMessage:
+        """Return a message for testing.
+
+        Args:
+            subject (str, optional):
+                The subject of the message.
+
+        Returns:
+            reviewboard.notifications.email.message.EmailMessage:
+            The message.
+        """
+        return EmailMessage(subject=subject,
+                            text_body='Test body',
+                            html_body='<p>Test body</p>',
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            to=['doc@example.com'])
+
+    def _queue_email(
+        self,
+        subject: str = 'Test subject',
+        review_request: Optional[ReviewRequest] = None,
+        **kwargs,
+    ) -> OutgoingEmail:
+        """Queue a message for testing, and then update its fields.
+
+        Args:
+            subject (str, optional):
+                The subject of the message.
+
+            review_request (reviewboard.reviews.models.ReviewRequest,
+                            optional):
+                The review request the message is about.
+
+            **kwargs (dict):
+                Fields to update on the queued message.
+
+        Returns:
+            reviewboard.notifications.models.OutgoingEmail:
+            The queued message.
+        """
+        outgoing_email = queue_email(self._build_message(subject=subject),
+                                     review_request=review_request)
+
+        if kwargs:
+            OutgoingEmail.objects.filter(pk=outgoing_email.pk).update(
+                **kwargs)
+            outgoing_email.refresh_from_db()
+
+        return outgoing_email
@@ -2,7 +2,7 @@ from django.contrib.auth.models import User
 from djblets.mail.utils import build_email_address_for_user
 from djblets.testing.decorators import add_fixtures
 
-from reviewboard.accounts.models import Profile
+from reviewboard.accounts.models import Profile, ReviewRequestVisit
 from reviewboard.notifications.email.utils import (
     build_recipients,
     get_email_addresses_for_group,
@@ -795,3 +795,180 @@ class EmailUtilsTests(TestCase):
 
         self.assertEqual(to, set([submitter, user1]))
         self.assertEqual(len(cc), 0)
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_query_count(self):
+        """Testing generating addresses from recipients that are groups uses
+        a constant number of queries as groups grow
+        """
+        review_request = self.create_review_request()
+
+        for num_users in (1, 5, 25):
+            groups = []
+
+            for i in range(3):
+                group = self.create_review_group('group-%s-%s'
+                                                 % (num_users, i))
+                group.users.add(*[
+                    User.objects.create_user(
+                        username='user-%s-%s-%s' % (num_users, i, j),
+                        email='user-%s-%s-%s@example.com'
+                              % (num_users, i, j))
+                    for j in range(num_users)
+                ])
+                groups.append(group)
+
+            # This will fetch the members of all groups and the users who
+            # have muted the review request.
+            with self.assertNumQueries(2):
+                addresses = recipients_to_addresses(groups,
+                                                    review_request.pk)
+
+            self.assertEqual(len(addresses), 3 * num_users)
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_no_email(self):
+        """Testing generating addresses from recipients that are groups
+        excludes members who don't want e-mail in the member query
+        """
+        user1 = User.objects.get(username='doc')
+        user2 = User.objects.get(username='grumpy')
+        user3 = User.objects.get(username='dopey')
+
+        Profile.objects.filter(user__in=(user1, user3)).delete()
+        Profile.objects.create(user=user1, should_send_email=False)
+
+        group = self.create_review_group()
+        group.users.add(user1, user2, user3)
+
+        # This will fetch the members of the group, excluding the user who
+        # doesn't want e-mail.
+        with self.assertNumQueries(1):
+            addresses = recipients_to_addresses([group])
+
+        self.assertEqual(
+            addresses,
+            {
+                build_email_address_for_user(user2),
+                build_email_address_for_user(user3),
+            })
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_cached(self):
+        """Testing generating addresses from recipients that are groups
+        caches group members for the review request
+        """
+        review_request = self.create_review_request()
+        group = self.create_review_group('group1')
+
+        user1 = User.objects.create_user(username='user1', first_name='User',
+                                         last_name='One',
+                                         email='user1@example.com')
+        group.users.add(user1)
+
+        expected_addresses = {build_email_address_for_user(user1)}
+
+        with self.assertNumQueries(2):
+            addresses = recipients_to_addresses([group], review_request.pk)
+
+        self.assertEqual(addresses, expected_addresses)
+
+        # Only the users who have muted the review request are fetched.
+        with self.assertNumQueries(1):
+            addresses = recipients_to_addresses([group], review_request.pk)
+
+        self.assertEqual(addresses, expected_addresses)
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_cached_membership_changed(
+        self,
+    ):
+        """Testing generating addresses from recipients that are groups
+        after group membership changes invalidates the cache
+        """
+        review_request = self.create_review_request()
+        group = self.create_review_group('group1')
+
+        user1 = User.objects.create_user(username='user1', first_name='User',
+                                         last_name='One',
+                                         email='user1@example.com')
+        user2 = User.objects.create_user(username='user2', first_name='User',
+                                         last_name='Two',
+                                         email='user2@example.com')
+        group.users.add(user1)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {build_email_address_for_user(user1)})
+
+        group.users.add(user2)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {
+                build_email_address_for_user(user1),
+                build_email_address_for_user(user2),
+            })
+
+        group.users.remove(user1)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {build_email_address_for_user(user2)})
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_cached_profile_changed(self):
+        """Testing generating addresses from recipients that are groups
+        after a member disables e-mail invalidates the cache
+        """
+        review_request = self.create_review_request()
+        group = self.create_review_group('group1')
+
+        user1 = User.objects.create_user(username='user1', first_name='User',
+                                         last_name='One',
+                                         email='user1@example.com')
+        group.users.add(user1)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {build_email_address_for_user(user1)})
+
+        profile = user1.get_profile()
+        profile.should_send_email = False
+        profile.save(update_fields=('should_send_email',))
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            set())
+
+    @add_fixtures(['test_users'])
+    def test_recipients_to_addresses_with_groups_cached_muted(self):
+        """Testing generating addresses from recipients that are groups
+        excludes members who muted the review request after caching
+        """
+        review_request = self.create_review_request()
+        group = self.create_review_group('group1')
+
+        user1 = User.objects.create_user(username='user1', first_name='User',
+                                         last_name='One',
+                                         email='user1@example.com')
+        user2 = User.objects.create_user(username='user2', first_name='User',
+                                         last_name='Two',
+                                         email='user2@example.com')
+        group.users.add(user1, user2)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {
+                build_email_address_for_user(user1),
+                build_email_address_for_user(user2),
+            })
+
+        ReviewRequestVisit.objects.create(
+            user=user2,
+            review_request=review_request,
+            visibility=ReviewRequestVisit.MUTED)
+
+        self.assertEqual(
+            recipients_to_addresses([group], review_request.pk),
+            {build_email_address_for_user(user1)})
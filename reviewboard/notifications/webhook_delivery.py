@@ -0,0 +1,916 @@
+"""Background delivery of WebHooks.
+
+By default, WebHooks are sent one target at a time from within the signal
+handler that triggered them, so a slow or unreachable endpoint holds up the
+request that published a review. Background delivery instead stores each
+payload in a :py:class:`~reviewboard.notifications.models.WebHookDelivery`
+outbox entry as part of the same transaction, and sends it afterward.
+
+Delivery is controlled by the ``webhooks_delivery_mode`` site configuration
+setting, which can be one of the following
+:py:class:`~reviewboard.background.BackgroundMode` values:
+
+``sync``:
+    WebHooks are sent immediately, without being stored.
+
+``local``:
+    WebHooks are sent by a background thread in the web server process once
+    the transaction commits. Deliveries that need to be retried are sent the
+    next time a WebHook is dispatched by the process, or by the
+    :command:`deliver-webhooks` management command.
+
+``worker``:
+    WebHooks are sent by the :command:`deliver-webhooks` management
+    command, which can be run on a schedule or left running with
+    ``--watch``.
+
+Each process sends up to ``webhooks_delivery_concurrency`` WebHooks at
+once, and no more than ``webhooks_delivery_target_concurrency`` of those to
+any one target. Connections are kept open and reused for later deliveries
+to the same host. Failed deliveries are retried with exponential backoff,
+up to ``webhooks_delivery_max_attempts`` attempts.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import http.client
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from datetime import timedelta
+from typing import Optional, TYPE_CHECKING
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import (HTTPRedirectHandler, Request, build_opener,
+                            getproxies, proxy_bypass)
+
+from django.db import connections, transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.background import (BackgroundMode,
+                                    BackgroundQueueStats,
+                                    LocalBackgroundRunner,
+                                    get_background_mode,
+                                    prune_finished_entries)
+from reviewboard.notifications.models import WebHookDelivery
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from reviewboard.notifications.models import WebHookTarget
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The delay before the first retry of a failed delivery, in seconds.
+#:
+#: This doubles with each attempt.
+RETRY_BASE_DELAY_SECS = 30
+
+#: The maximum delay between retries of a failed delivery, in seconds.
+RETRY_MAX_DELAY_SECS = 60 * 60
+
+#: How long a claimed delivery is reserved for the process sending it.
+#:
+#: This is added to the delivery timeout. If the process exits while sending,
+#: the delivery will be retried once this has passed.
+CLAIM_LEASE_SECS = 60
+
+#: The maximum number of idle connections kept open for each host.
+MAX_IDLE_CONNECTIONS_PER_HOST = 4
+
+#: HTTP status codes that indicate a delivery should be retried.
+RETRY_STATUS_CODES = {408, 425, 429}
+
+#: HTTP redirect status codes that are followed when sending a WebHook.
+#:
+#: These require the request to be repeated with the same method and body.
+#: Other redirects would turn the request into a GET without the payload,
+#: so they're treated as failed deliveries instead.
+FOLLOW_REDIRECT_STATUS_CODES = {307, 308}
+
+#: The maximum number of redirects followed when sending a WebHook.
+MAX_REDIRECTS = 10
+
+
+class WebHookDeliveryStats(BackgroundQueueStats):
+    """Statistics on WebHook deliveries.
+
+    Version Added:
+        8.0
+    """
+
+    #: The average latency of successful deliveries, in milliseconds.
+    #:
+    #: Type:
+    #:     float
+    avg_latency_ms: Optional[float]
+
+    #: The number of deliveries that succeeded.
+    #:
+    #: Type:
+    #:     int
+    delivered: int
+
+    #: The highest latency of successful deliveries, in milliseconds.
+    #:
+    #: Type:
+    #:     int
+    max_latency_ms: Optional[int]
+
+
+class WebHookDeliveryError(Exception):
+    """An error delivering a WebHook.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        response_status: Optional[int] = None,
+        retry: bool = True,
+    ) -> None:
+        """Initialize the error.
+
+        Args:
+            message (str):
+                The error message.
+
+            response_status (int, optional):
+                The HTTP status code returned by the target, if any.
+
+            retry (bool, optional):
+                Whether the delivery should be retried.
+        """
+        super().__init__(message)
+
+        self.response_status = response_status
+        self.retry = retry
+
+
+class HTTPConnectionPool:
+    """A pool of HTTP connections, kept open for reuse by host.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        *,
+        max_idle_per_host: int = MAX_IDLE_CONNECTIONS_PER_HOST,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_idle_per_host (int, optional):
+                The maximum number of idle connections to keep for each host.
+        """
+        self.max_idle_per_host = max_idle_per_host
+
+        self._idle: dict[tuple[str, str, Optional[int]],
+                         list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        scheme: str,
+        host: str,
+        port: Optional[int],
+        *,
+        timeout: float,
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """Return a connection to a host.
+
+        Args:
+            scheme (str):
+                The URL scheme (``http`` or ``https``).
+
+            host (str):
+                The host to connect to.
+
+            port (int):
+                The port to connect to, or ``None`` for the default.
+
+            timeout (float):
+                The timeout for the connection, in seconds.
+
+        Returns:
+            tuple:
+            A 2-tuple containing:
+
+            Tuple:
+                0 (http.client.HTTPConnection):
+                    The connection.
+
+                1 (bool):
+                    Whether this is an existing connection being reused.
+        """
+        key = (scheme, host, port)
+
+        with self._lock:
+            idle = self._idle.get(key)
+
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+
+                return conn, True
+
+        conn_cls: type[http.client.HTTPConnection]
+
+        if scheme == 'https':
+            conn_cls = http.client.HTTPSConnection
+        else:
+            conn_cls = http.client.HTTPConnection
+
+        return conn_cls(host, port, timeout=timeout), False
+
+    def release(
+        self,
+        scheme: str,
+        host: str,
+        port: Optional[int],
+        conn: http.client.HTTPConnection,
+    ) -> None:
+        """Return a connection to the pool for reuse.
+
+        If the pool already holds enough idle connections for the host, the
+        connection will be closed.
+
+        Args:
+            scheme (str):
+                The URL scheme (``http`` or ``https``).
+
+            host (str):
+                The host the connection is for.
+
+            port (int):
+                The port the connection is for.
+
+            conn (http.client.HTTPConnection):
+                The connection to return.
+        """
+        with self._lock:
+            idle = self._idle.setdefault((scheme, host, port), [])
+
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+
+        conn.close()
+
+    def close_all(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+connection_pool = HTTPConnectionPool()
+
+
+def get_delivery_mode() -> BackgroundMode:
+    """Return the configured WebHook delivery mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        reviewboard.background.BackgroundMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`BackgroundMode.SYNC
+        <reviewboard.background.BackgroundMode.SYNC>`.
+    """
+    return get_background_mode('webhooks_delivery_mode')
+
+
+def get_delivery_timeout() -> float:
+    """Return the timeout for sending a WebHook.
+
+    Version Added:
+        8.0
+
+    Returns:
+        float:
+        The timeout, in seconds.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    return max(1.0, float(siteconfig.get('webhooks_delivery_timeout')))
+
+
+def queue_webhook_deliveries(
+    deliveries: list[WebHookDelivery],
+) -> None:
+    """Queue WebHook deliveries for sending in the background.
+
+    The deliveries are saved as part of the current transaction, so they'll
+    only be sent if it commits.
+
+    Version Added:
+        8.0
+
+    Args:
+        deliveries (list of
+                    reviewboard.notifications.models.WebHookDelivery):
+            The unsaved deliveries to queue.
+    """
+    if not deliveries:
+        return
+
+    WebHookDelivery.objects.bulk_create(deliveries)
+
+    if get_delivery_mode() == BackgroundMode.LOCAL:
+        transaction.on_commit(_local_runner.start)
+
+
+def process_webhook_deliveries(
+    *,
+    concurrency: Optional[int] = None,
+    target_concurrency: Optional[int] = None,
+    max_deliveries: Optional[int] = None,
+) -> int:
+    """Send queued WebHook deliveries that are due.
+
+    Each delivery is claimed before it's sent, so several processes can
+    safely send deliveries at once. With a concurrency of 1, deliveries are
+    sent from the calling thread.
+
+    Version Added:
+        8.0
+
+    Args:
+        concurrency (int, optional):
+            The maximum number of deliveries to send at once. This defaults
+            to the ``webhooks_delivery_concurrency`` setting.
+
+        target_concurrency (int, optional):
+            The maximum number of deliveries to send to any one target at
+            once. This defaults to the
+            ``webhooks_delivery_target_concurrency`` setting.
+
+        max_deliveries (int, optional):
+            The maximum number of deliveries to send. By default, this will
+            send deliveries until none are due.
+
+    Returns:
+        int:
+        The number of deliveries attempted.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    if concurrency is None:
+        concurrency = int(siteconfig.get('webhooks_delivery_concurrency'))
+
+    if target_concurrency is None:
+        target_concurrency = int(
+            siteconfig.get('webhooks_delivery_target_concurrency'))
+
+    concurrency = max(1, concurrency)
+    target_concurrency = max(1, target_concurrency)
+    max_attempts = max(
+        1, int(siteconfig.get('webhooks_delivery_max_attempts')))
+    timeout = get_delivery_timeout()
+
+    in_flight: dict[Future, int] = {}
+    target_counts: Counter[int] = Counter()
+    num_processed = 0
+
+    executor: Optional[ThreadPoolExecutor] = None
+
+    if concurrency > 1:
+        executor = ThreadPoolExecutor(max_workers=concurrency,
+                                      thread_name_prefix='rb-webhooks')
+
+    try:
+        while True:
+            limit = concurrency - len(in_flight)
+            num_candidates = 0
+
+            if max_deliveries is not None:
+                limit = min(limit,
+                            max_deliveries - num_processed - len(in_flight))
+
+            if limit > 0:
+                busy_target_ids = [
+                    target_id
+                    for target_id, count in target_counts.items()
+                    if count >= target_concurrency
+                ]
+                candidates = list(
+                    WebHookDelivery.objects
+                    .filter(status=WebHookDelivery.STATUS_PENDING,
+                            next_attempt__lte=timezone.now())
+                    .exclude(target_id__in=busy_target_ids)
+                    .order_by('next_attempt', 'pk')
+                    .values_list('pk', 'target_id', 'next_attempt')
+                    [:limit * target_concurrency])
+                num_candidates = len(candidates)
+                num_submitted = 0
+
+                for delivery_id, target_id, next_attempt in candidates:
+                    if num_submitted >= limit:
+                        break
+
+                    if target_counts[target_id] >= target_concurrency:
+                        continue
+
+                    if not _claim_delivery(delivery_id, next_attempt,
+                                           timeout=timeout):
+                        # Another process claimed this delivery first.
+                        continue
+
+                    if executor is None:
+                        future = Future()
+                        _run_delivery(delivery_id,
+                                      timeout=timeout,
+                                      max_attempts=max_attempts)
+                        future.set_result(None)
+                    else:
+                        future = executor.submit(_run_delivery_in_thread,
+                                                 delivery_id,
+                                                 timeout=timeout,
+                                                 max_attempts=max_attempts)
+
+                    in_flight[future] = target_id
+                    target_counts[target_id] += 1
+                    num_submitted += 1
+
+            if not in_flight:
+                if num_candidates:
+                    # Other processes claimed everything we found. There may
+                    # be more due.
+                    continue
+
+                break
+
+            done = wait(in_flight, return_when=FIRST_COMPLETED)[0]
+
+            for future in done:
+                target_counts[in_flight.pop(future)] -= 1
+                num_processed += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return num_processed
+
+
+def send_webhook_request(
+    url: str,
+    body: bytes,
+    headers: dict[str, str],
+    *,
+    timeout: float,
+) -> int:
+    """Send a WebHook request to a URL.
+
+    Connections are reused for later requests to the same host, unless a
+    proxy is configured for the URL.
+
+    Redirects listed in :py:data:`FOLLOW_REDIRECT_STATUS_CODES` are
+    followed, sending the request again to the new URL. Any other redirect
+    status is returned as-is.
+
+    Version Added:
+        8.0
+
+    Args:
+        url (str):
+            The URL to send to.
+
+        body (bytes):
+            The request body.
+
+        headers (dict):
+            The request headers.
+
+        timeout (float):
+            The timeout for the request, in seconds.
+
+    Returns:
+        int:
+        The HTTP status code of the final response.
+
+    Raises:
+        Exception:
+            The request could not be sent. This may be any error raised
+            when connecting or sending.
+
+        WebHookDeliveryError:
+            The target redirected too many times.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        status, location = _send_request(url, body, headers,
+                                         timeout=timeout)
+
+        if status not in FOLLOW_REDIRECT_STATUS_CODES or not location:
+            return status
+
+        url = urljoin(url, location)
+
+    raise WebHookDeliveryError(
+        f'Redirected more than {MAX_REDIRECTS} times')
+
+
+def get_webhook_delivery_stats(
+    *,
+    target: Optional[WebHookTarget] = None,
+    since: Optional[datetime] = None,
+) -> WebHookDeliveryStats:
+    """Return statistics on WebHook deliveries.
+
+    Version Added:
+        8.0
+
+    Args:
+        target (reviewboard.notifications.models.WebHookTarget, optional):
+            A specific target to return statistics for.
+
+        since (datetime.datetime, optional):
+            Only include deliveries created after this time. Pending
+            deliveries are always included.
+
+    Returns:
+        WebHookDeliveryStats:
+        The delivery statistics.
+    """
+    queryset = WebHookDelivery.objects.all()
+
+    if target is not None:
+        queryset = queryset.filter(target=target)
+
+    if since is not None:
+        queryset = queryset.filter(
+            Q(created__gte=since) |
+            Q(status=WebHookDelivery.STATUS_PENDING))
+
+    delivered_q = Q(status=WebHookDelivery.STATUS_DELIVERED)
+    pending_q = Q(status=WebHookDelivery.STATUS_PENDING)
+
+    stats = queryset.aggregate(
+        avg_latency_ms=Avg('latency_ms', filter=delivered_q),
+        delivered=Count('pk', filter=delivered_q),
+        failed=Count('pk', filter=Q(status=WebHookDelivery.STATUS_FAILED)),
+        max_latency_ms=Max('latency_ms', filter=delivered_q),
+        oldest_pending=Min('created', filter=pending_q),
+        pending=Count('pk', filter=pending_q))
+
+    return {
+        'avg_latency_ms': stats['avg_latency_ms'],
+        'delivered': stats['delivered'],
+        'failed': stats['failed'],
+        'max_latency_ms': stats['max_latency_ms'],
+        'oldest_pending': stats['oldest_pending'],
+        'pending': stats['pending'],
+    }
+
+
+def prune_webhook_deliveries(
+    *,
+    older_than: datetime,
+) -> int:
+    """Delete completed deliveries from the delivery log.
+
+    Version Added:
+        8.0
+
+    Args:
+        older_than (datetime.datetime):
+            Only deliveries created before this time will be deleted.
+
+    Returns:
+        int:
+        The number of deliveries deleted.
+    """
+    return prune_finished_entries(
+        WebHookDelivery.objects.all(),
+        unfinished_statuses={WebHookDelivery.STATUS_PENDING},
+        older_than=older_than)
+
+
+def get_retry_delay(
+    attempts: int,
+) -> timedelta:
+    """Return how long to wait before retrying a failed delivery.
+
+    Version Added:
+        8.0
+
+    Args:
+        attempts (int):
+            The number of attempts made so far.
+
+    Returns:
+        datetime.timedelta:
+        The delay before the next attempt.
+    """
+    return timedelta(seconds=min(
+        RETRY_BASE_DELAY_SECS * (2 ** max(0, attempts - 1)),
+        RETRY_MAX_DELAY_SECS))
+
+
+class _NoRedirectHandler(HTTPRedirectHandler):
+    """A urllib handler that returns redirects instead of following them.
+
+    Version Added:
+        8.0
+    """
+
+    def redirect_request(self, *args, **kwargs) -> None:
+        """Return no new request for a redirect.
+
+        This causes urllib to raise the redirect response as an
+        :py:class:`~urllib.error.HTTPError`.
+
+        Args:
+            *args (tuple, unused):
+                Positional arguments passed to the handler.
+
+            **kwargs (dict, unused):
+                Keyword arguments passed to the handler.
+        """
+        return None
+
+
+def _send_request(
+    url: str,
+    body: bytes,
+    headers: dict[str, str],
+    *,
+    timeout: float,
+) -> tuple[int, Optional[str]]:
+    """Send a single WebHook request to a URL, without following redirects.
+
+    Version Added:
+        8.0
+
+    Args:
+        url (str):
+            The URL to send to.
+
+        body (bytes):
+            The request body.
+
+        headers (dict):
+            The request headers.
+
+        timeout (float):
+            The timeout for the request, in seconds.
+
+    Returns:
+        tuple:
+        A 2-tuple containing:
+
+        Tuple:
+            0 (int):
+                The HTTP status code of the response.
+
+            1 (str):
+                The :mailheader:`Location` header of the response, if any.
+
+    Raises:
+        Exception:
+            The request could not be sent. This may be any error raised
+            when connecting or sending.
+    """
+    url_parts = urlsplit(url)
+    scheme = url_parts.scheme
+    host = url_parts.hostname or ''
+
+    if scheme in getproxies() and not proxy_bypass(host):
+        # http.client doesn't support proxies, so let urllib handle these.
+        opener = build_opener(_NoRedirectHandler)
+
+        try:
+            with opener.open(Request(url, body, headers),
+                             timeout=timeout) as f:
+                f.read()
+
+                return f.status, f.headers.get('Location')
+        except HTTPError as e:
+            return e.code, e.headers.get('Location')
+
+    path = url_parts.path or '/'
+
+    if url_parts.query:
+        path = f'{path}?{url_parts.query}'
+
+    port = url_parts.port
+
+    while True:
+        conn, reused = connection_pool.acquire(scheme, host, port,
+                                               timeout=timeout)
+
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (BrokenPipeError, ConnectionResetError,
+                http.client.RemoteDisconnected):
+            conn.close()
+
+            if reused:
+                # The server closed the idle connection. Try a new one.
+                continue
+
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            connection_pool.release(scheme, host, port, conn)
+
+        return response.status, response.getheader('Location')
+
+
+def _claim_delivery(
+    delivery_id: int,
+    next_attempt: datetime,
+    *,
+    timeout: float,
+) -> bool:
+    """Claim a delivery for sending.
+
+    The delivery's next attempt is pushed back so other processes won't
+    send it. If this process exits before finishing, the delivery will be
+    picked up again once that time has passed.
+
+    Version Added:
+        8.0
+
+    Args:
+        delivery_id (int):
+            The ID of the delivery to claim.
+
+        next_attempt (datetime.datetime):
+            The time the delivery was due, as last read.
+
+        timeout (float):
+            The timeout for sending the delivery, in seconds.
+
+    Returns:
+        bool:
+        ``True`` if the delivery was claimed. ``False`` if another process
+        claimed it first.
+    """
+    lease = timedelta(seconds=timeout + CLAIM_LEASE_SECS)
+
+    return bool(
+        WebHookDelivery.objects
+        .filter(pk=delivery_id,
+                status=WebHookDelivery.STATUS_PENDING,
+                next_attempt=next_attempt)
+        .update(next_attempt=timezone.now() + lease)
+    )
+
+
+def _run_delivery_in_thread(
+    delivery_id: int,
+    *,
+    timeout: float,
+    max_attempts: int,
+) -> None:
+    """Send a claimed delivery from a thread in the thread pool.
+
+    Version Added:
+        8.0
+
+    Args:
+        delivery_id (int):
+            The ID of the delivery to send.
+
+        timeout (float):
+            The timeout for the request, in seconds.
+
+        max_attempts (int):
+            The maximum number of attempts before the delivery fails.
+    """
+    try:
+        _run_delivery(delivery_id,
+                      timeout=timeout,
+                      max_attempts=max_attempts)
+    finally:
+        connections.close_all()
+
+
+def _run_delivery(
+    delivery_id: int,
+    *,
+    timeout: float,
+    max_attempts: int,
+) -> None:
+    """Send a claimed delivery and record the result.
+
+    Version Added:
+        8.0
+
+    Args:
+        delivery_id (int):
+            The ID of the delivery to send.
+
+        timeout (float):
+            The timeout for the request, in seconds.
+
+        max_attempts (int):
+            The maximum number of attempts before the delivery fails.
+    """
+    try:
+        try:
+            delivery = WebHookDelivery.objects.get(pk=delivery_id)
+        except WebHookDelivery.DoesNotExist:
+            return
+
+        attempts = delivery.attempts + 1
+        response_status: Optional[int] = None
+        error: Optional[WebHookDeliveryError] = None
+        start = time.monotonic()
+
+        try:
+            response_status = send_webhook_request(delivery.url,
+                                                   bytes(delivery.body),
+                                                   delivery.headers,
+                                                   timeout=timeout)
+
+            if response_status >= 400:
+                error = WebHookDeliveryError(
+                    f'HTTP {response_status}',
+                    response_status=response_status,
+                    retry=(response_status >= 500 or
+                           response_status in RETRY_STATUS_CODES))
+            elif response_status >= 300:
+                # The payload wasn't accepted at the new location, so this
+                # isn't a delivery. The target may be fixed before the
+                # retry.
+                error = WebHookDeliveryError(
+                    f'HTTP {response_status} redirect was not followed',
+                    response_status=response_status)
+        except Exception as e:
+            error = WebHookDeliveryError(str(e) or type(e).__name__)
+
+        latency_ms = int((time.monotonic() - start) * 1000)
+        now = timezone.now()
+        values = {
+            'attempts': attempts,
+            'latency_ms': latency_ms,
+            'response_status': response_status,
+        }
+
+        if error is None:
+            values.update({
+                'completed': now,
+                'last_error': '',
+                'status': WebHookDelivery.STATUS_DELIVERED,
+            })
+        elif error.retry and attempts < max_attempts:
+            logger.warning('Could not deliver WebHook %s to %s (attempt '
+                           '%d of %d): %s',
+                           delivery_id, delivery.url, attempts,
+                           max_attempts, error)
+
+            values.update({
+                'last_error': str(error),
+                'next_attempt': now + get_retry_delay(attempts),
+            })
+        else:
+            logger.error('Could not deliver WebHook %s to %s after %d '
+                         'attempt(s): %s',
+                         delivery_id, delivery.url, attempts, error)
+
+            values.update({
+                'completed': now,
+                'last_error': str(error),
+                'status': WebHookDelivery.STATUS_FAILED,
+            })
+
+        WebHookDelivery.objects.filter(pk=delivery_id).update(**values)
+    except Exception as e:
+        logger.exception('Unexpected error delivering WebHook %s: %s',
+                         delivery_id, e)
+
+
+_local_runner = LocalBackgroundRunner(process_webhook_deliveries,
+                                     name='rb-webhooks-local')
@@ -29,7 +29,12 @@ from djblets.webapi.encoders import (BasicAPIEncoder, JSONEncoderAdapter,
                                      ResourceAPIEncoder, XMLEncoderAdapter)
 
 from reviewboard import get_package_version
-from reviewboard.notifications.models import WebHookTarget
+from reviewboard.background import BackgroundMode
+from reviewboard.notifications.models import WebHookDelivery, WebHookTarget
+from reviewboard.notifications.webhook_delivery import (
+    get_delivery_mode,
+    get_delivery_timeout,
+    queue_webhook_deliveries)
 from reviewboard.reviews.models import Review, ReviewRequest
 from reviewboard.reviews.signals import (review_request_closed,
                                          review_request_published,
@@ -280,6 +285,14 @@ def normalize_webhook_payload(payload, request, use_string_keys=False):
 def dispatch_webhook_event(request, webhook_targets, event, payload):
     """Dispatch the given event and payload to the given WebHook targets.
 
+    Depending on the configured WebHook delivery mode, the payloads will
+    either be sent immediately or queued for delivery in the background.
+    See :py:mod:`reviewboard.notifications.webhook_delivery` for details.
+
+    Version Changed:
+        8.0:
+        Added support for delivering WebHooks in the background.
+
     Args:
         request (django.http.HttpRequest):
             The HTTP request from the client.
@@ -302,6 +315,8 @@ def dispatch_webhook_event(request, webhook_targets, event, payload):
     """
     encoder = BasicAPIEncoder()
     bodies = {}
+    delivery_mode = get_delivery_mode()
+    deliveries = []
 
     raw_norm_payload = None
     json_norm_payload = None
@@ -401,23 +416,32 @@ def dispatch_webhook_event(request, webhook_targets, event, payload):
                               hashlib.sha1)
             headers['X-Hub-Signature'] = 'sha1=%s' % signer.hexdigest()
 
+        url = webhook_target.url
+        url_parts = urlsplit(url)
+
+        if url_parts.username or url_parts.password:
+            credentials, netloc = url_parts.netloc.split('@', 1)
+            url = urlunsplit(
+                (url_parts.scheme, netloc, url_parts.path,
+                 url_parts.query, url_parts.fragment))
+            headers['Authorization'] = \
+                'Basic %s' % b64encode(credentials.encode('utf-8'))
+
+        if delivery_mode != BackgroundMode.SYNC:
+            deliveries.append(WebHookDelivery(target=webhook_target,
+                                              event=event,
+                                              url=url,
+                                              headers=headers,
+                                              body=body))
+            continue
+
         with log_timed(f'Dispatching webhook for event {event} to '
                        f'{webhook_target.url}',
                        logger=logger,
                        request=request) as log_timer:
             try:
-                url = webhook_target.url
-                url_parts = urlsplit(url)
-
-                if url_parts.username or url_parts.password:
-                    credentials, netloc = url_parts.netloc.split('@', 1)
-                    url = urlunsplit(
-                        (url_parts.scheme, netloc, url_parts.path,
-                         url_parts.query, url_parts.fragment))
-                    headers['Authorization'] = \
-                        'Basic %s' % b64encode(credentials.encode('utf-8'))
-
-                urlopen(Request(url, body, headers))
+                urlopen(Request(url, body, headers),
+                        timeout=get_delivery_timeout())
             except Exception as e:
                 logger.exception('[%s] Could not dispatch WebHook to %s: %s',
                                  log_timer.trace_id, webhook_target.url, e,
@@ -429,6 +453,8 @@ def dispatch_webhook_event(request, webhook_targets, event, payload):
                                 e.code, e.reason, e.read(),
                                 extra={'request': request})
 
+    queue_webhook_deliveries(deliveries)
+
 
 def _serialize_review(review, request):
     return {
@@ -0,0 +1,194 @@
+"""Caching for the repositories and review groups accessible by users.
+
+Listing review requests requires looking up the IDs of every repository and
+review group the user can access, which takes several queries for each
+page. These IDs rarely change, so they're cached per-user and per-Local
+Site.
+
+All cached IDs share a generation. The generation changes whenever
+anything that affects access changes (membership, permissions, public or
+invite-only flags, or Local Site administrators), which invalidates every
+cached entry at once.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Sequence, TYPE_CHECKING
+from uuid import uuid4
+
+from django.core.cache import cache
+from djblets.cache.backend import cache_memoize, make_cache_key
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.scmtools.models import Repository
+from reviewboard.site.models import AnyOrAllLocalSites, LocalSite
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+
+
+#: How long cached IDs are kept, in seconds.
+#:
+#: Version Added:
+#:     8.0
+ACL_CACHE_EXPIRATION = 60 * 60
+
+
+_ACL_GENERATION_KEY = 'acl-generation'
+
+
+def get_accessible_repository_ids(
+    *,
+    user: User,
+    local_site: AnyOrAllLocalSites,
+) -> Sequence[int]:
+    """Return the IDs of the repositories accessible by a user.
+
+    This returns the same IDs as
+    :py:meth:`Repository.objects.accessible_ids()
+    <reviewboard.scmtools.managers.RepositoryManager.accessible_ids>` with
+    ``visible_only=False``, caching them if the
+    ``reviews_cache_access_lists`` setting is enabled.
+
+    Version Added:
+        8.0
+
+    Args:
+        user (django.contrib.auth.models.User):
+            The logged-in user to return IDs for.
+
+        local_site (reviewboard.site.models.LocalSite):
+            The Local Site to limit repositories to, ``None`` for
+            repositories not on a Local Site, or
+            :py:attr:`LocalSite.ALL <reviewboard.site.models.LocalSite.ALL>`
+            for all repositories.
+
+    Returns:
+        list of int:
+        The repository IDs.
+    """
+    return _get_accessible_ids(
+        name='repositories',
+        user=user,
+        local_site=local_site,
+        lookup=lambda: Repository.objects.accessible_ids(
+            user=user,
+            visible_only=False,
+            local_site=local_site))
+
+
+def get_accessible_group_ids(
+    *,
+    user: User,
+    local_site: AnyOrAllLocalSites,
+) -> Sequence[int]:
+    """Return the IDs of the review groups accessible by a user.
+
+    This returns the same IDs as
+    :py:meth:`Group.objects.accessible_ids()
+    <reviewboard.reviews.managers.ReviewGroupManager.accessible_ids>` with
+    ``visible_only=False``, caching them if the
+    ``reviews_cache_access_lists`` setting is enabled.
+
+    Version Added:
+        8.0
+
+    Args:
+        user (django.contrib.auth.models.User):
+            The logged-in user to return IDs for.
+
+        local_site (reviewboard.site.models.LocalSite):
+            The Local Site to limit review groups to, ``None`` for review
+            groups not on a Local Site, or
+            :py:attr:`LocalSite.ALL <reviewboard.site.models.LocalSite.ALL>`
+            for all review groups.
+
+    Returns:
+        list of int:
+        The review group IDs.
+    """
+    from reviewboard.reviews.models import Group
+
+    return _get_accessible_ids(
+        name='groups',
+        user=user,
+        local_site=local_site,
+        lookup=lambda: Group.objects.accessible_ids(
+            user=user,
+            visible_only=False,
+            local_site=local_site))
+
+
+def invalidate_acl_cache() -> None:
+    """Invalidate all cached repository and review group IDs.
+
+    Version Added:
+        8.0
+    """
+    cache.delete(make_cache_key(_ACL_GENERATION_KEY))
+
+
+def _get_accessible_ids(
+    *,
+    name: str,
+    user: User,
+    local_site: AnyOrAllLocalSites,
+    lookup: Callable[[], Sequence[int]],
+) -> Sequence[int]:
+    """Return accessible IDs, using the cache if enabled.
+
+    Version Added:
+        8.0
+
+    Args:
+        name (str):
+            The name of the type of object, for the cache key.
+
+        user (django.contrib.auth.models.User):
+            The logged-in user to return IDs for.
+
+        local_site (reviewboard.site.models.LocalSite):
+            The Local Site to limit objects to, ``None``, or
+            :py:attr:`LocalSite.ALL <reviewboard.site.models.LocalSite.ALL>`.
+
+        lookup (callable):
+            The function to look up the IDs in the database.
+
+    Returns:
+        list of int:
+        The IDs.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    if not siteconfig.get('reviews_cache_access_lists'):
+        return lookup()
+
+    if local_site is LocalSite.ALL:
+        local_site_key = 'all'
+    elif local_site is None:
+        local_site_key = 'none'
+    else:
+        local_site_key = getattr(local_site, 'pk', local_site)
+
+    return cache_memoize(
+        'acl-accessible-%s-%s-%s-%s' % (_get_acl_generation(), name,
+                                        user.pk, local_site_key),
+        lookup,
+        expiration=ACL_CACHE_EXPIRATION)
+
+
+def _get_acl_generation() -> str:
+    """Return the current generation of cached IDs.
+
+    Version Added:
+        8.0
+
+    Returns:
+        str:
+        An identifier that changes every time the cache is invalidated.
+    """
+    return cache_memoize(_ACL_GENERATION_KEY,
+                         lambda: uuid4().hex)
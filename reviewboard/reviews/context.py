@@ -11,6 +11,7 @@ from housekeeping import deprecate_non_keyword_only_args
 from typing_extensions import NotRequired, TypedDict
 
 from reviewboard.accounts.models import ReviewRequestVisit
+from reviewboard.accounts.visits import record_visit
 from reviewboard.admin.server import build_server_url
 from reviewboard.deprecation import (RemovedInReviewBoard80Warning,
                                      RemovedInReviewBoard90Warning)
@@ -352,10 +353,10 @@ def make_review_request_context(
         request.user.is_authenticated):
         # The main review request view will already have populated this, but
         # other related views (like the diffviewer) don't.
-        context['review_request_visit'] = \
-            ReviewRequestVisit.objects.get_or_create(
-                user=request.user,
-                review_request=review_request)[0]
+        context['review_request_visit'] = record_visit(
+            user=request.user,
+            review_request=review_request,
+            update_timestamp=False)[0]
 
     return context
 
@@ -29,6 +29,7 @@ from reviewboard.reviews.builtin_fields import (CommitListField,
 from reviewboard.reviews.context import should_view_draft
 from reviewboard.reviews.features import status_updates_feature
 from reviewboard.reviews.fields import get_review_request_fieldsets
+from reviewboard.reviews.markdown_utils import prefetch_rendered_markdown
 from reviewboard.reviews.models import (BaseComment,
                                         Comment,
                                         FileAttachmentComment,
@@ -825,6 +826,11 @@ class ReviewRequestPageData:
 
         self.all_comments = all_comments
 
+        # Render all the Markdown text on the page at once, rather than one
+        # field at a time as each entry is rendered.
+        prefetch_rendered_markdown(reviews, ['body_top', 'body_bottom'])
+        prefetch_rendered_markdown(all_comments, ['text'])
+
         if all_comments:
             self.latest_issue_timestamp = max(
                 comment.timestamp
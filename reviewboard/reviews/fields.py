@@ -27,7 +27,8 @@ from reviewboard.diffviewer.templatetags.difftags import highlightregion
 from reviewboard.registries.registry import Registry, OrderedRegistry
 from reviewboard.reviews.markdown_utils import (is_rich_text_default_for_user,
                                                 normalize_text_for_edit,
-                                                render_markdown)
+                                                render_markdown,
+                                                render_markdown_field)
 
 if TYPE_CHECKING:
     from django.db.models import Model
@@ -1518,6 +1519,11 @@ class BaseTextAreaField(BaseEditableField[str]):
         If Markdown is enabled, and the text is not in Markdown format,
         the text will be escaped.
 
+        Version Changed:
+            8.0:
+            Markdown rendered and stored in the review request's
+            ``extra_data`` is now used when it matches the value.
+
         Version Changed:
             7.1:
             This is now expected to return a
@@ -1536,7 +1542,8 @@ class BaseTextAreaField(BaseEditableField[str]):
         text = value or ''
 
         if self.should_render_as_markdown(text):
-            return mark_safe(render_markdown(text))
+            return mark_safe(render_markdown_field(
+                self.review_request_details, self.field_id, text))
         else:
             return escape(text)
 
@@ -0,0 +1,203 @@
+"""Management command to benchmark the queries for listing review requests.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, TYPE_CHECKING
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext as _
+from djblets.siteconfig.models import SiteConfiguration
+
+from reviewboard.reviews.acl_cache import invalidate_acl_cache
+from reviewboard.reviews.models import ReviewRequest
+from reviewboard.site.models import LocalSite
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+
+class Command(BaseCommand):
+    """Management command to benchmark the queries for listing review requests.
+
+    This runs the queries used by the Dashboard and the All Review Requests
+    page for a user, first with the cached access lists cleared and then
+    with them cached, reporting the number of queries and the time taken
+    for each. It can also show the database's query plan for each list.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Benchmark the database queries for listing review requests, with '
+        'and without cached access lists.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            'usernames',
+            metavar='USERNAME',
+            nargs='+',
+            help=_('The users to list review requests for.'))
+        parser.add_argument(
+            '--local-site',
+            metavar='NAME',
+            help=_('The name of the Local Site to list review requests on.'))
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=5,
+            help=_('Number of times to run each list. Defaults to 5.'))
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            default=False,
+            help=_('Show the query plan for each list.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                A user or Local Site could not be found.
+        """
+        iterations: int = max(1, options['iterations'])
+        local_site_name = options['local_site']
+
+        if local_site_name:
+            try:
+                local_site = LocalSite.objects.get(name=local_site_name)
+            except LocalSite.DoesNotExist:
+                raise CommandError(_('The Local Site "%s" does not exist.')
+                                   % local_site_name)
+        else:
+            local_site = None
+
+        users = []
+
+        for username in options['usernames']:
+            try:
+                users.append(User.objects.get(username=username))
+            except User.DoesNotExist:
+                raise CommandError(_('The user "%s" does not exist.')
+                                   % username)
+
+        siteconfig = SiteConfiguration.objects.get_current()
+
+        if not siteconfig.get('reviews_cache_access_lists'):
+            self.stderr.write(_(
+                'Access lists are not being cached. Cached results will be '
+                'the same as uncached results.'
+            ))
+
+        self.stdout.write('%-16s %-10s %8s %8s %12s'
+                          % (_('User'), _('List'), _('Cache'),
+                             _('Queries'), _('Avg. ms')))
+
+        for user in users:
+            lists: dict[str, Callable[[], QuerySet]] = {
+                'all': lambda: ReviewRequest.objects.public(
+                    user=user,
+                    local_site=local_site,
+                    distinct=False),
+                'incoming': lambda: ReviewRequest.objects.to_user(
+                    user,
+                    user,
+                    local_site=local_site,
+                    distinct=False,
+                    filter_private=True),
+            }
+
+            for list_name, get_queryset in lists.items():
+                for cold in (True, False):
+                    self._run_benchmark(
+                        username=user.username,
+                        list_name=list_name,
+                        cold=cold,
+                        get_queryset=get_queryset,
+                        iterations=iterations)
+
+                if options['explain']:
+                    self.stdout.write('')
+                    self.stdout.write(get_queryset().explain())
+                    self.stdout.write('')
+
+    def _run_benchmark(
+        self,
+        *,
+        username: str,
+        list_name: str,
+        cold: bool,
+        get_queryset: Callable[[], QuerySet],
+        iterations: int,
+    ) -> None:
+        """Benchmark a list of review requests.
+
+        The first run is used to count queries.
+
+        Args:
+            username (str):
+                The username of the user listing review requests.
+
+            list_name (str):
+                The name of the list.
+
+            cold (bool):
+                Whether to benchmark with the cache invalidated before each
+                run.
+
+            get_queryset (callable):
+                The function returning the queryset for the list.
+
+            iterations (int):
+                The number of times to run the list.
+        """
+        total_secs = 0.0
+        num_queries = 0
+
+        for i in range(iterations):
+            if cold:
+                invalidate_acl_cache()
+
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                queryset = get_queryset()
+                queryset.count()
+                list(queryset.values_list('pk', flat=True)[:25])
+                total_secs += time.perf_counter() - start
+
+            if i == 0:
+                num_queries = len(ctx.captured_queries)
+
+        self.stdout.write('%-16s %-10s %8s %8d %12.2f' % (
+            username,
+            list_name,
+            _('cold') if cold else _('warm'),
+            num_queries,
+            total_secs * 1000 / iterations,
+        ))
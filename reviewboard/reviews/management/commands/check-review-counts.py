@@ -0,0 +1,111 @@
+"""Management command to check and repair review request counters.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+
+from reviewboard.accounts.counters import check_site_profile_counters
+
+
+class Command(BaseCommand):
+    """Management command to check and repair review request counters.
+
+    Unlike :command:`fixreviewcounts`, which clears every counter so they're
+    all recomputed when next viewed, this compares each counter against the
+    true count and repairs only those that have drifted. It works through
+    the profiles in batches, so it can be run on a schedule on a busy
+    server.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Checks the review request counters on accounts against the true '
+        'counts, and repairs any that are wrong.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help=_('Report wrong counters without repairing them.'))
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help=_('Number of accounts to check at a time. Defaults to '
+                   '100.'))
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help=_('Number of seconds to wait between batches, to reduce '
+                   'load on the database. Defaults to 0.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        batch_size = options['batch_size']
+        pause = options['pause']
+        repair = not options['dry_run']
+
+        if batch_size < 1:
+            raise CommandError(_('--batch-size must be at least 1.'))
+
+        checked = 0
+        drifted = 0
+        repaired = 0
+        after_pk = 0
+
+        while True:
+            stats = check_site_profile_counters(repair=repair,
+                                                batch_size=batch_size,
+                                                after_pk=after_pk,
+                                                max_profiles=batch_size)
+
+            if not stats['checked']:
+                break
+
+            checked += stats['checked']
+            drifted += stats['drifted']
+            repaired += stats['repaired']
+            after_pk = stats['last_pk']
+
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(_('Checked %d account(s).') % checked)
+        self.stdout.write(_('Found %d wrong counter(s).') % drifted)
+
+        if repair:
+            self.stdout.write(_('Repaired %d counter(s).') % repaired)
@@ -1,12 +1,25 @@
 """Management command to manage the search index."""
 
+import os
+
+from django.conf import settings
 from django.core.management import call_command
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils.translation import gettext as _
 
+from reviewboard.search import search_backend_registry
+from reviewboard.search.rebuild import rebuild_search_index
+from reviewboard.search.search_backends.whoosh import WhooshBackend
+
 
 class Command(BaseCommand):
-    """Management command to manage the search index."""
+    """Management command to manage the search index.
+
+    Version Changed:
+        8.0:
+        Added ``--partitioned`` and ``--resume`` for rebuilding the index in
+        partitions across worker processes.
+    """
 
     help = _('Creates a search index of review requests.')
     requires_model_validation = True
@@ -24,6 +37,41 @@ class Command(BaseCommand):
             dest='rebuild',
             default=False,
             help='Rebuild the database index')
+        parser.add_argument(
+            '--partitioned',
+            action='store_true',
+            default=False,
+            help=_('Rebuild the index in ranges of IDs, which can be '
+                   'indexed by multiple workers and resumed if '
+                   'interrupted.'))
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            default=False,
+            help=_('Resume an interrupted partitioned rebuild.'))
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=_('Number of worker processes for a partitioned rebuild. '
+                   'Defaults to 1.'))
+        parser.add_argument(
+            '--partition-size',
+            type=int,
+            default=10000,
+            help=_('Number of IDs in each partition. Defaults to 10000.'))
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help=_('Number of objects each worker loads at a time. '
+                   'Defaults to 500.'))
+        parser.add_argument(
+            '--checkpoint-file',
+            default=os.path.join(settings.SITE_DATA_DIR,
+                                 'search-index-rebuild.json'),
+            help=_('File for recording the progress of a partitioned '
+                   'rebuild.'))
 
     def handle(self, **options):
         """Handle the command.
@@ -31,9 +79,97 @@ class Command(BaseCommand):
         Args:
             **options (dict):
                 Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options, or the
+                partitioned rebuild failed.
         """
-        # Call the appropriate Haystack command to refresh the search index.
-        if options['rebuild']:
+        if options['partitioned'] or options['resume']:
+            self._rebuild_partitioned(options)
+        elif options['rebuild']:
+            # Call the appropriate Haystack command to refresh the search
+            # index.
             call_command('rebuild_index', interactive=False)
         else:
             call_command('update_index')
+
+    def _rebuild_partitioned(self, options):
+        """Rebuild the search index in partitions.
+
+        Args:
+            options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options, or the
+                rebuild failed.
+        """
+        workers = options['workers']
+        checkpoint_path = options['checkpoint_file']
+
+        for option in ('workers', 'partition_size', 'chunk_size'):
+            if options[option] < 1:
+                raise CommandError(
+                    _('--%s must be at least 1.')
+                    % option.replace('_', '-'))
+
+        backend = search_backend_registry.current_backend
+
+        if backend is None:
+            raise CommandError(_('Search is not enabled.'))
+
+        if (workers > 1 and
+            backend.search_backend_id == WhooshBackend.search_backend_id):
+            # Whoosh only allows one process to write to an index at a time.
+            self.stderr.write(_('Whoosh does not support multiple workers. '
+                                'Using a single worker.'))
+            workers = 1
+
+        if options['resume'] and not os.path.exists(checkpoint_path):
+            raise CommandError(
+                _('There is no rebuild to resume. The checkpoint file "%s" '
+                  'does not exist.')
+                % checkpoint_path)
+
+        def _on_partition_done(model_label, i, num_partitions, count):
+            self.stdout.write(
+                _('Indexed %(count)d object(s) in partition %(num)d of '
+                  '%(total)d for %(model)s.')
+                % {
+                    'count': count,
+                    'model': model_label,
+                    'num': i + 1,
+                    'total': num_partitions,
+                })
+
+        try:
+            stats = rebuild_search_index(
+                checkpoint_path=checkpoint_path,
+                resume=options['resume'],
+                workers=workers,
+                partition_size=options['partition_size'],
+                chunk_size=options['chunk_size'],
+                on_partition_done=_on_partition_done)
+        except Exception as e:
+            raise CommandError(
+                _('The search index rebuild did not finish: %(error)s\n'
+                  'Run this command again with --resume to continue it.')
+                % {
+                    'error': e,
+                })
+
+        if stats['skipped']:
+            self.stdout.write(
+                _('Skipped %d partition(s) indexed previously.')
+                % stats['skipped'])
+
+        self.stdout.write(
+            _('Indexed %(count)d object(s) in %(partitions)d partition(s).')
+            % {
+                'count': stats['indexed'],
+                'partitions': stats['partitions'],
+            })
+
+        os.unlink(checkpoint_path)
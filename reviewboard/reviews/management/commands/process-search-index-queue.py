@@ -0,0 +1,112 @@
+"""Management command to write queued changes to the search index.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext as _
+
+from reviewboard.search.indexing_queue import (flush_search_index_queue,
+                                               get_search_index_queue_stats,
+                                               process_search_index_queue)
+
+
+class Command(BaseCommand):
+    """Management command to write queued changes to the search index.
+
+    By default, this writes all queued changes and then exits. With
+    ``--watch``, it keeps running and checks the queue on a fixed interval,
+    writing changes once they're due. This acts as a worker process, keeping
+    the search index up to date even if the web server processes that
+    queued the changes have exited.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Write changes queued for the search index when using batched '
+        'on-the-fly indexing.'
+    )
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help=_(
+                'Keep running, writing queued changes once they are due.'
+            ))
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help=_(
+                'Number of seconds to wait between checks of the queue '
+                'when using --watch. Defaults to 1.'
+            ))
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help=_('Show statistics on the queue.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        poll_interval = options['poll_interval']
+
+        if poll_interval <= 0:
+            raise CommandError(_('--poll-interval must be greater than 0.'))
+
+        if options['stats']:
+            self._show_stats()
+        elif options['watch']:
+            while True:
+                if not process_search_index_queue():
+                    time.sleep(poll_interval)
+        else:
+            num_written = flush_search_index_queue()
+
+            self.stdout.write(_('Wrote %d object(s) to the search index.')
+                              % num_written)
+
+    def _show_stats(self) -> None:
+        """Show statistics on the queue."""
+        stats = get_search_index_queue_stats()
+        oldest_pending_age = stats['oldest_pending_age']
+
+        self.stdout.write(_('Queued objects: %d') % stats['pending'])
+        self.stdout.write(_('Objects waiting to be retried: %d')
+                          % stats['retrying'])
+
+        if oldest_pending_age is not None:
+            self.stdout.write(
+                _('Oldest queued change: %d second(s) ago')
+                % oldest_pending_age)
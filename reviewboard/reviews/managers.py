@@ -15,6 +15,8 @@ from housekeeping.functions import deprecate_non_keyword_only_args
 
 from reviewboard.deprecation import RemovedInReviewBoard80Warning
 from reviewboard.diffviewer.models import DiffSetHistory
+from reviewboard.reviews.acl_cache import (get_accessible_group_ids,
+                                           get_accessible_repository_ids)
 from reviewboard.reviews.signals import review_request_diffset_uploaded
 from reviewboard.scmtools.errors import ChangeNumberInUseError
 from reviewboard.scmtools.models import Repository
@@ -169,8 +171,6 @@ class CommentManager(Manager['BaseComment']):
             django.db.models.query.QuerySet:
             A queryset for the given conditions.
         """
-        from reviewboard.reviews.models import Group
-
         q = Q()
 
         if local_site is not LocalSite.ALL:
@@ -188,13 +188,11 @@ class CommentManager(Manager['BaseComment']):
 
             # TODO: should be consolidated with queries in ReviewRequestManager
             if user and user.is_authenticated:
-                accessible_repo_ids = Repository.objects.accessible_ids(
+                accessible_repo_ids = get_accessible_repository_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
-                accessible_group_ids = Group.objects.accessible_ids(
+                accessible_group_ids = get_accessible_group_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
 
                 repo_q |= Q(('review__review_request__repository__in',
@@ -467,6 +465,12 @@ class ReviewRequestQuerySet(QuerySet):
         queryset = self
 
         if user and user.is_authenticated:
+            from reviewboard.accounts.visits import flush_visits
+
+            # New review counts are based on the user's visits, so make sure
+            # any deferred visits are stored first.
+            flush_visits(user=user)
+
             select_dict = {}
 
             select_dict['new_review_count'] = """
@@ -1228,8 +1232,6 @@ class ReviewRequestManager(Manager['ReviewRequest']):
             django.db.models.query.QuerySet:
             The resulting queryset.
         """
-        from reviewboard.reviews.models import Group
-
         is_authenticated = (user is not None and user.is_authenticated)
 
         if show_all_unpublished:
@@ -1257,9 +1259,8 @@ class ReviewRequestManager(Manager['ReviewRequest']):
             target_groups_m2m = model.target_groups.through.objects
 
             if is_authenticated:
-                accessible_repo_ids = Repository.objects.accessible_ids(
+                accessible_repo_ids = get_accessible_repository_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
 
                 # This is not a subquery, and will operate directly on the
@@ -1317,9 +1318,8 @@ class ReviewRequestManager(Manager['ReviewRequest']):
                 # Since we're using Exists(), we stop on the first match of
                 # either, so in the worst case, it should still be faster than
                 # using those two INNER JOINs + DISTINCT.
-                accessible_group_ids = Group.objects.accessible_ids(
+                accessible_group_ids = get_accessible_group_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
 
                 group_q = Q(
@@ -1748,8 +1748,6 @@ class ReviewManager(Manager['Review']):
             django.db.models.query.QuerySet:
             A queryset for the given conditions.
         """
-        from reviewboard.reviews.models import Group
-
         q = Q()
 
         if base_reply_to is not ReviewManager.ANY:
@@ -1771,13 +1769,11 @@ class ReviewManager(Manager['Review']):
 
             # TODO: should be consolidated with queries in ReviewRequestManager
             if user and user.is_authenticated:
-                accessible_repo_ids = Repository.objects.accessible_ids(
+                accessible_repo_ids = get_accessible_repository_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
-                accessible_group_ids = Group.objects.accessible_ids(
+                accessible_group_ids = get_accessible_group_ids(
                     user=user,
-                    visible_only=False,
                     local_site=local_site)
 
                 repo_q |= \
@@ -1,15 +1,29 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from typing import Iterable, Optional, Sequence
+
 import pymdownx.emoji
 from bleach.sanitizer import Cleaner
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Model
 from django.utils.encoding import force_str
 from django.utils.html import escape
 from djblets import markdown as djblets_markdown
+from djblets.cache.backend import make_cache_key
 from djblets.siteconfig.models import SiteConfiguration
 from markdown import markdown
 
 
+logger = logging.getLogger(__name__)
+
+
 # Keyword arguments used when calling a Markdown renderer function.
 #
 # We use XHTML instead of HTML5 to ensure the results can be parsed by an
@@ -120,6 +134,36 @@ SAFE_MARKDOWN_ATTRS = {
 SAFE_MARKDOWN_URL_PROTOCOLS = ['http', 'https', 'mailto']
 
 
+#: The version of the format of cached and stored rendered Markdown.
+#:
+#: This should be updated when the rendered HTML changes in a way not
+#: covered by :py:func:`get_markdown_render_version`, such as a change to
+#: the Markdown extensions' own code.
+#:
+#: Version Added:
+#:     8.0
+RENDERED_MARKDOWN_FORMAT_VERSION = 1
+
+
+#: The key in ``extra_data`` used to store rendered Markdown.
+#:
+#: Keys starting with ``__`` are private, and are not exposed in the API.
+#:
+#: Version Added:
+#:     8.0
+RENDERED_MARKDOWN_EXTRA_DATA_KEY = '__rendered_markdown'
+
+
+#: The maximum size of rendered Markdown to store in the cache.
+#:
+#: Larger rendered text will be rendered again each time it's needed,
+#: unless rendered Markdown is being stored in the database.
+#:
+#: Version Added:
+#:     8.0
+MAX_CACHED_RENDERED_MARKDOWN_SIZE = 512 * 1024
+
+
 def markdown_escape_field(obj, field_name):
     """Escapes Markdown text in a model or dictionary's field.
 
@@ -259,6 +303,11 @@ def render_markdown(text):
     It's rendered to XHTML in order to allow the element tree to be easily
     parsed for code review and change description diffing.
 
+    Version Changed:
+        8.0:
+        The rendered XHTML is now cached, keyed off the text and the
+        Markdown configuration. See :py:func:`render_markdown_many`.
+
     Args:
         text (bytes or unicode):
             The Markdown text to render.
@@ -269,7 +318,406 @@ def render_markdown(text):
         unicode:
         The Markdown-rendered XHTML.
     """
-    return clean_markdown_html(markdown(force_str(text), **MARKDOWN_KWARGS))
+    text = force_str(text)
+
+    return render_markdown_many([text])[text]
+
+
+def render_markdown_many(
+    texts: Iterable[str],
+) -> dict[str, str]:
+    """Render several Markdown texts to XHTML.
+
+    This works like :py:func:`render_markdown`, but fetches any
+    already-rendered texts from the cache in one go, which is much faster
+    than fetching them one at a time for a page full of comments.
+
+    Rendered text is cached based on a hash of the text and the version
+    from :py:func:`get_markdown_render_version`, so identical text is only
+    rendered once, and any change to the Markdown configuration or
+    libraries results in the text being rendered again.
+
+    Version Added:
+        8.0
+
+    Args:
+        texts (list of str):
+            The Markdown texts to render.
+
+    Returns:
+        dict:
+        A mapping of each Markdown text to its rendered XHTML.
+    """
+    render_version = get_markdown_render_version()
+    cache_keys: dict[str, str] = {}
+
+    for text in texts:
+        if text not in cache_keys:
+            cache_keys[text] = make_cache_key(
+                'markdown-html-%s' % _get_rendered_markdown_id(
+                    text, render_version))
+
+    if not cache_keys:
+        return {}
+
+    try:
+        cached = cache.get_many(list(cache_keys.values()))
+    except Exception as e:
+        logger.exception('Unable to fetch rendered Markdown from the '
+                         'cache: %s',
+                         e)
+        cached = {}
+
+    result: dict[str, str] = {}
+    to_cache: dict[str, str] = {}
+
+    for text, cache_key in cache_keys.items():
+        html = cached.get(cache_key)
+
+        if html is None:
+            html = clean_markdown_html(markdown(text, **MARKDOWN_KWARGS))
+
+            if len(html) <= MAX_CACHED_RENDERED_MARKDOWN_SIZE:
+                to_cache[cache_key] = html
+
+        result[text] = html
+
+    if to_cache:
+        try:
+            cache.set_many(to_cache)
+        except Exception as e:
+            logger.exception('Unable to store rendered Markdown in the '
+                             'cache: %s',
+                             e)
+
+    return result
+
+
+def get_markdown_render_version() -> str:
+    """Return a version identifying how Markdown is rendered.
+
+    This is a hash of the Markdown configuration, the list of safe HTML
+    tags, attributes, and URL protocols, and the versions of the libraries
+    that render Markdown. If any of these change, previously-rendered
+    Markdown will no longer be used.
+
+    Version Added:
+        8.0
+
+    Returns:
+        str:
+        The render version.
+    """
+    return hashlib.sha256(json.dumps(
+        {
+            'format': RENDERED_MARKDOWN_FORMAT_VERSION,
+            'kwargs': MARKDOWN_KWARGS,
+            'libraries': _get_markdown_library_versions(),
+            'safe_attrs': SAFE_MARKDOWN_ATTRS,
+            'safe_tags': SAFE_MARKDOWN_TAGS,
+            'safe_url_protocols': [
+                *SAFE_MARKDOWN_URL_PROTOCOLS,
+                *(settings.ALLOWED_MARKDOWN_URL_PROTOCOLS or []),
+            ],
+        },
+        sort_keys=True,
+        default=_serialize_markdown_config_value).encode('utf-8')
+    ).hexdigest()[:16]
+
+
+def get_rich_text_field_name(
+    text_field_name: str,
+) -> str:
+    """Return the name of the rich text flag for a text field.
+
+    Version Added:
+        8.0
+
+    Args:
+        text_field_name (str):
+            The name of the text field.
+
+    Returns:
+        str:
+        The name of the field storing whether the text is in Markdown.
+    """
+    if text_field_name == 'text':
+        return 'rich_text'
+    else:
+        return '%s_rich_text' % text_field_name
+
+
+def render_markdown_field(
+    obj: Model,
+    field_name: str,
+    text: Optional[str] = None,
+) -> str:
+    """Render a Markdown text field on an object to XHTML.
+
+    This will use rendered XHTML fetched by
+    :py:func:`prefetch_rendered_markdown` or stored by
+    :py:func:`store_rendered_markdown`, if it's available and matches the
+    text. Otherwise, the text will be rendered using
+    :py:func:`render_markdown`.
+
+    Version Added:
+        8.0
+
+    Args:
+        obj (django.db.models.Model):
+            The object containing the text field.
+
+        field_name (str):
+            The name of the text field.
+
+        text (str, optional):
+            The text to render. This defaults to the value of the field.
+
+    Returns:
+        str:
+        The Markdown-rendered XHTML.
+    """
+    if text is None:
+        text = getattr(obj, field_name)
+
+    text = force_str(text or '')
+
+    prefetched = getattr(obj, '_prefetched_rendered_markdown', {})
+
+    try:
+        prefetched_text, html = prefetched[field_name]
+
+        if prefetched_text == text:
+            return html
+    except KeyError:
+        pass
+
+    html = _get_stored_rendered_markdown(obj, field_name, text)
+
+    if html is None:
+        html = render_markdown(text)
+
+    return html
+
+
+def prefetch_rendered_markdown(
+    objs: Iterable[Model],
+    field_names: Sequence[str],
+) -> None:
+    """Render the Markdown text fields of many objects at once.
+
+    This will render all the Markdown text fields of the objects, fetching
+    any previously-rendered text from the database or the cache in one go.
+    The results are stored on the objects, and used by
+    :py:func:`render_markdown_field`.
+
+    This should be used when displaying many objects on a page, such as
+    all the reviews and comments on a review request.
+
+    Version Added:
+        8.0
+
+    Args:
+        objs (list of django.db.models.Model):
+            The objects to render text for.
+
+        field_names (list of str):
+            The names of the text fields to render. Only fields with rich
+            text enabled will be rendered.
+    """
+    to_render: list[tuple[Model, str, str]] = []
+
+    for obj in objs:
+        prefetched: dict[str, tuple[str, str]] = {}
+        obj._prefetched_rendered_markdown = prefetched
+
+        for field_name in field_names:
+            if not getattr(obj, get_rich_text_field_name(field_name), False):
+                continue
+
+            text = force_str(getattr(obj, field_name) or '')
+            html = _get_stored_rendered_markdown(obj, field_name, text)
+
+            if html is None:
+                to_render.append((obj, field_name, text))
+            else:
+                prefetched[field_name] = (text, html)
+
+    if to_render:
+        rendered = render_markdown_many(
+            text
+            for obj, field_name, text in to_render
+        )
+
+        for obj, field_name, text in to_render:
+            obj._prefetched_rendered_markdown[field_name] = \
+                (text, rendered[text])
+
+
+def store_rendered_markdown(
+    obj: Model,
+    field_names: Sequence[str],
+) -> None:
+    """Store the rendered Markdown text fields in an object's extra_data.
+
+    This only does anything if the ``reviews_store_rendered_markdown``
+    site configuration setting is enabled. The rendered text will be used
+    by :py:func:`render_markdown_field` and
+    :py:func:`prefetch_rendered_markdown`, so that pages showing the object
+    never need to render Markdown or fetch from the cache.
+
+    The object is not saved. This is meant to be called just before
+    saving the object.
+
+    Version Added:
+        8.0
+
+    Args:
+        obj (django.db.models.Model):
+            The object containing the text fields. This must have an
+            ``extra_data`` field.
+
+        field_names (list of str):
+            The names of the text fields to store. Only fields with rich
+            text enabled will be stored.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    if not siteconfig.get('reviews_store_rendered_markdown'):
+        return
+
+    if obj.extra_data is None:
+        obj.extra_data = {}
+
+    render_version = get_markdown_render_version()
+    stored: dict[str, dict[str, str]] = {}
+
+    for field_name in field_names:
+        if getattr(obj, get_rich_text_field_name(field_name), False):
+            text = force_str(getattr(obj, field_name) or '')
+            stored[field_name] = {
+                'html': render_markdown_field(obj, field_name, text),
+                'id': _get_rendered_markdown_id(text, render_version),
+            }
+
+    if stored:
+        obj.extra_data[RENDERED_MARKDOWN_EXTRA_DATA_KEY] = stored
+    else:
+        obj.extra_data.pop(RENDERED_MARKDOWN_EXTRA_DATA_KEY, None)
+
+
+def _get_stored_rendered_markdown(
+    obj: Model,
+    field_name: str,
+    text: str,
+) -> Optional[str]:
+    """Return rendered Markdown stored in an object's extra_data.
+
+    Version Added:
+        8.0
+
+    Args:
+        obj (django.db.models.Model):
+            The object containing the text field.
+
+        field_name (str):
+            The name of the text field.
+
+        text (str):
+            The text that was rendered.
+
+    Returns:
+        str:
+        The stored XHTML, or ``None`` if there's no stored XHTML for this
+        text and render version.
+    """
+    extra_data = getattr(obj, 'extra_data', None)
+
+    if not extra_data:
+        return None
+
+    try:
+        stored = extra_data[RENDERED_MARKDOWN_EXTRA_DATA_KEY][field_name]
+    except (KeyError, TypeError):
+        return None
+
+    if (not isinstance(stored, dict) or
+        stored.get('id') != _get_rendered_markdown_id(
+            text, get_markdown_render_version())):
+        return None
+
+    return stored.get('html')
+
+
+def _get_rendered_markdown_id(
+    text: str,
+    render_version: str,
+) -> str:
+    """Return an ID for rendered Markdown text.
+
+    Version Added:
+        8.0
+
+    Args:
+        text (str):
+            The Markdown text.
+
+        render_version (str):
+            The version from :py:func:`get_markdown_render_version`.
+
+    Returns:
+        str:
+        The ID for the rendered text.
+    """
+    return '%s-%s' % (
+        render_version,
+        hashlib.sha256(text.encode('utf-8')).hexdigest())
+
+
+@lru_cache(maxsize=1)
+def _get_markdown_library_versions() -> dict[str, str]:
+    """Return the versions of the libraries used to render Markdown.
+
+    Version Added:
+        8.0
+
+    Returns:
+        dict:
+        A mapping of package names to versions.
+    """
+    versions: dict[str, str] = {}
+
+    for package_name in ('bleach', 'Markdown', 'Pygments',
+                         'pymdown-extensions'):
+        try:
+            versions[package_name] = version(package_name)
+        except PackageNotFoundError:
+            versions[package_name] = ''
+
+    return versions
+
+
+def _serialize_markdown_config_value(
+    value: object,
+) -> str:
+    """Serialize a non-JSON value in the Markdown configuration.
+
+    This allows functions and other objects in :py:data:`MARKDOWN_KWARGS`
+    to be included in :py:func:`get_markdown_render_version`.
+
+    Version Added:
+        8.0
+
+    Args:
+        value (object):
+            The value to serialize.
+
+    Returns:
+        str:
+        A stable string representing the value.
+    """
+    return '%s.%s' % (getattr(value, '__module__', ''),
+                      getattr(value, '__qualname__', type(value).__name__))
 
 
 def render_markdown_from_file(f):
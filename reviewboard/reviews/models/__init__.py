@@ -1,6 +1,7 @@
 from reviewboard.reviews.models.base_comment import BaseComment
 from reviewboard.reviews.models.default_reviewer import DefaultReviewer
 from reviewboard.reviews.models.diff_comment import Comment
+from reviewboard.reviews.models.diff_upload import DiffUpload
 from reviewboard.reviews.models.file_attachment_comment import \
     FileAttachmentComment
 from reviewboard.reviews.models.general_comment import GeneralComment
@@ -10,6 +11,8 @@ from reviewboard.reviews.models.review_request import ReviewRequest
 from reviewboard.reviews.models.review_request_draft import ReviewRequestDraft
 from reviewboard.reviews.models.screenshot import Screenshot
 from reviewboard.reviews.models.screenshot_comment import ScreenshotComment
+from reviewboard.reviews.models.search_index_queue import \
+    SearchIndexQueueEntry
 from reviewboard.reviews.models.status_update import StatusUpdate
 
 
@@ -17,6 +20,7 @@ __all__ = [
     'BaseComment',
     'Comment',
     'DefaultReviewer',
+    'DiffUpload',
     'FileAttachmentComment',
     'GeneralComment',
     'Group',
@@ -25,5 +29,6 @@ __all__ = [
     'ReviewRequestDraft',
     'Screenshot',
     'ScreenshotComment',
+    'SearchIndexQueueEntry',
     'StatusUpdate',
 ]
@@ -0,0 +1,178 @@
+"""Definitions for the DiffUpload model.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from typing import ClassVar
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from djblets.db.fields import JSONField
+
+from reviewboard.diffviewer.models import DiffCommit, DiffSet
+from reviewboard.reviews.models.review_request import ReviewRequest
+
+
+class DiffUpload(models.Model):
+    """A diff or commit uploaded for processing in the background.
+
+    Large diffs can take a long time to parse, validate, and store. When a
+    client asks for an upload to be processed asynchronously, the uploaded
+    files and form data are stored here and the API returns right away.
+    Processing then happens in the background, and the client can poll the
+    upload's status through the API. See
+    :py:mod:`reviewboard.webapi.diff_uploads` for details.
+
+    Version Added:
+        8.0
+    """
+
+    TYPE_DIFF = 'D'
+    TYPE_COMMIT = 'C'
+
+    TYPE_CHOICES = (
+        (TYPE_DIFF, _('Diff')),
+        (TYPE_COMMIT, _('Commit')),
+    )
+
+    STATUS_PENDING = 'P'
+    STATUS_PROCESSING = 'R'
+    STATUS_DONE = 'D'
+    STATUS_FAILED = 'F'
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_PROCESSING, _('Processing')),
+        (STATUS_DONE, _('Done')),
+        (STATUS_FAILED, _('Failed')),
+    )
+
+    #: The statuses of uploads that haven't finished processing.
+    UNFINISHED_STATUSES: ClassVar[tuple[str, ...]] = (
+        STATUS_PENDING,
+        STATUS_PROCESSING,
+    )
+
+    review_request = models.ForeignKey(
+        ReviewRequest,
+        on_delete=models.CASCADE,
+        related_name='diff_uploads',
+        verbose_name=_('review request'))
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('user'))
+    upload_type = models.CharField(
+        _('upload type'),
+        max_length=1,
+        choices=TYPE_CHOICES)
+
+    form_data = JSONField(
+        _('form data'),
+        help_text=_('The fields posted along with the uploaded files.'))
+    extra_fields = JSONField(
+        _('extra fields'),
+        help_text=_('Extra data fields to store on the created diff.'))
+    diff_name = models.CharField(
+        _('diff name'),
+        max_length=256,
+        blank=True)
+    diff_data = models.BinaryField(
+        _('diff data'),
+        blank=True)
+    parent_diff_name = models.CharField(
+        _('parent diff name'),
+        max_length=256,
+        blank=True)
+    parent_diff_data = models.BinaryField(
+        _('parent diff data'),
+        null=True,
+        blank=True)
+
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True)
+    created = models.DateTimeField(
+        _('created'),
+        default=timezone.now,
+        db_index=True)
+    started = models.DateTimeField(
+        _('started'),
+        null=True,
+        blank=True)
+    lease_expires = models.DateTimeField(
+        _('lease expires'),
+        null=True,
+        blank=True,
+        help_text=_('While processing, the time after which the upload is '
+                    'considered abandoned. This is extended periodically '
+                    'by the process handling it.'))
+    completed = models.DateTimeField(
+        _('completed'),
+        null=True,
+        blank=True)
+
+    diffset = models.ForeignKey(
+        DiffSet,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('diff set'),
+        help_text=_('For diffs, the created diff set. For commits, the '
+                    'diff set the commit is added to.'))
+    diffcommit = models.ForeignKey(
+        DiffCommit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('commit'),
+        help_text=_('For commits, the created commit.'))
+
+    error_code = models.PositiveIntegerField(
+        _('error code'),
+        null=True,
+        blank=True,
+        help_text=_('The API error code, if processing failed.'))
+    error_data = JSONField(
+        _('error data'),
+        help_text=_('The API error message and details, if processing '
+                    'failed.'))
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether processing of the upload has finished.
+
+        Type:
+            bool
+        """
+        return self.status not in self.UNFINISHED_STATUSES
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return (f'{self.get_upload_type_display()} upload for review '
+                f'request {self.review_request_id}')
+
+    class Meta:
+        """Metadata for the model."""
+
+        app_label = 'reviews'
+        db_table = 'reviews_diffupload'
+        ordering = ('created', 'pk')
+        verbose_name = _('Diff Upload')
+        verbose_name_plural = _('Diff Uploads')
@@ -0,0 +1,85 @@
+"""Definitions for the SearchIndexQueueEntry model.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchIndexQueueEntry(models.Model):
+    """An object waiting to be written to the search index.
+
+    When search indexing is queued, changed objects are recorded here
+    instead of being written to the search index during the request. There
+    is at most one entry for each object, so repeated changes are coalesced.
+    Entries are claimed before being written, and kept for retrying if the
+    search backend fails.
+    See :py:mod:`reviewboard.search.indexing_queue` for details.
+
+    Version Added:
+        8.0
+    """
+
+    model_label = models.CharField(
+        _('model label'),
+        max_length=100,
+        help_text=_('The label of the indexed model (for example, '
+                    '"reviews.reviewrequest").'))
+    object_id = models.PositiveIntegerField(
+        _('object ID'))
+    remove = models.BooleanField(
+        _('remove'),
+        default=False,
+        help_text=_('Whether the object is to be removed from the search '
+                    'index.'))
+    queued = models.DateTimeField(
+        _('queued'),
+        default=timezone.now,
+        db_index=True,
+        help_text=_('The time the object was first queued.'))
+    last_queued = models.DateTimeField(
+        _('last queued'),
+        default=timezone.now,
+        help_text=_('The time the object was most recently queued.'))
+    next_attempt = models.DateTimeField(
+        _('next attempt'),
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text=_('If set, the object won\'t be written before this time. '
+                    'This is set while a process is writing the object, '
+                    'and after a failed write, to retry later.'))
+    attempts = models.PositiveIntegerField(
+        _('attempts'),
+        default=0,
+        help_text=_('The number of failed attempts to write the object.'))
+    claim_token = models.CharField(
+        _('claim token'),
+        max_length=32,
+        blank=True,
+        help_text=_('Identifies the flush that claimed the object for '
+                    'writing.'))
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the model.
+
+        Returns:
+            str:
+            A human-readable representation of the model.
+        """
+        return f'{self.model_label}.{self.object_id}'
+
+    class Meta:
+        """Metadata for the model."""
+
+        app_label = 'reviews'
+        db_table = 'reviews_searchindexqueueentry'
+        ordering = ('queued', 'pk')
+        unique_together = (('model_label', 'object_id'),)
+        verbose_name = _('Search Index Queue Entry')
+        verbose_name_plural = _('Search Index Queue Entries')
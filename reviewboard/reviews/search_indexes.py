@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Prefetch
 from haystack import indexes
 
+from reviewboard.diffviewer.models import FileDiff
 from reviewboard.reviews.models import ReviewRequest
 from reviewboard.search.indexes import BaseSearchIndex
 from reviewboard.site.models import LocalSite
@@ -40,7 +42,13 @@ class ReviewRequestIndex(BaseSearchIndex, indexes.Indexable):
         return 'last_updated'
 
     def index_queryset(self, using=None):
-        """Index only public pending and submitted review requests."""
+        """Index only public pending and submitted review requests.
+
+        Version Changed:
+            8.0:
+            File diffs are now fetched with only the file names needed for
+            the index, rather than all their fields.
+        """
         return (
             self.get_model().objects
             .public(status=None,
@@ -53,10 +61,15 @@ class ReviewRequestIndex(BaseSearchIndex, indexes.Indexable):
                             'repository',
                             'submitter',
                             'submitter__profile')
-            .prefetch_related('diffset_history__diffsets',
-                              'diffset_history__diffsets__files',
-                              'target_groups',
-                              'target_people')
+            .prefetch_related(
+                'diffset_history__diffsets',
+                Prefetch('diffset_history__diffsets__files',
+                         queryset=FileDiff.objects.only('pk',
+                                                        'diffset',
+                                                        'source_file',
+                                                        'dest_file')),
+                'target_groups',
+                'target_people')
         )
 
     def prepare_file(self, obj):
@@ -6,11 +6,75 @@ Version Added:
 
 from __future__ import annotations
 
-from django.db.models.signals import pre_delete
-
-from reviewboard.reviews.models import (ReviewRequest,
-                                        ReviewRequestDraft)
+from typing import Collection, Optional, TYPE_CHECKING
+
+from django.contrib.auth.models import Group as AuthGroup, User
+from django.db import transaction
+from django.db.models.signals import (m2m_changed,
+                                      post_delete,
+                                      post_save,
+                                      pre_delete,
+                                      pre_save)
+
+from reviewboard.accounts.models import LocalSiteProfile
+from reviewboard.diffviewer.prerender import queue_diffset_prerender
+from reviewboard.reviews.acl_cache import invalidate_acl_cache
+from reviewboard.reviews.markdown_utils import store_rendered_markdown
+from reviewboard.reviews.models import (Comment,
+                                        FileAttachmentComment,
+                                        GeneralComment,
+                                        Group,
+                                        Review,
+                                        ReviewRequest,
+                                        ReviewRequestDraft,
+                                        ScreenshotComment)
 from reviewboard.reviews.models.review_request import FileAttachmentState
+from reviewboard.reviews.signals import (reply_published,
+                                         review_published,
+                                         review_request_closed,
+                                         review_request_diffset_uploaded,
+                                         review_request_published,
+                                         review_request_reopened)
+from reviewboard.reviews.update_events import publish_review_request_update
+from reviewboard.scmtools.models import Repository
+from reviewboard.site.models import LocalSite
+
+if TYPE_CHECKING:
+    from django.db.models import Model
+    from django.dispatch import Signal
+
+    from reviewboard.changedescs.models import ChangeDescription
+    from reviewboard.diffviewer.models import DiffSet
+
+
+#: The Markdown text fields to store rendered HTML for, by model.
+#:
+#: Version Added:
+#:     8.0
+_MARKDOWN_FIELDS: dict[type[Model], list[str]] = {
+    Comment: ['text'],
+    FileAttachmentComment: ['text'],
+    GeneralComment: ['text'],
+    Review: ['body_top', 'body_bottom'],
+    ReviewRequest: ['description', 'testing_done'],
+    ReviewRequestDraft: ['description', 'testing_done'],
+    ScreenshotComment: ['text'],
+}
+
+
+#: Fields of repositories, review groups, users, and Local Site profiles
+#: that affect which repositories and review groups users can access.
+#:
+#: Version Added:
+#:     8.0
+_ACL_FIELDS = {
+    'invite_only',
+    'is_active',
+    'is_superuser',
+    'local_site',
+    'permissions',
+    'public',
+}
 
 
 def _on_review_request_draft_deleted(
@@ -117,6 +181,224 @@ def _on_review_request_deleted(
     instance.diffset_history.delete()
 
 
+def _on_review_request_diffset_uploaded(
+    sender: type,
+    diffset: DiffSet,
+    **kwargs,
+) -> None:
+    """Queue pre-rendering of a newly-uploaded diff.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type, unused):
+            The sender of the signal.
+
+        diffset (reviewboard.diffviewer.models.DiffSet):
+            The diffset that was uploaded.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    queue_diffset_prerender(diffset)
+
+
+def _on_review_request_published(
+    sender: type[ReviewRequest],
+    review_request: ReviewRequest,
+    changedesc: Optional[ChangeDescription] = None,
+    **kwargs,
+) -> None:
+    """Queue pre-rendering of a diff when it's published.
+
+    The diff will usually have been pre-rendered when it was uploaded, in
+    which case the pre-rendering will only hit the cache.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type, unused):
+            The sender of the signal.
+
+        review_request (reviewboard.reviews.models.ReviewRequest):
+            The review request that was published.
+
+        changedesc (reviewboard.changedescs.models.ChangeDescription,
+                    optional):
+            The change description for the publish, if any.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    if changedesc is None or 'diff' in changedesc.fields_changed:
+        diffset = review_request.get_latest_diffset()
+
+        if diffset is not None:
+            queue_diffset_prerender(diffset)
+
+
+def _on_review_request_updated(
+    sender: type[ReviewRequest],
+    review_request: ReviewRequest,
+    signal: Signal,
+    **kwargs,
+) -> None:
+    """Publish an update event when a review request is updated.
+
+    This handles review requests being published, closed, or reopened.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type, unused):
+            The sender of the signal.
+
+        review_request (reviewboard.reviews.models.ReviewRequest):
+            The review request that was updated.
+
+        signal (django.dispatch.Signal):
+            The signal that was emitted.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    if signal is review_request_closed:
+        event_type = 'review_request_closed'
+    elif signal is review_request_reopened:
+        event_type = 'review_request_reopened'
+    else:
+        event_type = 'review_request_published'
+
+    publish_review_request_update(review_request_id=review_request.pk,
+                                  event_type=event_type,
+                                  timestamp=review_request.last_updated)
+
+
+def _on_review_published(
+    sender: type[Review],
+    review: Review,
+    **kwargs,
+) -> None:
+    """Publish an update event when a review is published.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type, unused):
+            The sender of the signal.
+
+        review (reviewboard.reviews.models.Review):
+            The review that was published.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    publish_review_request_update(review_request_id=review.review_request_id,
+                                  event_type='review_published',
+                                  timestamp=review.timestamp)
+
+
+def _on_reply_published(
+    sender: type[Review],
+    reply: Review,
+    **kwargs,
+) -> None:
+    """Publish an update event when a reply is published.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type, unused):
+            The sender of the signal.
+
+        reply (reviewboard.reviews.models.Review):
+            The reply that was published.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    publish_review_request_update(review_request_id=reply.review_request_id,
+                                  event_type='reply_published',
+                                  timestamp=reply.timestamp)
+
+
+def _on_markdown_object_pre_save(
+    sender: type[Model],
+    instance: Model,
+    update_fields: Optional[frozenset[str]] = None,
+    **kwargs,
+) -> None:
+    """Store rendered Markdown for an object being saved.
+
+    This only does anything if storing rendered Markdown is enabled. See
+    :py:func:`reviewboard.reviews.markdown_utils.store_rendered_markdown`.
+
+    Version Added:
+        8.0
+
+    Args:
+        sender (type):
+            The model class of the object being saved.
+
+        instance (django.db.models.Model):
+            The object being saved.
+
+        update_fields (frozenset of str, optional):
+            The fields being saved, if not saving all fields.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    if update_fields is None or 'extra_data' in update_fields:
+        store_rendered_markdown(instance, _MARKDOWN_FIELDS[sender])
+
+
+def _on_acl_changed(
+    action: Optional[str] = None,
+    update_fields: Optional[Collection[str]] = None,
+    **kwargs,
+) -> None:
+    """Invalidate cached access lists when access may have changed.
+
+    This is called when memberships or permissions change, and when
+    repositories, review groups, users, or Local Site profiles are saved or
+    deleted. Saves that only update fields that don't affect access (such
+    as a user's last login time) are ignored.
+
+    The cache is invalidated again once the transaction commits. Until
+    then, other requests still read the old access rows, and may cache them
+    under the new generation.
+
+    Version Added:
+        8.0
+
+    Args:
+        action (str, optional):
+            The membership change action, for
+            :py:data:`~django.db.models.signals.m2m_changed` signals.
+
+        update_fields (collection of str, optional):
+            The fields being saved, for
+            :py:data:`~django.db.models.signals.post_save` signals.
+
+        **kwargs (dict, unused):
+            Unused additional keyword arguments.
+    """
+    if action is not None and not action.startswith('post_'):
+        return
+
+    if update_fields is not None and not _ACL_FIELDS & set(update_fields):
+        return
+
+    invalidate_acl_cache()
+    transaction.on_commit(invalidate_acl_cache)
+
+
 def connect_signal_handlers() -> None:
     """Connect review and review request related signal handlers.
 
@@ -127,3 +409,39 @@ def connect_signal_handlers() -> None:
                        sender=ReviewRequestDraft)
     pre_delete.connect(_on_review_request_deleted,
                        sender=ReviewRequest)
+    review_request_diffset_uploaded.connect(
+        _on_review_request_diffset_uploaded)
+    review_request_published.connect(_on_review_request_published,
+                                     sender=ReviewRequest)
+
+    for signal in (review_request_published,
+                   review_request_closed,
+                   review_request_reopened):
+        signal.connect(_on_review_request_updated,
+                       sender=ReviewRequest)
+
+    review_published.connect(_on_review_published,
+                             sender=Review)
+    reply_published.connect(_on_reply_published,
+                            sender=Review)
+
+    for model in _MARKDOWN_FIELDS.keys():
+        pre_save.connect(_on_markdown_object_pre_save,
+                         sender=model)
+
+    for through in (AuthGroup.permissions.through,
+                    Group.users.through,
+                    LocalSite.admins.through,
+                    LocalSite.users.through,
+                    Repository.review_groups.through,
+                    Repository.users.through,
+                    User.groups.through,
+                    User.user_permissions.through):
+        m2m_changed.connect(_on_acl_changed,
+                            sender=through)
+
+    for model in (Group, LocalSiteProfile, Repository, User):
+        post_save.connect(_on_acl_changed,
+                          sender=model)
+        post_delete.connect(_on_acl_changed,
+                            sender=model)
@@ -29,14 +29,17 @@ from reviewboard.reviews.builtin_fields import FileAttachmentsField
 from reviewboard.reviews.fields import (get_review_request_field,
                                         get_review_request_fieldset,
                                         get_review_request_fieldsets)
-from reviewboard.reviews.markdown_utils import (is_rich_text_default_for_user,
+from reviewboard.reviews.markdown_utils import (get_rich_text_field_name,
+                                                is_rich_text_default_for_user,
                                                 render_markdown,
+                                                render_markdown_field,
                                                 normalize_text_for_edit)
 from reviewboard.reviews.models import (BaseComment, Group,
                                         ReviewRequest, ScreenshotComment,
                                         FileAttachmentComment,
                                         GeneralComment)
 from reviewboard.reviews.ui.base import FileAttachmentReviewUI
+from reviewboard.reviews.update_events import is_push_updates_enabled
 from reviewboard.site.urlresolvers import local_site_reverse
 
 if TYPE_CHECKING:
@@ -685,6 +688,39 @@ def _render_markdown(text, is_rich_text):
         return text
 
 
+@register.filter('render_markdown_field')
+def _render_markdown_field(
+    obj: Any,
+    field_name: str,
+) -> str:
+    """Render a text field on an object, if it's in Markdown.
+
+    This works like the ``render_markdown`` filter, but can use rendered
+    text fetched by
+    :py:func:`~reviewboard.reviews.markdown_utils.prefetch_rendered_markdown`
+    or stored in the object's ``extra_data``.
+
+    Version Added:
+        8.0
+
+    Args:
+        obj (django.db.models.Model):
+            The object containing the text field.
+
+        field_name (str):
+            The name of the text field.
+
+    Returns:
+        str:
+        The rendered XHTML, if the field is in Markdown, or the plain text
+        otherwise.
+    """
+    if getattr(obj, get_rich_text_field_name(field_name), False):
+        return mark_safe(render_markdown_field(obj, field_name))
+    else:
+        return getattr(obj, field_name)
+
+
 @register.simple_tag(takes_context=True)
 def expand_fragment_link(context, expanding, tooltip,
                          expand_above, expand_below, text=None):
@@ -1074,15 +1110,23 @@ def reviewable_page_model_data(
     if file_attachment_comments_data:
         editor_data['fileAttachmentComments'] = file_attachment_comments_data
 
-    # And we're done! Assemble it together and chop off the outer dictionary
-    # so it can be injected correctly.
-    json_items = json_dumps_items({
+    page_data: dict[str, Any] = {
         'checkForUpdates': True,
         'reviewRequestData': review_request_data,
         'extraReviewRequestDraftData': extra_review_request_draft_data,
         'editorData': editor_data,
         'lastActivityTimestamp': context['last_activity_time'],
-    })
+    }
+
+    if is_push_updates_enabled():
+        page_data['updateEventsURL'] = local_site_reverse(
+            'review-request-events',
+            args=[review_request.display_id],
+            request=request)
+
+    # And we're done! Assemble it together and chop off the outer dictionary
+    # so it can be injected correctly.
+    json_items = json_dumps_items(page_data)
     assert isinstance(json_items, SafeString)
 
     return json_items
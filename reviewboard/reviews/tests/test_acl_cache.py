@@ -0,0 +1,227 @@
+"""Unit tests for reviewboard.reviews.acl_cache.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import kgb
+from django.contrib.auth.models import Permission, User
+from django.db import transaction
+from django.utils import timezone
+
+from reviewboard.reviews import acl_cache
+from reviewboard.reviews.acl_cache import (get_accessible_group_ids,
+                                           get_accessible_repository_ids)
+from reviewboard.reviews.models import Group, ReviewRequest
+from reviewboard.scmtools.models import Repository
+from reviewboard.testing import TestCase
+
+
+class ACLCacheTests(kgb.SpyAgency, TestCase):
+    """Unit tests for caching accessible repository and review group IDs.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users', 'test_scmtools']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.user = User.objects.get(username='doc')
+
+    def test_get_ids_cached(self) -> None:
+        """Testing get_accessible_repository_ids and get_accessible_group_ids
+        cache IDs
+        """
+        repository = self.create_repository(public=False,
+                                            users=[self.user])
+        group = self.create_review_group(invite_only=True,
+                                         users=[self.user])
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_repository_ids(user=self.user,
+                                              local_site=None),
+                [repository.pk])
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user,
+                                         local_site=None),
+                [group.pk])
+
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    get_accessible_repository_ids(user=self.user,
+                                                  local_site=None),
+                    [repository.pk])
+                self.assertEqual(
+                    get_accessible_group_ids(user=self.user,
+                                             local_site=None),
+                    [group.pk])
+
+    def test_get_ids_cached_per_local_site(self) -> None:
+        """Testing get_accessible_repository_ids caches IDs separately for
+        each Local Site
+        """
+        repository = self.create_repository()
+        local_site_repository = self.create_repository(
+            name='Local Site Repo',
+            with_local_site=True)
+        local_site = local_site_repository.local_site
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_repository_ids(user=self.user,
+                                              local_site=None),
+                [repository.pk])
+            self.assertEqual(
+                get_accessible_repository_ids(user=self.user,
+                                              local_site=local_site),
+                [local_site_repository.pk])
+
+    def test_get_ids_with_cache_disabled(self) -> None:
+        """Testing get_accessible_repository_ids with
+        reviews_cache_access_lists disabled
+        """
+        self.spy_on(Repository.objects.accessible_ids)
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': False},
+                                      reload_settings=False):
+            get_accessible_repository_ids(user=self.user, local_site=None)
+            get_accessible_repository_ids(user=self.user, local_site=None)
+
+        self.assertSpyCallCount(Repository.objects.accessible_ids, 2)
+
+    def test_invalidate_on_group_membership(self) -> None:
+        """Testing cached IDs are invalidated when review group membership
+        changes
+        """
+        group = self.create_review_group(invite_only=True)
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user, local_site=None),
+                [])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                group.users.add(self.user)
+
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user, local_site=None),
+                [group.pk])
+
+    def test_invalidate_on_commit(self) -> None:
+        """Testing cached IDs are invalidated when a transaction revoking
+        access commits
+        """
+        group = self.create_review_group(invite_only=True,
+                                         users=[self.user])
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user, local_site=None),
+                [group.pk])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    group.users.remove(self.user)
+
+                    # Another request looks up the IDs before the commit,
+                    # still seeing the old membership.
+                    self.spy_on(Group.objects.accessible_ids,
+                                op=kgb.SpyOpReturn([group.pk]))
+
+                    self.assertEqual(
+                        get_accessible_group_ids(user=self.user,
+                                                 local_site=None),
+                        [group.pk])
+
+                    Group.objects.accessible_ids.unspy()
+
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user, local_site=None),
+                [])
+
+    def test_invalidate_on_repository_public(self) -> None:
+        """Testing cached IDs are invalidated when a repository's public
+        flag changes
+        """
+        repository = self.create_repository(public=False)
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_repository_ids(user=self.user,
+                                              local_site=None),
+                [])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                repository.public = True
+                repository.save(update_fields=('public',))
+
+            self.assertEqual(
+                get_accessible_repository_ids(user=self.user,
+                                              local_site=None),
+                [repository.pk])
+
+    def test_invalidate_on_permission(self) -> None:
+        """Testing cached IDs are invalidated when a user's permissions
+        change
+        """
+        group = self.create_review_group(invite_only=True)
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                get_accessible_group_ids(user=self.user, local_site=None),
+                [])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.user_permissions.add(Permission.objects.get(
+                    codename='can_view_invite_only_groups'))
+
+            # Django caches permissions on the user.
+            user = User.objects.get(pk=self.user.pk)
+
+            self.assertEqual(
+                get_accessible_group_ids(user=user, local_site=None),
+                [group.pk])
+
+    def test_unrelated_save_does_not_invalidate(self) -> None:
+        """Testing cached IDs are not invalidated when saving fields that
+        don't affect access
+        """
+        self.spy_on(acl_cache.invalidate_acl_cache)
+
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=('last_login',))
+
+        self.assertSpyNotCalled(acl_cache.invalidate_acl_cache)
+
+    def test_review_request_query_uses_cache(self) -> None:
+        """Testing ReviewRequest.objects.public uses cached IDs"""
+        repository = self.create_repository(public=False,
+                                            users=[self.user])
+        self.create_review_request(repository=repository,
+                                   publish=True)
+
+        with self.siteconfig_settings({'reviews_cache_access_lists': True},
+                                      reload_settings=False):
+            self.assertEqual(
+                ReviewRequest.objects.public(user=self.user).count(),
+                1)
+
+            user = User.objects.get(pk=self.user.pk)
+
+            with self.assertNumQueries(1):
+                self.assertEqual(
+                    ReviewRequest.objects.public(user=user).count(),
+                    1)
@@ -778,6 +778,163 @@ class ReviewRequestCounterTests(SpyAgency, TestCase):
                              pending_outgoing=1,
                              total_incoming=0)
 
+    def test_counts_with_leave_group_still_incoming(self):
+        """Testing counters when leaving a review group with review requests
+        still assigned directly or through another group
+        """
+        user2 = self.create_user()
+
+        group2 = self.create_review_group(name='group2')
+        group2.users.add(self.user)
+
+        self.create_review_request(submitter=user2,
+                                   target_groups=[group2],
+                                   target_people=[self.user],
+                                   publish=True)
+        self.create_review_request(submitter=user2,
+                                   summary='Test 2',
+                                   target_groups=[group2, self.group],
+                                   publish=True)
+        self.create_review_request(submitter=user2,
+                                   summary='Test 3',
+                                   target_groups=[group2],
+                                   publish=True)
+
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             direct_incoming=1,
+                             total_incoming=3,
+                             group_incoming=1)
+
+        group2.users.remove(self.user)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             direct_incoming=1,
+                             total_incoming=2,
+                             group_incoming=1)
+
+        group2.users.add(self.user)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             direct_incoming=1,
+                             total_incoming=3,
+                             group_incoming=1)
+
+    def test_counts_with_leave_group_reverse(self):
+        """Testing counters when leaving review groups through
+        User.review_groups
+        """
+        user2 = self.create_user()
+
+        group2 = self.create_review_group(name='group2')
+        group2.users.add(self.user)
+
+        self.create_review_request(submitter=user2,
+                                   target_groups=[group2],
+                                   publish=True)
+        self.create_review_request(submitter=user2,
+                                   summary='Test 2',
+                                   target_groups=[self.group],
+                                   publish=True)
+
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             total_incoming=2,
+                             group_incoming=1)
+
+        self.user.review_groups.remove(group2)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             total_incoming=1,
+                             group_incoming=1)
+
+        self.user.review_groups.clear()
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             total_incoming=0,
+                             group_incoming=1)
+
+    def test_counts_with_remove_non_member(self):
+        """Testing counters when removing a user who isn't in a review group
+        """
+        user2 = self.create_user()
+        group2 = self.create_review_group(name='group2')
+
+        self.create_review_request(submitter=user2,
+                                   target_groups=[group2],
+                                   target_people=[self.user],
+                                   publish=True)
+
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             direct_incoming=1,
+                             total_incoming=1)
+
+        group2.users.remove(self.user)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1,
+                             direct_incoming=1,
+                             total_incoming=1)
+
+    def test_counts_with_join_group_inactive_submitter(self):
+        """Testing counters when joining and leaving a review group with
+        review requests from an inactive submitter
+        """
+        user2 = self.create_user()
+        group2 = self.create_review_group(name='group2')
+
+        self.create_review_request(submitter=user2,
+                                   target_groups=[group2],
+                                   publish=True)
+
+        user2.is_active = False
+        user2.save(update_fields=('is_active',))
+
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1)
+
+        group2.users.add(self.user)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1)
+
+        group2.users.remove(self.user)
+        self._check_counters(total_outgoing=1,
+                             pending_outgoing=1)
+
+    def test_counts_with_join_group_many_users(self):
+        """Testing counters when many users join a review group, using a
+        fixed number of queries
+        """
+        submitter = self.create_user()
+        group2 = self.create_review_group(name='group2')
+
+        self.create_review_request(submitter=submitter,
+                                   target_groups=[group2],
+                                   publish=True)
+
+        users = [
+            self.create_user(username='user%s' % i,
+                             email='user%s@example.com' % i)
+            for i in range(5)
+        ]
+        site_profiles = [
+            user.get_site_profile(local_site=None)
+            for user in users
+        ]
+
+        for site_profile in site_profiles:
+            self.assertEqual(site_profile.total_incoming_request_count, 0)
+
+        # Check and add the memberships, find the open review requests for
+        # the group, find those still assigned to the users directly or
+        # through other groups, and update the counters in one query.
+        with self.assertNumQueries(6):
+            group2.users.add(*users)
+
+        for site_profile in site_profiles:
+            site_profile.refresh_from_db()
+            self.assertEqual(site_profile.total_incoming_request_count, 1)
+
     def _check_counters(self, total_outgoing=0, pending_outgoing=0,
                         direct_incoming=0, total_incoming=0,
                         starred_public=0, group_incoming=0,
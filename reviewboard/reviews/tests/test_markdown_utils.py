@@ -7,11 +7,18 @@ from django.utils.safestring import SafeText
 from markdown import __version_info__ as markdown_version_info
 
 from reviewboard.accounts.models import Profile
-from reviewboard.reviews.markdown_utils import (clean_markdown_html,
-                                                markdown_render_conditional,
-                                                normalize_text_for_edit,
-                                                render_markdown,
-                                                render_markdown_from_file)
+from reviewboard.reviews.markdown_utils import (
+    RENDERED_MARKDOWN_EXTRA_DATA_KEY,
+    clean_markdown_html,
+    markdown_render_conditional,
+    normalize_text_for_edit,
+    prefetch_rendered_markdown,
+    render_markdown,
+    render_markdown_field,
+    render_markdown_from_file,
+    render_markdown_many,
+    store_rendered_markdown)
+from reviewboard.reviews.models import GeneralComment, Review
 from reviewboard.testing import TestCase
 
 
@@ -682,3 +689,141 @@ class MarkdownUtilsTests(kgb.SpyAgency, TestCase):
             ])
 
         self.assertSpyCallCount(clean_markdown_html, 1)
+
+
+class RenderedMarkdownCacheTests(kgb.SpyAgency, TestCase):
+    """Unit tests for caching and storing rendered Markdown.
+
+    Version Added:
+        8.0
+    """
+
+    def test_render_markdown_cached(self):
+        """Testing render_markdown caches rendered text"""
+        self.spy_on(clean_markdown_html)
+
+        self.assertEqual(render_markdown('**bold**'),
+                         '<p><strong>bold</strong></p>')
+        self.assertEqual(render_markdown('**bold**'),
+                         '<p><strong>bold</strong></p>')
+
+        self.assertSpyCallCount(clean_markdown_html, 1)
+
+    def test_render_markdown_cached_with_new_setting(self):
+        """Testing render_markdown renders again when
+        settings.ALLOWED_MARKDOWN_URL_PROTOCOLS changes
+        """
+        text = '[my link](ftp://ftp.example.com)'
+
+        self.assertEqual(render_markdown(text), '<p><a>my link</a></p>')
+
+        with override_settings(ALLOWED_MARKDOWN_URL_PROTOCOLS=['ftp']):
+            self.assertEqual(
+                render_markdown(text),
+                '<p><a href="ftp://ftp.example.com">my link</a></p>')
+
+    def test_render_markdown_many(self):
+        """Testing render_markdown_many"""
+        render_markdown('**bold**')
+
+        self.spy_on(clean_markdown_html)
+
+        self.assertEqual(
+            render_markdown_many(['**bold**', '*italic*', '**bold**']),
+            {
+                '**bold**': '<p><strong>bold</strong></p>',
+                '*italic*': '<p><em>italic</em></p>',
+            })
+
+        self.assertSpyCallCount(clean_markdown_html, 1)
+
+    def test_prefetch_rendered_markdown(self):
+        """Testing prefetch_rendered_markdown"""
+        comment1 = GeneralComment(text='**bold**', rich_text=True)
+        comment2 = GeneralComment(text='**plain**', rich_text=False)
+        review = Review(body_top='*top*',
+                        body_top_rich_text=True,
+                        body_bottom='*bottom*',
+                        body_bottom_rich_text=True)
+
+        prefetch_rendered_markdown([comment1, comment2], ['text'])
+        prefetch_rendered_markdown([review], ['body_top', 'body_bottom'])
+
+        self.spy_on(render_markdown_many)
+
+        self.assertEqual(render_markdown_field(comment1, 'text'),
+                         '<p><strong>bold</strong></p>')
+        self.assertEqual(render_markdown_field(review, 'body_top'),
+                         '<p><em>top</em></p>')
+        self.assertEqual(render_markdown_field(review, 'body_bottom'),
+                         '<p><em>bottom</em></p>')
+
+        self.assertSpyNotCalled(render_markdown_many)
+
+    def test_render_markdown_field_with_changed_text(self):
+        """Testing render_markdown_field with text changed since being
+        prefetched
+        """
+        comment = GeneralComment(text='**bold**', rich_text=True)
+        prefetch_rendered_markdown([comment], ['text'])
+
+        comment.text = '*italic*'
+
+        self.assertEqual(render_markdown_field(comment, 'text'),
+                         '<p><em>italic</em></p>')
+
+    def test_store_rendered_markdown(self):
+        """Testing store_rendered_markdown"""
+        comment = GeneralComment(text='**bold**', rich_text=True)
+
+        with self.siteconfig_settings(
+            {'reviews_store_rendered_markdown': True},
+            reload_settings=False):
+            store_rendered_markdown(comment, ['text'])
+
+        stored = comment.extra_data[RENDERED_MARKDOWN_EXTRA_DATA_KEY]
+        self.assertEqual(stored['text']['html'],
+                         '<p><strong>bold</strong></p>')
+
+        # The stored text should be used instead of rendering again.
+        self.spy_on(render_markdown_many)
+
+        self.assertEqual(render_markdown_field(comment, 'text'),
+                         '<p><strong>bold</strong></p>')
+        self.assertSpyNotCalled(render_markdown_many)
+
+        # If the text changes, it should be rendered again.
+        comment.text = '*italic*'
+
+        self.assertEqual(render_markdown_field(comment, 'text'),
+                         '<p><em>italic</em></p>')
+        self.assertSpyCalled(render_markdown_many)
+
+    def test_store_rendered_markdown_disabled(self):
+        """Testing store_rendered_markdown with
+        reviews_store_rendered_markdown disabled
+        """
+        comment = GeneralComment(text='**bold**', rich_text=True)
+        store_rendered_markdown(comment, ['text'])
+
+        self.assertNotIn(RENDERED_MARKDOWN_EXTRA_DATA_KEY,
+                         comment.extra_data or {})
+
+    def test_store_rendered_markdown_plain_text(self):
+        """Testing store_rendered_markdown with plain text removes stored
+        text
+        """
+        comment = GeneralComment(text='**bold**', rich_text=True)
+
+        with self.siteconfig_settings(
+            {'reviews_store_rendered_markdown': True},
+            reload_settings=False):
+            store_rendered_markdown(comment, ['text'])
+            self.assertIn(RENDERED_MARKDOWN_EXTRA_DATA_KEY,
+                          comment.extra_data)
+
+            comment.rich_text = False
+            store_rendered_markdown(comment, ['text'])
+
+        self.assertNotIn(RENDERED_MARKDOWN_EXTRA_DATA_KEY,
+                         comment.extra_data)
@@ -0,0 +1,74 @@
+"""Unit tests for reviewboard.reviews.views.ReviewRequestEventsView.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+
+from reviewboard.reviews.update_events import CacheReviewRequestUpdatesBroker
+from reviewboard.testing import TestCase
+
+
+class ReviewRequestEventsViewTests(TestCase):
+    """Unit tests for ReviewRequestEventsView.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def test_get(self) -> None:
+        """Testing ReviewRequestEventsView GET with events"""
+        review_request = self.create_review_request(publish=True)
+        CacheReviewRequestUpdatesBroker().publish(
+            review_request_id=review_request.pk,
+            event_type='review_published',
+            timestamp=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+        with self.siteconfig_settings({'reviews_push_updates': True},
+                                      reload_settings=False):
+            response = self.client.get(
+                '%s_events/' % review_request.get_absolute_url(),
+                HTTP_LAST_EVENT_ID='0')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertEqual(response['Cache-Control'], 'no-cache')
+
+            content = iter(response.streaming_content)
+
+            self.assertEqual(next(content), b'retry: 5000\n\n')
+            self.assertEqual(
+                next(content),
+                b'id: 1\n'
+                b'event: review_published\n'
+                b'data: {"timestamp": "2026-01-02T03:04:05+00:00"}\n\n')
+
+    def test_get_with_push_updates_disabled(self) -> None:
+        """Testing ReviewRequestEventsView GET with push updates disabled"""
+        review_request = self.create_review_request(publish=True)
+
+        response = self.client.get(
+            '%s_events/' % review_request.get_absolute_url())
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_without_access(self) -> None:
+        """Testing ReviewRequestEventsView GET without access to the review
+        request
+        """
+        review_request = self.create_review_request(publish=False)
+        self.client.force_login(User.objects.get(username='grumpy'))
+
+        with self.siteconfig_settings({'reviews_push_updates': True},
+                                      reload_settings=False):
+            response = self.client.get(
+                '%s_events/' % review_request.get_absolute_url())
+
+        self.assertEqual(response.status_code, 403)
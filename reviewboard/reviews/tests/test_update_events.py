@@ -0,0 +1,223 @@
+"""Unit tests for reviewboard.reviews.update_events.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+
+import kgb
+
+from reviewboard.reviews.update_events import (
+    CacheReviewRequestUpdatesBroker,
+    ReviewRequestUpdatesBrokerError,
+    get_updates_broker,
+    publish_review_request_update)
+from reviewboard.testing import TestCase
+
+
+class CacheReviewRequestUpdatesBrokerTests(TestCase):
+    """Unit tests for CacheReviewRequestUpdatesBroker.
+
+    Version Added:
+        8.0
+    """
+
+    timestamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.broker = CacheReviewRequestUpdatesBroker()
+
+    def test_publish(self) -> None:
+        """Testing CacheReviewRequestUpdatesBroker.publish"""
+        event = self.broker.publish(review_request_id=1,
+                                    event_type='review_published',
+                                    timestamp=self.timestamp)
+
+        self.assertEqual(
+            event,
+            {
+                'event_id': '1',
+                'event_type': 'review_published',
+                'review_request_id': 1,
+                'timestamp': '2026-01-02T03:04:05+00:00',
+            })
+        self.assertEqual(self.broker.get_last_event_id(1), '1')
+        self.assertEqual(self.broker.get_last_event_id(2), '0')
+
+    def test_wait_for_events(self) -> None:
+        """Testing CacheReviewRequestUpdatesBroker.wait_for_events"""
+        for event_type in ('review_published', 'reply_published'):
+            self.broker.publish(review_request_id=1,
+                                event_type=event_type,
+                                timestamp=self.timestamp)
+
+        events = self.broker.wait_for_events(review_request_id=1,
+                                             after_event_id='1',
+                                             timeout=0)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event_id'], '2')
+        self.assertEqual(events[0]['event_type'], 'reply_published')
+
+    def test_wait_for_events_timeout(self) -> None:
+        """Testing CacheReviewRequestUpdatesBroker.wait_for_events with no
+        new events
+        """
+        self.broker.publish(review_request_id=1,
+                            event_type='review_published',
+                            timestamp=self.timestamp)
+
+        self.assertEqual(
+            self.broker.wait_for_events(review_request_id=1,
+                                        after_event_id='1',
+                                        timeout=0),
+            [])
+
+    def test_wait_for_events_with_poller(self) -> None:
+        """Testing CacheReviewRequestUpdatesBroker.wait_for_events waits on
+        the shared poller for events published later
+        """
+        self.broker.POLL_INTERVAL_SECS = 0.01
+        results = {}
+
+        def _wait(review_request_id: int) -> None:
+            results[review_request_id] = self.broker.wait_for_events(
+                review_request_id=review_request_id,
+                after_event_id='0',
+                timeout=5)
+
+        threads = [
+            threading.Thread(target=_wait, args=(review_request_id,))
+            for review_request_id in (1, 2)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for review_request_id in (1, 2):
+            self.broker.publish(review_request_id=review_request_id,
+                                event_type='review_published',
+                                timestamp=self.timestamp)
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            {
+                review_request_id: [event['event_id'] for event in events]
+                for review_request_id, events in results.items()
+            },
+            {
+                1: ['1'],
+                2: ['1'],
+            })
+
+    def test_publish_limits_events(self) -> None:
+        """Testing CacheReviewRequestUpdatesBroker.publish keeps only the
+        most recent events
+        """
+        for i in range(self.broker.MAX_EVENTS + 5):
+            self.broker.publish(review_request_id=1,
+                                event_type='review_published',
+                                timestamp=self.timestamp)
+
+        events = self.broker.wait_for_events(review_request_id=1,
+                                             after_event_id='0',
+                                             timeout=0)
+
+        self.assertEqual(len(events), self.broker.MAX_EVENTS)
+        self.assertEqual(events[-1]['event_id'],
+                         str(self.broker.MAX_EVENTS + 5))
+
+
+class PublishReviewRequestUpdateTests(kgb.SpyAgency, TestCase):
+    """Unit tests for publish_review_request_update.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    timestamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    def test_with_push_updates_enabled(self) -> None:
+        """Testing publish_review_request_update with push updates enabled
+        """
+        self.spy_on(CacheReviewRequestUpdatesBroker.publish,
+                    owner=CacheReviewRequestUpdatesBroker)
+
+        with self.siteconfig_settings({'reviews_push_updates': True},
+                                      reload_settings=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_review_request_update(
+                    review_request_id=1,
+                    event_type='review_request_published',
+                    timestamp=self.timestamp)
+
+        self.assertSpyCalledWith(
+            CacheReviewRequestUpdatesBroker.publish,
+            review_request_id=1,
+            event_type='review_request_published',
+            timestamp=self.timestamp)
+
+    def test_with_push_updates_disabled(self) -> None:
+        """Testing publish_review_request_update with push updates disabled
+        """
+        self.spy_on(CacheReviewRequestUpdatesBroker.publish,
+                    owner=CacheReviewRequestUpdatesBroker)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_review_request_update(
+                review_request_id=1,
+                event_type='review_request_published',
+                timestamp=self.timestamp)
+
+        self.assertSpyNotCalled(CacheReviewRequestUpdatesBroker.publish)
+
+    def test_with_review_published(self) -> None:
+        """Testing publish_review_request_update called when a review is
+        published
+        """
+        review_request = self.create_review_request(publish=True)
+        review = self.create_review(review_request)
+
+        with self.siteconfig_settings({'reviews_push_updates': True},
+                                      reload_settings=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                review.publish()
+
+        events = CacheReviewRequestUpdatesBroker().wait_for_events(
+            review_request_id=review_request.pk,
+            after_event_id='0',
+            timeout=0)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event_type'], 'review_published')
+
+
+class GetUpdatesBrokerTests(TestCase):
+    """Unit tests for get_updates_broker.
+
+    Version Added:
+        8.0
+    """
+
+    def test_with_cache(self) -> None:
+        """Testing get_updates_broker with cache"""
+        self.assertIsInstance(get_updates_broker(),
+                              CacheReviewRequestUpdatesBroker)
+
+    def test_with_unknown(self) -> None:
+        """Testing get_updates_broker with an unknown broker"""
+        with self.siteconfig_settings({'reviews_updates_broker': 'xxx'},
+                                      reload_settings=False):
+            with self.assertRaises(ReviewRequestUpdatesBrokerError):
+                get_updates_broker()
@@ -0,0 +1,848 @@
+"""Push notifications for review request updates.
+
+Review request pages normally poll the server every few minutes to see if
+anything has changed. When push updates are enabled (using the
+``reviews_push_updates`` site configuration setting), pages instead listen
+for :py:class:`ReviewRequestUpdateEvent` entries on a server-sent events
+stream, and only check for updates when an event arrives. Pages fall back to
+polling if the stream can't be used.
+
+Events are passed from the process that published the review request,
+review, or reply to the processes serving the event streams through a
+broker, set by the ``reviews_updates_broker`` setting:
+
+``cache``:
+    Events are stored in the site's cache. A single thread in each web
+    server process checks the cache once a second for all of that process's
+    event streams. This works with any shared cache backend (such as
+    memcached) and requires no setup.
+
+``redis``:
+    Events are stored in Redis streams, which event streams wait on without
+    polling. This requires the :pypi:`redis` package and a Redis server,
+    set by the ``reviews_updates_redis_url`` setting.
+
+Each event stream holds a connection open for up to five minutes at a time.
+Event streams release their database connections once they start, but
+under a synchronous (WSGI) web server, each stream still occupies one of
+the server's worker threads or processes for as long as it's open. With
+many open pages, this can leave no workers for other requests. Push updates
+are therefore disabled by default, and should only be enabled on web
+servers that handle long-lived connections without tying up a worker, such
+as an ASGI server or gunicorn with gevent workers. They must not be enabled
+by default until Review Board is served through ASGI.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import ClassVar, Optional, Sequence
+
+from django.core.cache import cache
+from django.db import transaction
+from djblets.cache.backend import make_cache_key
+from djblets.siteconfig.models import SiteConfiguration
+from typing_extensions import TypedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewRequestUpdateEvent(TypedDict):
+    """An event indicating that a review request was updated.
+
+    Version Added:
+        8.0
+    """
+
+    #: The ID of the event.
+    #:
+    #: This is unique within the review request, and increases with each
+    #: event.
+    event_id: str
+
+    #: The type of event.
+    #:
+    #: This is one of ``review_request_published``, ``review_published``, or
+    #: ``reply_published``.
+    event_type: str
+
+    #: The ID of the review request that was updated.
+    review_request_id: int
+
+    #: The time of the update, in ISO 8601 format.
+    timestamp: str
+
+
+class ReviewRequestUpdatesBrokerError(Exception):
+    """An error with a review request updates broker.
+
+    Version Added:
+        8.0
+    """
+
+
+class ReviewRequestUpdatesBroker:
+    """Base class for passing review request update events between processes.
+
+    Version Added:
+        8.0
+    """
+
+    #: The ID of the broker, used in the ``reviews_updates_broker`` setting.
+    broker_id: ClassVar[str]
+
+    #: The maximum number of recent events kept for each review request.
+    #:
+    #: Clients that reconnect after missing more events than this will still
+    #: be notified of the latest event.
+    MAX_EVENTS = 20
+
+    #: How long events are kept after the last event, in seconds.
+    EVENT_EXPIRATION_SECS = 24 * 60 * 60
+
+    def publish(
+        self,
+        review_request_id: int,
+        event_type: str,
+        timestamp: datetime,
+    ) -> ReviewRequestUpdateEvent:
+        """Publish an event for a review request.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request that was updated.
+
+            event_type (str):
+                The type of event.
+
+            timestamp (datetime.datetime):
+                The time of the update.
+
+        Returns:
+            ReviewRequestUpdateEvent:
+            The published event.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The event could not be published.
+        """
+        raise NotImplementedError
+
+    def get_last_event_id(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the ID of the latest event for a review request.
+
+        This is used to only wait for events published after a client
+        connects.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The ID of the latest event. This may be an ID that doesn't
+            correspond to an event, if no events have been published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The ID could not be fetched.
+        """
+        raise NotImplementedError
+
+    def wait_for_events(
+        self,
+        review_request_id: int,
+        after_event_id: str,
+        timeout: float,
+    ) -> Sequence[ReviewRequestUpdateEvent]:
+        """Wait for events published after a given event.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+            after_event_id (str):
+                The ID of the last event the client has seen.
+
+            timeout (float):
+                The maximum time to wait, in seconds.
+
+        Returns:
+            list of ReviewRequestUpdateEvent:
+            The new events, in the order they were published. This will be
+            empty if no events were published before the timeout.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The events could not be fetched.
+        """
+        raise NotImplementedError
+
+
+class CacheReviewRequestUpdatesBroker(ReviewRequestUpdatesBroker):
+    """A broker that stores events in the site's cache.
+
+    The most recent events for each review request are stored as a list in
+    the cache, and event IDs are taken from a counter in the cache.
+
+    Waiting for events checks the cache once, and then waits on a poller
+    shared by the process. The poller fetches the events for every waiting
+    review request in one cache request every :py:attr:`POLL_INTERVAL_SECS`,
+    so the number of cache requests doesn't grow with the number of open
+    event streams.
+
+    If two events for the same review request are published at the same
+    moment, one may replace the other in the list. Clients will still be
+    notified, since they only need to know that something changed.
+
+    Version Added:
+        8.0
+    """
+
+    broker_id = 'cache'
+
+    #: How often the process's poller checks the cache, in seconds.
+    POLL_INTERVAL_SECS = 1.0
+
+    def publish(
+        self,
+        review_request_id: int,
+        event_type: str,
+        timestamp: datetime,
+    ) -> ReviewRequestUpdateEvent:
+        """Publish an event for a review request.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request that was updated.
+
+            event_type (str):
+                The type of event.
+
+            timestamp (datetime.datetime):
+                The time of the update.
+
+        Returns:
+            ReviewRequestUpdateEvent:
+            The published event.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The event could not be published.
+        """
+        counter_key = self._make_counter_key(review_request_id)
+        events_key = self._make_events_key(review_request_id)
+
+        try:
+            if cache.add(counter_key, 1, self.EVENT_EXPIRATION_SECS):
+                event_num = 1
+            else:
+                event_num = cache.incr(counter_key)
+
+            event = ReviewRequestUpdateEvent(
+                event_id=str(event_num),
+                event_type=event_type,
+                review_request_id=review_request_id,
+                timestamp=timestamp.isoformat())
+
+            events = cache.get(events_key) or []
+            events.append(event)
+            events.sort(key=lambda event: int(event['event_id']))
+
+            cache.set(events_key, events[-self.MAX_EVENTS:],
+                      self.EVENT_EXPIRATION_SECS)
+        except Exception as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to store event in the cache: %s' % e)
+
+        return event
+
+    def get_last_event_id(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the ID of the latest event for a review request.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The ID of the latest event, or ``0`` if no events have been
+            published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The ID could not be fetched.
+        """
+        try:
+            return str(cache.get(self._make_counter_key(review_request_id),
+                                 0))
+        except Exception as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to fetch event ID from the cache: %s' % e)
+
+    def wait_for_events(
+        self,
+        review_request_id: int,
+        after_event_id: str,
+        timeout: float,
+    ) -> Sequence[ReviewRequestUpdateEvent]:
+        """Wait for events published after a given event.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+            after_event_id (str):
+                The ID of the last event the client has seen.
+
+            timeout (float):
+                The maximum time to wait, in seconds.
+
+        Returns:
+            list of ReviewRequestUpdateEvent:
+            The new events, in the order they were published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The events could not be fetched.
+        """
+        try:
+            after_event_num = int(after_event_id)
+        except ValueError:
+            after_event_num = 0
+
+        events_key = self._make_events_key(review_request_id)
+
+        try:
+            events = cache.get(events_key) or []
+        except Exception as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to fetch events from the cache: %s' % e)
+
+        new_events = _filter_new_events(events, after_event_num)
+
+        if new_events or timeout <= 0:
+            return new_events
+
+        return _cache_events_poller.wait(events_key=events_key,
+                                         after_event_num=after_event_num,
+                                         timeout=timeout,
+                                         poll_interval=self.POLL_INTERVAL_SECS)
+
+    def _make_counter_key(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the cache key for a review request's event counter.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The cache key.
+        """
+        return make_cache_key('review-request-event-id-%s'
+                              % review_request_id)
+
+    def _make_events_key(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the cache key for a review request's recent events.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The cache key.
+        """
+        return make_cache_key('review-request-events-%s' % review_request_id)
+
+
+class _CacheEventsWaiter:
+    """A stream waiting on the cache events poller.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(
+        self,
+        after_event_num: int,
+    ) -> None:
+        """Initialize the waiter.
+
+        Args:
+            after_event_num (int):
+                The number of the last event the client has seen.
+        """
+        self.after_event_num = after_event_num
+        self.ready = threading.Event()
+        self.events: Sequence[ReviewRequestUpdateEvent] = []
+        self.error: Optional[Exception] = None
+
+
+class _CacheEventsPoller:
+    """Checks the cache for new events on behalf of a process's streams.
+
+    A thread is started when the first stream begins waiting, and exits once
+    no streams are waiting. Each check fetches the events for all waiting
+    review requests in one cache request, and wakes the streams that have
+    new events.
+
+    Version Added:
+        8.0
+    """
+
+    def __init__(self) -> None:
+        """Initialize the poller."""
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._waiters: dict[str, set[_CacheEventsWaiter]] = {}
+
+    def wait(
+        self,
+        *,
+        events_key: str,
+        after_event_num: int,
+        timeout: float,
+        poll_interval: float,
+    ) -> Sequence[ReviewRequestUpdateEvent]:
+        """Wait for events published after a given event.
+
+        Args:
+            events_key (str):
+                The cache key for the review request's recent events.
+
+            after_event_num (int):
+                The number of the last event the client has seen.
+
+            timeout (float):
+                The maximum time to wait, in seconds.
+
+            poll_interval (float):
+                How often to check the cache, in seconds.
+
+        Returns:
+            list of ReviewRequestUpdateEvent:
+            The new events, in the order they were published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The events could not be fetched.
+        """
+        waiter = _CacheEventsWaiter(after_event_num)
+
+        with self._lock:
+            self._waiters.setdefault(events_key, set()).add(waiter)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    kwargs={
+                        'poll_interval': poll_interval,
+                    },
+                    name='ReviewRequestEventsPoller',
+                    daemon=True)
+                self._thread.start()
+
+        try:
+            waiter.ready.wait(timeout)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(events_key)
+
+                if waiters is not None:
+                    waiters.discard(waiter)
+
+                    if not waiters:
+                        del self._waiters[events_key]
+
+        if waiter.error is not None:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to fetch events from the cache: %s' % waiter.error)
+
+        return waiter.events
+
+    def _run(
+        self,
+        poll_interval: float,
+    ) -> None:
+        """Check the cache for new events until no streams are waiting.
+
+        Args:
+            poll_interval (float):
+                How often to check the cache, in seconds.
+        """
+        while True:
+            time.sleep(poll_interval)
+
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    return
+
+                events_keys = list(self._waiters.keys())
+
+            try:
+                all_events = cache.get_many(events_keys)
+                error = None
+            except Exception as e:
+                logger.error('Unable to fetch review request events from '
+                             'the cache: %s',
+                             e)
+                all_events = {}
+                error = e
+
+            with self._lock:
+                for events_key, waiters in self._waiters.items():
+                    events = all_events.get(events_key) or []
+
+                    for waiter in waiters:
+                        if error is not None:
+                            waiter.error = error
+                            waiter.ready.set()
+                        else:
+                            new_events = _filter_new_events(
+                                events, waiter.after_event_num)
+
+                            if new_events:
+                                waiter.events = new_events
+                                waiter.ready.set()
+
+
+#: The poller shared by the process's cache broker event streams.
+_cache_events_poller = _CacheEventsPoller()
+
+
+def _filter_new_events(
+    events: Sequence[ReviewRequestUpdateEvent],
+    after_event_num: int,
+) -> Sequence[ReviewRequestUpdateEvent]:
+    """Return the events published after a given event.
+
+    Version Added:
+        8.0
+
+    Args:
+        events (list of ReviewRequestUpdateEvent):
+            The stored events.
+
+        after_event_num (int):
+            The number of the last event the client has seen.
+
+    Returns:
+        list of ReviewRequestUpdateEvent:
+        The new events.
+    """
+    return [
+        event
+        for event in events
+        if int(event['event_id']) > after_event_num
+    ]
+
+
+class RedisReviewRequestUpdatesBroker(ReviewRequestUpdatesBroker):
+    """A broker that stores events in Redis streams.
+
+    Each review request has a stream holding its most recent events. Event
+    IDs are the stream entry IDs, and waiting for events blocks on the
+    stream rather than polling.
+
+    Version Added:
+        8.0
+    """
+
+    broker_id = 'redis'
+
+    def __init__(
+        self,
+        url: str,
+    ) -> None:
+        """Initialize the broker.
+
+        Args:
+            url (str):
+                The URL of the Redis server.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The redis package is not installed.
+        """
+        if redis is None:
+            raise ReviewRequestUpdatesBrokerError(
+                'The redis package must be installed to use the Redis '
+                'updates broker.')
+
+        self.client = redis.Redis.from_url(url)
+
+    def publish(
+        self,
+        review_request_id: int,
+        event_type: str,
+        timestamp: datetime,
+    ) -> ReviewRequestUpdateEvent:
+        """Publish an event for a review request.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request that was updated.
+
+            event_type (str):
+                The type of event.
+
+            timestamp (datetime.datetime):
+                The time of the update.
+
+        Returns:
+            ReviewRequestUpdateEvent:
+            The published event.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The event could not be published.
+        """
+        key = self._make_stream_key(review_request_id)
+        data = {
+            'event_type': event_type,
+            'timestamp': timestamp.isoformat(),
+        }
+
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.xadd(key, {'data': json.dumps(data)},
+                          maxlen=self.MAX_EVENTS,
+                          approximate=True)
+            pipeline.expire(key, self.EVENT_EXPIRATION_SECS)
+            event_id = pipeline.execute()[0]
+        except redis.RedisError as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to add event to Redis: %s' % e)
+
+        return ReviewRequestUpdateEvent(
+            event_id=self._decode(event_id),
+            review_request_id=review_request_id,
+            **data)
+
+    def get_last_event_id(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the ID of the latest event for a review request.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The ID of the latest event, or ``0-0`` if no events have been
+            published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The ID could not be fetched.
+        """
+        try:
+            entries = self.client.xrevrange(
+                self._make_stream_key(review_request_id),
+                count=1)
+        except redis.RedisError as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to fetch event ID from Redis: %s' % e)
+
+        if entries:
+            return self._decode(entries[0][0])
+        else:
+            return '0-0'
+
+    def wait_for_events(
+        self,
+        review_request_id: int,
+        after_event_id: str,
+        timeout: float,
+    ) -> Sequence[ReviewRequestUpdateEvent]:
+        """Wait for events published after a given event.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+            after_event_id (str):
+                The ID of the last event the client has seen.
+
+            timeout (float):
+                The maximum time to wait, in seconds.
+
+        Returns:
+            list of ReviewRequestUpdateEvent:
+            The new events, in the order they were published.
+
+        Raises:
+            ReviewRequestUpdatesBrokerError:
+                The events could not be fetched.
+        """
+        try:
+            streams = self.client.xread(
+                {self._make_stream_key(review_request_id): after_event_id},
+                count=self.MAX_EVENTS,
+                block=max(1, int(timeout * 1000)))
+        except redis.RedisError as e:
+            raise ReviewRequestUpdatesBrokerError(
+                'Unable to fetch events from Redis: %s' % e)
+
+        events: list[ReviewRequestUpdateEvent] = []
+
+        for stream_key, entries in streams or []:
+            for event_id, fields in entries:
+                data = json.loads(self._decode(fields[b'data']))
+                events.append(ReviewRequestUpdateEvent(
+                    event_id=self._decode(event_id),
+                    event_type=data['event_type'],
+                    review_request_id=review_request_id,
+                    timestamp=data['timestamp']))
+
+        return events
+
+    def _make_stream_key(
+        self,
+        review_request_id: int,
+    ) -> str:
+        """Return the Redis key for a review request's event stream.
+
+        Args:
+            review_request_id (int):
+                The ID of the review request.
+
+        Returns:
+            str:
+            The Redis key.
+        """
+        return make_cache_key('review-request-events-%s' % review_request_id)
+
+    def _decode(
+        self,
+        value: bytes | str,
+    ) -> str:
+        """Return a value from Redis as a string.
+
+        Args:
+            value (bytes or str):
+                The value to decode.
+
+        Returns:
+            str:
+            The decoded value.
+        """
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+
+        return value
+
+
+def is_push_updates_enabled() -> bool:
+    """Return whether review request pages should listen for push updates.
+
+    Version Added:
+        8.0
+
+    Returns:
+        bool:
+        ``True`` if push updates are enabled.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    return bool(siteconfig.get('reviews_push_updates'))
+
+
+def get_updates_broker() -> ReviewRequestUpdatesBroker:
+    """Return the configured review request updates broker.
+
+    Version Added:
+        8.0
+
+    Returns:
+        ReviewRequestUpdatesBroker:
+        The broker.
+
+    Raises:
+        ReviewRequestUpdatesBrokerError:
+            The broker is unknown or could not be set up.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    broker_id = siteconfig.get('reviews_updates_broker')
+
+    if broker_id == CacheReviewRequestUpdatesBroker.broker_id:
+        return CacheReviewRequestUpdatesBroker()
+    elif broker_id == RedisReviewRequestUpdatesBroker.broker_id:
+        return RedisReviewRequestUpdatesBroker(
+            siteconfig.get('reviews_updates_redis_url'))
+    else:
+        raise ReviewRequestUpdatesBrokerError(
+            'Unknown review request updates broker "%s"' % broker_id)
+
+
+def publish_review_request_update(
+    review_request_id: int,
+    event_type: str,
+    timestamp: datetime,
+) -> None:
+    """Publish an update event for a review request.
+
+    The event is published once the current transaction is committed, so
+    that clients fetching the update will see the new data. Nothing is
+    published if push updates are disabled.
+
+    Errors are logged rather than raised, since they must not interfere
+    with publishing the review request, review, or reply.
+
+    Version Added:
+        8.0
+
+    Args:
+        review_request_id (int):
+            The ID of the review request that was updated.
+
+        event_type (str):
+            The type of event.
+
+        timestamp (datetime.datetime):
+            The time of the update.
+    """
+    if not is_push_updates_enabled():
+        return
+
+    def _publish() -> None:
+        try:
+            get_updates_broker().publish(review_request_id=review_request_id,
+                                         event_type=event_type,
+                                         timestamp=timestamp)
+        except ReviewRequestUpdatesBrokerError as e:
+            logger.error('Unable to publish %s event for review request '
+                         '%s: %s',
+                         event_type, review_request_id, e)
+
+    transaction.on_commit(_publish)
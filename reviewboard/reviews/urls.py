@@ -101,6 +101,10 @@ review_request_urls = [
          views.ReviewRequestUpdatesView.as_view(),
          name='review-request-updates'),
 
+    path('_events/',
+         views.ReviewRequestEventsView.as_view(),
+         name='review-request-events'),
+
     # Review request diffs
     path('diff/', include(diffviewer_urls)),
 
@@ -24,6 +24,8 @@ from reviewboard.reviews.views.mixins import ReviewRequestViewMixin
 from reviewboard.reviews.views.new_review_request import NewReviewRequestView
 from reviewboard.reviews.views.review_request_detail import \
     ReviewRequestDetailView
+from reviewboard.reviews.views.review_request_events import \
+    ReviewRequestEventsView
 from reviewboard.reviews.views.review_request_infobox import \
     ReviewRequestInfoboxView
 from reviewboard.reviews.views.review_request_updates import \
@@ -46,6 +48,7 @@ __all__ = [
     'PreviewReviewRequestEmailView',
     'ReviewFileAttachmentView',
     'ReviewRequestDetailView',
+    'ReviewRequestEventsView',
     'ReviewRequestInfoboxView',
     'ReviewRequestUpdatesView',
     'ReviewRequestViewMixin',
@@ -8,12 +8,12 @@ from typing import Any, List, Optional, TYPE_CHECKING, Tuple
 
 from django.conf import settings
 from django.http import HttpRequest
-from django.utils import timezone as django_timezone
 from django.views.generic.base import TemplateView
 from djblets.views.generic.etag import ETagViewMixin
 
 from reviewboard.accounts.mixins import UserProfileRequiredViewMixin
 from reviewboard.accounts.models import Profile, ReviewRequestVisit
+from reviewboard.accounts.visits import record_visit
 from reviewboard.attachments.models import get_latest_file_attachments
 from reviewboard.admin.read_only import is_site_read_only_for
 from reviewboard.reviews.context import make_review_request_context
@@ -176,10 +176,16 @@ class ReviewRequestDetailView(ReviewRequestViewMixin,
             review_request = self.review_request
 
             try:
-                visited, visited_is_new = \
-                    ReviewRequestVisit.objects.get_or_create(
-                        user=user, review_request=review_request)
-                last_visited = visited.timestamp.replace(tzinfo=timezone.utc)
+                # If the review request is public and pending review, mark
+                # that they've visited this review request.
+                visited, last_visited = record_visit(
+                    user=user,
+                    review_request=review_request,
+                    update_timestamp=(
+                        review_request.public and
+                        review_request.status ==
+                        review_request.PENDING_REVIEW))
+                last_visited = last_visited.replace(tzinfo=timezone.utc)
             except ReviewRequestVisit.DoesNotExist:
                 # Somehow, this visit was seen as created but then not
                 # accessible. We need to log this and then continue on.
@@ -189,14 +195,6 @@ class ReviewRequestDetailView(ReviewRequestViewMixin,
                              review_request.get_absolute_url())
                 visited = None
 
-            # If the review request is public and pending review and if the
-            # user is logged in, mark that they've visited this review request.
-            if (visited and
-                review_request.public and
-                review_request.status == review_request.PENDING_REVIEW):
-                visited.timestamp = django_timezone.now()
-                visited.save(update_fields=('timestamp',))
-
         return visited, last_visited
 
     def is_review_request_starred(self) -> bool:
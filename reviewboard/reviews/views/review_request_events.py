@@ -0,0 +1,177 @@
+"""View for streaming review request update events.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Iterator
+
+from django.db import connections
+from django.http import (HttpRequest,
+                         HttpResponse,
+                         HttpResponseNotFound,
+                         StreamingHttpResponse)
+from django.views.generic.base import View
+
+from reviewboard.reviews.update_events import (
+    ReviewRequestUpdatesBroker,
+    ReviewRequestUpdatesBrokerError,
+    get_updates_broker,
+    is_push_updates_enabled)
+from reviewboard.reviews.views.mixins import ReviewRequestViewMixin
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewRequestEventsView(ReviewRequestViewMixin, View):
+    """Internal view for streaming update events for a review request.
+
+    This sends a `server-sent events
+    <https://html.spec.whatwg.org/multipage/server-sent-events.html>`_ stream
+    of :py:class:`~reviewboard.reviews.update_events.
+    ReviewRequestUpdateEvent` entries. The review request page listens to
+    this and checks for updates when an event arrives, rather than polling.
+
+    The stream is closed after :py:attr:`MAX_STREAM_SECS`, and browsers will
+    reconnect automatically, passing the last event ID they received in the
+    :mailheader:`Last-Event-ID` header so that no events are missed.
+
+    Streams don't use the database, so they close their database
+    connections once they start. They do still occupy a web server worker
+    for as long as they're open, so push updates must only be enabled on
+    servers that can handle long-lived connections, such as ASGI servers.
+    See :py:mod:`reviewboard.reviews.update_events` for details.
+
+    This returns a HTTP 404 if push updates are disabled.
+
+    Version Added:
+        8.0
+    """
+
+    #: The maximum time to keep a stream open, in seconds.
+    MAX_STREAM_SECS = 5 * 60
+
+    #: How often to send a comment to keep the connection open, in seconds.
+    KEEPALIVE_SECS = 15
+
+    #: How long browsers should wait before reconnecting, in milliseconds.
+    RETRY_MSECS = 5000
+
+    def get(
+        self,
+        request: HttpRequest,
+        *args,
+        **kwargs,
+    ) -> HttpResponse:
+        """Handle HTTP GET requests for this view.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            *args (tuple, unused):
+                Positional arguments passed to the view.
+
+            **kwargs (dict, unused):
+                Keyword arguments passed to the view.
+
+        Returns:
+            django.http.HttpResponse:
+            The HTTP response containing the event stream.
+        """
+        if not is_push_updates_enabled():
+            return HttpResponseNotFound()
+
+        review_request_id = self.review_request.pk
+
+        try:
+            broker = get_updates_broker()
+            last_event_id = (request.headers.get('Last-Event-ID') or
+                             broker.get_last_event_id(review_request_id))
+        except ReviewRequestUpdatesBrokerError as e:
+            logger.error('Unable to stream events for review request %s: %s',
+                         review_request_id, e,
+                         extra={'request': request})
+
+            return HttpResponse(status=503)
+
+        response = StreamingHttpResponse(
+            self._iter_events(broker, review_request_id, last_event_id),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+
+        # Prevent nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+
+        return response
+
+    def _iter_events(
+        self,
+        broker: ReviewRequestUpdatesBroker,
+        review_request_id: int,
+        last_event_id: str,
+    ) -> Iterator[str]:
+        """Yield the content of the event stream.
+
+        Args:
+            broker (reviewboard.reviews.update_events.
+                    ReviewRequestUpdatesBroker):
+                The broker to wait for events from.
+
+            review_request_id (int):
+                The ID of the review request.
+
+            last_event_id (str):
+                The ID of the last event the client has seen.
+
+        Yields:
+            str:
+            Each part of the event stream.
+        """
+        # Nothing past this point needs the database, and the stream may be
+        # open for minutes. Close this thread's connections, so that open
+        # pages don't each hold one for the life of their stream.
+        # Connections inside a transaction are left alone.
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+
+        yield 'retry: %d\n\n' % self.RETRY_MSECS
+
+        deadline = time.monotonic() + self.MAX_STREAM_SECS
+
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            try:
+                events = broker.wait_for_events(
+                    review_request_id=review_request_id,
+                    after_event_id=last_event_id,
+                    timeout=min(self.KEEPALIVE_SECS, remaining))
+            except ReviewRequestUpdatesBrokerError as e:
+                logger.error('Unable to wait for events for review request '
+                             '%s: %s',
+                             review_request_id, e)
+                break
+
+            if events:
+                for event in events:
+                    last_event_id = event['event_id']
+
+                    yield 'id: %s\nevent: %s\ndata: %s\n\n' % (
+                        last_event_id,
+                        event['event_type'],
+                        json.dumps({
+                            'timestamp': event['timestamp'],
+                        }))
+            else:
+                yield ': keepalive\n\n'
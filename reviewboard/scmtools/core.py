@@ -6,8 +6,10 @@ import base64
 import logging
 import os
 import subprocess
-from typing import (Any, ClassVar, Dict, List, Mapping, Optional, Sequence,
-                    TYPE_CHECKING, Type, Tuple, Union, cast)
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, ClassVar, Dict, List, Mapping, NamedTuple,
+                    Optional, Sequence, TYPE_CHECKING, Type, Tuple, Union,
+                    cast)
 from urllib.error import HTTPError
 from urllib.parse import urlparse
 from urllib.request import Request as URLRequest, urlopen
@@ -657,6 +659,40 @@ PRE_CREATION = Revision('PRE-CREATION')
 RevisionID: TypeAlias = Union[Revision, str]
 
 
+#: The result of fetching a file as part of a batch.
+#:
+#: This is either the contents of the file, or the exception raised when
+#: fetching it.
+#:
+#: Version Added:
+#:     8.0
+FileResult: TypeAlias = Union[bytes, Exception]
+
+
+class FileLookup(NamedTuple):
+    """A file to look up as part of a batch.
+
+    This is passed to methods like :py:meth:`SCMTool.get_files` and
+    :py:meth:`Repository.get_files()
+    <reviewboard.scmtools.models.Repository.get_files>`.
+
+    Version Added:
+        8.0
+    """
+
+    #: The path to the file in the repository.
+    path: str
+
+    #: The revision of the file.
+    revision: RevisionID
+
+    #: Extra context used to help look up the file.
+    #:
+    #: This is always provided when called by
+    #: :py:class:`~reviewboard.scmtools.models.Repository`.
+    context: Optional[FileLookupContext] = None
+
+
 class _SCMToolIDProperty(str):
     """A property that automatically determines the ID for an SCMTool.
 
@@ -1072,6 +1108,76 @@ class SCMTool:
         except FileNotFoundError:
             return False
 
+    def get_files(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return the contents of several files from a repository.
+
+        By default, this fetches each file in turn using :py:meth:`get_file`.
+        Subclasses should override this if they can fetch several files
+        more efficiently at once.
+
+        An error fetching one file must not prevent the other files from
+        being fetched. Instead, the exception is returned in place of that
+        file's contents. Errors affecting the whole batch (such as failing
+        to connect to the repository) may be raised.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of FileLookup):
+                The files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+        """
+        results: list[FileResult] = []
+
+        for path, revision, context in lookups:
+            try:
+                results.append(self.get_file(
+                    path,
+                    revision,
+                    base_commit_id=context and context.base_commit_id,
+                    context=context))
+            except Exception as e:
+                results.append(e)
+
+        return results
+
+    def files_exist(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[bool]:
+        """Return whether several files exist in a repository.
+
+        By default, this checks each file in turn using
+        :py:meth:`file_exists`. Subclasses should override this if they can
+        check several files more efficiently at once.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of FileLookup):
+                The files to check.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+        """
+        return [
+            self.file_exists(path,
+                             revision,
+                             base_commit_id=context and context.base_commit_id,
+                             context=context)
+            for path, revision, context in lookups
+        ]
+
     def parse_diff_revision(
         self,
         filename: bytes,
@@ -1712,6 +1818,13 @@ class SCMClient:
     an HTTP-backed repository, handling authentication and errors.
     """
 
+    #: The maximum number of files fetched at once by
+    #: :py:meth:`get_files_http`.
+    #:
+    #: Version Added:
+    #:     8.0
+    max_http_fetch_workers: int = 4
+
     ######################
     # Instance variables #
     ######################
@@ -1839,3 +1952,55 @@ class SCMClient:
                         'url': url,
                         'error': e,
                     })
+
+    def get_files_http(
+        self,
+        files: Sequence[tuple[str, str, RevisionID]],
+        mime_type: Optional[str] = None,
+    ) -> Sequence[Union[Optional[bytes], Exception]]:
+        """Return the contents of several files from HTTP(S) URLs.
+
+        The files are fetched concurrently, using up to
+        :py:attr:`max_http_fetch_workers` threads. See
+        :py:meth:`get_file_http` for details on each fetch.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 3-tuples of the URL to fetch each file from, the
+                path of the file, and the revision of the file.
+
+            mime_type (str):
+                The expected content type of the files. If not specified,
+                this will default to accept everything.
+
+        Returns:
+            list:
+            A list with the result of :py:meth:`get_file_http` for each file,
+            or the exception raised when fetching it, in the same order as
+            ``files``.
+        """
+        def _get_file(
+            url: str,
+            path: str,
+            revision: RevisionID,
+        ) -> Union[Optional[bytes], Exception]:
+            try:
+                return self.get_file_http(url, path, revision,
+                                          mime_type=mime_type)
+            except Exception as e:
+                return e
+
+        if len(files) <= 1:
+            return [
+                _get_file(*file_info)
+                for file_info in files
+            ]
+
+        max_workers = min(len(files), self.max_http_fetch_workers)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda file_info: _get_file(*file_info),
+                                     files))
@@ -1,12 +1,18 @@
 """SCMTool implementation for Git."""
 
+from __future__ import annotations
+
+import atexit
 import io
 import logging
 import os
 import platform
 import re
 import stat
-from typing import Any, Dict
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, cast
 from urllib.parse import (quote as urlquote,
                           urlparse,
                           urlsplit as urlsplit,
@@ -21,7 +27,8 @@ from djblets.util.filesystem import is_exe_in_path
 from reviewboard import get_manual_url
 from reviewboard.diffviewer.parser import (DiffParser, DiffParserError,
                                            ParsedDiffFile)
-from reviewboard.scmtools.core import SCMClient, SCMTool, HEAD, PRE_CREATION
+from reviewboard.scmtools.core import (FileLookup, FileResult, RevisionID,
+                                       SCMClient, SCMTool, HEAD, PRE_CREATION)
 from reviewboard.scmtools.errors import (FileNotFoundError,
                                          InvalidRevisionFormatError,
                                          RepositoryNotFoundError,
@@ -144,6 +151,80 @@ class GitTool(SCMTool):
         except (FileNotFoundError, InvalidRevisionFormatError):
             return False
 
+    def get_files(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return the contents of several files from the repository.
+
+        Files in local repositories are looked up in one batch using
+        :command:`git cat-file`. Files fetched through a raw file URL are
+        fetched concurrently.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+        """
+        results: list[FileResult] = [b''] * len(lookups)
+        indexes = [
+            i
+            for i, lookup in enumerate(lookups)
+            if lookup.revision != PRE_CREATION
+        ]
+        fetched = self.client.get_files([
+            (lookups[i].path, lookups[i].revision)
+            for i in indexes
+        ])
+
+        for i, result in zip(indexes, fetched):
+            results[i] = result
+
+        return results
+
+    def files_exist(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[bool]:
+        """Return whether several files exist in the repository.
+
+        Files in local repositories are checked in one batch using
+        :command:`git cat-file`.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to check.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+        """
+        results = [False] * len(lookups)
+        indexes = [
+            i
+            for i, lookup in enumerate(lookups)
+            if lookup.revision != PRE_CREATION
+        ]
+        exists = self.client.get_files_exist([
+            (lookups[i].path, lookups[i].revision)
+            for i in indexes
+        ])
+
+        for i, result in zip(indexes, exists):
+            results[i] = result
+
+        return results
+
     def normalize_patch(self, patch, filename, revision):
         """Normalize the provided patch file.
 
@@ -744,6 +825,511 @@ class GitDiffParser(DiffParser):
                 setattr(file_info, attr, b'')
 
 
+class GitCatFileBatchProcess:
+    """A long-running :command:`git cat-file` process.
+
+    This runs :command:`git cat-file --batch` or
+    :command:`git cat-file --batch-check`, which reads object names from
+    standard input and writes information on each object to standard
+    output. This allows many objects to be looked up without starting a new
+    process for each one.
+
+    A process handles one request at a time. Instances are managed by
+    :py:class:`GitCatFileBatchPool`.
+
+    Version Added:
+        8.0
+    """
+
+    #: The largest batch of names written without a separate writer thread.
+    #:
+    #: This is kept well below the smallest pipe buffer size on supported
+    #: platforms.
+    #:
+    #: Version Added:
+    #:     8.0
+    MAX_DIRECT_WRITE_SIZE = 4096
+
+    #: The time of the last request, from :py:func:`time.monotonic`.
+    last_used: float
+
+    def __init__(
+        self,
+        *,
+        git_dir: str,
+        local_site_name: Optional[str],
+        batch_check: bool,
+    ) -> None:
+        """Start the process.
+
+        Args:
+            git_dir (str):
+                The path to the Git repository.
+
+            local_site_name (str):
+                The name of the Local Site the repository belongs to, if
+                any.
+
+            batch_check (bool):
+                Whether to only fetch object information, rather than
+                object contents.
+
+        Raises:
+            OSError:
+                The process could not be started.
+        """
+        self.batch_check = batch_check
+
+        if batch_check:
+            batch_arg = '--batch-check'
+        else:
+            batch_arg = '--batch'
+
+        self._process = SCMTool.popen(
+            ['git', f'--git-dir={git_dir}', 'cat-file', batch_arg],
+            local_site_name=local_site_name,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        """Return whether the process is still running.
+
+        Returns:
+            bool:
+            ``True`` if the process is running. ``False`` if it has exited.
+        """
+        return self._process.poll() is None
+
+    def get_object(
+        self,
+        name: str,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """Return information on an object.
+
+        Args:
+            name (str):
+                The name of the object. This can be anything
+                :command:`git cat-file` accepts, such as a SHA or a
+                ``<rev>:<path>`` pair. It must not contain newlines.
+
+        Returns:
+            tuple:
+            A 2-tuple of:
+
+            Tuple:
+                0 (str):
+                    The type of the object, or ``None`` if it doesn't exist
+                    or the name is ambiguous.
+
+                1 (bytes):
+                    The contents of the object, or ``None`` if it doesn't
+                    exist or this is a batch check process.
+
+        Raises:
+            OSError:
+                There was an error communicating with the process.
+
+            ValueError:
+                The process sent an unexpected response.
+        """
+        return self.get_objects([name])[0]
+
+    def get_objects(
+        self,
+        names: Sequence[str],
+    ) -> list[tuple[Optional[str], Optional[bytes]]]:
+        """Return information on several objects.
+
+        All names are sent to the process before any responses are read, so
+        the objects are looked up in a single round trip.
+
+        Version Added:
+            8.0
+
+        Args:
+            names (list of str):
+                The names of the objects. See :py:meth:`get_object` for
+                details.
+
+        Returns:
+            list of tuple:
+            A 2-tuple of the type and contents of each object, in the same
+            order as ``names``. See :py:meth:`get_object` for details.
+
+        Raises:
+            OSError:
+                There was an error communicating with the process.
+
+            ValueError:
+                The process sent an unexpected response.
+        """
+        process = self._process
+        stdin = process.stdin
+        assert stdin is not None
+
+        self.last_used = time.monotonic()
+
+        data = b''.join(
+            b'%s\n' % name.encode('utf-8')
+            for name in names
+        )
+        writer: Optional[threading.Thread] = None
+
+        if len(data) <= self.MAX_DIRECT_WRITE_SIZE:
+            stdin.write(data)
+            stdin.flush()
+        else:
+            # git cat-file writes each response as soon as it reads the
+            # name. If we wrote a large batch before reading, both pipes
+            # could fill up and block both processes, so the names are
+            # written from another thread instead.
+            writer = threading.Thread(target=self._write_names,
+                                      args=(data,),
+                                      daemon=True)
+            writer.start()
+
+        try:
+            return [
+                self._read_object()
+                for name in names
+            ]
+        except BaseException:
+            if writer is not None:
+                # Stop the process so that the writer can't remain blocked
+                # on a full pipe.
+                process.kill()
+
+            raise
+        finally:
+            if writer is not None:
+                writer.join()
+
+    def _write_names(
+        self,
+        data: bytes,
+    ) -> None:
+        """Write object names to the process.
+
+        Errors are ignored, since the failure will be seen when reading
+        the responses.
+
+        Args:
+            data (bytes):
+                The newline-separated names to write.
+        """
+        stdin = self._process.stdin
+        assert stdin is not None
+
+        try:
+            stdin.write(data)
+            stdin.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _read_object(self) -> tuple[Optional[str], Optional[bytes]]:
+        """Read information on an object from the process.
+
+        Returns:
+            tuple:
+            A 2-tuple of the type and contents of the object. See
+            :py:meth:`get_object` for details.
+
+        Raises:
+            OSError:
+                There was an error communicating with the process.
+
+            ValueError:
+                The process sent an unexpected response.
+        """
+        stdout = self._process.stdout
+        assert stdout is not None
+
+        header = stdout.readline()
+
+        if not header.endswith(b'\n'):
+            raise ValueError('git cat-file exited unexpectedly')
+
+        if header.endswith((b' missing\n', b' ambiguous\n')):
+            return None, None
+
+        object_type, size = header.split()[1:3]
+
+        if self.batch_check:
+            contents = None
+        else:
+            contents = stdout.read(int(size))
+
+            if len(contents) != int(size) or stdout.read(1) != b'\n':
+                raise ValueError('git cat-file exited unexpectedly')
+
+        return object_type.decode('utf-8'), contents
+
+    def close(self) -> None:
+        """Stop the process."""
+        process = self._process
+
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout is not None:
+                process.stdout.close()
+
+
+class GitCatFileBatchPool:
+    """A pool of long-running :command:`git cat-file` processes.
+
+    Processes are kept for each repository, and are shared by all
+    :py:class:`GitClient` instances in the process. Each request is sent to
+    an idle process, and a new process is started if none are idle, so
+    concurrent requests from multiple threads don't wait on each other.
+
+    Processes that have exited are replaced, and processes that haven't been
+    used for :py:attr:`idle_timeout_secs` are stopped.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of seconds after which an idle process is stopped.
+    idle_timeout_secs: float = 60
+
+    #: The maximum number of idle processes kept for each repository.
+    max_idle_processes: int = 4
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._idle: dict[tuple[str, Optional[str], bool],
+                         list[GitCatFileBatchProcess]] = {}
+        self._lock = threading.Lock()
+
+    def get_object(
+        self,
+        *,
+        git_dir: str,
+        local_site_name: Optional[str],
+        name: str,
+        batch_check: bool,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """Return information on an object.
+
+        If communicating with the process fails, the request will be retried
+        once with a new process.
+
+        Args:
+            git_dir (str):
+                The path to the Git repository.
+
+            local_site_name (str):
+                The name of the Local Site the repository belongs to, if
+                any.
+
+            name (str):
+                The name of the object.
+
+            batch_check (bool):
+                Whether to only fetch object information, rather than
+                object contents.
+
+        Returns:
+            tuple:
+            A 2-tuple of the object type and contents. See
+            :py:meth:`GitCatFileBatchProcess.get_object` for details.
+
+        Raises:
+            reviewboard.scmtools.errors.SCMError:
+                The object could not be looked up.
+        """
+        return self.get_objects(git_dir=git_dir,
+                                local_site_name=local_site_name,
+                                names=[name],
+                                batch_check=batch_check)[0]
+
+    def get_objects(
+        self,
+        *,
+        git_dir: str,
+        local_site_name: Optional[str],
+        names: Sequence[str],
+        batch_check: bool,
+    ) -> list[tuple[Optional[str], Optional[bytes]]]:
+        """Return information on several objects in one round trip.
+
+        If communicating with the process fails, the request will be retried
+        once with a new process.
+
+        Version Added:
+            8.0
+
+        Args:
+            git_dir (str):
+                The path to the Git repository.
+
+            local_site_name (str):
+                The name of the Local Site the repository belongs to, if
+                any.
+
+            names (list of str):
+                The names of the objects.
+
+            batch_check (bool):
+                Whether to only fetch object information, rather than
+                object contents.
+
+        Returns:
+            list of tuple:
+            A 2-tuple of the type and contents of each object, in the same
+            order as ``names``. See
+            :py:meth:`GitCatFileBatchProcess.get_object` for details.
+
+        Raises:
+            reviewboard.scmtools.errors.SCMError:
+                The objects could not be looked up.
+        """
+        if not names:
+            return []
+
+        key = (git_dir, local_site_name, batch_check)
+        error: Optional[Exception] = None
+
+        for attempt in range(2):
+            process = self._acquire(key)
+
+            try:
+                result = process.get_objects(names)
+            except (OSError, ValueError) as e:
+                logger.warning('Error communicating with git cat-file for '
+                               'repository "%s" (attempt %d): %s',
+                               git_dir, attempt + 1, e)
+                process.close()
+                error = e
+                continue
+
+            self._release(key, process)
+
+            return result
+
+        raise SCMError(
+            gettext('Unable to look up "%(name)s" in the Git repository: '
+                    '%(error)s')
+            % {
+                'name': '", "'.join(names),
+                'error': error,
+            })
+
+    def close_idle(
+        self,
+        *,
+        force: bool = False,
+    ) -> None:
+        """Stop idle processes.
+
+        Args:
+            force (bool, optional):
+                Whether to stop all idle processes, rather than only those
+                that have passed the idle timeout.
+        """
+        expired: list[GitCatFileBatchProcess] = []
+        cutoff = time.monotonic() - self.idle_timeout_secs
+
+        with self._lock:
+            for key, processes in list(self._idle.items()):
+                keep = [
+                    process
+                    for process in processes
+                    if not force and process.last_used >= cutoff
+                ]
+                expired += [
+                    process
+                    for process in processes
+                    if process not in keep
+                ]
+
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+
+        for process in expired:
+            process.close()
+
+    def _acquire(
+        self,
+        key: tuple[str, Optional[str], bool],
+    ) -> GitCatFileBatchProcess:
+        """Return a running process for a repository.
+
+        Args:
+            key (tuple):
+                The key for the repository's processes.
+
+        Returns:
+            GitCatFileBatchProcess:
+            The process.
+        """
+        self.close_idle()
+
+        with self._lock:
+            processes = self._idle.get(key, [])
+            process = None
+
+            while processes:
+                candidate = processes.pop()
+
+                if candidate.is_alive():
+                    process = candidate
+                    break
+
+                candidate.close()
+
+        if process is None:
+            git_dir, local_site_name, batch_check = key
+            process = GitCatFileBatchProcess(git_dir=git_dir,
+                                             local_site_name=local_site_name,
+                                             batch_check=batch_check)
+
+        return process
+
+    def _release(
+        self,
+        key: tuple[str, Optional[str], bool],
+        process: GitCatFileBatchProcess,
+    ) -> None:
+        """Return a process to the pool.
+
+        Args:
+            key (tuple):
+                The key for the repository's processes.
+
+            process (GitCatFileBatchProcess):
+                The process to return.
+        """
+        with self._lock:
+            processes = self._idle.setdefault(key, [])
+
+            if len(processes) < self.max_idle_processes:
+                processes.append(process)
+                process = None
+
+        if process is not None:
+            process.close()
+
+
+#: The pool of git cat-file processes used by GitClient.
+#:
+#: Version Added:
+#:     8.0
+cat_file_pool = GitCatFileBatchPool()
+
+atexit.register(cat_file_pool.close_idle, force=True)
+
+
 class GitClient(SCMClient):
     FULL_SHA1_LENGTH = 40
 
@@ -849,6 +1435,96 @@ class GitClient(SCMClient):
             contents = self._cat_file(path, revision, '-t')
             return contents and contents.strip() == b'blob'
 
+    def get_files(
+        self,
+        files: Sequence[tuple[str, RevisionID]],
+    ) -> list[FileResult]:
+        """Return the contents of several files.
+
+        Files in local repositories are looked up in one round trip to a
+        :command:`git cat-file` process. Files fetched through a raw file
+        URL are fetched concurrently.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 2-tuples of the path and revision of each file.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``files``.
+        """
+        if not self.raw_file_url:
+            return self._cat_files(files, 'blob')
+
+        results: list[Optional[FileResult]] = [None] * len(files)
+        indexes: list[int] = []
+        http_files: list[tuple[str, str, RevisionID]] = []
+
+        for i, (path, revision) in enumerate(files):
+            try:
+                self.validate_sha1_format(path, revision)
+            except ShortSHA1Error as e:
+                results[i] = e
+                continue
+
+            indexes.append(i)
+            http_files.append((self._build_raw_url(path, revision),
+                               path, revision))
+
+        for i, result in zip(indexes, self.get_files_http(http_files)):
+            results[i] = result
+
+        return cast(list[FileResult], results)
+
+    def get_files_exist(
+        self,
+        files: Sequence[tuple[str, RevisionID]],
+    ) -> list[bool]:
+        """Return whether several files exist.
+
+        Files in local repositories are checked in one round trip to a
+        :command:`git cat-file` process. Files checked through a raw file
+        URL are fetched concurrently.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 2-tuples of the path and revision of each file.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``files``.
+
+        Raises:
+            reviewboard.scmtools.errors.SCMError:
+                There was an error checking a file, other than the file or
+                revision not being found.
+        """
+        if self.raw_file_url:
+            return [
+                not isinstance(result, Exception)
+                for result in self.get_files(files)
+            ]
+
+        exists: list[bool] = []
+
+        for result in self._cat_files(files, '-t'):
+            if isinstance(result, (FileNotFoundError,
+                                   InvalidRevisionFormatError)):
+                exists.append(False)
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                exists.append(result.strip() == b'blob')
+
+        return exists
+
     def validate_sha1_format(self, path, sha1):
         """Validates that a SHA1 is of the right length for this repository."""
         if self.raw_file_url and len(sha1) != self.FULL_SHA1_LENGTH:
@@ -875,9 +1551,34 @@ class GitClient(SCMClient):
 
         Otherwise, "option" can be used to pass a switch to git-cat-file,
         e.g. to test or existence or get the type of "commit".
+
+        Version Changed:
+            8.0:
+            Blob contents and types are now looked up using long-running
+            processes from :py:data:`cat_file_pool`, rather than starting
+            a new process for each call.
         """
         commit = self._resolve_head(revision, path)
 
+        if (self.git_dir and
+            option in ('blob', '-t') and
+            '\n' not in commit and
+            '\r' not in commit):
+            # Names are sent to the process one per line, so they can't
+            # contain newlines. Those are looked up using a new process
+            # below instead.
+            object_type, contents = cat_file_pool.get_object(
+                git_dir=self.git_dir,
+                local_site_name=self.local_site_name,
+                name=commit,
+                batch_check=(option == '-t'))
+
+            return self._get_cat_file_result(path=path,
+                                             name=commit,
+                                             option=option,
+                                             object_type=object_type,
+                                             contents=contents)
+
         with self._run_git(
             [f'--git-dir={self.git_dir}', 'cat-file', option, commit],
         ) as p:
@@ -893,6 +1594,137 @@ class GitClient(SCMClient):
 
         return contents
 
+    def _cat_files(
+        self,
+        files: Sequence[tuple[str, RevisionID]],
+        option: str,
+    ) -> list[FileResult]:
+        """Return content or type information for several objects.
+
+        This is a batch version of :py:meth:`_cat_file`. Objects that can be
+        looked up through :py:data:`cat_file_pool` are sent to a process in
+        one round trip. Any others are looked up one at a time.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 2-tuples of the path and revision of each file.
+
+            option (str):
+                Either ``blob`` to fetch contents, or ``-t`` to fetch types.
+
+        Returns:
+            list:
+            A list with the result of :py:meth:`_cat_file` for each file, or
+            the exception raised when looking it up, in the same order as
+            ``files``.
+        """
+        results: list[Optional[FileResult]] = [None] * len(files)
+        indexes: list[int] = []
+        names: list[str] = []
+
+        for i, (path, revision) in enumerate(files):
+            try:
+                name = self._resolve_head(revision, path)
+            except SCMError as e:
+                results[i] = e
+                continue
+
+            if self.git_dir and '\n' not in name and '\r' not in name:
+                indexes.append(i)
+                names.append(name)
+            else:
+                try:
+                    results[i] = self._cat_file(path, revision, option)
+                except SCMError as e:
+                    results[i] = e
+
+        if names:
+            assert self.git_dir
+
+            objects = cat_file_pool.get_objects(
+                git_dir=self.git_dir,
+                local_site_name=self.local_site_name,
+                names=names,
+                batch_check=(option == '-t'))
+
+            for i, name, (object_type, contents) in zip(indexes, names,
+                                                        objects):
+                try:
+                    results[i] = self._get_cat_file_result(
+                        path=files[i][0],
+                        name=name,
+                        option=option,
+                        object_type=object_type,
+                        contents=contents)
+                except SCMError as e:
+                    results[i] = e
+
+        return cast(list[FileResult], results)
+
+    def _get_cat_file_result(
+        self,
+        *,
+        path: str,
+        name: str,
+        option: str,
+        object_type: Optional[str],
+        contents: Optional[bytes],
+    ) -> bytes:
+        """Return the result of a lookup from a git cat-file process.
+
+        This converts the result to match the output of
+        :command:`git cat-file`.
+
+        Version Added:
+            8.0
+
+        Args:
+            path (str):
+                The path of the file.
+
+            name (str):
+                The name of the object that was looked up.
+
+            option (str):
+                Either ``blob`` to return contents, or ``-t`` to return the
+                type.
+
+            object_type (str):
+                The type of the object, or ``None`` if it wasn't found.
+
+            contents (bytes):
+                The contents of the object, if fetched.
+
+        Returns:
+            bytes:
+            The contents or type of the object.
+
+        Raises:
+            reviewboard.scmtools.errors.FileNotFoundError:
+                The object was not found.
+
+            reviewboard.scmtools.errors.SCMError:
+                The object is not a file.
+        """
+        if object_type is None:
+            raise FileNotFoundError(path, revision=name)
+        elif option == '-t':
+            return b'%s\n' % object_type.encode('utf-8')
+        elif object_type != 'blob':
+            raise SCMError(
+                gettext('"%(name)s" is a %(type)s, not a file.')
+                % {
+                    'name': name,
+                    'type': object_type,
+                })
+
+        assert contents is not None
+
+        return contents
+
     def _resolve_head(self, revision, path):
         if revision == HEAD:
             if path == '':
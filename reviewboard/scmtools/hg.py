@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import tempfile
 from datetime import datetime
-from typing import Any, Optional, TYPE_CHECKING, Union
+from typing import Any, Optional, Sequence, TYPE_CHECKING, Union, cast
 from urllib.parse import quote as urllib_quote, urlparse
 
 from django.utils.encoding import force_str
@@ -15,6 +17,7 @@ from reviewboard.diffviewer.parser import DiffParser, DiffParserError
 from reviewboard.scmtools.core import (
     Branch,
     Commit,
+    FileResult,
     HEAD,
     PRE_CREATION,
     SCMClient,
@@ -29,6 +32,7 @@ if TYPE_CHECKING:
 
     from reviewboard.diffviewer.parser import ParsedDiffFile
     from reviewboard.scmtools.core import (
+        FileLookup,
         FileLookupContext,
         Revision,
         RevisionID,
@@ -127,6 +131,35 @@ class HgTool(SCMTool):
             str(revision),
             base_commit_id=base_commit_id)
 
+    def get_files(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return the contents of several files from the repository.
+
+        For local repositories, all files at the same revision are fetched
+        with a single :command:`hg cat`.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+        """
+        if not isinstance(self.client, HgClient):
+            return super().get_files(lookups)
+
+        return self.client.cat_files([
+            (path, str(revision), context and context.base_commit_id)
+            for path, revision, context in lookups
+        ])
+
     def parse_diff_revision(
         self,
         filename: bytes,
@@ -961,18 +994,10 @@ class HgClient(SCMClient):
             reviewboard.scmtools.errors.FileNotFoundError:
                 The file was not found at the given name and revision.
         """
-        # If the base commit id is provided it should override anything
-        # that was parsed from the diffs.
-        if rev != PRE_CREATION and base_commit_id is not None:
-            rev = base_commit_id
-
-        if rev == HEAD:
-            rev = 'tip'
-        elif rev == PRE_CREATION:
-            rev = ''
+        rev = self._get_cat_rev(rev, base_commit_id)
 
         if path:
-            with self._run_hg(['cat', '--rev', str(rev), path]) as p:
+            with self._run_hg(['cat', '--rev', rev, path]) as p:
                 assert p.stdout is not None
                 contents = p.stdout.read()
                 failure = p.wait()
@@ -982,6 +1007,108 @@ class HgClient(SCMClient):
 
         raise FileNotFoundError(path, rev)
 
+    def cat_files(
+        self,
+        files: Sequence[tuple[str, RevisionID, Optional[str]]],
+    ) -> list[FileResult]:
+        """Return the contents of several files.
+
+        All files at the same revision are fetched with a single
+        :command:`hg cat`, which writes each file to a temporary directory.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 3-tuples of the path, revision, and base commit ID
+                (or ``None``) of each file. See :py:meth:`cat_file` for
+                details.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``files``.
+        """
+        results: list[Optional[FileResult]] = [None] * len(files)
+        indexes_by_rev: dict[str, list[int]] = {}
+
+        for i, (path, rev, base_commit_id) in enumerate(files):
+            rev = self._get_cat_rev(rev, base_commit_id)
+
+            if not path:
+                results[i] = FileNotFoundError(path, rev)
+            elif (path == os.path.normpath(path) and
+                  not os.path.isabs(path) and
+                  not path.startswith(os.pardir)):
+                indexes_by_rev.setdefault(rev, []).append(i)
+            else:
+                # This isn't a plain path within the repository, so it can't
+                # be mapped to an output file. Look it up on its own instead.
+                try:
+                    results[i] = self.cat_file(path, rev)
+                except SCMError as e:
+                    results[i] = e
+
+        for rev, indexes in indexes_by_rev.items():
+            with tempfile.TemporaryDirectory(prefix='reviewboard.') as tmpdir:
+                paths = list(dict.fromkeys(
+                    files[i][0]
+                    for i in indexes
+                ))
+
+                # Files that don't exist are reported on stderr, and the
+                # rest are still written.
+                with self._run_hg(['cat', '--rev', rev,
+                                   '--output', os.path.join(tmpdir, '%p'),
+                                   '--'] + paths) as p:
+                    p.wait()
+
+                for i in indexes:
+                    path = files[i][0]
+                    filename = os.path.join(tmpdir, path)
+
+                    if os.path.isfile(filename):
+                        with open(filename, 'rb') as fp:
+                            results[i] = fp.read()
+                    else:
+                        results[i] = FileNotFoundError(path, rev)
+
+        return cast(list[FileResult], results)
+
+    def _get_cat_rev(
+        self,
+        rev: RevisionID,
+        base_commit_id: Optional[str],
+    ) -> str:
+        """Return the revision to pass to :command:`hg cat`.
+
+        Version Added:
+            8.0
+
+        Args:
+            rev (reviewboard.scmtools.core.RevisionID):
+                The revision of the file.
+
+            base_commit_id (str):
+                The base commit, if using.
+
+        Returns:
+            str:
+            The revision to fetch.
+        """
+        # If the base commit id is provided it should override anything
+        # that was parsed from the diffs.
+        if rev != PRE_CREATION and base_commit_id is not None:
+            rev = base_commit_id
+
+        if rev == HEAD:
+            rev = 'tip'
+        elif rev == PRE_CREATION:
+            rev = ''
+
+        return str(rev)
+
     def get_branches(self) -> list[Branch]:
         """Return open/inactive branches from repository in JSON.
 
@@ -28,7 +28,8 @@ from reviewboard.hostingsvcs.base import hosting_service_registry
 from reviewboard.hostingsvcs.errors import MissingHostingServiceError
 from reviewboard.hostingsvcs.models import HostingServiceAccount
 from reviewboard.scmtools import scmtools_registry
-from reviewboard.scmtools.core import FileLookupContext
+from reviewboard.scmtools.core import (FileLookup, FileLookupContext,
+                                       FileResult)
 from reviewboard.scmtools.crypto_utils import (decrypt_password,
                                                encrypt_password)
 from reviewboard.scmtools.managers import RepositoryManager, ToolManager
@@ -831,6 +832,181 @@ class Repository(models.Model):
 
         return exists
 
+    def get_files(
+        self,
+        lookups: Sequence[FileLookup],
+        *,
+        request: Optional[HttpRequest] = None,
+    ) -> Sequence[FileResult]:
+        """Return several files from the repository.
+
+        This is a batch version of :py:meth:`get_file`. Files that are
+        already cached are returned from the cache. The rest are fetched in
+        one batch from the repository or hosting service, and then cached
+        using the same cache keys as :py:meth:`get_file`.
+
+        This will send the
+        :py:data:`~reviewboard.scmtools.signals.fetching_file` and
+        :py:data:`~reviewboard.scmtools.signals.fetched_file` signals for
+        each file that isn't cached.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to fetch. Each revision must be a string.
+
+            request (django.http.HttpRequest, optional):
+                The current HTTP request from the client. This is used to
+                create a context for any lookups that don't have one.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+
+        Raises:
+            TypeError:
+                One or more of the provided lookups contains an invalid type.
+                Details are contained in the error message.
+        """
+        lookups = self._normalize_file_lookups(lookups, request=request)
+        keys = [
+            self._make_file_cache_key(
+                path=path,
+                revision=revision,
+                base_commit_id=context.base_commit_id)
+            for path, revision, context in lookups
+        ]
+        cached = cache.get_many([make_cache_key(key) for key in keys])
+
+        results: list[Optional[FileResult]] = [None] * len(lookups)
+        missing: list[int] = []
+
+        for i, key in enumerate(keys):
+            if make_cache_key(key) not in cached:
+                missing.append(i)
+                continue
+
+            # This will fall back on fetching the file if it has been
+            # evicted since the check above.
+            path, revision, context = lookups[i]
+
+            try:
+                results[i] = cache_memoize(
+                    key,
+                    lambda: [
+                        self._get_file_uncached(path=path,
+                                                revision=revision,
+                                                context=context),
+                    ],
+                    large_data=True)[0]
+            except Exception as e:
+                results[i] = e
+
+        if missing:
+            fetched = self._get_files_uncached([
+                lookups[i]
+                for i in missing
+            ])
+
+            for i, data in zip(missing, fetched):
+                results[i] = data
+
+                if isinstance(data, bytes):
+                    # See get_file() for why this is wrapped in a list.
+                    cache_memoize(keys[i],
+                                  lambda: [data],
+                                  large_data=True,
+                                  force_overwrite=True)
+
+        return cast(list[FileResult], results)
+
+    def files_exist(
+        self,
+        lookups: Sequence[FileLookup],
+        *,
+        request: Optional[HttpRequest] = None,
+    ) -> Sequence[bool]:
+        """Return whether several files exist in the repository.
+
+        This is a batch version of :py:meth:`get_file_exists`. Files that are
+        known to exist from the cache (including files that have been
+        fetched) aren't checked again. The rest are checked in one batch
+        through the repository or hosting service, and files that exist are
+        cached using the same cache keys as :py:meth:`get_file_exists`.
+
+        This will send the
+        :py:data:`~reviewboard.scmtools.signals.checking_file_exists` and
+        :py:data:`~reviewboard.scmtools.signals.checked_file_exists` signals
+        for each file that isn't cached.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to check. Each revision must be a string.
+
+            request (django.http.HttpRequest, optional):
+                The current HTTP request from the client. This is used to
+                create a context for any lookups that don't have one.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+
+        Raises:
+            TypeError:
+                One or more of the provided lookups contains an invalid type.
+                Details are contained in the error message.
+        """
+        lookups = self._normalize_file_lookups(lookups, request=request)
+        exists_keys: list[str] = []
+        file_keys: list[str] = []
+
+        for path, revision, context in lookups:
+            exists_keys.append(self._make_file_exists_cache_key(
+                path=path,
+                revision=revision,
+                base_commit_id=context.base_commit_id))
+            file_keys.append(make_cache_key(self._make_file_cache_key(
+                path=path,
+                revision=revision,
+                base_commit_id=context.base_commit_id)))
+
+        cached = cache.get_many([
+            make_cache_key(key)
+            for key in exists_keys
+        ] + file_keys)
+
+        results = [False] * len(lookups)
+        missing: list[int] = []
+
+        for i, (exists_key, file_key) in enumerate(zip(exists_keys,
+                                                       file_keys)):
+            if (cached.get(make_cache_key(exists_key)) == '1' or
+                file_key in cached):
+                results[i] = True
+            else:
+                missing.append(i)
+
+        if missing:
+            checked = self._get_files_exist_uncached([
+                lookups[i]
+                for i in missing
+            ])
+
+            for i, exists in zip(missing, checked):
+                results[i] = exists
+
+                if exists:
+                    cache_memoize(exists_keys[i], lambda: '1',
+                                  force_overwrite=True)
+
+        return results
+
     def get_branches(self) -> Sequence[Branch]:
         """Return a list of all branches on the repository.
 
@@ -1461,6 +1637,187 @@ class Repository(models.Model):
 
         return exists
 
+    def _normalize_file_lookups(
+        self,
+        lookups: Sequence[FileLookup],
+        *,
+        request: Optional[HttpRequest],
+    ) -> list[FileLookup]:
+        """Return validated file lookups, each with a context.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The lookups to normalize.
+
+            request (django.http.HttpRequest):
+                The current HTTP request from the client, used for lookups
+                without a context.
+
+        Returns:
+            list of reviewboard.scmtools.core.FileLookup:
+            The normalized lookups.
+
+        Raises:
+            TypeError:
+                One or more of the provided lookups contains an invalid type.
+                Details are contained in the error message.
+        """
+        result: list[FileLookup] = []
+
+        for path, revision, context in lookups:
+            if not isinstance(path, str):
+                raise TypeError('"path" must be a Unicode string, not %s'
+                                % type(path))
+
+            if not isinstance(revision, str):
+                raise TypeError('"revision" must be a Unicode string, not %s'
+                                % type(revision))
+
+            if context is None:
+                context = FileLookupContext(request=request)
+
+            result.append(FileLookup(path=path,
+                                     revision=revision,
+                                     context=context))
+
+        return result
+
+    def _get_files_uncached(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return several files from the repository, bypassing cache.
+
+        This is called internally by :py:meth:`get_files` for any files that
+        aren't already in the cache.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The normalized lookups for the files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+
+        Raises:
+            reviewboard.hostingsvcs.errors.MissingHostingServiceError:
+                The hosting service for this repository could not be loaded.
+        """
+        for path, revision, context in lookups:
+            assert context is not None
+
+            fetching_file.send(sender=self,
+                               path=path,
+                               revision=revision,
+                               base_commit_id=context.base_commit_id,
+                               request=context.request,
+                               context=context)
+
+        request = lookups[0].context and lookups[0].context.request
+
+        with log_timed(f'Fetching {len(lookups)} files from {self}',
+                       logger=logger,
+                       request=request):
+            hosting_service = self.hosting_service
+
+            if hosting_service:
+                source = hosting_service
+                results = hosting_service.get_files(self, lookups)
+            else:
+                source = self.get_scmtool()
+                results = source.get_files(lookups)
+
+        assert len(results) == len(lookups), (
+            '%s.get_files() must return one result per file'
+            % type(source).__name__)
+
+        for (path, revision, context), data in zip(lookups, results):
+            assert context is not None
+
+            if isinstance(data, Exception):
+                continue
+
+            assert isinstance(data, bytes), (
+                '%s.get_files() must return byte strings, not %s'
+                % (type(source).__name__, type(data)))
+
+            fetched_file.send(sender=self,
+                              path=path,
+                              revision=revision,
+                              base_commit_id=context.base_commit_id,
+                              request=context.request,
+                              context=context,
+                              data=data)
+
+        return results
+
+    def _get_files_exist_uncached(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[bool]:
+        """Check for the existence of several files, bypassing cache.
+
+        This is called internally by :py:meth:`files_exist` for any files
+        that aren't known to exist from the cache.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The normalized lookups for the files to check.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+
+        Raises:
+            reviewboard.hostingsvcs.errors.MissingHostingServiceError:
+                The hosting service for this repository could not be loaded.
+        """
+        for path, revision, context in lookups:
+            assert context is not None
+
+            checking_file_exists.send(sender=self,
+                                      path=path,
+                                      revision=revision,
+                                      base_commit_id=context.base_commit_id,
+                                      request=context.request,
+                                      context=context)
+
+        request = lookups[0].context and lookups[0].context.request
+
+        with log_timed(f'Checking file existence for {len(lookups)} files '
+                       f'from {self}',
+                       logger=logger,
+                       request=request):
+            hosting_service = self.hosting_service
+
+            if hosting_service:
+                results = hosting_service.get_files_exist(self, lookups)
+            else:
+                results = self.get_scmtool().files_exist(lookups)
+
+        for (path, revision, context), exists in zip(lookups, results):
+            assert context is not None
+
+            checked_file_exists.send(sender=self,
+                                     path=path,
+                                     revision=revision,
+                                     base_commit_id=context.base_commit_id,
+                                     request=context.request,
+                                     exists=exists,
+                                     context=context)
+
+        return results
+
     def __str__(self) -> str:
         """Return a string representation of the repository.
 
@@ -14,7 +14,7 @@ import subprocess
 import tempfile
 import time
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Union
+from typing import Optional, Sequence, TYPE_CHECKING, Union
 
 from django.conf import settings
 from django.utils.encoding import force_str
@@ -33,7 +33,10 @@ from reviewboard.scmtools.errors import (SCMError, EmptyChangeSetError,
                                          UnverifiedCertificateError)
 
 if TYPE_CHECKING:
-    from reviewboard.scmtools.core import Revision
+    from P4 import P4Exception
+
+    from reviewboard.scmtools.core import (FileLookup, FileResult, Revision,
+                                           RevisionID)
 
 
 logger = logging.getLogger(__name__)
@@ -487,15 +490,7 @@ class PerforceClient(object):
             with self.connect():
                 yield
         except P4Exception as e:
-            try:
-                error = str(e)
-            except AttributeError:
-                # p4python 2024.1.2625398 introduced a regression in
-                # P4Exception.__str__ where the 'errors' and 'warnings'
-                # attributes were being checked but weren't necessarily
-                # defined during construction. We handle this by falling
-                # back to the raw value.
-                error = e.value
+            error = self._get_error_message(e)
 
             if 'Perforce password' in error or 'Password must be set' in error:
                 raise AuthenticationError(msg=error)
@@ -577,31 +572,52 @@ class PerforceClient(object):
         if revision == PRE_CREATION:
             return b''
 
-        if revision == HEAD:
-            depot_path = path
-        else:
-            depot_path = '%s#%s' % (path, revision)
-
         with self.run_worker():
-            fd, filename = tempfile.mkstemp(prefix='reviewboard.')
+            return self._print_file(path, revision)
 
-            try:
-                os.close(fd)
-                self.p4.run_print('-q', '-o', filename, depot_path)
+    def get_files(
+        self,
+        files: Sequence[tuple[str, RevisionID]],
+    ) -> list[FileResult]:
+        """Return the contents of several files.
 
-                if os.path.islink(filename):
-                    return b''
-                else:
-                    # p4 print will change the permissions on the file to be
-                    # read-only, which will break the unlink unless we fix it.
-                    os.chmod(filename, stat.S_IREAD | stat.S_IWRITE)
+        All files are fetched over a single connection to the server.
 
-                    with open(filename, 'rb') as f:
-                        return f.read()
-            finally:
-                os.unlink(filename)
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 2-tuples of the depot path and revision of each
+                file.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``files``.
+
+        Raises:
+            reviewboard.scmtools.errors.SCMError:
+                There was an error connecting to the server.
+        """
+        from P4 import P4Exception
 
-        return b''
+        results: list[FileResult] = [b''] * len(files)
+        indexes = [
+            i
+            for i, (path, revision) in enumerate(files)
+            if revision != PRE_CREATION
+        ]
+
+        if indexes:
+            with self.run_worker():
+                for i in indexes:
+                    try:
+                        results[i] = self._print_file(*files[i])
+                    except P4Exception as e:
+                        results[i] = SCMError(self._get_error_message(e))
+
+        return results
 
     def get_file_stat(self, path, revision):
         """Return status information about a file in the repository.
@@ -622,19 +638,175 @@ class PerforceClient(object):
         """
         if revision == PRE_CREATION:
             return None
-        elif revision == HEAD:
-            depot_path = path
-        else:
-            depot_path = '%s#%s' % (path, revision)
 
         with self.run_worker():
-            res = self.p4.run_fstat(depot_path)
+            return self._stat_file(path, revision)
+
+    def get_files_stat(
+        self,
+        files: Sequence[tuple[str, RevisionID]],
+    ) -> list[Optional[dict]]:
+        """Return status information about several files.
+
+        All files are checked over a single connection to the server.
+
+        Version Added:
+            8.0
+
+        Args:
+            files (list of tuple):
+                A list of 2-tuples of the depot path and revision of each
+                file.
+
+        Returns:
+            list:
+            The status information for each file, or ``None`` if there was
+            none, in the same order as ``files``.
+
+        Raises:
+            reviewboard.scmtools.errors.SCMError:
+                There was an error communicating with the server.
+        """
+        results: list[Optional[dict]] = [None] * len(files)
+        indexes = [
+            i
+            for i, (path, revision) in enumerate(files)
+            if revision != PRE_CREATION
+        ]
+
+        if indexes:
+            with self.run_worker():
+                for i in indexes:
+                    results[i] = self._stat_file(*files[i])
+
+        return results
+
+    def _get_depot_path(
+        self,
+        path: str,
+        revision: RevisionID,
+    ) -> str:
+        """Return a depot path with a revision specifier.
+
+        Version Added:
+            8.0
+
+        Args:
+            path (str):
+                The depot path, without a revision.
+
+            revision (reviewboard.scmtools.core.RevisionID):
+                The revision for the path.
+
+        Returns:
+            str:
+            The depot path to pass to Perforce.
+        """
+        if revision == HEAD:
+            return path
+        else:
+            return '%s#%s' % (path, revision)
+
+    def _print_file(
+        self,
+        path: str,
+        revision: RevisionID,
+    ) -> bytes:
+        """Return the contents of a file using an active connection.
+
+        This must be called within :py:meth:`run_worker`.
+
+        Version Added:
+            8.0
+
+        Args:
+            path (str):
+                The Perforce depot path, without a revision.
+
+            revision (reviewboard.scmtools.core.RevisionID):
+                The revision for the path.
+
+        Returns:
+            bytes:
+            The contents of the file.
+        """
+        fd, filename = tempfile.mkstemp(prefix='reviewboard.')
+
+        try:
+            os.close(fd)
+            self.p4.run_print('-q', '-o', filename,
+                              self._get_depot_path(path, revision))
+
+            if os.path.islink(filename):
+                return b''
+            else:
+                # p4 print will change the permissions on the file to be
+                # read-only, which will break the unlink unless we fix it.
+                os.chmod(filename, stat.S_IREAD | stat.S_IWRITE)
+
+                with open(filename, 'rb') as f:
+                    return f.read()
+        finally:
+            os.unlink(filename)
+
+    def _stat_file(
+        self,
+        path: str,
+        revision: RevisionID,
+    ) -> Optional[dict]:
+        """Return status information about a file using an active connection.
+
+        This must be called within :py:meth:`run_worker`.
+
+        Version Added:
+            8.0
+
+        Args:
+            path (str):
+                The depot path for the file.
+
+            revision (reviewboard.scmtools.core.RevisionID):
+                The revision number of the file.
+
+        Returns:
+            dict:
+            The status information, or ``None`` if there was none for the
+            given file and revision.
+        """
+        res = self.p4.run_fstat(self._get_depot_path(path, revision))
 
         if res:
             return res[-1]
 
         return None
 
+    def _get_error_message(
+        self,
+        e: P4Exception,
+    ) -> str:
+        """Return the message for a Perforce exception.
+
+        Version Added:
+            8.0
+
+        Args:
+            e (P4.P4Exception):
+                The exception.
+
+        Returns:
+            str:
+            The error message.
+        """
+        try:
+            return str(e)
+        except AttributeError:
+            # p4python 2024.1.2625398 introduced a regression in
+            # P4Exception.__str__ where the 'errors' and 'warnings'
+            # attributes were being checked but weren't necessarily
+            # defined during construction. We handle this by falling
+            # back to the raw value.
+            return e.value
+
 
 class PerforceTool(SCMTool):
     """Repository support for Perforce.
@@ -851,6 +1023,58 @@ class PerforceTool(SCMTool):
 
         return stat is not None and 'headRev' in stat
 
+    def get_files(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[FileResult]:
+        """Return the contents of several files in the repository.
+
+        All files are fetched over a single connection to the server.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to fetch.
+
+        Returns:
+            list:
+            A list with the contents of each file, or the exception raised
+            when fetching it, in the same order as ``lookups``.
+        """
+        return self.client.get_files([
+            (lookup.path, lookup.revision)
+            for lookup in lookups
+        ])
+
+    def files_exist(
+        self,
+        lookups: Sequence[FileLookup],
+    ) -> Sequence[bool]:
+        """Return whether several files exist in the repository.
+
+        All files are checked over a single connection to the server.
+
+        Version Added:
+            8.0
+
+        Args:
+            lookups (list of reviewboard.scmtools.core.FileLookup):
+                The files to check.
+
+        Returns:
+            list of bool:
+            Whether each file exists, in the same order as ``lookups``.
+        """
+        return [
+            stat is not None and 'headRev' in stat
+            for stat in self.client.get_files_stat([
+                (lookup.path, lookup.revision)
+                for lookup in lookups
+            ])
+        ]
+
     def parse_diff_revision(
         self,
         filename: bytes,
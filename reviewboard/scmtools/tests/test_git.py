@@ -5,13 +5,19 @@ import unittest
 
 import kgb
 from djblets.testing.decorators import add_fixtures
+from djblets.util.filesystem import is_exe_in_path
 
 from reviewboard import get_manual_url
 from reviewboard.diffviewer.parser import DiffParserError
 from reviewboard.diffviewer.testing.mixins import DiffParserTestingMixin
-from reviewboard.scmtools.core import PRE_CREATION
+from reviewboard.scmtools.core import (FileLookup, HEAD, PRE_CREATION,
+                                       SCMTool)
 from reviewboard.scmtools.errors import SCMError, FileNotFoundError
-from reviewboard.scmtools.git import ShortSHA1Error, GitClient, GitTool
+from reviewboard.scmtools.git import (GitCatFileBatchPool,
+                                      GitClient,
+                                      GitTool,
+                                      ShortSHA1Error,
+                                      cat_file_pool)
 from reviewboard.scmtools.tests.testcases import SCMTestCase
 from reviewboard.testing.testcase import TestCase
 
@@ -1204,6 +1210,96 @@ class GitTests(DiffParserTestingMixin, kgb.SpyAgency, SCMTestCase):
         with self.assertRaises(FileNotFoundError):
             tool.get_file('readme', '0000000')
 
+    def test_get_file_with_cat_file_pool(self):
+        """Testing GitTool.get_file uses the git cat-file process pool"""
+        self.spy_on(cat_file_pool.get_object)
+
+        self.assertEqual(self.tool.get_file('readme', 'e965047'),
+                         b'Hello\n')
+        self.assertTrue(self.tool.file_exists('readme', 'e965047'))
+
+        self.assertSpyCallCount(cat_file_pool.get_object, 2)
+        self.assertSpyCalledWith(cat_file_pool.get_object.calls[0],
+                                 name='e965047',
+                                 batch_check=False)
+        self.assertSpyCalledWith(cat_file_pool.get_object.calls[1],
+                                 name='e965047',
+                                 batch_check=True)
+
+    def test_get_file_with_non_blob(self):
+        """Testing GitTool.get_file with a revision that is not a blob"""
+        message = '"a62df6c" is a commit, not a file.'
+
+        with self.assertRaisesMessage(SCMError, message):
+            self.tool.get_file('readme', 'a62df6c')
+
+    def test_get_files(self):
+        """Testing GitTool.get_files"""
+        self.spy_on(cat_file_pool.get_objects)
+
+        results = self.tool.get_files([
+            FileLookup(path='readme', revision=PRE_CREATION),
+            FileLookup(path='readme', revision='e965047'),
+            FileLookup(path='readme', revision='d6613f5'),
+            FileLookup(path='readme', revision='0000000'),
+            FileLookup(path='readme', revision='a62df6c'),
+            FileLookup(path='', revision=HEAD),
+        ])
+
+        self.assertEqual(results[:3], [b'', b'Hello\n', b'Hello there\n'])
+        self.assertIsInstance(results[3], FileNotFoundError)
+        self.assertIsInstance(results[4], SCMError)
+        self.assertEqual(str(results[4]),
+                         '"a62df6c" is a commit, not a file.')
+        self.assertIsInstance(results[5], SCMError)
+
+        self.assertSpyCallCount(cat_file_pool.get_objects, 1)
+        self.assertSpyCalledWith(
+            cat_file_pool.get_objects,
+            names=['e965047', 'd6613f5', '0000000', 'a62df6c'],
+            batch_check=False)
+
+    def test_files_exist(self):
+        """Testing GitTool.files_exist"""
+        self.spy_on(cat_file_pool.get_objects)
+
+        self.assertEqual(
+            self.tool.files_exist([
+                FileLookup(path='readme', revision=PRE_CREATION),
+                FileLookup(path='readme', revision='e965047'),
+                FileLookup(path='readme', revision='0000000'),
+                FileLookup(path='readme', revision='a62df6c'),
+            ]),
+            [False, True, False, False])
+
+        self.assertSpyCallCount(cat_file_pool.get_objects, 1)
+        self.assertSpyCalledWith(
+            cat_file_pool.get_objects,
+            names=['e965047', '0000000', 'a62df6c'],
+            batch_check=True)
+
+    def test_get_files_with_remote(self):
+        """Testing GitTool.get_files with remote files"""
+        def _get_file_http(_self, url, path, revision, mime_type=None):
+            if url.endswith('/' + '1' * 40):
+                return b'Hello\n'
+
+            raise FileNotFoundError(path, revision)
+
+        self.spy_on(GitClient.get_file_http,
+                    owner=GitClient,
+                    call_fake=_get_file_http)
+
+        results = self.remote_tool.get_files([
+            FileLookup(path='README', revision='1' * 40),
+            FileLookup(path='README', revision='2' * 40),
+            FileLookup(path='README', revision='d7e96b3'),
+        ])
+
+        self.assertEqual(results[0], b'Hello\n')
+        self.assertIsInstance(results[1], FileNotFoundError)
+        self.assertIsInstance(results[2], ShortSHA1Error)
+
     def test_parse_diff_revision_with_remote_and_short_SHA1_error(self):
         """Testing GitTool.parse_diff_revision with remote files and short
         SHA1 error
@@ -1371,6 +1467,150 @@ class GitTests(DiffParserTestingMixin, kgb.SpyAgency, SCMTestCase):
             ))
 
 
+class GitCatFileBatchPoolTests(kgb.SpyAgency, TestCase):
+    """Unit tests for reviewboard.scmtools.git.GitCatFileBatchPool."""
+
+    def setUp(self):
+        super().setUp()
+
+        if not is_exe_in_path('git'):
+            raise unittest.SkipTest('git binary not found')
+
+        self.git_dir = os.path.join(os.path.dirname(__file__), '..',
+                                    'testdata', 'git_repo')
+        self.pool = GitCatFileBatchPool()
+
+    def tearDown(self):
+        self.pool.close_idle(force=True)
+
+        super().tearDown()
+
+    def test_get_object(self):
+        """Testing GitCatFileBatchPool.get_object"""
+        self.assertEqual(self._get_object('e965047'), ('blob', b'Hello\n'))
+        self.assertEqual(self._get_object('d6613f5'),
+                         ('blob', b'Hello there\n'))
+
+    def test_get_object_with_batch_check(self):
+        """Testing GitCatFileBatchPool.get_object with batch_check=True"""
+        self.assertEqual(self._get_object('e965047', batch_check=True),
+                         ('blob', None))
+        self.assertEqual(self._get_object('a62df6c', batch_check=True),
+                         ('commit', None))
+
+    def test_get_object_with_missing(self):
+        """Testing GitCatFileBatchPool.get_object with a missing object"""
+        self.assertEqual(self._get_object('0000000'), (None, None))
+        self.assertEqual(self._get_object('0000000', batch_check=True),
+                         (None, None))
+
+    def test_get_object_reuses_process(self):
+        """Testing GitCatFileBatchPool.get_object reuses processes"""
+        self.spy_on(SCMTool.popen)
+
+        self._get_object('e965047')
+        self._get_object('d6613f5')
+        self._get_object('0000000')
+
+        self.assertSpyCallCount(SCMTool.popen, 1)
+
+    def test_get_object_with_exited_process(self):
+        """Testing GitCatFileBatchPool.get_object with a process that has
+        exited
+        """
+        self._get_object('e965047')
+
+        process = self.pool._idle[(self.git_dir, None, False)][0]
+        process._process.kill()
+        process._process.wait()
+
+        self.assertEqual(self._get_object('e965047'), ('blob', b'Hello\n'))
+
+    def test_get_object_with_communication_error(self):
+        """Testing GitCatFileBatchPool.get_object retries with a new process
+        after a communication error
+        """
+        self._get_object('e965047')
+
+        process = self.pool._idle[(self.git_dir, None, False)][0]
+        process._process.stdin.close()
+
+        self.assertEqual(self._get_object('e965047'), ('blob', b'Hello\n'))
+
+    def test_get_objects(self):
+        """Testing GitCatFileBatchPool.get_objects"""
+        self.spy_on(SCMTool.popen)
+
+        self.assertEqual(
+            self.pool.get_objects(git_dir=self.git_dir,
+                                  local_site_name=None,
+                                  names=['e965047', '0000000', 'd6613f5'],
+                                  batch_check=False),
+            [
+                ('blob', b'Hello\n'),
+                (None, None),
+                ('blob', b'Hello there\n'),
+            ])
+
+        self.assertSpyCallCount(SCMTool.popen, 1)
+
+    def test_get_objects_with_large_batch(self):
+        """Testing GitCatFileBatchPool.get_objects with a batch larger than
+        the pipe buffers
+        """
+        names = ['e965047', 'd6613f5', 'a62df6c'] * 5000
+
+        results = self.pool.get_objects(git_dir=self.git_dir,
+                                        local_site_name=None,
+                                        names=names,
+                                        batch_check=False)
+
+        self.assertEqual(len(results), len(names))
+        self.assertEqual(results[-3:-1], [
+            ('blob', b'Hello\n'),
+            ('blob', b'Hello there\n'),
+        ])
+        self.assertEqual(results[-1][0], 'commit')
+
+    def test_close_idle(self):
+        """Testing GitCatFileBatchPool.close_idle with expired processes"""
+        self._get_object('e965047')
+        self.pool.idle_timeout_secs = 0
+
+        self.pool.close_idle()
+
+        self.assertEqual(self.pool._idle, {})
+
+    def test_close_idle_with_active_processes(self):
+        """Testing GitCatFileBatchPool.close_idle keeps recently-used
+        processes
+        """
+        self._get_object('e965047')
+
+        self.pool.close_idle()
+
+        self.assertEqual(len(self.pool._idle), 1)
+
+    def _get_object(self, name, batch_check=False):
+        """Return information on an object in the test repository.
+
+        Args:
+            name (str):
+                The name of the object.
+
+            batch_check (bool, optional):
+                Whether to only fetch object information.
+
+        Returns:
+            tuple:
+            The result of :py:meth:`GitCatFileBatchPool.get_object`.
+        """
+        return self.pool.get_object(git_dir=self.git_dir,
+                                    local_site_name=None,
+                                    name=name,
+                                    batch_check=batch_check)
+
+
 class GitAuthFormTests(TestCase):
     """Unit tests for GitTool's authentication form."""
 
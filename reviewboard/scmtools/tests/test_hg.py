@@ -12,6 +12,7 @@ from djblets.testing.decorators import add_fixtures
 
 from reviewboard.diffviewer.testing.mixins import DiffParserTestingMixin
 from reviewboard.scmtools.core import (
+    FileLookup,
     FileLookupContext,
     HEAD,
     PRE_CREATION,
@@ -448,6 +449,25 @@ class MercurialTests(DiffParserTestingMixin, SCMTestCase):
         self.assertTrue(self.tool.file_exists('doc/readme', rev))
         self.assertFalse(self.tool.file_exists('doc/readme2', rev))
 
+    def test_get_files(self) -> None:
+        """Testing HgTool.get_files"""
+        rev = Revision('661e5dd3c493')
+        context = FileLookupContext(base_commit_id='661e5dd3c493')
+
+        results = self.tool.get_files([
+            FileLookup(path='doc/readme', revision=rev),
+            FileLookup(path='doc/readme2', revision=rev),
+            FileLookup(path='doc/readme',
+                       revision=Revision('bogusrevision'),
+                       context=context),
+            FileLookup(path='', revision=rev),
+        ])
+
+        self.assertEqual(results[0], b'Hello\n\ngoodbye\n')
+        self.assertIsInstance(results[1], FileNotFoundError)
+        self.assertEqual(results[2], b'Hello\n\ngoodbye\n')
+        self.assertIsInstance(results[3], FileNotFoundError)
+
     def test_get_file_base_commit_id_override(self) -> None:
         """Testing base_commit_id overrides revision in HgTool.get_file"""
         base_commit_id = '661e5dd3c493'
@@ -14,7 +14,8 @@ from djblets.testing.decorators import add_fixtures
 from reviewboard.hostingsvcs.errors import MissingHostingServiceError
 from reviewboard.hostingsvcs.github import GitHub
 from reviewboard.hostingsvcs.models import HostingServiceAccount
-from reviewboard.scmtools.core import FileLookupContext
+from reviewboard.scmtools.core import FileLookup, FileLookupContext
+from reviewboard.scmtools.errors import FileNotFoundError
 from reviewboard.scmtools.git import GitTool
 from reviewboard.scmtools.models import Repository, Tool
 from reviewboard.scmtools.signals import (checked_file_exists,
@@ -467,6 +468,170 @@ class RepositoryTests(kgb.SpyAgency, TestCase):
             request=request,
             context=context)
 
+    def test_get_files(self):
+        """Testing Repository.get_files"""
+        repository = self.repository
+        scmtool_cls = repository.scmtool_class
+
+        self.spy_on(scmtool_cls.get_files, owner=scmtool_cls)
+
+        results = repository.get_files([
+            FileLookup(path='readme', revision='e965047'),
+            FileLookup(path='readme', revision='d6613f5'),
+            FileLookup(path='readme', revision='0000000'),
+        ])
+
+        self.assertEqual(results[:2], [b'Hello\n', b'Hello there\n'])
+        self.assertIsInstance(results[2], FileNotFoundError)
+        self.assertSpyCallCount(scmtool_cls.get_files, 1)
+
+    def test_get_files_caching(self):
+        """Testing Repository.get_files only fetches uncached files and
+        caches results for get_file
+        """
+        repository = self.repository
+        scmtool_cls = repository.scmtool_class
+
+        self.spy_on(scmtool_cls.get_files, owner=scmtool_cls)
+        self.spy_on(scmtool_cls.get_file, owner=scmtool_cls)
+
+        repository.get_file(path='readme',
+                            revision='e965047')
+
+        results = repository.get_files([
+            FileLookup(path='readme', revision='e965047'),
+            FileLookup(path='readme',
+                       revision='d6613f5',
+                       context=FileLookupContext(base_commit_id='def456')),
+        ])
+
+        self.assertEqual(results, [b'Hello\n', b'Hello there\n'])
+        self.assertSpyCallCount(scmtool_cls.get_files, 1)
+
+        lookups = scmtool_cls.get_files.last_call.args[0]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(lookups[0].revision, 'd6613f5')
+        self.assertEqual(lookups[0].context.base_commit_id, 'def456')
+
+        # The fetched file should now be cached for get_file().
+        self.assertEqual(
+            repository.get_file(
+                path='readme',
+                revision='d6613f5',
+                context=FileLookupContext(base_commit_id='def456')),
+            b'Hello there\n')
+        self.assertSpyCallCount(scmtool_cls.get_file, 1)
+
+    def test_get_files_signals(self):
+        """Testing Repository.get_files emits signals"""
+        def on_fetching_file(**kwargs):
+            pass
+
+        def on_fetched_file(**kwargs):
+            pass
+
+        repository = self.repository
+
+        fetching_file.connect(on_fetching_file, sender=repository)
+        fetched_file.connect(on_fetched_file, sender=repository)
+
+        self.spy_on(on_fetching_file)
+        self.spy_on(on_fetched_file)
+
+        request = self.create_http_request()
+        context = FileLookupContext(request=request)
+
+        repository.get_files([
+            FileLookup(path='readme', revision='e965047', context=context),
+            FileLookup(path='readme', revision='0000000', context=context),
+        ])
+
+        self.assertSpyCallCount(on_fetching_file, 2)
+        self.assertSpyCallCount(on_fetched_file, 1)
+        self.assertSpyCalledWith(
+            on_fetched_file,
+            sender=repository,
+            path='readme',
+            revision='e965047',
+            base_commit_id=None,
+            request=request,
+            context=context,
+            data=b'Hello\n')
+
+    def test_get_files_with_invalid_revision_type(self):
+        """Testing Repository.get_files with a non-string revision"""
+        message = '"revision" must be a Unicode string, not <class \'bytes\'>'
+
+        with self.assertRaisesMessage(TypeError, message):
+            self.repository.get_files([
+                FileLookup(path='readme', revision=b'e965047'),
+            ])
+
+    def test_files_exist(self):
+        """Testing Repository.files_exist"""
+        repository = self.repository
+        scmtool_cls = repository.scmtool_class
+
+        self.spy_on(scmtool_cls.files_exist, owner=scmtool_cls)
+
+        self.assertEqual(
+            repository.files_exist([
+                FileLookup(path='readme', revision='e965047'),
+                FileLookup(path='readme', revision='0000000'),
+                FileLookup(path='readme', revision='a62df6c'),
+            ]),
+            [True, False, False])
+        self.assertSpyCallCount(scmtool_cls.files_exist, 1)
+
+    def test_files_exist_caching(self):
+        """Testing Repository.files_exist only checks files not known to
+        exist
+        """
+        repository = self.repository
+        scmtool_cls = repository.scmtool_class
+
+        self.spy_on(scmtool_cls.files_exist, owner=scmtool_cls)
+        self.spy_on(scmtool_cls.file_exists, owner=scmtool_cls)
+
+        repository.get_file(path='readme',
+                            revision='d6613f5')
+        self.assertEqual(
+            repository.files_exist([
+                FileLookup(path='readme', revision='e965047'),
+                FileLookup(path='readme', revision='d6613f5'),
+                FileLookup(path='readme', revision='0000000'),
+            ]),
+            [True, True, False])
+
+        lookups = scmtool_cls.files_exist.last_call.args[0]
+        self.assertEqual(
+            [
+                lookup.revision
+                for lookup in lookups
+            ],
+            ['e965047', '0000000'])
+
+        # Existing files should now be cached for get_file_exists().
+        self.assertTrue(repository.get_file_exists(path='readme',
+                                                   revision='e965047'))
+        self.assertSpyNotCalled(scmtool_cls.file_exists)
+
+        # Files that don't exist aren't cached.
+        self.assertEqual(
+            repository.files_exist([
+                FileLookup(path='readme', revision='e965047'),
+                FileLookup(path='readme', revision='0000000'),
+            ]),
+            [True, False])
+
+        lookups = scmtool_cls.files_exist.last_call.args[0]
+        self.assertEqual(
+            [
+                lookup.revision
+                for lookup in lookups
+            ],
+            ['0000000'])
+
     def test_hosting_service(self):
         """Testing Repository.hosting_service with a valid hosting service"""
         account = HostingServiceAccount.objects.create(
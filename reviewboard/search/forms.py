@@ -9,8 +9,9 @@ from haystack.forms import ModelSearchForm
 from haystack.inputs import Raw
 from haystack.query import SQ
 
-from reviewboard.reviews.models import Group, ReviewRequest
-from reviewboard.scmtools.models import Repository
+from reviewboard.reviews.acl_cache import (get_accessible_group_ids,
+                                           get_accessible_repository_ids)
+from reviewboard.reviews.models import ReviewRequest
 from reviewboard.search.indexes import BaseSearchIndex
 
 
@@ -151,16 +152,13 @@ class RBSearchForm(ModelSearchForm):
                 # because we're already filtering by Local Sites.
 
                 # Make sure they have access to the repository, if any.
-                accessible_repo_ids = list(Repository.objects.accessible_ids(
-                    user,
-                    visible_only=False,
-                    local_site=self.local_site,
-                ))
-
-                accessible_group_ids = Group.objects.accessible_ids(
-                    user,
-                    visible_only=False,
-                )
+                accessible_repo_ids = list(get_accessible_repository_ids(
+                    user=user,
+                    local_site=self.local_site))
+
+                accessible_group_ids = get_accessible_group_ids(
+                    user=user,
+                    local_site=None)
 
                 repository_sq = SQ(
                     private_repository_id__in=[0] + accessible_repo_ids
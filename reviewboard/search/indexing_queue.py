@@ -0,0 +1,679 @@
+"""Queued updates to the search index.
+
+When on-the-fly indexing is enabled, the search index is updated whenever
+review requests or users change. By default, the index is written to during
+the request, meaning a slow search backend slows down the request, and a
+single change (such as publishing a review request) may write to the index
+several times.
+
+Indexing is controlled by the ``search_indexing_mode`` site configuration
+setting, which can be one of the following :py:class:`SearchIndexingMode`
+values:
+
+``immediate``:
+    The index is written to during the request. This is the default, and is
+    what unit tests use.
+
+``queued``:
+    Changed objects are recorded in a queue table, and written to the index
+    in bulk afterward. Repeated changes to an object are coalesced into a
+    single write.
+
+    The queue is written once no changes have been queued for
+    ``search_indexing_delay`` seconds, but never later than
+    ``search_indexing_max_lag`` seconds after the oldest change was queued,
+    bounding how stale the index can become.
+
+    The queue is written by a background thread in each web server process,
+    started when changes are queued. Because the queue is stored in the
+    database, changes aren't lost if a process exits or is killed before
+    writing them. They'll be written the next time any process writes the
+    queue. To keep the staleness bound even when web server processes are
+    restarted, run the ``process-search-index-queue`` management command
+    with ``--watch`` as a worker process, which checks the queue on a fixed
+    interval.
+
+    Several processes may write the queue at once. Each claims the changes
+    it's writing, so a change is only written by one process at a time. If
+    a process exits while writing, its changes are written by another once
+    the claim expires. If the search backend fails, the changes are kept
+    and retried with exponential backoff.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Collection, Optional
+from uuid import uuid4
+
+import haystack
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Model, Q
+from django.utils import timezone
+from djblets.siteconfig.models import SiteConfiguration
+from haystack.exceptions import NotHandled
+from typing_extensions import TypedDict
+
+from reviewboard.background import LocalBackgroundRunner
+from reviewboard.reviews.models import SearchIndexQueueEntry
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The number of queued changes that will be written without waiting.
+#:
+#: This is also the number of queued changes loaded at a time when writing
+#: the queue.
+MAX_PENDING = 1000
+
+#: How long changes claimed for writing are reserved, in seconds.
+#:
+#: If the process writing them exits, they'll be written by another process
+#: once this has passed.
+CLAIM_LEASE_SECS = 5 * 60
+
+#: The delay before the first retry of a failed write, in seconds.
+#:
+#: This doubles with each attempt.
+RETRY_BASE_DELAY_SECS = 30
+
+#: The maximum delay between retries of a failed write, in seconds.
+RETRY_MAX_DELAY_SECS = 60 * 60
+
+
+class SearchIndexingMode(str, Enum):
+    """How changes are written to the search index.
+
+    Version Added:
+        8.0
+    """
+
+    #: Changes are written to the index during the request.
+    IMMEDIATE = 'immediate'
+
+    #: Changes are queued and written to the index in bulk.
+    QUEUED = 'queued'
+
+
+class SearchIndexQueueStats(TypedDict):
+    """Statistics on the search indexing queue.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of objects waiting to be indexed or removed.
+    #:
+    #: This includes objects waiting to be retried.
+    pending: int
+
+    #: The number of objects waiting to be retried after a failed write.
+    retrying: int
+
+    #: The number of seconds the oldest queued change has been waiting.
+    #:
+    #: This will be ``None`` if nothing is queued.
+    oldest_pending_age: Optional[float]
+
+    #: The number of objects written in this process's last flush.
+    last_flush_count: int
+
+    #: The number of seconds the oldest change waited before this
+    #: process's last flush.
+    #:
+    #: This will be ``None`` if this process hasn't flushed the queue.
+    last_flush_lag: Optional[float]
+
+    #: The number of seconds this process's last flush took.
+    #:
+    #: This will be ``None`` if this process hasn't flushed the queue.
+    last_flush_duration: Optional[float]
+
+
+_lock = threading.Lock()
+_last_flush_count: int = 0
+_last_flush_duration: Optional[float] = None
+_last_flush_lag: Optional[float] = None
+
+
+def get_search_indexing_mode() -> SearchIndexingMode:
+    """Return the configured search indexing mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        SearchIndexingMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`SearchIndexingMode.IMMEDIATE`.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    value = siteconfig.get('search_indexing_mode')
+
+    try:
+        return SearchIndexingMode(value)
+    except ValueError:
+        logger.warning('Invalid search_indexing_mode setting %r. The '
+                       'search index will be updated immediately.',
+                       value)
+
+        return SearchIndexingMode.IMMEDIATE
+
+
+def queue_index_update(
+    *,
+    model: type[Model],
+    pk: int,
+    remove: bool = False,
+) -> None:
+    """Queue an object to be updated in or removed from the search index.
+
+    If the object is already queued, the new change replaces the old one,
+    but the object keeps its place in the queue.
+
+    Version Added:
+        8.0
+
+    Args:
+        model (type):
+            The indexed model class.
+
+        pk (int):
+            The ID of the object.
+
+        remove (bool, optional):
+            Whether to remove the object from the index.
+    """
+    queue_index_updates(model=model,
+                        pks=[pk],
+                        remove=remove)
+
+
+def queue_index_updates(
+    *,
+    model: type[Model],
+    pks: Collection[int],
+    remove: bool = False,
+) -> None:
+    """Queue objects to be updated in or removed from the search index.
+
+    This works like :py:func:`queue_index_update`, but queues several
+    objects of a model at once, in a fixed number of queries.
+
+    The queue is written in the background once the current transaction
+    commits.
+
+    Version Added:
+        8.0
+
+    Args:
+        model (type):
+            The indexed model class.
+
+        pks (list of int):
+            The IDs of the objects.
+
+        remove (bool, optional):
+            Whether to remove the objects from the index.
+    """
+    if not pks:
+        return
+
+    model_label = model._meta.label_lower
+    now = timezone.now()
+
+    # Update the objects that are already queued, and then add the rest.
+    # Objects queued by another process in between are left as they are,
+    # since they'll be written either way.
+    (
+        SearchIndexQueueEntry.objects
+        .filter(model_label=model_label,
+                object_id__in=pks)
+        .update(remove=remove,
+                last_queued=now)
+    )
+    SearchIndexQueueEntry.objects.bulk_create(
+        [
+            SearchIndexQueueEntry(model_label=model_label,
+                                  object_id=pk,
+                                  remove=remove,
+                                  queued=now,
+                                  last_queued=now)
+            for pk in pks
+        ],
+        ignore_conflicts=True)
+
+    transaction.on_commit(_local_runner.start)
+
+
+def process_search_index_queue() -> int:
+    """Write queued changes to the search index, if they're due.
+
+    Changes are due once no changes have been queued for
+    ``search_indexing_delay`` seconds, once the oldest change has waited
+    ``search_indexing_max_lag`` seconds, or once :py:data:`MAX_PENDING`
+    changes are waiting.
+
+    Version Added:
+        8.0
+
+    Returns:
+        int:
+        The number of objects written.
+    """
+    if _get_flush_delay() == 0:
+        return flush_search_index_queue()
+
+    return 0
+
+
+def flush_search_index_queue() -> int:
+    """Write all queued changes to the search index.
+
+    Objects to update are loaded in bulk for each model, using the search
+    index's queryset, and written to the backend in a single call. Objects
+    that are no longer included in the index's queryset (for instance,
+    inactive users) are removed, matching a full rebuild of the index.
+
+    Changes are claimed before they're written, so that other processes
+    writing the queue at the same time skip them. Changes being written by
+    another process, or waiting to be retried, are left for later.
+
+    If there's any error writing a model's objects to the search backend,
+    the error will be logged and those changes kept in the queue, to be
+    retried with exponential backoff.
+
+    Objects queued again while the queue is being written are kept in the
+    queue, to be written on the next flush.
+
+    Version Added:
+        8.0
+
+    Returns:
+        int:
+        The number of objects written or attempted.
+    """
+    global _last_flush_count, _last_flush_duration, _last_flush_lag
+
+    start = timezone.now()
+    start_time = time.monotonic()
+    lag: Optional[float] = None
+    count = 0
+    num_failed = 0
+
+    while True:
+        claimed_at = timezone.now()
+        entries = _claim_entries(queued_before=start,
+                                 claimed_at=claimed_at)
+
+        if entries is None:
+            break
+
+        if not entries:
+            # Another process claimed these first. Try the next ones.
+            continue
+
+        if lag is None:
+            lag = (start - entries[0].queued).total_seconds()
+
+        failed_labels = _write_entries(entries)
+        claim_token = entries[0].claim_token
+        written_ids = [
+            entry.pk
+            for entry in entries
+            if entry.model_label not in failed_labels
+        ]
+        claimed = SearchIndexQueueEntry.objects.filter(
+            claim_token=claim_token)
+
+        # Only remove the entries that haven't been queued again since they
+        # were claimed. The rest are released for the next flush.
+        (
+            claimed
+            .filter(pk__in=written_ids,
+                    last_queued__lte=claimed_at)
+            .delete()
+        )
+        claimed.filter(pk__in=written_ids).update(claim_token='',
+                                                  next_attempt=None)
+
+        if failed_labels:
+            _schedule_retries([
+                entry
+                for entry in entries
+                if entry.model_label in failed_labels
+            ])
+            num_failed += len(entries) - len(written_ids)
+
+        count += len(entries)
+
+    if lag is None:
+        return 0
+
+    duration = time.monotonic() - start_time
+
+    with _lock:
+        _last_flush_count = count
+        _last_flush_duration = duration
+        _last_flush_lag = lag
+
+    siteconfig = SiteConfiguration.objects.get_current()
+
+    if num_failed:
+        logger.warning('Failed to write %d of %d object(s) to the search '
+                       'index. They will be retried.',
+                       num_failed, count)
+
+    if lag > siteconfig.get('search_indexing_max_lag'):
+        logger.warning('Search index updates for %d object(s) were delayed '
+                       'by %.1f seconds, which is longer than the '
+                       'configured maximum. The search backend may be '
+                       'slow or overloaded.',
+                       count, lag)
+    else:
+        logger.debug('Wrote %d object(s) to the search index in %.3f '
+                     'seconds, %.1f seconds after they changed.',
+                     count, duration, lag)
+
+    return count
+
+
+def get_search_index_queue_stats() -> SearchIndexQueueStats:
+    """Return statistics on the search indexing queue.
+
+    The pending changes are those queued by all processes. The statistics
+    on the last flush are for this process.
+
+    Version Added:
+        8.0
+
+    Returns:
+        SearchIndexQueueStats:
+        The statistics.
+    """
+    queue_stats = SearchIndexQueueEntry.objects.aggregate(
+        oldest_queued=Min('queued'),
+        pending=Count('pk'),
+        retrying=Count('pk', filter=Q(attempts__gt=0)))
+    oldest_queued = queue_stats['oldest_queued']
+
+    if oldest_queued is None:
+        oldest_pending_age = None
+    else:
+        oldest_pending_age = max(
+            0.0,
+            (timezone.now() - oldest_queued).total_seconds())
+
+    with _lock:
+        return {
+            'last_flush_count': _last_flush_count,
+            'last_flush_duration': _last_flush_duration,
+            'last_flush_lag': _last_flush_lag,
+            'oldest_pending_age': oldest_pending_age,
+            'pending': queue_stats['pending'],
+            'retrying': queue_stats['retrying'],
+        }
+
+
+def get_retry_delay(
+    attempts: int,
+) -> timedelta:
+    """Return how long to wait before retrying a failed write.
+
+    Version Added:
+        8.0
+
+    Args:
+        attempts (int):
+            The number of attempts made so far.
+
+    Returns:
+        datetime.timedelta:
+        The delay before the next attempt.
+    """
+    return timedelta(seconds=min(
+        RETRY_BASE_DELAY_SECS * (2 ** max(0, attempts - 1)),
+        RETRY_MAX_DELAY_SECS))
+
+
+def _get_ready_q(
+    now: datetime,
+) -> Q:
+    """Return a query for changes that are ready to be written.
+
+    This excludes changes claimed by another process and changes waiting
+    to be retried.
+
+    Version Added:
+        8.0
+
+    Args:
+        now (datetime.datetime):
+            The current time.
+
+    Returns:
+        django.db.models.Q:
+        The query.
+    """
+    return Q(next_attempt__isnull=True) | Q(next_attempt__lte=now)
+
+
+def _claim_entries(
+    *,
+    queued_before: datetime,
+    claimed_at: datetime,
+) -> Optional[list[SearchIndexQueueEntry]]:
+    """Claim a batch of queued changes for writing.
+
+    The changes are marked with a new claim token and reserved for
+    :py:data:`CLAIM_LEASE_SECS` seconds in a single ``UPDATE``, so other
+    processes won't claim them too.
+
+    Version Added:
+        8.0
+
+    Args:
+        queued_before (datetime.datetime):
+            Only changes last queued at or before this time will be claimed.
+
+        claimed_at (datetime.datetime):
+            The current time, from which the claim is reserved.
+
+    Returns:
+        list of reviewboard.reviews.models.SearchIndexQueueEntry:
+        The claimed changes, which may be empty if another process claimed
+        them first. This will be ``None`` if there are no changes ready to
+        be written.
+    """
+    queryset = SearchIndexQueueEntry.objects.filter(
+        _get_ready_q(claimed_at),
+        last_queued__lte=queued_before)
+    entry_ids = list(queryset.values_list('pk', flat=True)[:MAX_PENDING])
+
+    if not entry_ids:
+        return None
+
+    claim_token = uuid4().hex
+
+    # The entries are checked again as part of the update, in case
+    # another process has claimed them since they were read.
+    (
+        queryset
+        .filter(pk__in=entry_ids)
+        .update(claim_token=claim_token,
+                next_attempt=claimed_at + timedelta(
+                    seconds=CLAIM_LEASE_SECS))
+    )
+
+    return list(SearchIndexQueueEntry.objects.filter(
+        claim_token=claim_token))
+
+
+def _schedule_retries(
+    entries: list[SearchIndexQueueEntry],
+) -> None:
+    """Schedule claimed changes to be retried after a failed write.
+
+    Entries with the same number of attempts share a single ``UPDATE``.
+
+    Version Added:
+        8.0
+
+    Args:
+        entries (list of reviewboard.reviews.models.SearchIndexQueueEntry):
+            The changes that failed to be written.
+    """
+    entry_ids_by_attempts: dict[int, list[int]] = {}
+
+    for entry in entries:
+        entry_ids_by_attempts.setdefault(entry.attempts, []).append(entry.pk)
+
+    now = timezone.now()
+
+    for attempts, entry_ids in entry_ids_by_attempts.items():
+        (
+            SearchIndexQueueEntry.objects
+            .filter(pk__in=entry_ids,
+                    claim_token=entries[0].claim_token)
+            .update(attempts=F('attempts') + 1,
+                    claim_token='',
+                    next_attempt=now + get_retry_delay(attempts + 1))
+        )
+
+
+def _write_entries(
+    entries: list[SearchIndexQueueEntry],
+) -> set[str]:
+    """Write queued changes to the search index.
+
+    Version Added:
+        8.0
+
+    Args:
+        entries (list of reviewboard.reviews.models.SearchIndexQueueEntry):
+            The queued changes to write.
+
+    Returns:
+        set of str:
+        The labels of the models whose changes could not be written.
+    """
+    failed_labels: set[str] = set()
+    update_pks: dict[str, set[int]] = {}
+    remove_pks: dict[str, set[int]] = {}
+
+    for entry in entries:
+        if entry.remove:
+            pks = remove_pks.setdefault(entry.model_label, set())
+        else:
+            pks = update_pks.setdefault(entry.model_label, set())
+
+        pks.add(entry.object_id)
+
+    for using in haystack.connection_router.for_write():
+        connection = haystack.connections[using]
+        backend = connection.get_backend()
+        unified_index = connection.get_unified_index()
+
+        for model_label in set(update_pks.keys()) | set(remove_pks.keys()):
+            try:
+                index = unified_index.get_index(apps.get_model(model_label))
+            except (LookupError, NotHandled):
+                continue
+
+            pks = update_pks.get(model_label, set())
+            stale_pks = set(remove_pks.get(model_label, set()))
+
+            try:
+                if pks:
+                    objs = list(
+                        index.index_queryset(using=using)
+                        .filter(pk__in=pks)
+                    )
+
+                    if objs:
+                        backend.update(index, objs)
+
+                    stale_pks.update(pks - {obj.pk for obj in objs})
+
+                for pk in stale_pks:
+                    backend.remove('%s.%s' % (model_label, pk))
+            except Exception as e:
+                logger.error('Error updating the search index. Check to '
+                             'make sure the search backend is running and '
+                             'configured correctly. The changes will be '
+                             'retried. Error: %s',
+                             e)
+                failed_labels.add(model_label)
+
+    return failed_labels
+
+
+def _get_flush_delay() -> Optional[float]:
+    """Return how long to wait before writing queued changes.
+
+    Version Added:
+        8.0
+
+    Returns:
+        float:
+        The number of seconds to wait, which may be 0, or ``None`` if
+        nothing is ready to be written. Changes claimed by another process
+        or waiting to be retried aren't counted.
+    """
+    siteconfig = SiteConfiguration.objects.get_current()
+    now = timezone.now()
+    queue_stats = (
+        SearchIndexQueueEntry.objects
+        .filter(_get_ready_q(now))
+        .aggregate(last_queued=Max('last_queued'),
+                   oldest_queued=Min('queued'),
+                   pending=Count('pk'))
+    )
+
+    if not queue_stats['pending']:
+        return None
+
+    if queue_stats['pending'] >= MAX_PENDING:
+        return 0
+    due = min(
+        queue_stats['last_queued'] +
+        timedelta(seconds=siteconfig.get('search_indexing_delay')),
+        queue_stats['oldest_queued'] +
+        timedelta(seconds=siteconfig.get('search_indexing_max_lag')))
+
+    return max(0.0, (due - now).total_seconds())
+
+
+def _process_local_queue() -> None:
+    """Write queued changes from the process's background thread.
+
+    If changes aren't due yet, this waits until they are (checking again
+    at least every second, in case more are queued) and has the thread run
+    again, so they're written before it exits.
+
+    Version Added:
+        8.0
+    """
+    delay = _get_flush_delay()
+
+    if delay is None:
+        return
+
+    if delay > 0:
+        time.sleep(min(delay, 1))
+        _local_runner.start()
+    else:
+        flush_search_index_queue()
+
+
+_local_runner = LocalBackgroundRunner(_process_local_queue,
+                                      name='rb-search-index-queue')
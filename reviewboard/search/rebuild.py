@@ -0,0 +1,431 @@
+"""Partitioned, resumable rebuilds of the search index.
+
+Haystack's ``rebuild_index`` command indexes every object in a single
+process, and must start over if it's interrupted. On large servers, this
+can take hours.
+
+:py:func:`rebuild_search_index` instead splits each indexed model into
+ranges of IDs (partitions), and indexes the partitions in parallel across
+worker processes. Each partition is loaded in small chunks, keeping memory
+use bounded. Completed partitions are recorded in a checkpoint file, so an
+interrupted rebuild can be resumed where it left off.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional, TYPE_CHECKING
+
+import haystack
+from django.apps import apps
+from django.db import connections
+from django.db.models import Max, Min
+from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from haystack.indexes import SearchIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The version of the checkpoint file format.
+CHECKPOINT_VERSION = 1
+
+
+class ModelCheckpoint(TypedDict):
+    """Rebuild progress for an indexed model.
+
+    Version Added:
+        8.0
+    """
+
+    #: The ranges of IDs to index.
+    #:
+    #: Each is a 2-item list of the first ID and the ID after the last. The
+    #: end of the last range is ``None``, so that objects created during the
+    #: rebuild are included.
+    partitions: list[list[Optional[int]]]
+
+    #: The indexes of the partitions that have been indexed.
+    done: list[int]
+
+
+class RebuildCheckpoint(TypedDict):
+    """Rebuild progress stored in a checkpoint file.
+
+    Version Added:
+        8.0
+    """
+
+    #: The version of the checkpoint file format.
+    version: int
+
+    #: Progress for each indexed model, keyed by model label.
+    models: dict[str, ModelCheckpoint]
+
+
+class RebuildStats(TypedDict):
+    """Statistics on a search index rebuild.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of objects indexed.
+    indexed: int
+
+    #: The number of partitions indexed.
+    partitions: int
+
+    #: The number of partitions skipped, having been indexed previously.
+    skipped: int
+
+
+#: A callback for when a partition has been indexed.
+#:
+#: This takes the model label, the partition index, the number of
+#: partitions for the model, and the number of objects indexed.
+PartitionCallback = Callable[[str, int, int, int], None]
+
+
+def plan_index_partitions(
+    index: SearchIndex,
+    *,
+    partition_size: int,
+    using: str = 'default',
+) -> list[list[Optional[int]]]:
+    """Return the ranges of IDs to index for a search index.
+
+    Version Added:
+        8.0
+
+    Args:
+        index (haystack.indexes.SearchIndex):
+            The search index.
+
+        partition_size (int):
+            The number of IDs in each range.
+
+        using (str, optional):
+            The search connection name.
+
+    Returns:
+        list:
+        A list of 2-item lists of the first ID and the ID after the last.
+        The end of the last range will be ``None``.
+    """
+    bounds = (
+        index.index_queryset(using=using)
+        .order_by()
+        .aggregate(min_pk=Min('pk'),
+                   max_pk=Max('pk'))
+    )
+    min_pk = bounds['min_pk']
+    max_pk = bounds['max_pk']
+
+    if min_pk is None:
+        return []
+
+    partitions: list[list[Optional[int]]] = [
+        [start_pk, start_pk + partition_size]
+        for start_pk in range(min_pk, max_pk + 1, partition_size)
+    ]
+    partitions[-1][1] = None
+
+    return partitions
+
+
+def index_partition(
+    *,
+    model_label: str,
+    start_pk: int,
+    end_pk: Optional[int],
+    chunk_size: int,
+    using: str = 'default',
+) -> int:
+    """Index the objects in a range of IDs.
+
+    Objects are loaded and sent to the search backend in chunks of
+    ``chunk_size``, so only one chunk is held in memory at a time.
+
+    Version Added:
+        8.0
+
+    Args:
+        model_label (str):
+            The label of the indexed model (for example,
+            ``reviews.reviewrequest``).
+
+        start_pk (int):
+            The first ID to index.
+
+        end_pk (int):
+            The ID after the last to index, or ``None`` to index all
+            remaining objects.
+
+        chunk_size (int):
+            The number of objects to load at a time.
+
+        using (str, optional):
+            The search connection name.
+
+    Returns:
+        int:
+        The number of objects indexed.
+    """
+    connection = haystack.connections[using]
+    backend = connection.get_backend()
+    index = connection.get_unified_index().get_index(
+        apps.get_model(model_label))
+
+    queryset = index.index_queryset(using=using).filter(pk__gte=start_pk)
+
+    if end_pk is not None:
+        queryset = queryset.filter(pk__lt=end_pk)
+
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    count = 0
+
+    while True:
+        if last_pk is None:
+            objs = list(queryset[:chunk_size])
+        else:
+            objs = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+
+        if not objs:
+            break
+
+        backend.update(index, objs)
+        count += len(objs)
+        last_pk = objs[-1].pk
+
+    return count
+
+
+def rebuild_search_index(
+    *,
+    checkpoint_path: str,
+    resume: bool = False,
+    workers: int = 1,
+    partition_size: int = 10000,
+    chunk_size: int = 500,
+    using: str = 'default',
+    on_partition_done: Optional[PartitionCallback] = None,
+) -> RebuildStats:
+    """Rebuild the search index in partitions.
+
+    Unless resuming, the index is cleared and a new checkpoint file is
+    written listing the partitions for each model. Each partition is marked
+    in the checkpoint file as it completes.
+
+    If any partitions fail, the rest are still indexed, and the first error
+    is raised at the end. The rebuild can then be resumed to retry them.
+
+    Version Added:
+        8.0
+
+    Args:
+        checkpoint_path (str):
+            The path to the checkpoint file.
+
+        resume (bool, optional):
+            Whether to resume a rebuild from the checkpoint file.
+
+        workers (int, optional):
+            The number of worker processes. If 1, partitions are indexed in
+            this process.
+
+        partition_size (int, optional):
+            The number of IDs in each partition.
+
+        chunk_size (int, optional):
+            The number of objects to load at a time.
+
+        using (str, optional):
+            The search connection name.
+
+        on_partition_done (callable, optional):
+            A function to call when a partition has been indexed.
+
+    Returns:
+        RebuildStats:
+        Statistics on the rebuild.
+
+    Raises:
+        Exception:
+            A partition failed to index, or there was an error reading the
+            checkpoint file.
+    """
+    connection = haystack.connections[using]
+
+    if resume:
+        with open(checkpoint_path, 'r') as fp:
+            checkpoint: RebuildCheckpoint = json.load(fp)
+
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            raise ValueError('Unsupported search index checkpoint file '
+                             'version %r.'
+                             % checkpoint.get('version'))
+    else:
+        unified_index = connection.get_unified_index()
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'models': {
+                model._meta.label_lower: {
+                    'done': [],
+                    'partitions': plan_index_partitions(
+                        unified_index.get_index(model),
+                        partition_size=partition_size,
+                        using=using),
+                }
+                for model in unified_index.get_indexed_models()
+            },
+        }
+
+        connection.get_backend().clear()
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+    stats: RebuildStats = {
+        'indexed': 0,
+        'partitions': 0,
+        'skipped': 0,
+    }
+    tasks: list[tuple[str, int]] = []
+
+    for model_label, model_checkpoint in checkpoint['models'].items():
+        done = set(model_checkpoint['done'])
+        stats['skipped'] += len(done)
+
+        tasks += [
+            (model_label, i)
+            for i in range(len(model_checkpoint['partitions']))
+            if i not in done
+        ]
+
+    def _get_task_kwargs(
+        model_label: str,
+        i: int,
+    ) -> dict[str, object]:
+        start_pk, end_pk = checkpoint['models'][model_label]['partitions'][i]
+
+        return {
+            'chunk_size': chunk_size,
+            'end_pk': end_pk,
+            'model_label': model_label,
+            'start_pk': start_pk,
+            'using': using,
+        }
+
+    def _on_done(
+        model_label: str,
+        i: int,
+        count: int,
+    ) -> None:
+        model_checkpoint = checkpoint['models'][model_label]
+        model_checkpoint['done'].append(i)
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+        stats['indexed'] += count
+        stats['partitions'] += 1
+
+        if on_partition_done is not None:
+            on_partition_done(model_label, i,
+                              len(model_checkpoint['partitions']), count)
+
+    error: Optional[Exception] = None
+
+    if workers <= 1:
+        for model_label, i in tasks:
+            try:
+                count = index_partition(**_get_task_kwargs(model_label, i))
+            except Exception as e:
+                logger.exception('Error indexing partition %s of %s: %s',
+                                 i, model_label, e)
+                error = error or e
+            else:
+                _on_done(model_label, i, count)
+    else:
+        # Worker processes can't share this process's database connections.
+        connections.close_all()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(using,)) as executor:
+            futures = {
+                executor.submit(index_partition,
+                                **_get_task_kwargs(model_label, i)):
+                    (model_label, i)
+                for model_label, i in tasks
+            }
+
+            for future in as_completed(futures):
+                model_label, i = futures[future]
+
+                try:
+                    count = future.result()
+                except Exception as e:
+                    logger.exception('Error indexing partition %s of %s: %s',
+                                     i, model_label, e)
+                    error = error or e
+                else:
+                    _on_done(model_label, i, count)
+
+    if error is not None:
+        raise error
+
+    return stats
+
+
+def _init_worker(
+    using: str,
+) -> None:
+    """Initialize a worker process for indexing.
+
+    Version Added:
+        8.0
+
+    Args:
+        using (str):
+            The search connection name.
+    """
+    # Start with new connections to the search backend, rather than those
+    # inherited from the parent process.
+    haystack.connections[using].reset_forwarding()
+
+
+def _save_checkpoint(
+    path: str,
+    checkpoint: RebuildCheckpoint,
+) -> None:
+    """Write a checkpoint file.
+
+    The file is replaced atomically, so an interruption won't leave a
+    partially-written file.
+
+    Version Added:
+        8.0
+
+    Args:
+        path (str):
+            The path to the checkpoint file.
+
+        checkpoint (RebuildCheckpoint):
+            The checkpoint to write.
+    """
+    tmp_path = '%s.tmp' % path
+
+    with open(tmp_path, 'w') as fp:
+        json.dump(checkpoint, fp)
+
+    os.replace(tmp_path, path)
@@ -14,6 +14,10 @@ from reviewboard.accounts.models import Profile
 from reviewboard.reviews.models import Group, ReviewRequest
 from reviewboard.reviews.signals import review_request_published
 from reviewboard.search import search_backend_registry
+from reviewboard.search.indexing_queue import (SearchIndexingMode,
+                                               get_search_indexing_mode,
+                                               queue_index_update,
+                                               queue_index_updates)
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +34,14 @@ class SignalProcessor(BaseSignalProcessor):
 
     1) Search is enabled.
     2) The current search engine backend supports on-the-fly indexing.
+
+    If the ``search_indexing_mode`` setting is ``queued``, changes are queued
+    and written in bulk by :py:mod:`reviewboard.search.indexing_queue`
+    instead.
+
+    Version Changed:
+        8.0:
+        Added support for queued indexing.
     """
 
     save_signals = [
@@ -153,11 +165,21 @@ class SignalProcessor(BaseSignalProcessor):
         If there's any error writing to the search backend, the error will
         be caught and logged.
 
+        Version Changed:
+            8.0:
+            When queueing index updates, the object is queued instead of
+            written immediately.
+
         Args:
             **kwargs (dict):
                 Signal arguments. These will be passed to
                 :py:meth:`handle_save`.
         """
+        if get_search_indexing_mode() == SearchIndexingMode.QUEUED:
+            queue_index_update(model=kwargs['sender'],
+                               pk=kwargs['instance'].pk)
+            return
+
         try:
             super(SignalProcessor, self).handle_save(**kwargs)
         except Exception as e:
@@ -173,11 +195,22 @@ class SignalProcessor(BaseSignalProcessor):
         If there's any error writing to the search backend, the error will
         be caught and logged.
 
+        Version Changed:
+            8.0:
+            When queueing index updates, the object is queued for removal
+            instead of removed immediately.
+
         Args:
             **kwargs (dict):
                 Signal arguments. These will be passed to
                 :py:meth:`handle_save`.
         """
+        if get_search_indexing_mode() == SearchIndexingMode.QUEUED:
+            queue_index_update(model=kwargs['sender'],
+                               pk=kwargs['instance'].pk,
+                               remove=True)
+            return
+
         try:
             super(SignalProcessor, self).handle_delete(**kwargs)
         except Exception as e:
@@ -247,15 +280,12 @@ class SignalProcessor(BaseSignalProcessor):
             if reverse:
                 # When using the reverse relation, the instance is the User and
                 # the pk_set is the PKs of the groups being added or removed.
-                users = [instance]
+                self.handle_save(instance=instance, instance_kwarg='instance',
+                                 sender=User)
             else:
                 # Otherwise the instance is the Group and the pk_set is the set
                 # of User primary keys.
-                users = User.objects.filter(pk__in=pk_set)
-
-            for user in users:
-                self.handle_save(instance=user, instance_kwarg='instance',
-                                 sender=User)
+                self._reindex_users(pk_set)
         elif action == 'pre_clear':
             # When ``reverse`` is ``True``, a User is having their groups
             # cleared so we don't need to worry about storing any state in the
@@ -277,8 +307,26 @@ class SignalProcessor(BaseSignalProcessor):
             else:
                 # Here, we are reindexing every user that got removed from the
                 # group via clearing.
-                pks = self._pending_user_changes.data.pop(instance.pk)
+                self._reindex_users(
+                    self._pending_user_changes.data.pop(instance.pk))
+
+    def _reindex_users(self, user_ids):
+        """Update the search index for a list of users.
+
+        When queueing index updates, the users are queued without being
+        loaded.
 
-                for user in User.objects.filter(pk__in=pks):
-                    self.handle_save(instance=user, instance_kwarg='instance',
-                                     sender=User)
+        Version Added:
+            8.0
+
+        Args:
+            user_ids (list of int):
+                The IDs of the users to update.
+        """
+        if get_search_indexing_mode() == SearchIndexingMode.QUEUED:
+            queue_index_updates(model=User,
+                                pks=user_ids)
+        else:
+            for user in User.objects.filter(pk__in=user_ids):
+                self.handle_save(instance=user, instance_kwarg='instance',
+                                 sender=User)
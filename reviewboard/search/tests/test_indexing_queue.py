@@ -0,0 +1,288 @@
+"""Unit tests for reviewboard.search.indexing_queue.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import kgb
+from django.contrib.auth.models import User
+from django.utils import timezone
+from haystack.signals import BaseSignalProcessor
+
+from reviewboard.reviews.models import SearchIndexQueueEntry
+from reviewboard.search import indexing_queue
+from reviewboard.search.haystack_backend import ForwardingSearchEngine
+from reviewboard.search.indexing_queue import (flush_search_index_queue,
+                                               get_search_index_queue_stats,
+                                               process_search_index_queue,
+                                               queue_index_update)
+from reviewboard.search.testing import search_enabled
+from reviewboard.testing import TestCase
+
+
+class _RecordingBackend:
+    """A search backend that records updates and removals."""
+
+    def __init__(self) -> None:
+        """Initialize the backend."""
+        self.updated = []
+        self.removed = []
+        self.fail = False
+
+    def update(self, index, iterable, **kwargs) -> None:
+        """Record updated objects.
+
+        Args:
+            index (haystack.indexes.SearchIndex):
+                The search index.
+
+            iterable (list):
+                The objects to update.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Raises:
+            Exception:
+                The backend is set to fail.
+        """
+        if self.fail:
+            raise Exception('Search backend is down')
+
+        self.updated.append(list(iterable))
+
+    def remove(self, obj_or_string, **kwargs) -> None:
+        """Record a removed object.
+
+        Args:
+            obj_or_string (str):
+                The identifier of the object to remove.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+        """
+        self.removed.append(obj_or_string)
+
+
+class SearchIndexingQueueTests(kgb.SpyAgency, TestCase):
+    """Unit tests for queued search indexing.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.spy_on(indexing_queue._local_runner.start, call_original=False)
+
+    def test_queue_index_update_coalesces(self) -> None:
+        """Testing queue_index_update coalesces changes to an object"""
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_index_update(model=User, pk=1)
+            queue_index_update(model=User, pk=1)
+            queue_index_update(model=User, pk=1, remove=True)
+
+        self.assertEqual(get_search_index_queue_stats()['pending'], 1)
+
+        entry = SearchIndexQueueEntry.objects.get()
+        self.assertEqual(entry.model_label, 'auth.user')
+        self.assertEqual(entry.object_id, 1)
+        self.assertTrue(entry.remove)
+        self.assertLessEqual(entry.queued, entry.last_queued)
+        self.assertSpyCalled(indexing_queue._local_runner.start)
+
+    def test_flush_writes_in_bulk(self) -> None:
+        """Testing flush_search_index_queue writes updates for a model in
+        one call
+        """
+        backend = _RecordingBackend()
+        self.spy_on(ForwardingSearchEngine.get_backend,
+                    owner=ForwardingSearchEngine,
+                    op=kgb.SpyOpReturn(backend))
+
+        doc = User.objects.get(username='doc')
+        grumpy = User.objects.get(username='grumpy')
+        dopey = User.objects.get(username='dopey')
+        dopey.is_active = False
+        dopey.save(update_fields=('is_active',))
+
+        with search_enabled():
+            for user in (doc, grumpy, dopey):
+                queue_index_update(model=User, pk=user.pk)
+
+            queue_index_update(model=User, pk=12345, remove=True)
+
+            self.assertEqual(flush_search_index_queue(), 4)
+
+        self.assertEqual(len(backend.updated), 1)
+        self.assertEqual({user.pk for user in backend.updated[0]},
+                         {doc.pk, grumpy.pk})
+        self.assertEqual(set(backend.removed),
+                         {'auth.user.%s' % dopey.pk, 'auth.user.12345'})
+
+        stats = get_search_index_queue_stats()
+        self.assertEqual(stats['pending'], 0)
+        self.assertIsNone(stats['oldest_pending_age'])
+        self.assertEqual(stats['last_flush_count'], 4)
+        self.assertIsNotNone(stats['last_flush_lag'])
+
+    def test_flush_keeps_changes_queued_during_flush(self) -> None:
+        """Testing flush_search_index_queue keeps objects queued again
+        while writing
+        """
+        backend = _RecordingBackend()
+        self.spy_on(ForwardingSearchEngine.get_backend,
+                    owner=ForwardingSearchEngine,
+                    op=kgb.SpyOpReturn(backend))
+
+        doc = User.objects.get(username='doc')
+        grumpy = User.objects.get(username='grumpy')
+
+        def _write_entries(entries):
+            indexing_queue._write_entries.call_original(entries)
+
+            if len(backend.updated) == 1:
+                queue_index_update(model=User, pk=doc.pk)
+
+        self.spy_on(indexing_queue._write_entries, call_fake=_write_entries)
+
+        with search_enabled():
+            queue_index_update(model=User, pk=doc.pk)
+            queue_index_update(model=User, pk=grumpy.pk)
+
+            self.assertEqual(flush_search_index_queue(), 2)
+            self.assertEqual(
+                list(SearchIndexQueueEntry.objects
+                     .values_list('object_id', flat=True)),
+                [doc.pk])
+
+            self.assertEqual(flush_search_index_queue(), 1)
+
+        self.assertFalse(SearchIndexQueueEntry.objects.exists())
+        self.assertEqual([[user.pk for user in users]
+                          for users in backend.updated[1:]],
+                         [[doc.pk]])
+
+    def test_flush_retries_failed_writes(self) -> None:
+        """Testing flush_search_index_queue keeps changes that fail to be
+        written and retries them later
+        """
+        backend = _RecordingBackend()
+        backend.fail = True
+        self.spy_on(ForwardingSearchEngine.get_backend,
+                    owner=ForwardingSearchEngine,
+                    op=kgb.SpyOpReturn(backend))
+
+        doc = User.objects.get(username='doc')
+
+        with search_enabled():
+            queue_index_update(model=User, pk=doc.pk)
+
+            self.assertEqual(flush_search_index_queue(), 1)
+
+            entry = SearchIndexQueueEntry.objects.get()
+            self.assertEqual(entry.attempts, 1)
+            self.assertEqual(entry.claim_token, '')
+            self.assertGreater(entry.next_attempt, timezone.now())
+
+            stats = get_search_index_queue_stats()
+            self.assertEqual(stats['pending'], 1)
+            self.assertEqual(stats['retrying'], 1)
+
+            # The change isn't retried until its next attempt is due.
+            backend.fail = False
+            self.assertEqual(flush_search_index_queue(), 0)
+            self.assertEqual(backend.updated, [])
+
+            entry.next_attempt = timezone.now() - timedelta(seconds=1)
+            entry.save(update_fields=('next_attempt',))
+
+            self.assertEqual(flush_search_index_queue(), 1)
+
+        self.assertFalse(SearchIndexQueueEntry.objects.exists())
+        self.assertEqual([[user.pk for user in users]
+                          for users in backend.updated],
+                         [[doc.pk]])
+
+    def test_flush_skips_claimed_entries(self) -> None:
+        """Testing flush_search_index_queue skips changes claimed by another
+        process until the claim expires
+        """
+        backend = _RecordingBackend()
+        self.spy_on(ForwardingSearchEngine.get_backend,
+                    owner=ForwardingSearchEngine,
+                    op=kgb.SpyOpReturn(backend))
+
+        doc = User.objects.get(username='doc')
+
+        with search_enabled():
+            queue_index_update(model=User, pk=doc.pk)
+            SearchIndexQueueEntry.objects.update(
+                claim_token='other-process',
+                next_attempt=timezone.now() + timedelta(minutes=5))
+
+            self.assertEqual(flush_search_index_queue(), 0)
+            self.assertEqual(backend.updated, [])
+
+            # The other process exited without finishing.
+            SearchIndexQueueEntry.objects.update(
+                next_attempt=timezone.now() - timedelta(seconds=1))
+
+            self.assertEqual(flush_search_index_queue(), 1)
+
+        self.assertFalse(SearchIndexQueueEntry.objects.exists())
+        self.assertEqual(len(backend.updated), 1)
+
+    def test_process_waits_for_delay(self) -> None:
+        """Testing process_search_index_queue waits for the indexing delay
+        """
+        spy = self.spy_on(indexing_queue.flush_search_index_queue,
+                          op=kgb.SpyOpReturn(1))
+
+        with self.siteconfig_settings({'search_indexing_delay': 60},
+                                      reload_settings=False):
+            self.assertEqual(process_search_index_queue(), 0)
+
+            queue_index_update(model=User, pk=1)
+            self.assertEqual(process_search_index_queue(), 0)
+            self.assertSpyNotCalled(spy)
+
+        with self.siteconfig_settings({'search_indexing_delay': 0},
+                                      reload_settings=False):
+            self.assertEqual(process_search_index_queue(), 1)
+            self.assertSpyCalledOnce(spy)
+
+    def test_signal_processor_queues_changes(self) -> None:
+        """Testing SignalProcessor queues changes with
+        search_indexing_mode=queued
+        """
+        self.spy_on(BaseSignalProcessor.handle_save,
+                    owner=BaseSignalProcessor,
+                    call_original=False)
+
+        user = User.objects.get(username='doc')
+        group = self.create_review_group()
+
+        with search_enabled(on_the_fly_indexing=True):
+            with self.siteconfig_settings(
+                {'search_indexing_mode': 'queued'},
+                reload_settings=False):
+                user.first_name = 'Doc'
+                user.save()
+
+                grumpy = User.objects.get(username='grumpy')
+                group.users.add(grumpy)
+
+        self.assertSpyNotCalled(BaseSignalProcessor.handle_save)
+        self.assertEqual(
+            set(SearchIndexQueueEntry.objects
+                .values_list('model_label', 'object_id')),
+            {('auth.user', user.pk), ('auth.user', grumpy.pk)})
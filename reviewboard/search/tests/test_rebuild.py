@@ -0,0 +1,165 @@
+"""Unit tests for reviewboard.search.rebuild.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+
+import haystack
+import kgb
+from django.contrib.auth.models import User
+
+from reviewboard.search import rebuild
+from reviewboard.search.haystack_backend import ForwardingSearchEngine
+from reviewboard.search.rebuild import (index_partition,
+                                        plan_index_partitions,
+                                        rebuild_search_index)
+from reviewboard.search.testing import search_enabled
+from reviewboard.testing import TestCase
+
+
+class _RecordingBackend:
+    """A search backend that records updates."""
+
+    def __init__(self) -> None:
+        """Initialize the backend."""
+        self.cleared = False
+        self.updated = []
+
+    def clear(self, **kwargs) -> None:
+        """Record clearing the index.
+
+        Args:
+            **kwargs (dict):
+                Additional keyword arguments.
+        """
+        self.cleared = True
+
+    def update(self, index, iterable, **kwargs) -> None:
+        """Record updated objects.
+
+        Args:
+            index (haystack.indexes.SearchIndex):
+                The search index.
+
+            iterable (list):
+                The objects to update.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+        """
+        self.updated.append([obj.pk for obj in iterable])
+
+
+class RebuildSearchIndexTests(kgb.SpyAgency, TestCase):
+    """Unit tests for partitioned search index rebuilds.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users']
+
+    def setUp(self) -> None:
+        """Set up the test case."""
+        super().setUp()
+
+        self.backend = _RecordingBackend()
+        self.spy_on(ForwardingSearchEngine.get_backend,
+                    owner=ForwardingSearchEngine,
+                    op=kgb.SpyOpReturn(self.backend))
+
+        self.tempdir = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.tempdir, 'checkpoint.json')
+        self.user_ids = sorted(
+            User.objects
+            .filter(is_active=True)
+            .values_list('pk', flat=True))
+
+    def tearDown(self) -> None:
+        """Tear down the test case."""
+        shutil.rmtree(self.tempdir)
+
+        super().tearDown()
+
+    def test_plan_index_partitions(self) -> None:
+        """Testing plan_index_partitions"""
+        with search_enabled():
+            index = (
+                haystack.connections['default']
+                .get_unified_index()
+                .get_index(User)
+            )
+            partitions = plan_index_partitions(index, partition_size=2)
+
+        min_pk = self.user_ids[0]
+
+        self.assertEqual(partitions[0], [min_pk, min_pk + 2])
+        self.assertIsNone(partitions[-1][1])
+
+        # Every user falls into exactly one partition.
+        for user_id in self.user_ids:
+            self.assertEqual(
+                len([
+                    start_pk
+                    for start_pk, end_pk in partitions
+                    if start_pk <= user_id and (end_pk is None or
+                                                user_id < end_pk)
+                ]),
+                1)
+
+    def test_index_partition_in_chunks(self) -> None:
+        """Testing index_partition loads and writes objects in chunks"""
+        with search_enabled():
+            count = index_partition(model_label='auth.user',
+                                    start_pk=self.user_ids[0],
+                                    end_pk=None,
+                                    chunk_size=1)
+
+        self.assertEqual(count, len(self.user_ids))
+        self.assertEqual(self.backend.updated,
+                         [[user_id] for user_id in self.user_ids])
+
+    def test_rebuild_resumes_from_checkpoint(self) -> None:
+        """Testing rebuild_search_index resumes after a failed partition"""
+        failed_start_pk = self.user_ids[-1]
+
+        def _index_partition(**kwargs):
+            if kwargs['start_pk'] == failed_start_pk:
+                raise Exception('kaboom!')
+
+            return index_partition.call_original(**kwargs)
+
+        self.spy_on(rebuild.index_partition, call_fake=_index_partition)
+
+        with search_enabled():
+            with self.assertRaisesMessage(Exception, 'kaboom!'):
+                rebuild_search_index(checkpoint_path=self.checkpoint_path,
+                                     partition_size=1)
+
+            self.assertTrue(self.backend.cleared)
+
+            with open(self.checkpoint_path, 'r') as fp:
+                checkpoint = json.load(fp)
+
+            user_checkpoint = checkpoint['models']['auth.user']
+            self.assertEqual(len(user_checkpoint['done']),
+                             len(user_checkpoint['partitions']) - 1)
+
+            self.backend.cleared = False
+            self.backend.updated = []
+            rebuild.index_partition.unspy()
+
+            stats = rebuild_search_index(checkpoint_path=self.checkpoint_path,
+                                         resume=True)
+
+        self.assertFalse(self.backend.cleared)
+        self.assertEqual(self.backend.updated, [[failed_start_pk]])
+        self.assertEqual(stats['partitions'], 1)
+        self.assertEqual(stats['indexed'], 1)
@@ -255,6 +255,20 @@ export class ReviewRequest extends BaseResource<
 
     static CHECK_UPDATES_MSECS = 5 * 60 * 1000; // Every 5 minutes
 
+    /**
+     * The types of server-sent events that indicate an update.
+     *
+     * Version Added:
+     *     8.0
+     */
+    static UPDATE_EVENT_TYPES = [
+        'reply_published',
+        'review_published',
+        'review_request_closed',
+        'review_request_published',
+        'review_request_reopened',
+    ];
+
     static CLOSE_DISCARDED = 1;
     static CLOSE_SUBMITTED = 2;
     static PENDING = 3;
@@ -275,6 +289,14 @@ export class ReviewRequest extends BaseResource<
         model: Review,
     });
 
+    /**
+     * The source of server-sent update events, if listening for updates.
+     *
+     * Version Added:
+     *     8.0
+     */
+    _updateEventSource: EventSource = null;
+
     /**
      * Initialize the model.
      *
@@ -619,22 +641,86 @@ export class ReviewRequest extends BaseResource<
      *
      * The 'updated' event will be triggered when there's a new update.
      *
+     * If an update events URL is provided and the browser supports
+     * server-sent events, this will only check for updates when the server
+     * sends an event. Otherwise, or if the server stops sending events, this
+     * will check for updates periodically.
+     *
+     * Version Changed:
+     *     8.0:
+     *     Added the ``updateEventsURL`` argument.
+     *
      * Args:
      *     updateType (string):
      *         The type of updates to check for.
      *
      *     lastUpdateTimestamp (string):
      *         The timestamp of the last known update.
+     *
+     *     updateEventsURL (string, optional):
+     *         The URL of the server-sent events stream for updates.
      */
     async beginCheckForUpdates(
         updateType: string,
         lastUpdateTimestamp: string,
+        updateEventsURL: string = null,
     ) {
         this._checkUpdatesType = updateType;
         this._lastUpdateTimestamp = lastUpdateTimestamp;
 
         await this.ready();
-        setTimeout(this._checkForUpdates.bind(this),
+
+        if (updateEventsURL && window.EventSource) {
+            this._listenForUpdateEvents(updateEventsURL);
+        } else {
+            this._scheduleCheckForUpdates();
+        }
+    }
+
+    /**
+     * Listen for server-sent update events.
+     *
+     * Each event will trigger a check for updates. If the server refuses
+     * the stream, this will fall back to checking periodically.
+     *
+     * Version Added:
+     *     8.0
+     *
+     * Args:
+     *     url (string):
+     *         The URL of the server-sent events stream.
+     */
+    _listenForUpdateEvents(url: string) {
+        const eventSource = new EventSource(url);
+        const onUpdateEvent = () => this._checkForUpdates(false);
+
+        for (const eventType of ReviewRequest.UPDATE_EVENT_TYPES) {
+            eventSource.addEventListener(eventType, onUpdateEvent);
+        }
+
+        eventSource.addEventListener('error', () => {
+            /*
+             * The browser will reconnect on its own after network errors.
+             * The stream is only closed if the server responded with an
+             * error, in which case we go back to polling.
+             */
+            if (eventSource.readyState === EventSource.CLOSED) {
+                this._updateEventSource = null;
+                this._scheduleCheckForUpdates();
+            }
+        });
+
+        this._updateEventSource = eventSource;
+    }
+
+    /**
+     * Schedule the next periodic check for updates.
+     *
+     * Version Added:
+     *     8.0
+     */
+    _scheduleCheckForUpdates() {
+        setTimeout(() => this._checkForUpdates(),
                    ReviewRequest.CHECK_UPDATES_MSECS);
     }
 
@@ -642,10 +728,21 @@ export class ReviewRequest extends BaseResource<
      * Check for updates.
      *
      * This is called periodically after an initial call to
-     * beginCheckForUpdates. It will see if there's a new update yet on the
-     * server, and if there is, trigger the 'updated' event.
+     * beginCheckForUpdates, or when the server sends an update event. It
+     * will see if there's a new update yet on the server, and if there is,
+     * trigger the 'updated' event.
+     *
+     * Version Changed:
+     *     8.0:
+     *     Added the ``scheduleNext`` argument.
+     *
+     * Args:
+     *     scheduleNext (boolean, optional):
+     *         Whether to schedule the next periodic check.
      */
-    _checkForUpdates() {
+    _checkForUpdates(
+        scheduleNext = true,
+    ) {
         API.request({
             noActivityIndicator: true,
             prefix: this.get('sitePrefix'),
@@ -660,8 +757,9 @@ export class ReviewRequest extends BaseResource<
 
                 this._lastUpdateTimestamp = lastUpdate.timestamp;
 
-                setTimeout(this._checkForUpdates.bind(this),
-                           ReviewRequest.CHECK_UPDATES_MSECS);
+                if (scheduleNext) {
+                    this._scheduleCheckForUpdates();
+                }
             },
             type: 'GET',
             url: this.get('links').last_update.href,
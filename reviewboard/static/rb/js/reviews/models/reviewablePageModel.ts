@@ -54,6 +54,14 @@ export interface ReviewablePageAttrs extends ModelAttributes {
      * The review request that this page is for.
      */
     reviewRequest?: ReviewRequest;
+
+    /**
+     * The URL of the server-sent events stream for updates, if enabled.
+     *
+     * Version Added:
+     *     8.0
+     */
+    updateEventsURL?: string;
 }
 
 
@@ -69,6 +77,7 @@ export interface ReviewablePageParseData {
     checkForUpdates: boolean;
     checkUpdatesType: string;
     lastActivityTimestamp: string;
+    updateEventsURL?: string;
 }
 
 
@@ -93,6 +102,7 @@ export class ReviewablePage<
         lastActivityTimestamp: null,
         pendingReview: null,
         reviewRequest: null,
+        updateEventsURL: null,
     };
 
     /**********************
@@ -240,21 +250,23 @@ export class ReviewablePage<
             lastActivityTimestamp: rsp.lastActivityTimestamp,
             pendingReview: reviewRequest.createReview(),
             reviewRequest: reviewRequest,
+            updateEventsURL: rsp.updateEventsURL || null,
         };
     }
 
     /**
      * Register for update notification to the review request from the server.
      *
-     * The server will be periodically checked for new updates. When a new
-     * update arrives, an update bubble will be displayed in the bottom-right
-     * of the page, and if the user has allowed desktop notifications in their
-     * account settings, a desktop notification will be shown with the update
-     * information.
+     * The server will be checked for new updates, either periodically or
+     * when it sends an update event. When a new update arrives, an update
+     * bubble will be displayed in the bottom-right of the page, and if the
+     * user has allowed desktop notifications in their account settings, a
+     * desktop notification will be shown with the update information.
      */
     _registerForUpdates() {
         this.get('reviewRequest').beginCheckForUpdates(
             this.get('checkUpdatesType'),
-            this.get('lastActivityTimestamp'));
+            this.get('lastActivityTimestamp'),
+            this.get('updateEventsURL'));
     }
 }
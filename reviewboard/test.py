@@ -69,6 +69,11 @@ class RBTestRunner(TestRunner):
 
         siteconfig = init_siteconfig()
         siteconfig.set('mail_from_spoofing', 'never')
+
+        # Tests check the exact queries made when listing review requests,
+        # so access lists must not be cached between lookups. Tests for
+        # the cache enable it explicitly.
+        siteconfig.set('reviews_cache_access_lists', False)
         siteconfig.save(update_fields=('settings',))
 
         return result
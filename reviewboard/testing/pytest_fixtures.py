@@ -108,4 +108,9 @@ def django_db_setup(django_db_setup, django_db_blocker):
 
         siteconfig = init_siteconfig()
         siteconfig.set('mail_from_spoofing', 'never')
+
+        # Tests check the exact queries made when listing review requests,
+        # so access lists must not be cached between lookups. Tests for
+        # the cache enable it explicitly.
+        siteconfig.set('reviews_cache_access_lists', False)
         siteconfig.save(update_fields=('settings',))
@@ -1,15 +1,78 @@
 """Tests for top level Review Board modules."""
 
 import os
+import threading
 
 from djblets.staticbundles import (
     PIPELINE_JAVASCRIPT as DJBLETS_PIPELINE_JAVASCRIPT,
     PIPELINE_STYLESHEETS as DJBLETS_PIPELINE_STYLESHEETS)
 
+from reviewboard.background import (BackgroundMode,
+                                    LocalBackgroundRunner,
+                                    get_background_mode)
 from reviewboard.staticbundles import PIPELINE_JAVASCRIPT, PIPELINE_STYLESHEETS
 from reviewboard.testing import TestCase
 
 
+class BackgroundTests(TestCase):
+    """Unit tests for reviewboard.background.
+
+    Version Added:
+        8.0
+    """
+
+    def test_get_background_mode(self) -> None:
+        """Testing get_background_mode"""
+        with self.siteconfig_settings({'mail_delivery_mode': 'worker'},
+                                      reload_settings=False):
+            self.assertEqual(get_background_mode('mail_delivery_mode'),
+                             BackgroundMode.WORKER)
+
+    def test_get_background_mode_with_invalid(self) -> None:
+        """Testing get_background_mode with an invalid setting"""
+        with self.siteconfig_settings({'mail_delivery_mode': 'bad'},
+                                      reload_settings=False):
+            with self.assertLogs('reviewboard.background', 'WARNING'):
+                self.assertEqual(get_background_mode('mail_delivery_mode'),
+                                 BackgroundMode.SYNC)
+
+    def test_local_runner_reruns(self) -> None:
+        """Testing LocalBackgroundRunner.start while running runs the work
+        again
+        """
+        started = threading.Event()
+        resume = threading.Event()
+        done = threading.Event()
+        calls = []
+
+        def _func() -> None:
+            calls.append(len(calls))
+
+            if len(calls) == 1:
+                started.set()
+                resume.wait(5)
+            else:
+                done.set()
+
+        runner = LocalBackgroundRunner(_func, name='rb-test-runner')
+        runner.start()
+        started.wait(5)
+
+        thread = runner._thread
+        assert thread is not None
+
+        # These are both handled by a single extra run.
+        runner.start()
+        runner.start()
+        resume.set()
+
+        thread.join(5)
+
+        self.assertTrue(done.is_set())
+        self.assertEqual(calls, [0, 1])
+        self.assertIsNone(runner._thread)
+
+
 class StaticBundlesTests(TestCase):
     """Tests the static bundles in reviewboard.staticbundles."""
 
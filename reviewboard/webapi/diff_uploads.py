@@ -0,0 +1,701 @@
+"""Background processing of uploaded diffs and commits.
+
+By default, uploading a diff or commit through the API parses the diff,
+validates every file against the repository, and stores the results before
+responding. For very large diffs, this can hold up a web server process
+long enough to hit proxy timeouts.
+
+Clients can instead ask for an upload to be processed in the background by
+passing ``process_async=1``. The upload is checked as usual and then stored
+in a :py:class:`~reviewboard.reviews.models.DiffUpload`, and the API
+responds right away with a link to the upload's status. The client polls
+that until processing is done, and then follows the link to the new diff
+or commit.
+
+Processing is controlled by the ``diffviewer_upload_processing_mode`` site
+configuration setting, which can be one of the following
+:py:class:`~reviewboard.background.BackgroundMode` values:
+
+``sync``:
+    Uploads are always processed while handling the request, even if the
+    client asks for background processing. This is the default, and is
+    what unit tests use.
+
+``local``:
+    Uploads are processed by a background thread in the web server process
+    once the transaction commits. Uploads left behind by a restart are
+    processed the next time an upload is queued by the process, or by the
+    :command:`process-diff-uploads` management command.
+
+``worker``:
+    Uploads are processed by the :command:`process-diff-uploads`
+    management command, which can be run on a schedule or left running
+    with ``--watch``.
+
+Uploads for a review request are processed one at a time, in the order
+they were made, so commits are always added to a commit series in order.
+
+A process handling an upload holds a lease on it, which it extends every
+:py:data:`LEASE_RENEW_INTERVAL_SECS` seconds for as long as it's processing.
+If the process stops, the lease expires after :py:data:`LEASE_SECS`
+seconds, and the upload is processed again. Uploads that simply take a long
+time to process keep their lease, and are never processed twice.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Iterator, Optional, TYPE_CHECKING, Union
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.db.models import Count, Exists, Min, OuterRef, Q
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+from djblets.webapi.errors import (INVALID_ATTRIBUTE,
+                                   INVALID_FORM_DATA,
+                                   PERMISSION_DENIED,
+                                   WebAPIError)
+from reviewboard.background import (BackgroundMode,
+                                    BackgroundQueueStats,
+                                    LocalBackgroundRunner,
+                                    get_background_mode,
+                                    prune_finished_entries)
+from reviewboard.diffviewer.diffutils import check_diff_size
+from reviewboard.reviews.forms import UploadCommitForm, UploadDiffForm
+from reviewboard.reviews.models import DiffUpload
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.contrib.auth.models import User
+    from django.core.files.uploadedfile import UploadedFile
+
+    from reviewboard.diffviewer.models import DiffSet
+    from reviewboard.reviews.models import ReviewRequest
+
+
+logger = logging.getLogger(__name__)
+
+
+#: How long a process's lease on an upload lasts, in seconds.
+#:
+#: Uploads whose lease has expired (for instance, because the worker
+#: processing them was stopped) are processed again.
+LEASE_SECS = 5 * 60
+
+#: How often a process extends its lease on an upload, in seconds.
+LEASE_RENEW_INTERVAL_SECS = 60
+
+#: The number of pending uploads to look at when picking the next one.
+BATCH_SIZE = 20
+
+
+#: The form fields for the diff files in each type of upload.
+_FILE_FIELDS = {
+    DiffUpload.TYPE_DIFF: ('path', 'parent_diff_path'),
+    DiffUpload.TYPE_COMMIT: ('diff', 'parent_diff'),
+}
+
+
+class DiffUploadStats(BackgroundQueueStats):
+    """Statistics on uploads processed in the background.
+
+    Version Added:
+        8.0
+    """
+
+    #: The number of uploads that were processed successfully.
+    #:
+    #: Type:
+    #:     int
+    done: int
+
+    #: The number of uploads being processed.
+    #:
+    #: Type:
+    #:     int
+    processing: int
+
+
+def get_diff_upload_processing_mode() -> BackgroundMode:
+    """Return the configured upload processing mode.
+
+    Version Added:
+        8.0
+
+    Returns:
+        reviewboard.background.BackgroundMode:
+        The configured mode. If the setting is invalid, this will be
+        :py:attr:`BackgroundMode.SYNC
+        <reviewboard.background.BackgroundMode.SYNC>`.
+    """
+    return get_background_mode('diffviewer_upload_processing_mode')
+
+
+def queue_diff_upload(
+    *,
+    review_request: ReviewRequest,
+    user: User,
+    upload_type: str,
+    form_data: MultiValueDict,
+    files: MultiValueDict,
+    extra_fields: Optional[dict[str, Any]] = None,
+    diffset: Optional[DiffSet] = None,
+) -> DiffUpload:
+    """Queue an uploaded diff or commit for processing in the background.
+
+    The upload should already have been validated by the upload form. The
+    size of the diffs is checked here, so that diffs that are too large are
+    rejected before they're stored.
+
+    The upload is saved as part of the current transaction, so it will only
+    be processed if the transaction commits.
+
+    Version Added:
+        8.0
+
+    Args:
+        review_request (reviewboard.reviews.models.ReviewRequest):
+            The review request the diff or commit is for.
+
+        user (django.contrib.auth.models.User):
+            The user who uploaded the diff or commit.
+
+        upload_type (str):
+            The type of upload. This is one of
+            :py:attr:`DiffUpload.TYPE_DIFF
+            <reviewboard.reviews.models.DiffUpload.TYPE_DIFF>` or
+            :py:attr:`DiffUpload.TYPE_COMMIT
+            <reviewboard.reviews.models.DiffUpload.TYPE_COMMIT>`.
+
+        form_data (django.utils.datastructures.MultiValueDict):
+            The posted form data.
+
+        files (django.utils.datastructures.MultiValueDict):
+            The uploaded files.
+
+        extra_fields (dict, optional):
+            Extra data fields to store on the created diff.
+
+        diffset (reviewboard.diffviewer.models.DiffSet, optional):
+            The diff set that a commit will be added to.
+
+    Returns:
+        reviewboard.reviews.models.DiffUpload:
+        The queued upload.
+
+    Raises:
+        reviewboard.diffviewer.errors.DiffTooBigError:
+            The diff or parent diff is too large.
+    """
+    diff_field, parent_diff_field = _FILE_FIELDS[upload_type]
+    diff_file = files[diff_field]
+    parent_diff_file = files.get(parent_diff_field)
+
+    check_diff_size(diff_file, parent_diff_file)
+
+    if parent_diff_file is None:
+        parent_diff_name = ''
+        parent_diff_data = None
+    else:
+        parent_diff_name = parent_diff_file.name
+        parent_diff_data = _read_file(parent_diff_file)
+
+    upload = DiffUpload.objects.create(
+        review_request=review_request,
+        user=user,
+        upload_type=upload_type,
+        form_data={
+            key: values
+            for key, values in form_data.lists()
+            if key not in (diff_field, parent_diff_field)
+        },
+        extra_fields=extra_fields or {},
+        diff_name=diff_file.name,
+        diff_data=_read_file(diff_file),
+        parent_diff_name=parent_diff_name,
+        parent_diff_data=parent_diff_data,
+        diffset=diffset)
+
+    if get_diff_upload_processing_mode() == BackgroundMode.LOCAL:
+        transaction.on_commit(_local_runner.start)
+
+    return upload
+
+
+def process_diff_uploads(
+    *,
+    max_uploads: Optional[int] = None,
+) -> int:
+    """Process uploads waiting for background processing.
+
+    Each upload is claimed before it's processed, so several processes can
+    safely process uploads at once. Uploads for the same review request are
+    never processed at the same time.
+
+    Version Added:
+        8.0
+
+    Args:
+        max_uploads (int, optional):
+            The maximum number of uploads to process. By default, this will
+            process uploads until none are left.
+
+    Returns:
+        int:
+        The number of uploads processed.
+    """
+    _reclaim_expired_uploads()
+
+    num_processed = 0
+
+    while max_uploads is None or num_processed < max_uploads:
+        upload_id = _claim_next_upload()
+
+        if upload_id is None:
+            break
+
+        _process_upload(upload_id)
+        num_processed += 1
+
+    return num_processed
+
+
+def get_diff_upload_stats(
+    *,
+    since: Optional[datetime] = None,
+) -> DiffUploadStats:
+    """Return statistics on uploads processed in the background.
+
+    Version Added:
+        8.0
+
+    Args:
+        since (datetime.datetime, optional):
+            Only include uploads made after this time. Unfinished uploads are
+            always included.
+
+    Returns:
+        DiffUploadStats:
+        The upload statistics.
+    """
+    queryset = DiffUpload.objects.all()
+
+    if since is not None:
+        queryset = queryset.filter(
+            Q(created__gte=since) |
+            Q(status__in=DiffUpload.UNFINISHED_STATUSES))
+
+    pending_q = Q(status=DiffUpload.STATUS_PENDING)
+
+    stats = queryset.aggregate(
+        done=Count('pk', filter=Q(status=DiffUpload.STATUS_DONE)),
+        failed=Count('pk', filter=Q(status=DiffUpload.STATUS_FAILED)),
+        oldest_pending=Min('created', filter=pending_q),
+        pending=Count('pk', filter=pending_q),
+        processing=Count('pk',
+                         filter=Q(status=DiffUpload.STATUS_PROCESSING)))
+
+    return {
+        'done': stats['done'],
+        'failed': stats['failed'],
+        'oldest_pending': stats['oldest_pending'],
+        'pending': stats['pending'],
+        'processing': stats['processing'],
+    }
+
+
+def prune_diff_uploads(
+    *,
+    older_than: datetime,
+) -> int:
+    """Delete uploads that have finished processing.
+
+    Version Added:
+        8.0
+
+    Args:
+        older_than (datetime.datetime):
+            Only uploads made before this time will be deleted.
+
+    Returns:
+        int:
+        The number of uploads deleted.
+    """
+    return prune_finished_entries(
+        DiffUpload.objects.all(),
+        unfinished_statuses=DiffUpload.UNFINISHED_STATUSES,
+        older_than=older_than)
+
+
+def _read_file(
+    uploaded_file: UploadedFile,
+) -> bytes:
+    """Return the contents of an uploaded file.
+
+    Version Added:
+        8.0
+
+    Args:
+        uploaded_file (django.core.files.uploadedfile.UploadedFile):
+            The uploaded file.
+
+    Returns:
+        bytes:
+        The contents of the file.
+    """
+    uploaded_file.seek(0)
+
+    return uploaded_file.read()
+
+
+def _reclaim_expired_uploads() -> None:
+    """Return uploads whose processing lease has expired to the queue.
+
+    Version Added:
+        8.0
+    """
+    num_reset = (
+        DiffUpload.objects
+        .filter(status=DiffUpload.STATUS_PROCESSING,
+                lease_expires__lt=timezone.now())
+        .update(status=DiffUpload.STATUS_PENDING,
+                started=None,
+                lease_expires=None)
+    )
+
+    if num_reset:
+        logger.warning('Re-queued %d diff upload(s) that were abandoned '
+                       'while processing.',
+                       num_reset)
+
+
+def _claim_next_upload() -> Optional[int]:
+    """Claim the next upload to process.
+
+    The oldest pending upload is chosen, skipping any review request that
+    has an older upload that hasn't finished processing.
+
+    Version Added:
+        8.0
+
+    Returns:
+        int:
+        The ID of the claimed upload, or ``None`` if there are no uploads
+        ready to process.
+    """
+    blocking = DiffUpload.objects.filter(
+        Q(pk__lt=OuterRef('pk')) |
+        Q(status=DiffUpload.STATUS_PROCESSING),
+        review_request=OuterRef('review_request'),
+        status__in=DiffUpload.UNFINISHED_STATUSES)
+
+    while True:
+        upload_ids = list(
+            DiffUpload.objects
+            .filter(~Exists(blocking),
+                    status=DiffUpload.STATUS_PENDING)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+            [:BATCH_SIZE])
+
+        if not upload_ids:
+            return None
+
+        for upload_id in upload_ids:
+            now = timezone.now()
+            claimed = (
+                DiffUpload.objects
+                .filter(pk=upload_id,
+                        status=DiffUpload.STATUS_PENDING)
+                .update(status=DiffUpload.STATUS_PROCESSING,
+                        started=now,
+                        lease_expires=now + timedelta(seconds=LEASE_SECS))
+            )
+
+            if claimed:
+                return upload_id
+
+
+def _process_upload(
+    upload_id: int,
+) -> None:
+    """Process a claimed upload and record the result.
+
+    Version Added:
+        8.0
+
+    Args:
+        upload_id (int):
+            The ID of the upload to process.
+    """
+    try:
+        upload = (
+            DiffUpload.objects
+            .select_related('review_request', 'user')
+            .get(pk=upload_id)
+        )
+    except DiffUpload.DoesNotExist:
+        return
+
+    start_time = time.monotonic()
+
+    try:
+        with _hold_lease(upload_id), transaction.atomic():
+            result = _create_from_upload(upload)
+
+            if _get_result_error(result) is not None:
+                # Don't leave behind a partially-created diff.
+                transaction.set_rollback(True)
+    except Exception as e:
+        logger.exception('Unexpected error processing diff upload %s for '
+                         'review request %s: %s',
+                         upload_id, upload.review_request_id, e)
+
+        result = INVALID_FORM_DATA, {
+            'fields': {
+                _FILE_FIELDS[upload.upload_type][0]: [str(e)],
+            },
+        }
+
+    values: dict[str, Any] = {
+        'completed': timezone.now(),
+        'lease_expires': None,
+    }
+    error = _get_result_error(result)
+
+    if error is None:
+        # The payload contains only the created diff set or commit.
+        assert isinstance(result, tuple)
+        obj = next(iter(result[1].values()))
+
+        if upload.upload_type == DiffUpload.TYPE_DIFF:
+            values['diffset'] = obj
+        else:
+            values['diffcommit'] = obj
+
+        values.update({
+            'diff_data': b'',
+            'parent_diff_data': None,
+            'status': DiffUpload.STATUS_DONE,
+        })
+
+        logger.info('Processed diff upload %s for review request %s in '
+                    '%.3f seconds.',
+                    upload_id, upload.review_request_id,
+                    time.monotonic() - start_time)
+    else:
+        if isinstance(result, tuple):
+            payload = result[1]
+        else:
+            payload = {}
+
+        values.update({
+            'error_code': error.code,
+            'error_data': dict(payload, msg=error.msg),
+            'status': DiffUpload.STATUS_FAILED,
+        })
+
+        logger.warning('Could not process diff upload %s for review '
+                       'request %s: %s %r',
+                       upload_id, upload.review_request_id, error.msg,
+                       payload)
+
+    DiffUpload.objects.filter(pk=upload_id).update(**values)
+
+
+@contextmanager
+def _hold_lease(
+    upload_id: int,
+) -> Iterator[None]:
+    """Extend the lease on a claimed upload while it's being processed.
+
+    A background thread extends the lease every
+    :py:data:`LEASE_RENEW_INTERVAL_SECS` seconds until the context exits.
+
+    Version Added:
+        8.0
+
+    Args:
+        upload_id (int):
+            The ID of the upload being processed.
+
+    Yields:
+        None:
+        The context for processing the upload.
+    """
+    stop = threading.Event()
+
+    def _renew_lease() -> None:
+        try:
+            while not stop.wait(LEASE_RENEW_INTERVAL_SECS):
+                try:
+                    (DiffUpload.objects
+                     .filter(pk=upload_id,
+                             status=DiffUpload.STATUS_PROCESSING)
+                     .update(lease_expires=(
+                         timezone.now() + timedelta(seconds=LEASE_SECS))))
+                except Exception as e:
+                    logger.error('Unable to extend the lease on diff '
+                                 'upload %s: %s',
+                                 upload_id, e)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=_renew_lease,
+                              name='rb-diff-upload-lease',
+                              daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _create_from_upload(
+    upload: DiffUpload,
+) -> Union[WebAPIError, tuple]:
+    """Create the diff or commit for an upload.
+
+    This goes through the same steps as the API would when processing the
+    upload immediately.
+
+    Version Added:
+        8.0
+
+    Args:
+        upload (reviewboard.reviews.models.DiffUpload):
+            The upload to process.
+
+    Returns:
+        tuple or djblets.webapi.errors.WebAPIError:
+        The result from the API resource.
+    """
+    from reviewboard.webapi.resources import resources
+
+    review_request = upload.review_request
+    request = _build_request(upload)
+
+    if not review_request.is_mutable_by(upload.user):
+        return PERMISSION_DENIED
+
+    diff_field, parent_diff_field = _FILE_FIELDS[upload.upload_type]
+    files = MultiValueDict({
+        diff_field: [
+            SimpleUploadedFile(upload.diff_name, bytes(upload.diff_data)),
+        ],
+    })
+
+    if upload.parent_diff_data is not None:
+        files[parent_diff_field] = SimpleUploadedFile(
+            upload.parent_diff_name,
+            bytes(upload.parent_diff_data))
+
+    data = MultiValueDict(upload.form_data)
+
+    if upload.upload_type == DiffUpload.TYPE_DIFF:
+        form = UploadDiffForm(review_request,
+                              data=data,
+                              files=files,
+                              request=request)
+        resource = resources.diff
+    else:
+        diffset = upload.diffset
+        assert diffset is not None
+
+        if diffset.is_commit_series_finalized:
+            return INVALID_ATTRIBUTE, {
+                'reason': 'The diff has already been finalized.',
+            }
+
+        form = UploadCommitForm(review_request=review_request,
+                                diffset=diffset,
+                                request=request,
+                                data=data,
+                                files=files)
+        resource = resources.draft_diffcommit
+
+    if not form.is_valid():
+        return INVALID_FORM_DATA, {
+            'fields': resource._get_form_errors(form),
+        }
+
+    if upload.upload_type == DiffUpload.TYPE_DIFF:
+        return resource.create_from_upload_form(
+            request=request,
+            review_request=review_request,
+            form=form,
+            extra_fields=upload.extra_fields)
+    else:
+        return resource.create_from_upload_form(request=request,
+                                                form=form)
+
+
+def _get_result_error(
+    result: Union[WebAPIError, tuple],
+) -> Optional[WebAPIError]:
+    """Return the API error from a resource's result, if any.
+
+    Version Added:
+        8.0
+
+    Args:
+        result (tuple or djblets.webapi.errors.WebAPIError):
+            The result from the API resource.
+
+    Returns:
+        djblets.webapi.errors.WebAPIError:
+        The error, or ``None`` if the result was successful.
+    """
+    if isinstance(result, WebAPIError):
+        return result
+    elif isinstance(result[0], WebAPIError):
+        return result[0]
+    else:
+        return None
+
+
+def _build_request(
+    upload: DiffUpload,
+) -> HttpRequest:
+    """Return an HTTP request to process an upload with.
+
+    The diff parsing and validation code and any extensions hooked into it
+    expect the request from the client. This provides a stand-in with the
+    uploading user and Local Site.
+
+    Version Added:
+        8.0
+
+    Args:
+        upload (reviewboard.reviews.models.DiffUpload):
+            The upload to process.
+
+    Returns:
+        django.http.HttpRequest:
+        The HTTP request.
+    """
+    local_site = upload.review_request.local_site
+
+    request = HttpRequest()
+    request.method = 'POST'
+    request.user = upload.user
+    request.local_site = local_site
+    request._local_site_name = local_site and local_site.name
+
+    return request
+
+
+_local_runner = LocalBackgroundRunner(process_diff_uploads,
+                                     name='rb-diff-upload-local')
@@ -0,0 +1,148 @@
+"""Management command to process diffs uploaded for background processing.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from reviewboard.webapi.diff_uploads import (get_diff_upload_stats,
+                                             process_diff_uploads,
+                                             prune_diff_uploads)
+
+
+class Command(BaseCommand):
+    """Management command to process diffs uploaded for background processing.
+
+    By default, this processes any waiting uploads and then exits. With
+    ``--watch``, it keeps running and processes uploads as they're made,
+    acting as a worker process.
+
+    Version Added:
+        8.0
+    """
+
+    help = _(
+        'Process diffs and commits uploaded through the API for processing '
+        'in the background.'
+    )
+
+    #: How often old uploads are pruned when using --watch, in seconds.
+    PRUNE_INTERVAL_SECS = 60 * 60
+
+    def add_arguments(
+        self,
+        parser: argparse.ArgumentParser,
+    ) -> None:
+        """Add arguments to the command.
+
+        Args:
+            parser (argparse.ArgumentParser):
+                The argument parser for the command.
+        """
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help=_(
+                'Keep running, processing diffs as they are uploaded.'
+            ))
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help=_(
+                'Number of seconds to wait between checks for new uploads '
+                'when using --watch. Defaults to 1.'
+            ))
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help=_(
+                'Number of days to keep the status of finished uploads. '
+                'Defaults to 7.'
+            ))
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help=_('Show statistics on uploads.'))
+
+    def handle(
+        self,
+        **options,
+    ) -> None:
+        """Handle the command.
+
+        Args:
+            **options (dict):
+                Options parsed on the command line.
+
+        Raises:
+            django.core.management.CommandError:
+                There was an error with the provided options.
+        """
+        keep_days = options['keep_days']
+
+        if keep_days < 1:
+            raise CommandError(_('--keep-days must be at least 1.'))
+
+        if options['stats']:
+            self._show_stats()
+        elif options['watch']:
+            poll_interval = options['poll_interval']
+            last_pruned = 0.0
+
+            while True:
+                if time.monotonic() - last_pruned >= self.PRUNE_INTERVAL_SECS:
+                    self._prune(keep_days)
+                    last_pruned = time.monotonic()
+
+                if not process_diff_uploads():
+                    time.sleep(poll_interval)
+        else:
+            self._prune(keep_days)
+            num_processed = process_diff_uploads()
+
+            self.stdout.write(_('Processed %d upload(s).') % num_processed)
+
+    def _prune(
+        self,
+        keep_days: int,
+    ) -> None:
+        """Delete old finished uploads.
+
+        Args:
+            keep_days (int):
+                The number of days of uploads to keep.
+        """
+        prune_diff_uploads(
+            older_than=timezone.now() - timedelta(days=keep_days))
+
+    def _show_stats(self) -> None:
+        """Show statistics on uploads."""
+        stats = get_diff_upload_stats(
+            since=timezone.now() - timedelta(days=1))
+        oldest_pending = stats['oldest_pending']
+
+        self.stdout.write(_('Waiting uploads: %d') % stats['pending'])
+        self.stdout.write(_('Processing uploads: %d') % stats['processing'])
+
+        if oldest_pending is not None:
+            self.stdout.write(
+                _('Oldest waiting upload: %d second(s) ago')
+                % (timezone.now() - oldest_pending).total_seconds())
+
+        self.stdout.write(_('Processed in the last 24 hours: %d')
+                          % stats['done'])
+        self.stdout.write(_('Failed in the last 24 hours: %d')
+                          % stats['failed'])
@@ -12,6 +12,7 @@ from reviewboard.notifications.models import WebHookTarget
 from reviewboard.oauth.models import Application
 from reviewboard.reviews.models import (Comment,
                                         DefaultReviewer,
+                                        DiffUpload,
                                         FileAttachmentComment,
                                         GeneralComment,
                                         Group,
@@ -57,6 +58,7 @@ class Resources(ResourcesRegistry):
             lambda obj: (self.diffcommit
                          if obj.diffset.history_id
                          else self.draft_diffcommit))
+        register_resource_for_model(DiffUpload, self.diff_upload)
         register_resource_for_model(
             DiffSet,
             lambda obj: obj.history_id and self.diff or self.draft_diff)
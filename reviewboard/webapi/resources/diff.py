@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Any, Optional, TYPE_CHECKING
 
 from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
 from django.http import HttpResponse
@@ -14,28 +14,38 @@ from djblets.webapi.decorators import (webapi_login_required,
 from djblets.webapi.errors import (DOES_NOT_EXIST, INVALID_ATTRIBUTE,
                                    INVALID_FORM_DATA, NOT_LOGGED_IN,
                                    PERMISSION_DENIED)
-from djblets.webapi.fields import (DateTimeFieldType,
+from djblets.webapi.fields import (BooleanFieldType,
+                                   DateTimeFieldType,
                                    DictFieldType,
                                    FileFieldType,
                                    IntFieldType,
                                    ResourceFieldType,
                                    StringFieldType)
 
+from reviewboard.background import BackgroundMode
 from reviewboard.diffviewer.errors import DiffTooBigError, EmptyDiffError
 from reviewboard.diffviewer.features import dvcs_feature
 from reviewboard.diffviewer.models import DiffSet
 from reviewboard.reviews.forms import UploadDiffForm
-from reviewboard.reviews.models import ReviewRequest, ReviewRequestDraft
+from reviewboard.reviews.models import (DiffUpload,
+                                        ReviewRequest,
+                                        ReviewRequestDraft)
 from reviewboard.reviews.signals import review_request_diffset_uploaded
 from reviewboard.scmtools.errors import FileNotFoundError
 from reviewboard.webapi.base import ImportExtraDataError, WebAPIResource
 from reviewboard.webapi.decorators import (webapi_check_login_required,
                                            webapi_check_local_site)
+from reviewboard.webapi.diff_uploads import (get_diff_upload_processing_mode,
+                                             queue_diff_upload)
 from reviewboard.webapi.errors import (DIFF_EMPTY,
                                        DIFF_TOO_BIG,
                                        REPO_FILE_NOT_FOUND)
 from reviewboard.webapi.resources import resources
 
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+    from djblets.webapi.resources.base import WebAPIResourceHandlerResult
+
 
 logger = logging.getLogger(__name__)
 
@@ -247,11 +257,22 @@ class DiffResource(WebAPIResource):
                                'how the diff was uploaded.',
                 'added_in': '1.7.13',
             },
+            'process_async': {
+                'type': BooleanFieldType,
+                'description': 'Whether to process the diff in the '
+                               'background. If the server supports this, '
+                               'this will respond with a 202 Accepted and '
+                               'the status of the upload, which can be '
+                               'polled until processing is done. Check for '
+                               'the ``diffs.async_processing`` capability '
+                               'before using this.',
+                'added_in': '8.0',
+            },
         },
         allow_unknown=True
     )
-    def create(self, request, extra_fields={}, local_site=None, *args,
-               **kwargs):
+    def create(self, request, extra_fields={}, local_site=None,
+               process_async=False, *args, **kwargs):
         """Creates a new diff by parsing an uploaded diff file.
 
         This will implicitly create the new Review Request draft, which can
@@ -285,12 +306,14 @@ class DiffResource(WebAPIResource):
 
         Extra data can be stored later lookup. See
         :ref:`webapi2.0-extra-data` for more information.
-        """
-        # Prevent a circular dependency, as ReviewRequestDraftResource
-        # needs DraftDiffResource, which needs DiffResource.
-        from reviewboard.webapi.resources.review_request_draft import \
-            ReviewRequestDraftResource
 
+        Large diffs can take a while to process. If ``process_async`` is
+        set and the server has background processing enabled, the diff will
+        be checked and stored, and then processed in the background. This
+        responds with a 202 Accepted and a
+        :ref:`diff upload <webapi2.0-diff-upload-resource>` that can be
+        polled until processing is done.
+        """
         try:
             review_request = \
                 resources.review_request.get_object(request, *args, **kwargs)
@@ -339,31 +362,135 @@ class DiffResource(WebAPIResource):
                     'fields': self._get_form_errors(form),
                 }
 
-            try:
-                diffset = form.create()
-            except FileNotFoundError as e:
-                return REPO_FILE_NOT_FOUND, {
-                    'file': e.path,
-                    'revision': str(e.revision)
-                }
-            except EmptyDiffError:
-                return DIFF_EMPTY
-            except DiffTooBigError as e:
-                return DIFF_TOO_BIG, {
-                    'reason': str(e),
-                    'max_size': e.max_diff_size,
+            if (process_async and
+                get_diff_upload_processing_mode() !=
+                BackgroundMode.SYNC):
+                try:
+                    upload = queue_diff_upload(
+                        review_request=review_request,
+                        user=request.user,
+                        upload_type=DiffUpload.TYPE_DIFF,
+                        form_data=form_data,
+                        files=request.FILES,
+                        extra_fields=extra_fields)
+                except DiffTooBigError as e:
+                    return DIFF_TOO_BIG, {
+                        'reason': str(e),
+                        'max_size': e.max_diff_size,
+                    }
+
+                return 202, {
+                    resources.diff_upload.item_result_key: upload,
                 }
-            except Exception as e:
-                # This could be very wrong, but at least they'll see the error.
-                # We probably want a new error type for this.
-                logger.error('Error uploading new diff: %s', e, exc_info=True,
-                             extra={'request': request})
 
-                return INVALID_FORM_DATA, {
-                    'fields': {
-                        'path': [str(e)]
-                    }
+            return self.create_from_upload_form(request=request,
+                                                review_request=review_request,
+                                                form=form,
+                                                extra_fields=extra_fields)
+
+        return self._attach_diffset(request=request,
+                                    review_request=review_request,
+                                    diffset=diffset,
+                                    extra_fields=extra_fields)
+
+    def create_from_upload_form(
+        self,
+        *,
+        request: HttpRequest,
+        review_request: ReviewRequest,
+        form: UploadDiffForm,
+        extra_fields: dict[str, Any],
+    ) -> WebAPIResourceHandlerResult:
+        """Create a diff from a validated upload form.
+
+        The new diff will be set on the review request's draft, creating
+        the draft if needed.
+
+        Version Added:
+            8.0
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            review_request (reviewboard.reviews.models.ReviewRequest):
+                The review request to add the diff to.
+
+            form (reviewboard.reviews.forms.UploadDiffForm):
+                The validated form for the uploaded diff.
+
+            extra_fields (dict):
+                Extra data fields to store on the diff.
+
+        Returns:
+            djblets.webapi.resources.base.WebAPIResourceHandlerResult:
+            The response to send to the client.
+        """
+        try:
+            diffset = form.create()
+        except FileNotFoundError as e:
+            return REPO_FILE_NOT_FOUND, {
+                'file': e.path,
+                'revision': str(e.revision)
+            }
+        except EmptyDiffError:
+            return DIFF_EMPTY
+        except DiffTooBigError as e:
+            return DIFF_TOO_BIG, {
+                'reason': str(e),
+                'max_size': e.max_diff_size,
+            }
+        except Exception as e:
+            # This could be very wrong, but at least they'll see the error.
+            # We probably want a new error type for this.
+            logger.error('Error uploading new diff: %s', e, exc_info=True,
+                         extra={'request': request})
+
+            return INVALID_FORM_DATA, {
+                'fields': {
+                    'path': [str(e)]
                 }
+            }
+
+        return self._attach_diffset(request=request,
+                                    review_request=review_request,
+                                    diffset=diffset,
+                                    extra_fields=extra_fields)
+
+    def _attach_diffset(
+        self,
+        *,
+        request: HttpRequest,
+        review_request: ReviewRequest,
+        diffset: DiffSet,
+        extra_fields: dict[str, Any],
+    ) -> WebAPIResourceHandlerResult:
+        """Set a new diff on the review request's draft.
+
+        Version Added:
+            8.0
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            review_request (reviewboard.reviews.models.ReviewRequest):
+                The review request to add the diff to.
+
+            diffset (reviewboard.diffviewer.models.DiffSet):
+                The new diff.
+
+            extra_fields (dict):
+                Extra data fields to store on the diff.
+
+        Returns:
+            djblets.webapi.resources.base.WebAPIResourceHandlerResult:
+            The response to send to the client.
+        """
+        # Prevent a circular dependency, as ReviewRequestDraftResource
+        # needs DraftDiffResource, which needs DiffResource.
+        from reviewboard.webapi.resources.review_request_draft import \
+            ReviewRequestDraftResource
 
         discarded_diffset: Optional[DiffSet] = None
 
@@ -385,7 +512,7 @@ class DiffResource(WebAPIResource):
         if review_request.can_add_default_reviewers():
             draft.add_default_reviewers()
 
-        if not created_with_history:
+        if not review_request.created_with_history:
             # If this is a non-commit series diffset, emit a signal that a
             # diffset has been uploaded.
             #
@@ -0,0 +1,326 @@
+"""The resource for diffs and commits being processed in the background.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, TYPE_CHECKING
+
+from djblets.util.decorators import augment_method_from
+from djblets.webapi.decorators import webapi_login_required
+from djblets.webapi.fields import (ChoiceFieldType,
+                                   DateTimeFieldType,
+                                   DictFieldType,
+                                   IntFieldType,
+                                   ResourceFieldType)
+
+from reviewboard.reviews.models import DiffUpload
+from reviewboard.webapi.base import WebAPIResource
+from reviewboard.webapi.resources import resources
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from django.http import HttpRequest
+
+    from reviewboard.diffviewer.models import DiffCommit, DiffSet
+
+
+class DiffUploadResource(WebAPIResource):
+    """Provides the status of diffs and commits processed in the background.
+
+    When a diff or commit is uploaded with ``process_async=1`` and the server
+    has background processing enabled, the upload is stored and processed
+    separately from the request. The response contains an item from this
+    resource, which can be polled until its ``status`` is ``done`` or
+    ``failed``.
+
+    Once done, the ``diff`` link points to the new diff (or, for commits,
+    the diff the commit was added to), and the ``commit`` link points to the
+    new commit. If processing failed, ``error`` contains the error that
+    would have been returned had the upload been processed immediately.
+
+    Only users who can modify the review request can see its uploads.
+
+    Version Added:
+        8.0
+    """
+
+    added_in = '8.0'
+
+    model = DiffUpload
+    name = 'diff_upload'
+    model_parent_key = 'review_request'
+    uri_object_key = 'diff_upload_id'
+    allowed_methods = ('GET',)
+
+    uri_template_name = 'review_request_diff_upload'
+
+    fields = {
+        'commit': {
+            'type': ResourceFieldType,
+            'resource': 'reviewboard.webapi.resources.diffcommit.'
+                        'DiffCommitResource',
+            'description': 'The commit created from a commit upload, once '
+                           'processed.',
+        },
+        'completed': {
+            'type': DateTimeFieldType,
+            'description': 'The date and time that processing finished.',
+        },
+        'created': {
+            'type': DateTimeFieldType,
+            'description': 'The date and time that the diff or commit was '
+                           'uploaded.',
+        },
+        'diff': {
+            'type': ResourceFieldType,
+            'resource': 'reviewboard.webapi.resources.diff.DiffResource',
+            'description': 'The diff created from a diff upload, once '
+                           'processed. For commit uploads, this is the diff '
+                           'that the commit is added to.',
+        },
+        'error': {
+            'type': DictFieldType,
+            'description': 'The error that caused processing to fail. This '
+                           'contains the ``code`` and ``msg`` of the API '
+                           'error, along with any other details that would '
+                           'have been returned with it.',
+        },
+        'id': {
+            'type': IntFieldType,
+            'description': 'The numeric ID of the upload.',
+        },
+        'status': {
+            'type': ChoiceFieldType,
+            'choices': ('pending', 'processing', 'done', 'failed'),
+            'description': 'The processing status of the upload.',
+        },
+        'upload_type': {
+            'type': ChoiceFieldType,
+            'choices': ('diff', 'commit'),
+            'description': 'Whether a diff or a commit was uploaded.',
+        },
+    }
+
+    _STATUS_NAMES = {
+        DiffUpload.STATUS_PENDING: 'pending',
+        DiffUpload.STATUS_PROCESSING: 'processing',
+        DiffUpload.STATUS_DONE: 'done',
+        DiffUpload.STATUS_FAILED: 'failed',
+    }
+
+    _TYPE_NAMES = {
+        DiffUpload.TYPE_DIFF: 'diff',
+        DiffUpload.TYPE_COMMIT: 'commit',
+    }
+
+    def get_queryset(
+        self,
+        request: HttpRequest,
+        *args,
+        **kwargs,
+    ) -> QuerySet:
+        """Return a queryset for the review request's uploads.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            *args (tuple):
+                Positional arguments to pass through to the review request
+                resource.
+
+            **kwargs (dict):
+                Keyword arguments to pass through to the review request
+                resource.
+
+        Returns:
+            django.db.models.QuerySet:
+            The queryset for the uploads.
+        """
+        review_request = resources.review_request.get_object(
+            request, *args, **kwargs)
+
+        return review_request.diff_uploads.all()
+
+    def has_list_access_permissions(
+        self,
+        request: HttpRequest,
+        *args,
+        **kwargs,
+    ) -> bool:
+        """Return whether the user can list the review request's uploads.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            *args (tuple):
+                Positional arguments to pass through to the review request
+                resource.
+
+            **kwargs (dict):
+                Keyword arguments to pass through to the review request
+                resource.
+
+        Returns:
+            bool:
+            Whether the user can modify the review request.
+        """
+        review_request = resources.review_request.get_object(
+            request, *args, **kwargs)
+
+        return review_request.is_mutable_by(request.user)
+
+    def has_access_permissions(
+        self,
+        request: HttpRequest,
+        upload: DiffUpload,
+        *args,
+        **kwargs,
+    ) -> bool:
+        """Return whether the user can see an upload.
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            upload (reviewboard.reviews.models.DiffUpload):
+                The upload to check.
+
+            *args (tuple):
+                Additional positional arguments.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            bool:
+            Whether the user can modify the upload's review request.
+        """
+        return upload.review_request.is_mutable_by(request.user)
+
+    def serialize_commit_field(
+        self,
+        obj: DiffUpload,
+        **kwargs,
+    ) -> Optional[DiffCommit]:
+        """Return the commit created from the upload.
+
+        Args:
+            obj (reviewboard.reviews.models.DiffUpload):
+                The upload being serialized.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            reviewboard.diffviewer.models.DiffCommit:
+            The commit, or ``None`` if one hasn't been created.
+        """
+        return obj.diffcommit
+
+    def serialize_diff_field(
+        self,
+        obj: DiffUpload,
+        **kwargs,
+    ) -> Optional[DiffSet]:
+        """Return the diff for the upload.
+
+        Args:
+            obj (reviewboard.reviews.models.DiffUpload):
+                The upload being serialized.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            reviewboard.diffviewer.models.DiffSet:
+            The diff, or ``None`` if one hasn't been created.
+        """
+        return obj.diffset
+
+    def serialize_error_field(
+        self,
+        obj: DiffUpload,
+        **kwargs,
+    ) -> Optional[dict[str, Any]]:
+        """Return the error that caused processing to fail.
+
+        Args:
+            obj (reviewboard.reviews.models.DiffUpload):
+                The upload being serialized.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            dict:
+            The error details, or ``None`` if processing didn't fail.
+        """
+        if obj.status != DiffUpload.STATUS_FAILED:
+            return None
+
+        return dict(obj.error_data or {},
+                    code=obj.error_code)
+
+    def serialize_status_field(
+        self,
+        obj: DiffUpload,
+        **kwargs,
+    ) -> str:
+        """Return the processing status of the upload.
+
+        Args:
+            obj (reviewboard.reviews.models.DiffUpload):
+                The upload being serialized.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            str:
+            The processing status.
+        """
+        return self._STATUS_NAMES[obj.status]
+
+    def serialize_upload_type_field(
+        self,
+        obj: DiffUpload,
+        **kwargs,
+    ) -> str:
+        """Return the type of the upload.
+
+        Args:
+            obj (reviewboard.reviews.models.DiffUpload):
+                The upload being serialized.
+
+            **kwargs (dict):
+                Additional keyword arguments.
+
+        Returns:
+            str:
+            The type of the upload.
+        """
+        return self._TYPE_NAMES[obj.upload_type]
+
+    @webapi_login_required
+    @augment_method_from(WebAPIResource)
+    def get_list(self, *args, **kwargs):
+        """Returns the diffs and commits uploaded for background processing.
+
+        Uploads are listed in the order they were made. Finished uploads are
+        removed after a while.
+        """
+        pass
+
+    @webapi_login_required
+    @augment_method_from(WebAPIResource)
+    def get(self, *args, **kwargs):
+        """Returns the processing status of an uploaded diff or commit."""
+        pass
+
+
+diff_upload_resource = DiffUploadResource()
@@ -18,6 +18,7 @@ from djblets.webapi.fields import (BooleanFieldType,
 
 from reviewboard.diffviewer.commit_utils import deserialize_validation_info
 from reviewboard.diffviewer.features import dvcs_feature
+from reviewboard.reviews.models import DiffUpload
 from reviewboard.reviews.signals import review_request_diffset_uploaded
 from reviewboard.webapi.base import ImportExtraDataError
 from reviewboard.webapi.decorators import webapi_check_local_site
@@ -249,6 +250,15 @@ class DraftDiffResource(DiffResource):
                 'reason': 'This diff is already finalized.',
             }
 
+        if (DiffUpload.objects
+            .filter(diffset=diffset,
+                    status__in=DiffUpload.UNFINISHED_STATUSES)
+            .exists()):
+            return INVALID_ATTRIBUTE, {
+                'reason': 'Commits uploaded to this diff are still being '
+                          'processed.',
+            }
+
         if field_errors:
             return INVALID_FORM_DATA, {
                 'fields': field_errors,
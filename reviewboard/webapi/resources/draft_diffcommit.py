@@ -1,6 +1,9 @@
 """Resources representing commits on a multi-commit review request draft."""
 
+from __future__ import annotations
+
 import logging
+from typing import TYPE_CHECKING
 
 from djblets.util.decorators import augment_method_from
 from djblets.webapi.decorators import (webapi_login_required,
@@ -8,21 +11,31 @@ from djblets.webapi.decorators import (webapi_login_required,
                                        webapi_response_errors)
 from djblets.webapi.errors import (DOES_NOT_EXIST, INVALID_ATTRIBUTE,
                                    INVALID_FORM_DATA)
-from djblets.webapi.fields import (DateTimeFieldType,
+from djblets.webapi.fields import (BooleanFieldType,
+                                   DateTimeFieldType,
                                    FileFieldType,
                                    StringFieldType)
 
+from reviewboard.background import BackgroundMode
 from reviewboard.diffviewer.errors import DiffTooBigError, EmptyDiffError
 from reviewboard.reviews.forms import UploadCommitForm
-from reviewboard.reviews.models import ReviewRequest, ReviewRequestDraft
+from reviewboard.reviews.models import (DiffUpload,
+                                        ReviewRequest,
+                                        ReviewRequestDraft)
 from reviewboard.scmtools.core import FileNotFoundError
 from reviewboard.webapi.decorators import webapi_check_local_site
+from reviewboard.webapi.diff_uploads import (get_diff_upload_processing_mode,
+                                             queue_diff_upload)
 from reviewboard.webapi.errors import (DIFF_EMPTY,
                                        DIFF_TOO_BIG,
                                        REPO_FILE_NOT_FOUND)
 from reviewboard.webapi.resources import resources
 from reviewboard.webapi.resources.diffcommit import DiffCommitResource
 
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+    from djblets.webapi.resources.base import WebAPIResourceHandlerResult
+
 
 logger = logging.getLogger(__name__)
 
@@ -235,14 +248,35 @@ class DraftDiffCommitResource(DiffCommitResource):
                     'This is required for all but the first commit.'
                 ),
             },
+            'process_async': {
+                'type': BooleanFieldType,
+                'description': (
+                    'Whether to process the commit in the background. If '
+                    'the server supports this, this will respond with a 202 '
+                    'Accepted and the status of the upload, which can be '
+                    'polled until processing is done. Check for the '
+                    '``diffs.async_processing`` capability before using '
+                    'this.'
+                ),
+                'added_in': '8.0',
+            },
         },
         allow_unknown=True
     )
-    def create(self, request, extra_fields=None, *args, **kwargs):
+    def create(self, request, extra_fields=None, process_async=False, *args,
+               **kwargs):
         """Create a new commit.
 
         A draft must exist and the review request must be created with history
         support in order to post to this resource.
+
+        If ``process_async`` is set and the server has background processing
+        enabled, the commit will be checked and stored, and then processed in
+        the background. This responds with a 202 Accepted and a
+        :ref:`diff upload <webapi2.0-diff-upload-resource>` that can be
+        polled until processing is done. Commits are processed in the order
+        they were uploaded, and the diff can't be finalized until they've all
+        been processed.
         """
         try:
             review_request = resources.review_request.get_object(
@@ -309,6 +343,52 @@ class DraftDiffCommitResource(DiffCommitResource):
                 'fields': self._get_form_errors(form),
             }
 
+        if (process_async and
+            get_diff_upload_processing_mode() !=
+            BackgroundMode.SYNC):
+            try:
+                upload = queue_diff_upload(
+                    review_request=review_request,
+                    user=request.user,
+                    upload_type=DiffUpload.TYPE_COMMIT,
+                    form_data=request.POST,
+                    files=request.FILES,
+                    diffset=diffset)
+            except DiffTooBigError as e:
+                return DIFF_TOO_BIG, {
+                    'reason': str(e),
+                    'max_size': e.max_diff_size,
+                }
+
+            return 202, {
+                resources.diff_upload.item_result_key: upload,
+            }
+
+        return self.create_from_upload_form(request=request,
+                                            form=form)
+
+    def create_from_upload_form(
+        self,
+        *,
+        request: HttpRequest,
+        form: UploadCommitForm,
+    ) -> WebAPIResourceHandlerResult:
+        """Create a commit from a validated upload form.
+
+        Version Added:
+            8.0
+
+        Args:
+            request (django.http.HttpRequest):
+                The HTTP request from the client.
+
+            form (reviewboard.reviews.forms.UploadCommitForm):
+                The validated form for the uploaded commit.
+
+        Returns:
+            djblets.webapi.resources.base.WebAPIResourceHandlerResult:
+            The response to send to the client.
+        """
         try:
             commit = form.create()
         except FileNotFoundError as e:
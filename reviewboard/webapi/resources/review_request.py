@@ -326,6 +326,7 @@ class ReviewRequestResource(MarkdownFieldsMixin, WebAPIResource):
         resources.change,
         resources.diff,
         resources.diff_context,
+        resources.diff_upload,
         resources.file_attachment,
         resources.review,
         resources.review_request_draft,
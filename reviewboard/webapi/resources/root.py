@@ -340,6 +340,14 @@ class RootResource(WebAPIResource, DjbletsRootResource):
          - :ref:`webapi2.0-change-list-resource`
          - 5.0.2
 
+       * - ``review_request_diff_upload``
+         - :ref:`webapi2.0-diff-upload-resource`
+         - 8.0
+
+       * - ``review_request_diff_uploads``
+         - :ref:`webapi2.0-diff-upload-list-resource`
+         - 8.0
+
        * - ``review_request_draft``
          - :ref:`webapi2.0-review-request-draft-resource`
          - 5.0.2
@@ -128,6 +128,8 @@ def get_capabilities(request=None):
         siteconfig.get('client_web_login')
 
     capabilities['diffs'].update({
+        'async_processing': (
+            siteconfig.get('diffviewer_upload_processing_mode') != 'sync'),
         'max_binary_size': siteconfig.get('diffviewer_max_binary_size'),
         'max_diff_size': siteconfig.get('diffviewer_max_diff_size'),
     })
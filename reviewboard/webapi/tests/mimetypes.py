@@ -27,6 +27,10 @@ diff_list_mimetype = _build_mimetype('diffs')
 diff_item_mimetype = _build_mimetype('diff')
 
 
+diff_upload_list_mimetype = _build_mimetype('diff-uploads')
+diff_upload_item_mimetype = _build_mimetype('diff-upload')
+
+
 diffcommit_list_mimetype = _build_mimetype('commits')
 diffcommit_item_mimetype = _build_mimetype('commit')
 
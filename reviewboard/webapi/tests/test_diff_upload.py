@@ -0,0 +1,330 @@
+"""Unit tests for the DiffUploadResource.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+import kgb
+from django.core.files.uploadedfile import SimpleUploadedFile
+from djblets.features.testing import override_feature_check
+from djblets.webapi.errors import PERMISSION_DENIED
+
+from reviewboard.diffviewer.errors import EmptyDiffError
+from reviewboard.diffviewer.features import dvcs_feature
+from reviewboard.diffviewer.models import DiffCommit, DiffSet
+from reviewboard.reviews.forms import UploadDiffForm
+from reviewboard.reviews.models import DiffUpload
+from reviewboard.webapi.diff_uploads import process_diff_uploads
+from reviewboard.webapi.errors import DIFF_EMPTY, DIFF_TOO_BIG
+from reviewboard.webapi.resources import resources
+from reviewboard.webapi.tests.base import BaseWebAPITestCase
+from reviewboard.webapi.tests.mimetypes import (
+    diff_item_mimetype,
+    diff_upload_item_mimetype,
+    diff_upload_list_mimetype,
+    draft_diffcommit_item_mimetype)
+from reviewboard.webapi.tests.urls import (get_diff_list_url,
+                                           get_diff_upload_item_url,
+                                           get_diff_upload_list_url,
+                                           get_draft_diffcommit_list_url)
+
+
+class DiffUploadResourceTests(kgb.SpyAgency, BaseWebAPITestCase):
+    """Testing the DiffUploadResource APIs.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users', 'test_scmtools']
+    resource = resources.diff_upload
+
+    _COMMIT_DIFF = (
+        b'diff --git a/readme b/readme\n'
+        b'index d6613f5..5b50866 100644\n'
+        b'--- a/readme\n'
+        b'+++ b/readme\n'
+        b'@@ -1 +1,3 @@\n'
+        b' Hello there\n'
+        b'+\n'
+        b'+Oh hi!\n'
+    )
+
+    def test_post_diff_with_process_async(self) -> None:
+        """Testing the POST review-requests/<id>/diffs/ API with
+        process_async=1
+        """
+        review_request = self._create_review_request()
+
+        with self.siteconfig_settings(
+            {'diffviewer_upload_processing_mode': 'worker'},
+            reload_settings=False):
+            rsp = self.api_post(
+                get_diff_list_url(review_request),
+                self._build_diff_post_data(),
+                expected_status=202,
+                expected_mimetype=diff_item_mimetype)
+
+        self.assertEqual(rsp['stat'], 'ok')
+
+        item_rsp = rsp['diff_upload']
+        self.assertEqual(item_rsp['upload_type'], 'diff')
+        self.assertEqual(item_rsp['status'], 'pending')
+        self.assertIsNone(item_rsp['error'])
+        self.assertIsNone(item_rsp['diff'])
+
+        upload = DiffUpload.objects.get(pk=item_rsp['id'])
+        self.assertEqual(upload.user, self.user)
+        self.assertEqual(upload.diff_name, 'diff')
+        self.assertEqual(bytes(upload.diff_data),
+                         self.DEFAULT_GIT_README_DIFF)
+        self.assertEqual(upload.form_data['basedir'], ['/trunk'])
+        self.assertNotIn('path', upload.form_data)
+
+        self.assertFalse(DiffSet.objects.exists())
+        self.assertIsNone(review_request.get_draft())
+
+        self.assertEqual(process_diff_uploads(), 1)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, DiffUpload.STATUS_DONE)
+        self.assertIsNotNone(upload.completed)
+        self.assertEqual(bytes(upload.diff_data), b'')
+
+        draft = review_request.get_draft()
+        self.assertIsNotNone(draft)
+        self.assertEqual(draft.diffset, upload.diffset)
+        self.assertEqual(draft.diffset.basedir, '/trunk')
+
+        rsp = self.api_get(
+            get_diff_upload_item_url(review_request, upload.pk),
+            expected_mimetype=diff_upload_item_mimetype)
+
+        self.assertEqual(rsp['stat'], 'ok')
+
+        item_rsp = rsp['diff_upload']
+        self.assertEqual(item_rsp['status'], 'done')
+        self.assertIn('diff', item_rsp['links'])
+
+    def test_post_diff_with_process_async_and_sync_mode(self) -> None:
+        """Testing the POST review-requests/<id>/diffs/ API with
+        process_async=1 and background processing disabled
+        """
+        review_request = self._create_review_request()
+
+        with self.siteconfig_settings(
+            {'diffviewer_upload_processing_mode': 'sync'},
+            reload_settings=False):
+            rsp = self.api_post(
+                get_diff_list_url(review_request),
+                self._build_diff_post_data(),
+                expected_status=201,
+                expected_mimetype=diff_item_mimetype)
+
+        self.assertEqual(rsp['stat'], 'ok')
+        self.assertIn('diff', rsp)
+        self.assertFalse(DiffUpload.objects.exists())
+        self.assertEqual(review_request.get_draft().diffset_id,
+                         rsp['diff']['id'])
+
+    def test_post_diff_with_process_async_too_big(self) -> None:
+        """Testing the POST review-requests/<id>/diffs/ API with
+        process_async=1 and a diff that's too large
+        """
+        review_request = self._create_review_request()
+
+        with self.siteconfig_settings(
+            {
+                'diffviewer_max_diff_size': 10,
+                'diffviewer_upload_processing_mode': 'worker',
+            },
+            reload_settings=False):
+            rsp = self.api_post(
+                get_diff_list_url(review_request),
+                self._build_diff_post_data(),
+                expected_status=400)
+
+        self.assertEqual(rsp['stat'], 'fail')
+        self.assertEqual(rsp['err']['code'], DIFF_TOO_BIG.code)
+        self.assertEqual(rsp['max_size'], 10)
+        self.assertFalse(DiffUpload.objects.exists())
+
+    def test_get_with_failed_upload(self) -> None:
+        """Testing the GET review-requests/<id>/diff-uploads/<id>/ API with
+        an upload that failed processing
+        """
+        self.spy_on(UploadDiffForm.create,
+                    owner=UploadDiffForm,
+                    op=kgb.SpyOpRaise(EmptyDiffError()))
+
+        review_request = self._create_review_request()
+
+        with self.siteconfig_settings(
+            {'diffviewer_upload_processing_mode': 'worker'},
+            reload_settings=False):
+            rsp = self.api_post(
+                get_diff_list_url(review_request),
+                self._build_diff_post_data(),
+                expected_status=202,
+                expected_mimetype=diff_item_mimetype)
+
+        upload_id = rsp['diff_upload']['id']
+
+        self.assertEqual(process_diff_uploads(), 1)
+        self.assertFalse(DiffSet.objects.exists())
+
+        rsp = self.api_get(
+            get_diff_upload_item_url(review_request, upload_id),
+            expected_mimetype=diff_upload_item_mimetype)
+
+        self.assertEqual(rsp['stat'], 'ok')
+
+        item_rsp = rsp['diff_upload']
+        self.assertEqual(item_rsp['status'], 'failed')
+        self.assertEqual(item_rsp['error'], {
+            'code': DIFF_EMPTY.code,
+            'msg': DIFF_EMPTY.msg,
+        })
+
+    def test_get_list(self) -> None:
+        """Testing the GET review-requests/<id>/diff-uploads/ API"""
+        review_request = self._create_review_request()
+        upload1 = self._create_upload(review_request)
+        upload2 = self._create_upload(review_request)
+
+        rsp = self.api_get(get_diff_upload_list_url(review_request),
+                           expected_mimetype=diff_upload_list_mimetype)
+
+        self.assertEqual(rsp['stat'], 'ok')
+        self.assertEqual(
+            [item_rsp['id'] for item_rsp in rsp['diff_uploads']],
+            [upload1.pk, upload2.pk])
+
+    def test_get_without_modify_access(self) -> None:
+        """Testing the GET review-requests/<id>/diff-uploads/<id>/ API
+        without permission to modify the review request
+        """
+        review_request = self.create_review_request(
+            create_repository=True,
+            submitter='doc',
+            publish=True)
+        upload = self._create_upload(review_request)
+
+        rsp = self.api_get(
+            get_diff_upload_item_url(review_request, upload.pk),
+            expected_status=403)
+
+        self.assertEqual(rsp['stat'], 'fail')
+        self.assertEqual(rsp['err']['code'], PERMISSION_DENIED.code)
+
+    def test_post_commits_with_process_async(self) -> None:
+        """Testing the POST review-requests/<id>/draft/diffs/<revision>/
+        commits/ API with process_async=1 processes commits in order
+        """
+        with override_feature_check(dvcs_feature.feature_id, enabled=True):
+            repository = self.create_repository(tool_name='Git')
+            review_request = self.create_review_request(
+                repository=repository,
+                submitter=self.user,
+                create_with_history=True)
+            diffset = self.create_diffset(review_request, draft=True)
+            url = get_draft_diffcommit_list_url(review_request,
+                                                diffset.revision)
+
+            with self.siteconfig_settings(
+                {'diffviewer_upload_processing_mode': 'worker'},
+                reload_settings=False):
+                for commit_id, parent_id in (('r1', 'r0'), ('r2', 'r1')):
+                    rsp = self.api_post(
+                        url,
+                        {
+                            'author_date': '2024-01-01T00:00:00+00:00',
+                            'author_email': 'author@example.com',
+                            'author_name': 'Author',
+                            'commit_id': commit_id,
+                            'commit_message': 'Commit message',
+                            'committer_date': '2024-01-01T00:00:00+00:00',
+                            'committer_email': 'committer@example.com',
+                            'committer_name': 'Committer',
+                            'diff': SimpleUploadedFile(
+                                'diff', self._COMMIT_DIFF,
+                                content_type='text/x-patch'),
+                            'parent_id': parent_id,
+                            'process_async': True,
+                        },
+                        expected_status=202,
+                        expected_mimetype=draft_diffcommit_item_mimetype)
+
+                    self.assertEqual(rsp['diff_upload']['upload_type'],
+                                     'commit')
+
+            self.assertFalse(DiffCommit.objects.exists())
+
+            # The first commit is processed before the second.
+            self.assertEqual(process_diff_uploads(max_uploads=1), 1)
+
+            upload1, upload2 = DiffUpload.objects.all()
+            self.assertEqual(upload1.status, DiffUpload.STATUS_DONE)
+            self.assertEqual(upload1.diffcommit.commit_id, 'r1')
+            self.assertEqual(upload1.diffset, diffset)
+            self.assertEqual(upload2.status, DiffUpload.STATUS_PENDING)
+
+            # The second commit has no validation info for the first, so it
+            # fails just as it would if processed immediately.
+            self.assertEqual(process_diff_uploads(), 1)
+
+            upload2.refresh_from_db()
+            self.assertEqual(upload2.status, DiffUpload.STATUS_FAILED)
+            self.assertIn('validation_info', upload2.error_data['fields'])
+            self.assertEqual(
+                list(diffset.commits.values_list('commit_id', flat=True)),
+                ['r1'])
+
+    def _build_diff_post_data(self) -> dict:
+        """Return data for uploading a diff in the background.
+
+        Returns:
+            dict:
+            The data to post.
+        """
+        return {
+            'base_commit_id': '1234',
+            'basedir': '/trunk',
+            'path': SimpleUploadedFile('diff',
+                                       self.DEFAULT_GIT_README_DIFF,
+                                       content_type='text/x-patch'),
+            'process_async': True,
+        }
+
+    def _create_review_request(self):
+        """Create a review request owned by the test user.
+
+        Returns:
+            reviewboard.reviews.models.ReviewRequest:
+            The new review request.
+        """
+        return self.create_review_request(
+            repository=self.create_repository(tool_name='Test'),
+            submitter=self.user)
+
+    def _create_upload(self, review_request) -> DiffUpload:
+        """Create a pending diff upload.
+
+        Args:
+            review_request (reviewboard.reviews.models.ReviewRequest):
+                The review request for the upload.
+
+        Returns:
+            reviewboard.reviews.models.DiffUpload:
+            The new upload.
+        """
+        return DiffUpload.objects.create(
+            review_request=review_request,
+            user=review_request.submitter,
+            upload_type=DiffUpload.TYPE_DIFF,
+            form_data={},
+            extra_fields={},
+            diff_name='diff',
+            diff_data=self.DEFAULT_GIT_README_DIFF)
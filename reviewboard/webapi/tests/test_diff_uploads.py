@@ -0,0 +1,226 @@
+"""Unit tests for reviewboard.webapi.diff_uploads.
+
+Version Added:
+    8.0
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import kgb
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+
+from reviewboard.reviews.models import DiffUpload
+from reviewboard.testing import TestCase
+from reviewboard.webapi import diff_uploads
+from reviewboard.webapi.diff_uploads import (LEASE_SECS,
+                                             get_diff_upload_stats,
+                                             process_diff_uploads,
+                                             prune_diff_uploads,
+                                             queue_diff_upload)
+
+
+class DiffUploadProcessingTests(kgb.SpyAgency, TestCase):
+    """Unit tests for processing diff uploads in the background.
+
+    Version Added:
+        8.0
+    """
+
+    fixtures = ['test_users', 'test_scmtools']
+
+    def test_queue_with_local(self) -> None:
+        """Testing queue_diff_upload with
+        diffviewer_upload_processing_mode=local
+        """
+        self.spy_on(diff_uploads._local_runner.start,
+                    call_original=False)
+
+        review_request = self.create_review_request(create_repository=True)
+
+        with self.siteconfig_settings(
+            {'diffviewer_upload_processing_mode': 'local'},
+            reload_settings=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                upload = queue_diff_upload(
+                    review_request=review_request,
+                    user=review_request.submitter,
+                    upload_type=DiffUpload.TYPE_DIFF,
+                    form_data=MultiValueDict({
+                        'basedir': ['/'],
+                    }),
+                    files=MultiValueDict({
+                        'path': [SimpleUploadedFile('my.diff', b'diff')],
+                        'parent_diff_path': [
+                            SimpleUploadedFile('parent.diff', b'parent'),
+                        ],
+                    }))
+
+        self.assertSpyCalledOnce(diff_uploads._local_runner.start)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, DiffUpload.STATUS_PENDING)
+        self.assertEqual(upload.form_data, {'basedir': ['/']})
+        self.assertEqual(upload.diff_name, 'my.diff')
+        self.assertEqual(bytes(upload.diff_data), b'diff')
+        self.assertEqual(upload.parent_diff_name, 'parent.diff')
+        self.assertEqual(bytes(upload.parent_diff_data), b'parent')
+
+    def test_process_in_order_per_review_request(self) -> None:
+        """Testing process_diff_uploads processes uploads for a review
+        request one at a time, in order
+        """
+        processed = []
+
+        @self.spy_for(diff_uploads._process_upload)
+        def _process_upload(upload_id):
+            processed.append(upload_id)
+
+            # Later uploads for this review request must wait for this to
+            # finish.
+            self.assertIsNone(diff_uploads._claim_next_upload())
+
+            DiffUpload.objects.filter(pk=upload_id).update(
+                status=DiffUpload.STATUS_DONE)
+
+        review_request = self.create_review_request(create_repository=True)
+        upload1 = self._create_upload(review_request)
+        upload2 = self._create_upload(review_request)
+
+        self.assertEqual(process_diff_uploads(), 2)
+        self.assertEqual(processed, [upload1.pk, upload2.pk])
+
+    def test_process_skips_busy_review_requests(self) -> None:
+        """Testing process_diff_uploads skips review requests with an upload
+        already being processed
+        """
+        self.spy_on(diff_uploads._process_upload, call_original=False)
+
+        review_request1 = self.create_review_request(create_repository=True)
+        review_request2 = self.create_review_request(
+            repository=review_request1.repository)
+
+        self._create_upload(review_request1,
+                            status=DiffUpload.STATUS_PROCESSING,
+                            started=timezone.now())
+        self._create_upload(review_request1)
+        upload = self._create_upload(review_request2)
+
+        self.assertEqual(process_diff_uploads(), 1)
+        self.assertSpyCalledWith(diff_uploads._process_upload, upload.pk)
+
+    def test_process_requeues_expired_uploads(self) -> None:
+        """Testing process_diff_uploads re-processes uploads whose lease has
+        expired
+        """
+        self.spy_on(diff_uploads._process_upload, call_original=False)
+
+        review_request = self.create_review_request(create_repository=True)
+        now = timezone.now()
+        upload = self._create_upload(
+            review_request,
+            status=DiffUpload.STATUS_PROCESSING,
+            started=now - timedelta(seconds=LEASE_SECS + 60),
+            lease_expires=now - timedelta(seconds=1))
+
+        self.assertEqual(process_diff_uploads(), 1)
+        self.assertSpyCalledWith(diff_uploads._process_upload, upload.pk)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, DiffUpload.STATUS_PROCESSING)
+        self.assertGreater(upload.started, now - timedelta(seconds=1))
+        self.assertGreater(upload.lease_expires, now)
+
+    def test_process_keeps_leased_uploads(self) -> None:
+        """Testing process_diff_uploads leaves long-running uploads alone
+        while their lease is held
+        """
+        self.spy_on(diff_uploads._process_upload, call_original=False)
+
+        review_request = self.create_review_request(create_repository=True)
+        now = timezone.now()
+        upload = self._create_upload(
+            review_request,
+            status=DiffUpload.STATUS_PROCESSING,
+            started=now - timedelta(hours=2),
+            lease_expires=now + timedelta(seconds=LEASE_SECS))
+
+        self.assertEqual(process_diff_uploads(), 0)
+        self.assertSpyNotCalled(diff_uploads._process_upload)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, DiffUpload.STATUS_PROCESSING)
+
+    def test_process_with_max_uploads(self) -> None:
+        """Testing process_diff_uploads with max_uploads"""
+        self.spy_on(diff_uploads._process_upload, call_original=False)
+
+        repository = self.create_repository()
+
+        for i in range(3):
+            self._create_upload(
+                self.create_review_request(repository=repository))
+
+        self.assertEqual(process_diff_uploads(max_uploads=2), 2)
+        self.assertEqual(
+            DiffUpload.objects.filter(
+                status=DiffUpload.STATUS_PENDING).count(),
+            1)
+
+    def test_get_stats_and_prune(self) -> None:
+        """Testing get_diff_upload_stats and prune_diff_uploads"""
+        review_request = self.create_review_request(create_repository=True)
+        old = timezone.now() - timedelta(days=10)
+
+        self._create_upload(review_request,
+                            status=DiffUpload.STATUS_DONE,
+                            created=old)
+        self._create_upload(review_request,
+                            status=DiffUpload.STATUS_FAILED,
+                            created=old)
+        pending = self._create_upload(review_request,
+                                      created=old)
+
+        self.assertEqual(get_diff_upload_stats(), {
+            'done': 1,
+            'failed': 1,
+            'oldest_pending': pending.created,
+            'pending': 1,
+            'processing': 0,
+        })
+
+        self.assertEqual(
+            prune_diff_uploads(older_than=timezone.now() - timedelta(days=7)),
+            2)
+        self.assertQuerySetEqual(DiffUpload.objects.all(), [pending])
+
+    def _create_upload(
+        self,
+        review_request,
+        **kwargs,
+    ) -> DiffUpload:
+        """Create a diff upload.
+
+        Args:
+            review_request (reviewboard.reviews.models.ReviewRequest):
+                The review request for the upload.
+
+            **kwargs (dict):
+                Additional fields to set on the upload.
+
+        Returns:
+            reviewboard.reviews.models.DiffUpload:
+            The new upload.
+        """
+        return DiffUpload.objects.create(
+            review_request=review_request,
+            user=review_request.submitter,
+            upload_type=DiffUpload.TYPE_DIFF,
+            form_data={},
+            extra_fields={},
+            diff_name='diff',
+            diff_data=b'diff',
+            **kwargs)
@@ -16,7 +16,7 @@ from reviewboard.diffviewer.commit_utils import (serialize_validation_info,
                                                  update_validation_info)
 from reviewboard.diffviewer.features import dvcs_feature
 from reviewboard.diffviewer.models import DiffSet, FileDiff
-from reviewboard.reviews.models import DefaultReviewer
+from reviewboard.reviews.models import DefaultReviewer, DiffUpload
 from reviewboard.reviews.signals import review_request_diffset_uploaded
 from reviewboard.scmtools.models import Repository
 from reviewboard.webapi.errors import DIFF_TOO_BIG
@@ -507,6 +507,59 @@ class ResourceItemTests(kgb.SpyAgency, ExtraDataItemMixin, BaseWebAPITestCase,
             self.assertEqual(rsp['stat'], 'ok')
             self.compare_item(rsp['diff'], diffset)
 
+    @webapi_test_template
+    def test_put_finalize_with_unfinished_uploads(self):
+        """Testing the PUT <URL> API with finalize_commit_series=1 while
+        commits are being processed in the background
+        """
+        with override_feature_check(dvcs_feature.feature_id, enabled=True):
+            review_request = self.create_review_request(
+                create_repository=True,
+                create_with_history=True,
+                submitter=self.user)
+            diffset = self.create_diffset(review_request=review_request,
+                                          draft=True)
+            commit = self.create_diffcommit(diffset=diffset)
+
+            DiffUpload.objects.create(
+                review_request=review_request,
+                user=self.user,
+                upload_type=DiffUpload.TYPE_COMMIT,
+                form_data={},
+                extra_fields={},
+                diff_data=b'',
+                diffset=diffset)
+
+            filediff = FileDiff.objects.get()
+
+            cumulative_diff = SimpleUploadedFile('diff', filediff.diff,
+                                                 content_type='text/x-patch')
+
+            validation_info = update_validation_info(
+                {},
+                commit_id=commit.commit_id,
+                parent_id=commit.parent_id,
+                filediffs=[filediff])
+
+            rsp = self.api_put(
+                get_draft_diff_item_url(review_request, diffset.revision),
+                {
+                    'finalize_commit_series': True,
+                    'cumulative_diff': cumulative_diff,
+                    'validation_info': serialize_validation_info(
+                        validation_info),
+                },
+                expected_status=400)
+
+        self.assertEqual(rsp['stat'], 'fail')
+        self.assertEqual(rsp['err']['code'], INVALID_ATTRIBUTE.code)
+        self.assertEqual(
+            rsp['reason'],
+            'Commits uploaded to this diff are still being processed.')
+
+        diffset.refresh_from_db()
+        self.assertFalse(diffset.is_commit_series_finalized)
+
     @webapi_test_template
     def test_put_finalized_with_parent(self):
         """Testing the PUT <URL> API with finalize_commit_series=1 and a parent
@@ -324,6 +324,12 @@ class ResourceTests(BaseWebAPITestCase, metaclass=BasicTestsMetaclass):
             'review_request_changes':
                 'http://testserver/api/review-requests/{review_request_id}/'
                 'changes/',
+            'review_request_diff_upload':
+                'http://testserver/api/review-requests/{review_request_id}/'
+                'diff-uploads/{diff_upload_id}/',
+            'review_request_diff_uploads':
+                'http://testserver/api/review-requests/{review_request_id}/'
+                'diff-uploads/',
             'review_request_draft':
                 'http://testserver/api/review-requests/{review_request_id}/'
                 'draft/',
@@ -443,6 +449,7 @@ class ResourceTests(BaseWebAPITestCase, metaclass=BasicTestsMetaclass):
         self.assertIn('diffs', caps)
 
         diffs_caps = caps['diffs']
+        self.assertFalse(diffs_caps['async_processing'])
         self.assertTrue(diffs_caps['moved_files'])
         self.assertTrue(diffs_caps['base_commit_ids'])
 
@@ -110,6 +110,23 @@ def get_diff_item_url(review_request, diff_revision, local_site_name=None):
         diff_revision=diff_revision)
 
 
+#
+# DiffUploadResource
+#
+def get_diff_upload_list_url(review_request, local_site_name=None):
+    return resources.diff_upload.get_list_url(
+        local_site_name=local_site_name,
+        review_request_id=review_request.display_id)
+
+
+def get_diff_upload_item_url(review_request, diff_upload_id,
+                             local_site_name=None):
+    return resources.diff_upload.get_item_url(
+        local_site_name=local_site_name,
+        review_request_id=review_request.display_id,
+        diff_upload_id=diff_upload_id)
+
+
 #
 # DiffCommitResource
 #